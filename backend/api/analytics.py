@@ -0,0 +1,66 @@
+"""
+Exercise Analytics API
+Serves per-exercise progress trends (top set, volume, estimated 1RM)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date, timedelta
+from typing import Optional
+import logging
+
+from ..models import ExerciseSeriesListResponse, ExerciseTrendResponse
+from ..services.exercise_analytics import exercise_analytics_service, METRICS, PERIODS
+from ..api.dependencies import require_auth
+
+router = APIRouter(prefix="/api/v3/analytics", tags=["Analytics"])
+logger = logging.getLogger(__name__)
+
+
+@router.get("/exercises", response_model=ExerciseSeriesListResponse)
+async def list_tracked_exercises(user_id: str = Depends(require_auth)):
+    """List exercises with trend data, most recently trained first"""
+    try:
+        exercises = await exercise_analytics_service.list_exercises(user_id)
+        return ExerciseSeriesListResponse(exercises=exercises)
+    except Exception as e:
+        logger.error(f"Error listing analytics exercises: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error listing exercises: {str(e)}")
+
+
+@router.get("/exercises/{exercise_name}", response_model=ExerciseTrendResponse)
+async def get_exercise_trend(
+    exercise_name: str,
+    period: str = Query("week", description="Bucket size: day, week or month"),
+    days: Optional[int] = Query(365, ge=1, le=3650, description="Look back this many days (ignored when start is set)"),
+    start: Optional[date] = Query(None, description="First day to include"),
+    end: Optional[date] = Query(None, description="Last day to include"),
+    metric: str = Query("e1rm", description="Metric for the moving average: top_weight, e1rm, volume or sets"),
+    moving_average: Optional[int] = Query(None, ge=2, le=52, description="Moving average window, in buckets"),
+    user_id: str = Depends(require_auth)
+):
+    """
+    Trend for one exercise, rolled up by day/week/month.
+    Served from a single analytics doc per exercise.
+    """
+    if period not in PERIODS:
+        raise HTTPException(status_code=400, detail=f"period must be one of: {', '.join(PERIODS)}")
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(METRICS)}")
+
+    try:
+        if start is None and days:
+            start = (end or date.today()) - timedelta(days=days)
+
+        trend = await exercise_analytics_service.get_trend(
+            user_id, exercise_name, period=period, start=start, end=end,
+            moving_average_window=moving_average, metric=metric
+        )
+        if trend is None:
+            raise HTTPException(status_code=404, detail="No history for this exercise")
+        return ExerciseTrendResponse(**trend)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting exercise trend: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error getting exercise trend: {str(e)}")
@@ -45,15 +45,13 @@ async def trigger_daily_workout(
         sys.path.insert(0, str(project_root))
 
         from backend.scripts.add_daily_workout import generate_workout
-        from backend.config.firebase_config import get_firebase_app
-        from firebase_admin import firestore
+        from backend.config.firebase_config import firestore
+        from backend.services.firestore_clients import firestore_clients
         import secrets
 
-        app = get_firebase_app()
-        if not app:
+        db = firestore_clients.client()
+        if db is None:
             raise HTTPException(status_code=500, detail="Firebase not available")
-
-        db = firestore.client(app=app)
         collection = db.collection('public_workouts')
 
         results = []
@@ -134,14 +132,11 @@ async def cleanup_demo_accounts(
 
     try:
         from backend.services.demo_provisioner import cleanup_expired_demo_users
-        from backend.config.firebase_config import get_firebase_app
-        from firebase_admin import firestore
+        from backend.services.firestore_clients import firestore_clients
 
-        app = get_firebase_app()
-        if not app:
+        db = firestore_clients.client()
+        if db is None:
             raise HTTPException(status_code=500, detail="Firebase not available")
-
-        db = firestore.client(app=app)
         result = cleanup_expired_demo_users(db)
 
         logger.info(f"Demo cleanup: deleted {result['deleted']} accounts")
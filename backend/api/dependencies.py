@@ -18,18 +18,23 @@ from ..middleware.auth import get_current_user, get_current_user_optional, extra
 
 # Service Dependencies
 
-# Create global service instances (singletons)
-_data_service = DataService()
+# Lazy singletons: built on first request, not when the routers are imported
+_data_service = None
+_document_service = None
 
 def get_data_service() -> DataService:
     """Get local data service instance"""
+    global _data_service
+    if _data_service is None:
+        _data_service = DataService()
     return _data_service
 
 
-_document_service = DocumentServiceV2()
-
 def get_document_service() -> DocumentServiceV2:
     """Get document service instance"""
+    global _document_service
+    if _document_service is None:
+        _document_service = DocumentServiceV2()
     return _document_service
 
 
@@ -82,7 +87,7 @@ async def get_storage_service(
         }
     else:
         return {
-            'service': _data_service,
+            'service': get_data_service(),
             'user_id': None,
             'mode': 'local'
         }
@@ -9,6 +9,7 @@ from pathlib import Path
 from ..models import WorkoutData
 from ..api.dependencies import get_document_service
 from ..services.v2.document_service_v2 import DocumentServiceV2
+from ..services.v2.template_registry import template_registry
 
 router = APIRouter(prefix="/api", tags=["Documents"])
 
@@ -37,6 +38,12 @@ async def list_templates():
         raise HTTPException(status_code=500, detail=f"Error listing V2 templates: {str(e)}")
 
 
+@router.get("/templates/render-stats")
+async def get_template_render_stats():
+    """Per-template render-time histograms from the shared template registry"""
+    return template_registry.get_stats()
+
+
 @router.post("/preview-html")
 async def preview_html(
     workout_data: WorkoutData,
@@ -3,16 +3,20 @@ Exercise Database Management
 Handles global exercise database and user custom exercises
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from typing import Optional
 from datetime import datetime
-from firebase_admin import firestore
+from ..services.firestore_clients import firestore_clients
 import logging
 from ..models import (
     Exercise, CreateExerciseRequest,
-    ExerciseListResponse
+    ExerciseListResponse,
+    ExerciseResolveRequest, ExerciseResolveResponse, ExerciseResolution, ExerciseCandidate,
+    BulkAutoCreateRequest, BulkAutoCreateResponse
 )
+from ..services.exercise_resolver import AUTO_MATCH_SCORE
 from ..api.dependencies import get_exercise_service, require_auth
+from ..services.exercise_catalog_snapshot import SNAPSHOT_MEDIA_TYPE
 
 router = APIRouter(prefix="/api/v3", tags=["Exercises"])
 logger = logging.getLogger(__name__)
@@ -25,7 +29,9 @@ async def get_exercise_metadata():
     Frontend uses this to determine if cached data is stale.
     """
     try:
-        db = firestore.client()
+        db = firestore_clients.client()
+        if db is None:
+            raise RuntimeError("Firebase not initialized")
         
         metadata_ref = db.collection("exercises_metadata").document("global")
         doc = metadata_ref.get()
@@ -37,6 +43,7 @@ async def get_exercise_metadata():
                 "lastUpdated": data.get("lastUpdated"),
                 "exerciseCount": data.get("exerciseCount", 0),
                 "checksum": data.get("checksum"),
+                "snapshot": data.get("snapshot"),
                 "status": "ok"
             }
         
@@ -66,6 +73,42 @@ async def get_exercise_metadata():
         }
 
 
+@router.get("/exercises/snapshot")
+async def get_exercise_snapshot(
+    request: Request,
+    exercise_service = Depends(get_exercise_service)
+):
+    """
+    The whole global catalog as one compact, cacheable blob (gzip-encoded
+    columnar JSON, see services/exercise_catalog_snapshot.py). The ETag is
+    the snapshot checksum, so unchanged catalogs revalidate with a 304.
+    """
+    try:
+        snapshot = exercise_service.get_catalog_snapshot()
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="Exercise catalog snapshot not available")
+
+        headers = {
+            "ETag": f'"{snapshot.checksum}"',
+            "Cache-Control": "public, max-age=300",
+            "X-Catalog-Version": str(snapshot.version),
+        }
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+
+        return Response(
+            content=snapshot.blob,
+            media_type=SNAPSHOT_MEDIA_TYPE,
+            headers={**headers, "Content-Encoding": "gzip"},
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error serving exercise snapshot: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error serving exercise snapshot: {str(e)}")
+
+
 @router.get("/exercises", response_model=ExerciseListResponse)
 async def get_all_exercises(
     page: int = Query(1, ge=1),
@@ -85,6 +128,37 @@ async def get_all_exercises(
         raise HTTPException(status_code=500, detail=f"Error retrieving exercises: {str(e)}")
 
 
+@router.post("/exercises/resolve", response_model=ExerciseResolveResponse)
+async def resolve_exercise_names(
+    request: ExerciseResolveRequest,
+    user_id: str = Depends(require_auth),
+    exercise_service = Depends(get_exercise_service)
+):
+    """
+    Resolve free-text exercise names (typo-tolerant) against the global
+    catalog and the user's custom exercises, in one call for a whole workout
+    """
+    try:
+        resolved = exercise_service.resolve_exercise_names(request.names, user_id, limit=request.limit)
+
+        results = []
+        for name in request.names:
+            candidates = [
+                ExerciseCandidate(exercise=exercise, score=score, source=source)
+                for exercise, score, source in resolved.get(name, [])
+            ]
+            match = candidates[0].exercise if candidates and candidates[0].score >= AUTO_MATCH_SCORE else None
+            results.append(ExerciseResolution(query=name, match=match, candidates=candidates))
+
+        return ExerciseResolveResponse(results=results)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error resolving exercise names: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error resolving exercise names: {str(e)}")
+
+
 @router.get("/exercises/{exercise_id}", response_model=Exercise)
 async def get_exercise(
     exercise_id: str,
@@ -212,4 +286,22 @@ async def auto_create_custom_exercise(
         raise
     except Exception as e:
         logger.error(f"Error auto-creating custom exercise: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error auto-creating custom exercise: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error auto-creating custom exercise: {str(e)}")
+
+
+@router.post("/exercises/auto-create/bulk", response_model=BulkAutoCreateResponse)
+async def auto_create_custom_exercises(
+    request: BulkAutoCreateRequest,
+    user_id: str = Depends(require_auth),
+    exercise_service = Depends(get_exercise_service)
+):
+    """Auto-create custom exercises for every unmatched name in a workout, returning existing ones for the rest"""
+    try:
+        exercises = exercise_service.auto_create_or_get_custom_exercises(user_id, request.names)
+        return BulkAutoCreateResponse(exercises=exercises)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error auto-creating custom exercises: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error auto-creating custom exercises: {str(e)}")
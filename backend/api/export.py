@@ -4,12 +4,16 @@ Handles workout exports: text, image, and printable PDF formats
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import PlainTextResponse, FileResponse
+from fastapi.responses import PlainTextResponse, FileResponse, Response, StreamingResponse
 from typing import Optional
+import asyncio
+import io
 import logging
 
-from ..models import WorkoutTemplate
+from ..models import WorkoutTemplate, BatchExportRequest
 from ..services.export_service import ExportService
+from ..services.batch_export_service import BatchExportService
+from ..services.docx_export_service import DOCX_MIME_TYPE
 from ..services.firestore_data_service import firestore_data_service
 from ..middleware.auth import get_current_user_optional, extract_user_id
 
@@ -18,6 +22,10 @@ logger = logging.getLogger(__name__)
 
 # Initialize export service
 export_service = ExportService()
+batch_export_service = BatchExportService(export_service)
+
+# Hard cap on parts per batch request (workout_ids + program workouts)
+MAX_BATCH_EXPORT_WORKOUTS = 100
 
 
 @router.get("/text/{workout_id}", response_class=PlainTextResponse)
@@ -153,6 +161,118 @@ async def export_workout_print(
         raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
 
 
+@router.post("/docx/{workout_id}")
+async def export_workout_docx(
+    workout_id: str,
+    current_user: Optional[dict] = Depends(get_current_user_optional)
+):
+    """
+    Export workout as an editable Word gym log (.docx).
+    Rendered off the event loop in the DOCX worker pool and streamed from memory.
+    """
+    user_id = extract_user_id(current_user)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    # Get workout
+    workout = await firestore_data_service.get_workout(user_id, workout_id)
+    if not workout:
+        raise HTTPException(status_code=404, detail="Workout not found")
+
+    try:
+        docx_bytes = await export_service.generate_docx_bytes(workout)
+    except Exception as e:
+        logger.error(f"Error generating docx export: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate Word document: {str(e)}")
+
+    safe_name = workout.name.replace(' ', '_').replace('/', '-')[:30]
+    return StreamingResponse(
+        io.BytesIO(docx_bytes),
+        media_type=DOCX_MIME_TYPE,
+        headers={
+            "Content-Disposition": f'attachment; filename="workout_{safe_name}.docx"',
+            "Content-Length": str(len(docx_bytes))
+        }
+    )
+
+
+@router.post("/batch")
+async def export_workouts_batch(
+    request: BatchExportRequest,
+    current_user: Optional[dict] = Depends(get_current_user_optional)
+):
+    """
+    Export many workouts (or every workout in a program) in one request.
+    PDF formats with merge=true return a single merged PDF; everything else
+    streams a ZIP archive whose entries are added as each render finishes.
+    """
+    user_id = extract_user_id(current_user)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    workout_ids = list(request.workout_ids)
+    archive_name = "workouts"
+    if request.program_id:
+        program = await firestore_data_service.get_program(user_id, request.program_id)
+        if not program:
+            raise HTTPException(status_code=404, detail="Program not found")
+        archive_name = program.name.replace(' ', '_').replace('/', '-')[:40]
+        workout_ids.extend(pw.workout_id for pw in sorted(program.workouts, key=lambda pw: pw.order_index))
+        workout_ids.extend(entry.workout_id for entry in program.schedule)
+
+    # Each workout is rendered once, in first-seen order
+    workout_ids = list(dict.fromkeys(workout_ids))
+    if not workout_ids:
+        raise HTTPException(status_code=400, detail="No workouts to export")
+    if len(workout_ids) > MAX_BATCH_EXPORT_WORKOUTS:
+        raise HTTPException(status_code=400, detail=f"Batch export is limited to {MAX_BATCH_EXPORT_WORKOUTS} workouts")
+
+    found = await firestore_data_service.get_workouts_by_ids(user_id, workout_ids)
+    workouts = [found[workout_id] for workout_id in workout_ids if workout_id in found]
+    missing = [workout_id for workout_id in workout_ids if workout_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Workouts not found: {', '.join(missing)}")
+
+    uses_weights = request.include_weights and request.format != "docx"
+    weights_by_workout = None
+    if uses_weights:
+        weights_by_workout = await firestore_data_service.get_exercise_histories_for_workouts(
+            user_id, [workout.id for workout in workouts]
+        )
+
+    # One Gotenberg client (and one health check) for the whole batch
+    client = None
+    if request.format != "docx":
+        from ..services.v2.gotenberg_client import GotenbergClient
+        client = await asyncio.to_thread(GotenbergClient)
+        if not client.available:
+            raise HTTPException(status_code=503, detail="Gotenberg service is not available")
+
+    logger.info(f"Batch export of {len(workouts)} workouts as {request.format} for user {user_id}")
+
+    if request.merge and request.format in ("simple", "log"):
+        try:
+            merged_pdf, failed = await batch_export_service.render_merged_pdf(
+                client, workouts, request.format, uses_weights, weights_by_workout
+            )
+        except Exception as e:
+            logger.error(f"Error generating batch PDF export: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to generate batch PDF: {str(e)}")
+
+        headers = {"Content-Disposition": f'attachment; filename="{archive_name}.pdf"'}
+        if failed:
+            headers["X-Export-Failed"] = ",".join(failed)
+        return Response(content=merged_pdf, media_type="application/pdf", headers=headers)
+
+    return StreamingResponse(
+        batch_export_service.stream_zip(
+            client, workouts, request.format, uses_weights, weights_by_workout
+        ),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{archive_name}_{request.format}.zip"'}
+    )
+
+
 @router.get("/video-base64/{filename}")
 async def get_video_as_base64(filename: str):
     """Return a tutorial video as base64 for n8n Twitter upload workflow."""
@@ -178,8 +298,11 @@ async def get_export_status():
     client = GotenbergClient()
     gotenberg_available = client.is_available()
 
+    from ..services.docx_export_service import docx_export_service
+
     return {
         "text_export": True,  # Always available
+        "docx_export": docx_export_service.is_available(),
         "image_export": gotenberg_available,
         "print_export": gotenberg_available,
         "gotenberg_status": "available" if gotenberg_available else "unavailable"
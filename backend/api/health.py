@@ -7,31 +7,46 @@ from fastapi import APIRouter
 from pathlib import Path
 from ..services.firebase_service import firebase_service
 from ..services.auth_service import auth_service
-from ..services.v2.document_service_v2 import DocumentServiceV2
+from ..services.worker_status import worker_status
+from ..services.startup_timing import startup_timing
+from ..services.firestore_clients import firestore_clients
+from ..config.logging_config import log_pipeline
+from .dependencies import get_document_service
 
 router = APIRouter(prefix="/api", tags=["Health"])
 
 
 @router.get("/health")
 async def health_check():
-    """Basic health check endpoint"""
-    firebase_status = "available" if firebase_service.is_available() else "unavailable"
-    auth_status = "available" if auth_service.is_available() else "unavailable"
+    """Basic health check endpoint (never waits for Firebase to connect)"""
+    firebase_status = _status(firebase_service)
+    auth_status = _status(auth_service)
     
     return {
         "status": "healthy",
         "message": "Fitness Field Notes API is running",
         "version": "v3",
         "firebase_status": firebase_status,
-        "auth_status": auth_status
+        "auth_status": auth_status,
+        "worker": worker_status.to_dict(),
+        "startup": startup_timing.to_dict(),
+        "firestore": firestore_clients.stats(),
+        "logging": log_pipeline.stats.to_dict()
     }
 
 
+def _status(service) -> str:
+    """available/unavailable, or initializing while the startup warm-up hasn't reached it"""
+    if not service.initialized:
+        return "initializing"
+    return "available" if service.is_available() else "unavailable"
+
+
 @router.get("/status")
 async def v3_status():
     """Get V3 system status including all services"""
     try:
-        document_service = DocumentServiceV2()
+        document_service = get_document_service()
         gotenberg_available = document_service.is_gotenberg_available()
         firebase_available = firebase_service.is_available()
         auth_available = auth_service.is_available()
@@ -0,0 +1,93 @@
+"""
+Prometheus Metrics Endpoint
+Exposes this worker's request and Firestore usage totals in the Prometheus
+text format. Counters are per worker process; every series carries a worker
+label, so sum across workers (and replicas) in the query.
+Set METRICS_TOKEN to require "Authorization: Bearer <token>".
+"""
+
+import hmac
+import os
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from ..services.firestore_clients import firestore_clients
+from ..services.firestore_usage import BACKGROUND_ROUTE, usage_stats
+from ..services.worker_status import worker_status
+
+router = APIRouter(tags=["Metrics"])
+
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (metric, type, help, RouteTotals field)
+ROUTE_METRICS = (
+    ("http_requests_total", "counter", "Requests served", "requests"),
+    ("http_request_errors_total", "counter", "Requests answered with a 5xx status", "server_errors"),
+    ("http_request_duration_seconds_total", "counter", "Time spent serving requests", "seconds"),
+    ("firestore_document_reads_total", "counter", "Firestore documents read", "reads"),
+    ("firestore_document_writes_total", "counter", "Firestore documents written", "writes"),
+    ("firestore_document_deletes_total", "counter", "Firestore documents deleted", "deletes"),
+    ("firestore_rpcs_total", "counter", "Firestore RPCs made", "rpcs"),
+    ("firestore_rpc_duration_seconds_total", "counter", "Time spent in Firestore RPCs", "rpc_seconds"),
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _family(lines: List[str], name: str, kind: str, help_text: str, samples: Dict[str, float]) -> None:
+    """Append one metric family: label string -> value"""
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples.items():
+        lines.append(f"{name}{labels} {value}")
+
+
+def render_metrics() -> str:
+    worker = str(worker_status.worker_id)
+    lines: List[str] = []
+
+    routes = usage_stats.routes()
+    for name, kind, help_text, field in ROUTE_METRICS:
+        _family(lines, name, kind, help_text, {
+            _labels(worker=worker, route=route): getattr(totals, field)
+            for route, totals in sorted(routes.items())
+            # The background bucket only has Firestore usage, no requests
+            if not (name.startswith("http_") and route == BACKGROUND_ROUTE)
+        })
+
+    methods = firestore_clients.metrics.methods()
+    method_labels = {method: _labels(worker=worker, method=method) for method in sorted(methods)}
+    _family(lines, "firestore_rpc_calls_total", "counter", "Firestore RPCs completed, by method",
+            {labels: methods[method][0] for method, labels in method_labels.items()})
+    _family(lines, "firestore_rpc_errors_total", "counter", "Firestore RPCs that failed, by method",
+            {labels: methods[method][1] for method, labels in method_labels.items()})
+    _family(lines, "firestore_rpc_method_seconds_total", "counter", "Time spent in Firestore RPCs, by method",
+            {labels: methods[method][2] for method, labels in method_labels.items()})
+
+    rpc = firestore_clients.metrics
+    _family(lines, "firestore_rpcs_in_flight", "gauge", "Firestore RPCs currently in flight",
+            {_labels(worker=worker): rpc.in_flight})
+    _family(lines, "firestore_rpcs_in_flight_peak", "gauge", "Most Firestore RPCs in flight at once since the worker started",
+            {_labels(worker=worker): rpc.peak_in_flight})
+
+    return "\n".join(lines) + "\n"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus scrape endpoint for this worker"""
+    if METRICS_TOKEN:
+        expected = f"Bearer {METRICS_TOKEN}"
+        if not authorization or not hmac.compare_digest(authorization, expected):
+            raise HTTPException(status_code=403, detail="Invalid metrics token")
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
@@ -4,6 +4,8 @@ Handles data migration and unified data operations
 """
 
 from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import StreamingResponse
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 import logging
 from ..models import (
@@ -13,6 +15,7 @@ from ..models import (
 )
 from ..services.unified_data_service import unified_data_service
 from ..services.migration_service import migration_service
+from ..services.history_export_service import history_export_service, NDJSON_MEDIA_TYPE
 from ..middleware.auth import get_current_user_optional, get_current_user, extract_user_id
 
 # Set up logging
@@ -383,6 +386,23 @@ async def get_migration_status(
         logger.error(f"Error getting migration status: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error getting migration status: {str(e)}")
 
+@router.get("/migration/progress")
+async def get_migration_progress(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Get chunk-level progress of the current user's latest migration"""
+    try:
+        user_id = extract_user_id(current_user)
+        if not user_id:
+            raise HTTPException(status_code=401, detail="User ID not found")
+        
+        return await migration_service.get_migration_progress(user_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting migration progress: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error getting migration progress: {str(e)}")
+
 @router.get("/migration/eligibility")
 async def check_migration_eligibility(
     current_user: Dict[str, Any] = Depends(get_current_user)
@@ -558,4 +578,33 @@ async def backup_user_data(
         return result
     except Exception as e:
         logger.error(f"Error backing up user data: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error creating backup: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error creating backup: {str(e)}")
+
+
+@router.get("/user/data/export")
+async def export_user_history(
+    gzip: bool = Query(False, description="Gzip-compress the NDJSON stream"),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Stream the user's complete training history as NDJSON.
+    Every subcollection is paged with cursors, so memory use is flat regardless of history size.
+    """
+    user_id = extract_user_id(current_user)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="User ID not found")
+    if not history_export_service.is_available():
+        raise HTTPException(status_code=503, detail="Firestore not available")
+
+    filename = f"ghost_gym_history_{datetime.now().strftime('%Y%m%d')}.ndjson"
+    if gzip:
+        return StreamingResponse(
+            history_export_service.iter_ndjson_gzip(user_id),
+            media_type="application/gzip",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.gz"'}
+        )
+    return StreamingResponse(
+        history_export_service.iter_ndjson(user_id),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
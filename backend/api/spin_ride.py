@@ -5,17 +5,23 @@ AI-generated spin bike interval workouts with structured ride plans.
 
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, Any
+import asyncio
 import logging
 import os
 
 from ..models.spin_ride import GenerateSpinRideRequest, SpinRidePlan
 from ..services.spin_ride_generator import get_spin_ride_generator
+from ..services.spin_ride_local_generator import get_local_spin_ride_generator
+from ..services.plan_library import get_spin_ride_library, spin_ride_key
 from ..services.ai_rate_limiter import ai_rate_limiter
 from ..middleware.auth import get_current_user, extract_user_id
 
 router = APIRouter(prefix="/api/v3/spin-ride", tags=["Spin Ride"])
 logger = logging.getLogger(__name__)
 
+# engine="auto" stops waiting on Gemini after this long and builds the ride locally
+SPIN_RIDE_MODEL_TIMEOUT_SECONDS = float(os.getenv("SPIN_RIDE_MODEL_TIMEOUT_SECONDS", "20"))
+
 
 def _check_ai_rate_limit(user_id: str):
     """Check AI rate limit. Raises 429 if exceeded."""
@@ -35,6 +41,8 @@ async def spin_ride_status():
     return {
         "available": generator.is_available(),
         "gemini_key_set": bool(os.getenv("GEMINI_API_KEY")),
+        "local_generator": get_local_spin_ride_generator().is_available(),
+        "library": get_spin_ride_library().get_stats(),
     }
 
 
@@ -43,31 +51,69 @@ async def generate_spin_ride(
     request: GenerateSpinRideRequest,
     current_user: Dict[str, Any] = Depends(get_current_user),
 ):
-    """Generate an AI-powered spin ride plan for the given duration."""
+    """
+    Generate a spin ride plan for the given duration.
+    Served from the plan library when the parameter tuple has a full pool;
+    otherwise calls Gemini (rate limited) and adds the result to the library.
+    With engine="auto", a ride is built by the local generator whenever the
+    model path is slow, rate limited, or unavailable.
+    """
     user_id = extract_user_id(current_user)
-    _check_ai_rate_limit(user_id)
-
     generator = get_spin_ride_generator()
-    if not generator.is_available():
-        raise HTTPException(
-            status_code=503,
-            detail="AI ride generation is not available (API key not configured)"
-        )
+    library = get_spin_ride_library()
+    key = spin_ride_key(request.duration_minutes, request.include_all_outs, request.difficulty)
 
-    try:
+    def _generate_with_model() -> Dict[str, Any]:
+        _check_ai_rate_limit(user_id)
+        if not generator.is_available():
+            raise HTTPException(
+                status_code=503,
+                detail="AI ride generation is not available (API key not configured)"
+            )
         plan = generator.generate(
             request.duration_minutes,
             include_all_outs=request.include_all_outs,
             difficulty=request.difficulty,
         )
         ai_rate_limiter.record_request(user_id)
+        return plan
+
+    def _generate_locally() -> Dict[str, Any]:
+        return get_local_spin_ride_generator().generate(
+            request.duration_minutes,
+            include_all_outs=request.include_all_outs,
+            difficulty=request.difficulty,
+        )
+
+    try:
+        if request.engine == "local":
+            plan, source = _generate_locally(), "local"
+        elif request.engine == "ai":
+            plan, source = await asyncio.to_thread(library.get_or_generate, key, _generate_with_model)
+        else:
+            try:
+                # On timeout the model call finishes in its thread and still tops up the library
+                plan, source = await asyncio.wait_for(
+                    asyncio.to_thread(library.get_or_generate, key, _generate_with_model),
+                    timeout=SPIN_RIDE_MODEL_TIMEOUT_SECONDS,
+                )
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    reason = f"timed out after {SPIN_RIDE_MODEL_TIMEOUT_SECONDS:g}s"
+                else:
+                    reason = e.detail if isinstance(e, HTTPException) else f"{type(e).__name__}: {e}"
+                logger.warning(f"Spin ride model path failed ({reason}), using local generator")
+                plan, source = _generate_locally(), "local"
+
         logger.info(
             f"Generated {request.duration_minutes}min spin ride for user {user_id} "
             f"(all_outs={'on' if request.include_all_outs else 'off'}, "
-            f"difficulty={request.difficulty or 'auto'})"
+            f"difficulty={request.difficulty or 'auto'}, source={source})"
         )
         return plan
 
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Spin ride generation ValueError: {e}")
         raise HTTPException(status_code=422, detail=str(e))
@@ -0,0 +1,41 @@
+"""
+Sync API
+Changes-since feed so each device downloads only what changed elsewhere
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+import logging
+
+from ..models import SyncChangesResponse
+from ..services.firestore_data_service import firestore_data_service
+from ..services.sync_service import sync_service, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..api.dependencies import require_auth
+
+router = APIRouter(prefix="/api/v3/sync", tags=["Sync"])
+logger = logging.getLogger(__name__)
+
+
+@router.get("/changes", response_model=SyncChangesResponse)
+async def get_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous response; omit for a full snapshot"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Max documents per collection"),
+    user_id: str = Depends(require_auth)
+):
+    """
+    Workouts, programs, workout sessions and cardio sessions created, modified
+    or deleted after the cursor. Keep calling with the returned cursor while
+    has_more is true; when reset is true, replace local data instead of merging.
+    """
+    if not firestore_data_service.is_available():
+        raise HTTPException(status_code=503, detail="Sync service temporarily unavailable")
+
+    try:
+        changes = await sync_service.changes_since(user_id, since, limit)
+        return SyncChangesResponse(**changes)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error building sync changes: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error building sync changes: {str(e)}")
@@ -10,6 +10,7 @@ import os
 
 from ..models.tabata_kettlebell import GenerateTabataKettlebellRequest
 from ..services.tabata_kettlebell_generator import get_tabata_kettlebell_generator
+from ..services.plan_library import get_tabata_kettlebell_library, tabata_kettlebell_key
 from ..services.ai_rate_limiter import ai_rate_limiter
 from ..middleware.auth import get_current_user, extract_user_id
 
@@ -35,6 +36,7 @@ async def tabata_kettlebell_status():
     return {
         "available": generator.is_available(),
         "gemini_key_set": bool(os.getenv("GEMINI_API_KEY")),
+        "library": get_tabata_kettlebell_library().get_stats(),
     }
 
 
@@ -43,36 +45,52 @@ async def generate_tabata_kettlebell(
     request: GenerateTabataKettlebellRequest,
     current_user: Dict[str, Any] = Depends(get_current_user),
 ):
-    """Generate an AI-powered tabata kettlebell workout plan."""
+    """
+    Generate a tabata kettlebell workout plan.
+    Served from the plan library when the parameter tuple has a full pool;
+    otherwise calls Gemini (rate limited) and adds the result to the library.
+    """
     user_id = extract_user_id(current_user)
-    _check_ai_rate_limit(user_id)
-
     generator = get_tabata_kettlebell_generator()
-    if not generator.is_available():
-        raise HTTPException(
-            status_code=503,
-            detail="AI workout generation is not available (API key not configured)"
-        )
+    library = get_tabata_kettlebell_library()
+    include_exercises = list(request.include_exercises or [])
+    exclude_exercises = list(request.exclude_exercises or [])
+    key = tabata_kettlebell_key(
+        request.protocol, list(request.focus_areas), request.sets,
+        request.rounds_per_set, include_exercises, exclude_exercises,
+    )
 
-    try:
+    def _generate_with_model() -> Dict[str, Any]:
+        _check_ai_rate_limit(user_id)
+        if not generator.is_available():
+            raise HTTPException(
+                status_code=503,
+                detail="AI workout generation is not available (API key not configured)"
+            )
         plan = generator.generate(
             protocol=request.protocol,
             focus_areas=list(request.focus_areas),
             sets=request.sets,
             rounds_per_set=request.rounds_per_set,
-            include_exercises=list(request.include_exercises or []),
-            exclude_exercises=list(request.exclude_exercises or []),
+            include_exercises=include_exercises,
+            exclude_exercises=exclude_exercises,
         )
         ai_rate_limiter.record_request(user_id)
+        return plan
+
+    try:
+        plan, source = library.get_or_generate(key, _generate_with_model)
         logger.info(
             f"Generated tabata KB workout for user {user_id} "
             f"(protocol={request.protocol}, sets={request.sets}, "
             f"rounds_per_set={request.rounds_per_set}, focus={request.focus_areas}, "
-            f"include={len(request.include_exercises or [])}, "
-            f"exclude={len(request.exclude_exercises or [])})"
+            f"include={len(include_exercises)}, "
+            f"exclude={len(exclude_exercises)}, source={source})"
         )
         return plan
 
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Tabata KB generation ValueError: {e}")
         raise HTTPException(status_code=422, detail=str(e))
@@ -4,7 +4,7 @@ Handles workout session CRUD operations and exercise history tracking
 Premium feature for authenticated users only
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
 from typing import List, Optional
 import logging
 
@@ -15,12 +15,17 @@ from ..models import (
     CompleteSessionRequest,
     CreateAndCompleteSessionRequest,
     EditSessionRequest,
+    SessionAutosaveRequest,
+    SessionAutosaveResponse,
     SessionListResponse,
     ExerciseHistory,
-    ExerciseHistoryResponse
+    ExerciseHistoryResponse,
+    SessionImportResponse
 )
 from ..services.firestore_data_service import firestore_data_service
 from ..services.firebase_service import firebase_service
+from ..services.session_importer import detect_format, import_sessions
+from ..services.session_autosave import session_autosaver, SessionNotInProgress
 from ..middleware.auth import get_current_user_optional, extract_user_id
 
 router = APIRouter(prefix="/api/v3/workout-sessions", tags=["Workout Sessions"])
@@ -129,6 +134,52 @@ async def create_and_complete_session(
         raise HTTPException(status_code=500, detail=f"Error completing session: {str(e)}")
 
 
+@router.post("/import", response_model=SessionImportResponse)
+async def import_session_history(
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None, description="'csv' or 'ndjson' (detected from the filename if omitted)"),
+    dry_run: bool = Form(False, description="Parse and count without writing"),
+    current_user: Optional[dict] = Depends(get_current_user_optional)
+):
+    """
+    Bulk import historical sessions from another app's CSV/NDJSON export.
+
+    Rows are deduplicated by (date, workout, exercise), sessions and exercise
+    history are written in batched commits, and PRs are rebuilt once at the end.
+
+    **Premium Feature**: Requires authentication
+    """
+    try:
+        user_id = extract_user_id(current_user)
+
+        if not user_id:
+            raise HTTPException(
+                status_code=401,
+                detail="Authentication required for workout logging"
+            )
+
+        if not firebase_service.is_available():
+            raise HTTPException(
+                status_code=503,
+                detail="Workout logging service temporarily unavailable"
+            )
+
+        fmt = (format or detect_format(file.filename, file.content_type)).lower()
+        if fmt not in ("csv", "ndjson"):
+            raise HTTPException(status_code=400, detail="Format must be 'csv' or 'ndjson'")
+
+        result = await import_sessions(firestore_data_service, user_id, file.file, fmt, dry_run)
+        return SessionImportResponse(**result)
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing sessions: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error importing sessions: {str(e)}")
+
+
 @router.get("/{session_id}", response_model=WorkoutSession)
 async def get_session(
     session_id: str,
@@ -199,6 +250,7 @@ async def update_session(
                 detail="Workout session not found"
             )
         
+        session_autosaver.forget(user_id, session_id)
         logger.info(f"✅ Workout session updated: {session_id}")
         return session
         
@@ -209,6 +261,56 @@ async def update_session(
         raise HTTPException(status_code=500, detail=f"Error updating session: {str(e)}")
 
 
+@router.post("/{session_id}/autosave", response_model=SessionAutosaveResponse)
+async def autosave_session(
+    session_id: str,
+    autosave_request: SessionAutosaveRequest,
+    current_user: Optional[dict] = Depends(get_current_user_optional)
+):
+    """
+    Autosave changed exercises/sets of an in-progress session.
+
+    Send only what changed since the last save. Saves arriving close together
+    are merged into one write, and the merged session is returned.
+
+    **Premium Feature**: Requires authentication
+    """
+    try:
+        user_id = extract_user_id(current_user)
+
+        if not user_id:
+            raise HTTPException(
+                status_code=401,
+                detail="Authentication required"
+            )
+
+        if not firestore_data_service.is_available():
+            raise HTTPException(
+                status_code=503,
+                detail="Workout logging service temporarily unavailable"
+            )
+
+        result = await session_autosaver.autosave(user_id, session_id, autosave_request)
+
+        if not result:
+            raise HTTPException(
+                status_code=404,
+                detail="Workout session not found"
+            )
+
+        return SessionAutosaveResponse(**result)
+
+    except HTTPException:
+        raise
+    except SessionNotInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error autosaving workout session: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error autosaving session: {str(e)}")
+
+
 @router.patch("/{session_id}", response_model=WorkoutSession)
 async def edit_session(
     session_id: str,
@@ -245,6 +347,7 @@ async def edit_session(
                 detail="Workout session not found"
             )
 
+        session_autosaver.forget(user_id, session_id)
         logger.info(f"✅ Workout session edited: {session_id}")
         return session
 
@@ -296,6 +399,7 @@ async def complete_session(
                 detail="Workout session not found"
             )
         
+        session_autosaver.forget(user_id, session_id)
         logger.info(f"✅ Workout session completed: {session_id}")
         return session
         
@@ -383,6 +487,7 @@ async def delete_session(
                 detail="Workout session not found"
             )
         
+        session_autosaver.forget(user_id, session_id)
         logger.info(f"✅ Workout session deleted: {session_id}")
         return {"message": "Workout session deleted successfully"}
         
@@ -404,7 +404,7 @@ async def get_workout_exercise_history(
             for name, history in histories.items()
         }
         
-        logger.info(f"✅ Retrieved history for {len(result)} exercises")
+        logger.debug(f"✅ Retrieved history for {len(result)} exercises")
         return result
         
     except HTTPException:
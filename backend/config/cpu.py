@@ -0,0 +1,36 @@
+"""
+CPU Budget - how many CPUs this container may use and how many server
+workers share them, for sizing per-worker pools.
+"""
+
+import os
+from pathlib import Path
+
+
+def cpu_quota() -> float:
+    """CPUs this container may use: cgroup v2/v1 quota, else the scheduler affinity"""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    try:
+        return float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return float(os.cpu_count() or 1)
+
+
+def server_workers() -> int:
+    """Server worker processes sharing the quota (gunicorn.conf.py exports WEB_CONCURRENCY; 1 in dev)"""
+    try:
+        return max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    except ValueError:
+        return 1
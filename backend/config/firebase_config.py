@@ -3,27 +3,26 @@ Firebase Configuration for Ghost Gym V3
 Handles Firebase Admin SDK initialization with environment variables
 """
 
+import importlib
+import importlib.util
 import os
 import json
 import logging
 import traceback
 import sys
+import threading
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
-# Enhanced diagnostic import with detailed error logging
-try:
-    import firebase_admin
-    from firebase_admin import credentials
-    FIREBASE_AVAILABLE = True
-    logger.info(f"✅ Firebase Admin SDK imported successfully (version: {getattr(firebase_admin, '__version__', 'unknown')})")
-except ImportError as e:
-    FIREBASE_AVAILABLE = False
-    firebase_admin = None
-    credentials = None
-    
-    # Log detailed error information for Railway debugging
+# firebase_admin and google.cloud.firestore take ~0.3s to import, so they are
+# only located here; the first get_firebase_app() (or first use of the lazy
+# modules below) actually imports them.
+FIREBASE_AVAILABLE = importlib.util.find_spec('firebase_admin') is not None
+
+
+def _log_import_failure(e: ImportError) -> None:
+    """Log why firebase_admin failed to import (for Railway debugging)"""
     logger.error("=" * 60)
     logger.error("❌ FIREBASE IMPORT FAILED")
     logger.error("=" * 60)
@@ -56,10 +55,47 @@ except ImportError as e:
     
     logger.error("=" * 60)
 
+
+class _LazyImport:
+    """
+    Stands in for a module (or one of its attributes) and imports it on first
+    use, e.g. firestore.SERVER_TIMESTAMP or FieldPath.document_id().
+    """
+
+    def __init__(self, module: str, attribute: Optional[str] = None):
+        self._module = module
+        self._attribute = attribute
+        self._target = None
+
+    def _resolve(self):
+        if self._target is None:
+            target = importlib.import_module(self._module)
+            if self._attribute:
+                target = getattr(target, self._attribute)
+            self._target = target
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        name = f"{self._module}.{self._attribute}" if self._attribute else self._module
+        return f"<lazy {name}{' (loaded)' if self._target is not None else ''}>"
+
+
+# Shared lazy handles; None when firebase-admin isn't installed
+firestore = _LazyImport('firebase_admin.firestore') if FIREBASE_AVAILABLE else None
+firebase_auth = _LazyImport('firebase_admin.auth') if FIREBASE_AVAILABLE else None
+FieldPath = _LazyImport('google.cloud.firestore_v1.field_path', 'FieldPath') if FIREBASE_AVAILABLE else None
+
 # Global Firebase app instance
-_firebase_app: Optional[firebase_admin.App] = None
+_firebase_app = None
+_firebase_app_lock = threading.Lock()
 
-def get_firebase_app() -> Optional[firebase_admin.App]:
+def get_firebase_app():
     """
     Get or initialize Firebase Admin SDK app
     
@@ -76,11 +112,28 @@ def get_firebase_app() -> Optional[firebase_admin.App]:
     if _firebase_app is not None:
         return _firebase_app
     
+    with _firebase_app_lock:
+        if _firebase_app is None:
+            _firebase_app = _initialize_firebase_app()
+    return _firebase_app
+
+
+def _initialize_firebase_app():
+    """Import firebase_admin and initialize the app (caller holds _firebase_app_lock)"""
+    global FIREBASE_AVAILABLE
+    
+    try:
+        import firebase_admin
+        from firebase_admin import credentials
+    except ImportError as e:
+        FIREBASE_AVAILABLE = False
+        _log_import_failure(e)
+        return None
+    
     # Check if Firebase is already initialized by another module
     if firebase_admin._apps:
-        _firebase_app = firebase_admin.get_app()
         logger.info("✅ Using existing Firebase app")
-        return _firebase_app
+        return firebase_admin.get_app()
     
     try:
         # Try to initialize Firebase Admin SDK
@@ -114,12 +167,12 @@ def get_firebase_app() -> Optional[firebase_admin.App]:
         
         # Initialize Firebase with service account credentials
         cred = credentials.Certificate(cred_dict)
-        _firebase_app = firebase_admin.initialize_app(cred, {
+        app = firebase_admin.initialize_app(cred, {
             'projectId': project_id
         })
         
         logger.info(f"✅ Firebase Admin SDK initialized successfully for project: {project_id}")
-        return _firebase_app
+        return app
         
     except Exception as e:
         logger.error(f"❌ Firebase initialization failed: {str(e)}")
@@ -151,9 +204,6 @@ def get_firebase_config_status() -> dict:
         "environment": os.getenv('ENVIRONMENT', 'development')
     }
 
-# Initialize Firebase on module import (optional - can be lazy loaded)
-if os.getenv('FIREBASE_AUTO_INIT', 'true').lower() == 'true':
+# Initialize Firebase on module import (opt-in; services connect on first use)
+if os.getenv('FIREBASE_AUTO_INIT', 'false').lower() == 'true':
     get_firebase_app()
-
-# Export firebase_app for backward compatibility
-firebase_app = get_firebase_app()
\ No newline at end of file
@@ -0,0 +1,278 @@
+"""
+Logging Configuration - non-blocking, structured, sampled logging.
+
+configure_logging() replaces logging.basicConfig. A log call used to format
+and write to stderr on the calling thread, usually the event loop. Now:
+
+- the root logger's only handler puts the record on a bounded queue; a
+  background thread formats and writes it. If the writer falls behind,
+  records below WARNING are dropped (and counted) instead of blocking
+- LOG_FORMAT=json writes one JSON object per line (the default in
+  production); text keeps the development format
+- every record carries the id of the request that logged it (set by
+  RequestIdMiddleware and returned in X-Request-ID), so a request's lines
+  can be grouped
+- below WARNING, each logger is rate limited (LOG_RATE_LIMIT records per
+  second) and may be sampled (LOG_SAMPLE_RATES). Sampling is decided per
+  request, so a sampled request keeps all of its lines. Warnings and errors
+  always pass
+
+Environment:
+    LOG_LEVEL         Root level (default INFO)
+    LOG_FORMAT        json or text (default: json in production, else text)
+    LOG_QUEUE_SIZE    Records buffered for the writer thread (default 10000)
+    LOG_RATE_LIMIT    Records per second per logger below WARNING (default 50, 0 = unlimited)
+    LOG_SAMPLE_RATES  Comma-separated logger=rate, e.g.
+                      "backend.middleware.auth=0.01,backend.services=0.1";
+                      a rate applies to the logger and its children
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def set_request_id(request_id: Optional[str]) -> contextvars.Token:
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token: contextvars.Token) -> None:
+    _request_id.reset(token)
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """"a.b=0.1,c=0.5" -> {"a.b": 0.1, "c": 0.5}; malformed entries are ignored"""
+    rates = {}
+    for entry in value.split(","):
+        name, _, rate = entry.partition("=")
+        try:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+class LogPipelineStats:
+    """Records the pipeline let through or dropped (approximate under contention)"""
+
+    def __init__(self):
+        self.queued = 0
+        self.dropped_queue_full = 0
+        self.sampled_out = 0
+        self.rate_limited: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "dropped_queue_full": self.dropped_queue_full,
+            "sampled_out": self.sampled_out,
+            "rate_limited": dict(self.rate_limited),
+        }
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps the request id on the record (runs on the logging thread, where the context is)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Per-logger sampling and rate limiting for records below WARNING"""
+
+    def __init__(self, stats: LogPipelineStats, rate_limit: int, sample_rates: Dict[str, float]):
+        super().__init__()
+        self.stats = stats
+        self.rate_limit = rate_limit
+        self.sample_rates = sample_rates
+        self._lock = threading.Lock()
+        # logger -> [current second, records in it]
+        self._windows: Dict[str, list] = {}
+        # logger -> resolved sample rate (None = keep all)
+        self._resolved: Dict[str, Optional[float]] = {}
+
+    def _rate_for(self, name: str) -> Optional[float]:
+        if name not in self._resolved:
+            rate = None
+            prefix = name
+            while prefix:
+                if prefix in self.sample_rates:
+                    rate = self.sample_rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return self._resolved[name]
+
+    def _sampled(self, record: logging.LogRecord, rate: float) -> bool:
+        request_id = getattr(record, "request_id", None)
+        if request_id is None:
+            return random.random() < rate
+        # Same decision for every line of a request
+        return zlib.crc32(request_id.encode()) / 0xFFFFFFFF < rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        rate = self._rate_for(record.name)
+        if rate is not None and not self._sampled(record, rate):
+            self.stats.sampled_out += 1
+            return False
+
+        if self.rate_limit:
+            second = int(time.monotonic())
+            with self._lock:
+                window = self._windows.get(record.name)
+                if window is None or window[0] != second:
+                    window = self._windows[record.name] = [second, 0]
+                window[1] += 1
+                if window[1] > self.rate_limit:
+                    self.stats.rate_limited[record.name] = self.stats.rate_limited.get(record.name, 0) + 1
+                    return False
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops low-severity records instead of blocking on a full queue"""
+
+    def __init__(self, log_queue: queue.Queue, stats: LogPipelineStats):
+        super().__init__(log_queue)
+        self.stats = stats
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve %-args now (they may change after the call); formatting is left
+        # to the writer thread, unlike QueueHandler.prepare
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno < logging.WARNING:
+                self.stats.dropped_queue_full += 1
+                return
+            # Warnings and errors wait for the writer
+            self.queue.put(record)
+        self.stats.queued += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """logging.basicConfig's format, with the request id when there is one"""
+
+    def __init__(self):
+        super().__init__(logging.BASIC_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        return f"{line} [{request_id}]" if request_id else line
+
+
+class LogPipeline:
+    """The queue, its writer thread and the handler feeding it"""
+
+    def __init__(self):
+        self.stats = LogPipelineStats()
+        self.handler: Optional[NonBlockingQueueHandler] = None
+        self._writer: Optional[logging.Handler] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._queue_size = 10000
+
+    @property
+    def configured(self) -> bool:
+        return self.handler is not None
+
+    def configure(self) -> None:
+        """Install the pipeline on the root logger (idempotent)"""
+        if self.configured:
+            return
+
+        environment = os.getenv("ENVIRONMENT", "development")
+        log_format = os.getenv("LOG_FORMAT", "json" if environment == "production" else "text")
+        self._queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+        self._writer = logging.StreamHandler(sys.stderr)
+        self._writer.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter())
+
+        self.handler = NonBlockingQueueHandler(queue.Queue(self._queue_size), self.stats)
+        self.handler.addFilter(RequestContextFilter())
+        self.handler.addFilter(SamplingFilter(
+            self.stats,
+            rate_limit=int(os.getenv("LOG_RATE_LIMIT", "50")),
+            sample_rates=parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", "")),
+        ))
+
+        root = logging.getLogger()
+        for existing in root.handlers[:]:
+            root.removeHandler(existing)
+        root.addHandler(self.handler)
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+        self._start_writer()
+        atexit.register(self.stop)
+        # The writer thread doesn't survive fork (gunicorn preloads the app in the master)
+        os.register_at_fork(after_in_child=self._restart_after_fork)
+
+    def _start_writer(self) -> None:
+        self._listener = logging.handlers.QueueListener(self.handler.queue, self._writer)
+        self._listener.start()
+
+    def _restart_after_fork(self) -> None:
+        # The parent's queue (and its lock) may have been mid-use at fork; start clean
+        self.handler.queue = queue.Queue(self._queue_size)
+        self._start_writer()
+
+    def stop(self) -> None:
+        """Flush queued records and stop the writer thread"""
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+
+
+# Global log pipeline instance
+log_pipeline = LogPipeline()
+
+
+def configure_logging() -> None:
+    log_pipeline.configure()
@@ -3,6 +3,9 @@ Fitness Field Notes - Main Application Entry Point
 Slim FastAPI application with modular router architecture
 """
 
+# Imported first so the startup report's clock covers every import below
+from .services.startup_timing import startup_timing
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, PlainTextResponse, Response
@@ -15,14 +18,39 @@ from dotenv import load_dotenv
 # Load environment variables FIRST before importing Firebase services
 load_dotenv()
 
+# Queue-backed, structured logging, before any module logs at import
+from .config.logging_config import configure_logging
+configure_logging()
+startup_timing.mark("framework imports")
+
 # Import routers
-from .api import health, documents, workouts, programs, exercises, favorites, personal_records, auth, data, migration, workout_sessions, sharing, user_profile, export, cardio_sessions, import_routes, universal_log_routes, cron, exercise_images, spin_ride, tabata_kettlebell
+from .api import health, documents, workouts, programs, exercises, favorites, personal_records, auth, data, migration, workout_sessions, sharing, user_profile, export, cardio_sessions, import_routes, universal_log_routes, cron, exercise_images, spin_ride, tabata_kettlebell, analytics, sync, metrics
 from .services.sharing_service import sharing_service
+from .services.v2.template_registry import template_registry
+from .services.docx_export_service import docx_export_service
+from .services.workout_schema_migration import (
+    MigrationLeaseHeld,
+    WORKOUT_MIGRATION_LEASE_SECONDS,
+    workout_schema_migration,
+)
+from .services.exercise_service import exercise_service
+from .middleware.request_snapshot import RequestSnapshotMiddleware
+from .middleware.worker_status import WorkerStatusMiddleware
+from .middleware.firestore_usage import FirestoreUsageMiddleware
+from .middleware.request_id import RequestIdMiddleware
+from .services.exercise_catalog_snapshot import catalog_snapshot_store
+from .services.worker_status import worker_status
+from .services.firebase_service import firebase_service
+from .services.auth_service import auth_service
+from .services.firestore_data_service import firestore_data_service
+from .services.firestore_clients import firestore_clients
+import asyncio
 import re
 import html
+import time
+
+startup_timing.mark("router and service imports")
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
@@ -42,6 +70,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Memoize per-user cached data (custom exercises, favorites) for each request
+app.add_middleware(RequestSnapshotMiddleware)
+
+# Per-worker request counters for /api/health
+app.add_middleware(WorkerStatusMiddleware)
+
+# Firestore reads/writes per request (Server-Timing header) and per route (/metrics)
+app.add_middleware(FirestoreUsageMiddleware)
+
+# Request id for log correlation (outermost, so every log line of the request has it)
+app.add_middleware(RequestIdMiddleware)
+
 # Include routers
 app.include_router(health.router)
 app.include_router(documents.router)
@@ -66,8 +106,112 @@ app.include_router(cron.router)  # Scheduled task endpoints (daily workout gener
 app.include_router(exercise_images.router)  # Exercise GIF proxy/cache
 app.include_router(spin_ride.router)  # Spin Ride generator (experimental)
 app.include_router(tabata_kettlebell.router)  # Tabata Kettlebell generator (experimental)
+app.include_router(analytics.router)  # Exercise progress trends
+app.include_router(sync.router)  # Multi-device changes-since sync
+app.include_router(metrics.router)  # Prometheus metrics (per worker)
 
 logger.info("✅ All routers included successfully (22 routers total)")
+startup_timing.mark("router registration")
+
+
+def preload_shared_state():
+    """
+    Load read-only state in the production server master before it forks
+    workers (gunicorn.conf.py), so every worker shares one copy instead of
+    building its own. Nothing here may open a Firestore/gRPC connection:
+    connections don't survive fork.
+    """
+    if template_registry.precompile():
+        worker_status.preloaded.append("templates")
+    if catalog_snapshot_store.preload_file() is not None:
+        worker_status.preloaded.append("exercise_catalog")
+
+
+@app.on_event("startup")
+async def precompile_templates():
+    """Compile every HTML template once so the first export doesn't pay for it"""
+    if not template_registry.precompiled:
+        with startup_timing.phase("template precompile"):
+            template_registry.precompile()
+
+
+def warm_up_services():
+    """
+    Connect the Firestore-backed services and load the exercise catalog
+    snapshot. Runs in a thread after the worker starts accepting requests,
+    so health checks answer immediately and real requests rarely wait for
+    the connection.
+    """
+    for service in (firebase_service, firestore_data_service, exercise_service):
+        service.is_available()
+    auth_service.is_available()
+    try:
+        snapshot = exercise_service.get_catalog_snapshot(None)
+        if snapshot is None:
+            logger.info("No current exercise catalog snapshot - exercises will be read from Firestore")
+    except Exception as e:
+        logger.error(f"Failed to load exercise catalog snapshot: {str(e)}")
+
+
+@app.on_event("startup")
+async def start_service_warm_up():
+    """Warm up services in the background (see warm_up_services)"""
+    async def warm_up():
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(warm_up_services)
+        except Exception as e:
+            logger.error(f"Service warm-up failed: {str(e)}")
+        startup_timing.record_deferred("service warm-up", time.perf_counter() - started)
+
+    asyncio.create_task(warm_up())
+
+
+@app.on_event("startup")
+async def start_workout_schema_migration():
+    """
+    Rewrite legacy workout docs in the background (opt-in, resumes from its checkpoint).
+    Every worker tries; the one holding the migration's Firestore lease runs it,
+    the others retry once per lease period to take over if it dies.
+    """
+    if os.getenv("WORKOUT_SCHEMA_MIGRATION_ON_STARTUP", "false").lower() != "true":
+        return
+    if not workout_schema_migration.is_available():
+        logger.warning("Workout schema migration skipped - Firestore not available")
+        return
+
+    async def run_migration():
+        while True:
+            try:
+                result = await asyncio.to_thread(workout_schema_migration.run)
+                if result.get("completed"):
+                    return
+            except MigrationLeaseHeld as e:
+                logger.debug(f"Workout schema migration not claimed: {str(e)}")
+            except Exception as e:
+                logger.error(f"Workout schema migration failed: {str(e)}")
+                return
+            await asyncio.sleep(WORKOUT_MIGRATION_LEASE_SECONDS)
+
+    asyncio.create_task(run_migration())
+
+
+@app.on_event("startup")
+async def report_startup_timing():
+    """Log where this worker's cold start went (registered last; also in /api/health)"""
+    startup_timing.ready()
+
+
+@app.on_event("shutdown")
+async def stop_docx_workers():
+    """Stop DOCX render worker processes"""
+    docx_export_service.shutdown()
+
+
+@app.on_event("shutdown")
+async def close_firestore_clients():
+    """Close the shared Firestore channels"""
+    firestore_clients.close()
 
 # ============================================
 # SEO Routes (robots.txt, sitemap.xml, llms.txt)
@@ -578,4 +722,5 @@ if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
 
+startup_timing.mark("page routes and static files")
 logger.info("🚀 Fitness Field Notes API initialized successfully")
@@ -8,16 +8,7 @@ from typing import Optional, Dict, Any
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-try:
-    import firebase_admin
-    from firebase_admin import auth
-    FIREBASE_AUTH_AVAILABLE = True
-except ImportError:
-    FIREBASE_AUTH_AVAILABLE = False
-    firebase_admin = None
-    auth = None
-
-from ..config.firebase_config import get_firebase_app
+from ..config.firebase_config import FIREBASE_AVAILABLE as FIREBASE_AUTH_AVAILABLE, firebase_auth as auth, get_firebase_app
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +39,6 @@ async def get_current_user_optional(
         
         # Verify the Firebase ID token
         decoded_token = auth.verify_id_token(credentials.credentials, app=app)
-        logger.info(f"📱 [AUTH DEBUG] Token verified - UID: {decoded_token.get('uid')}, Email: {decoded_token.get('email')}")
 
         # Extract user information
         user_info = {
@@ -63,7 +53,7 @@ async def get_current_user_optional(
             'iat': decoded_token.get('iat')
         }
         
-        logger.info(f"✅ User authenticated: {user_info.get('email', user_info.get('uid'))}")
+        logger.debug(f"✅ User authenticated: {user_info.get('uid')}")
         return user_info
         
     except auth.InvalidIdTokenError:
@@ -0,0 +1,54 @@
+"""
+Firestore Usage Middleware
+Counts the Firestore reads, writes and deletes each request makes (see
+services/firestore_usage.py), reports them to the client in a Server-Timing
+header and adds them to the route's totals for /metrics.
+"""
+
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from ..services.firestore_usage import track_usage, usage_stats
+
+# Requests that matched no route share one series, so unknown paths can't grow /metrics
+UNMATCHED_ROUTE = "other"
+
+
+def _route_name(scope) -> str:
+    """Route template (e.g. "GET /api/v3/workouts/{workout_id}"), set on the scope by routing"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return UNMATCHED_ROUTE
+    return f"{scope['method']} {path}"
+
+
+class FirestoreUsageMiddleware:
+    """Pure ASGI middleware; one usage counter per request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        with track_usage() as usage:
+            async def send_with_timing(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    # Covers Firestore calls made before the response starts, not during streaming
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", usage.server_timing(time.perf_counter() - started))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                usage_stats.record_request(_route_name(scope), status, time.perf_counter() - started, usage)
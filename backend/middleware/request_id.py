@@ -0,0 +1,52 @@
+"""
+Request ID Middleware
+Gives every request an id, stamped on each log record it produces (see
+config/logging_config.py) and returned in the X-Request-ID header. A valid
+X-Request-ID from the client or proxy is kept, so logs can be matched
+across services.
+"""
+
+import re
+import uuid
+
+from starlette.datastructures import MutableHeaders
+
+from ..config.logging_config import reset_request_id, set_request_id
+
+REQUEST_ID_HEADER = b"x-request-id"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+
+def _incoming_request_id(scope) -> str:
+    for name, value in scope["headers"]:
+        if name == REQUEST_ID_HEADER:
+            request_id = value.decode("latin-1")
+            if _VALID_REQUEST_ID.match(request_id):
+                return request_id
+            break
+    return uuid.uuid4().hex[:16]
+
+
+class RequestIdMiddleware:
+    """Pure ASGI middleware; sets the request id for the request's context"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        token = set_request_id(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            reset_request_id(token)
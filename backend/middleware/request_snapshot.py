@@ -0,0 +1,22 @@
+"""
+Request Snapshot Middleware
+Runs every HTTP request inside user_cache.request_snapshot(), so per-user
+cached values (custom exercises, favorites) are read at most once per request
+and stay consistent for its duration.
+"""
+
+from ..services.user_cache import request_snapshot
+
+
+class RequestSnapshotMiddleware:
+    """Pure ASGI middleware; the snapshot's context is inherited by threadpool endpoints"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with request_snapshot():
+            await self.app(scope, receive, send)
@@ -0,0 +1,25 @@
+"""
+Worker Status Middleware
+Counts served and in-flight HTTP requests for this worker (see
+services/worker_status.py), reported by /api/health.
+"""
+
+from ..services.worker_status import worker_status
+
+
+class WorkerStatusMiddleware:
+    """Pure ASGI middleware; one counter update per request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        worker_status.requests += 1
+        worker_status.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            worker_status.in_flight -= 1
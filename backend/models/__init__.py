@@ -17,3 +17,6 @@ from .cardio import *
 from .sharing import *
 from .importing import *
 from .spin_ride import *
+from .export import *
+from .analytics import *
+from .sync import *
@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class ExerciseSeriesSummary(BaseModel):
+    """An exercise that has an analytics series"""
+    exercise_key: str = Field(..., description="Series ID (normalized exercise name)")
+    exercise_name: str = Field(..., description="Exercise name as first logged")
+    unit: str = Field(default="lbs", description="Weight unit of the series")
+    sessions: int = Field(default=0, description="Sessions recorded")
+    first_date: str = Field(..., description="First session date (ISO)")
+    last_date: str = Field(..., description="Most recent session date (ISO)")
+
+
+class ExerciseSeriesListResponse(BaseModel):
+    """Exercises available for trend charts"""
+    exercises: List[ExerciseSeriesSummary] = Field(default_factory=list)
+
+
+class ExerciseTrendPoint(BaseModel):
+    """One rolled-up bucket of an exercise trend"""
+    period_start: str = Field(..., description="First day of the bucket (ISO)")
+    top_weight: float = Field(default=0.0, description="Heaviest set in the bucket")
+    e1rm: float = Field(default=0.0, description="Best estimated 1RM (Epley) in the bucket")
+    volume: float = Field(default=0.0, description="Total weight x reps in the bucket")
+    sets: int = Field(default=0, description="Total sets in the bucket")
+    sessions: int = Field(default=0, description="Sessions in the bucket")
+    moving_average: Optional[float] = Field(None, description="Trailing moving average of the requested metric")
+
+
+class ExerciseTrendResponse(BaseModel):
+    """Trend for one exercise"""
+    exercise_name: str
+    unit: str = "lbs"
+    period: str = Field(..., description="Bucket size: 'day', 'week' or 'month'")
+    metric: str = Field(..., description="Metric the moving average is computed over")
+    total_sessions: int = Field(default=0, description="Sessions in the whole series")
+    points: List[ExerciseTrendPoint] = Field(default_factory=list)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from uuid import uuid4
 
@@ -333,3 +333,38 @@ class ExerciseSearchResponse(BaseModel):
     exercises: List[Exercise] = Field(..., description="Matching exercises")
     query: str = Field(..., description="Search query used")
     total_results: int = Field(..., description="Total number of results")
+
+class ExerciseResolveRequest(BaseModel):
+    """Request model for resolving free-text exercise names (e.g. a whole imported workout)"""
+
+    names: List[str] = Field(..., min_length=1, max_length=200, description="Exercise names to resolve")
+    limit: int = Field(default=3, ge=1, le=10, description="Candidates returned per name")
+
+class ExerciseCandidate(BaseModel):
+    """A scored candidate for a free-text exercise name"""
+
+    exercise: Exercise = Field(..., description="Candidate exercise")
+    score: float = Field(..., description="Match score (1.0 = same name after normalization)")
+    source: str = Field(..., description="'global' or 'custom'")
+
+class ExerciseResolution(BaseModel):
+    """Resolution of one exercise name"""
+
+    query: str = Field(..., description="Name as submitted")
+    match: Optional[Exercise] = Field(None, description="Confident match, if any")
+    candidates: List[ExerciseCandidate] = Field(default_factory=list, description="Best candidates first")
+
+class ExerciseResolveResponse(BaseModel):
+    """Response model for bulk exercise name resolution"""
+
+    results: List[ExerciseResolution] = Field(..., description="One entry per requested name, in order")
+
+class BulkAutoCreateRequest(BaseModel):
+    """Request model for auto-creating custom exercises for a whole workout"""
+
+    names: List[str] = Field(..., min_length=1, max_length=200, description="Exercise names")
+
+class BulkAutoCreateResponse(BaseModel):
+    """Response model for bulk auto-create"""
+
+    exercises: Dict[str, Optional[Exercise]] = Field(..., description="Requested name -> existing or created exercise")
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+
+class BatchExportRequest(BaseModel):
+    """Request to export many workouts (or a whole program) in one call"""
+    workout_ids: List[str] = Field(default_factory=list, max_items=100, description="Workout IDs to export, in output order")
+    program_id: Optional[str] = Field(None, description="Export every workout in this program (appended after workout_ids)")
+    format: Literal["simple", "log", "image", "docx"] = Field(default="simple", description="'simple' | 'log' PDF, 'image' PNG, or 'docx' Word log")
+    include_weights: bool = Field(default=False, description="Include exercise weights (PDF/image formats only)")
+    merge: bool = Field(default=True, description="Merge PDFs into a single document; otherwise stream a ZIP of parts")
@@ -98,3 +98,20 @@ class SaveStrengthLogRequest(BaseModel):
     notes: Optional[str] = None
     started_at: Optional[datetime] = None
     save_as_template: bool = False
+
+
+# ── Bulk Session Import Models ────────────────────────────────────────────
+
+class SessionImportResponse(BaseModel):
+    """Result of a bulk session import"""
+    rows: int = Field(default=0, description="Rows read from the file")
+    invalid_rows: int = Field(default=0, description="Rows skipped because they couldn't be parsed")
+    duplicate_rows: int = Field(default=0, description="Rows repeating a set already seen in the file")
+    skipped_existing: int = Field(default=0, description="Rows for (date, workout, exercise) already logged in the app")
+    sessions: int = Field(default=0, description="Sessions written (or that would be, for a dry run)")
+    exercises: int = Field(default=0, description="Exercise entries across the imported sessions")
+    histories: int = Field(default=0, description="Exercise history docs written")
+    personal_records_updated: int = Field(default=0, description="Tracked PRs raised by the import")
+    commits: int = Field(default=0, description="Batched commits used")
+    dry_run: bool = False
+    errors: List[str] = Field(default_factory=list, description="Per-row parse errors (capped)")
@@ -243,6 +243,54 @@ class UpdateSessionRequest(BaseModel):
     notes: Optional[str] = Field(None, max_length=500, description="Session notes")
     status: Optional[str] = Field(None, description="Session status")
 
+
+class SetDelta(BaseModel):
+    """Change to one set of an exercise, matched by set_number"""
+
+    set_number: int = Field(..., ge=1, description="Set to add, update or remove")
+    reps_completed: Optional[int] = Field(None, ge=0, description="Actual reps completed")
+    weight: Optional[float] = Field(None, ge=0, description="Weight used for this set")
+    notes: Optional[str] = Field(None, max_length=200, description="Notes about this set")
+    remove: bool = Field(default=False, description="Remove this set instead of updating it")
+
+
+class ExerciseDelta(BaseModel):
+    """Change to one exercise of an in-progress session, matched by exercise_name"""
+
+    exercise_name: str = Field(..., description="Exercise to add, update or remove")
+    fields: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="ExercisePerformance fields to set (e.g. weight, sets_completed, is_skipped)"
+    )
+    set_details: List[SetDelta] = Field(default_factory=list, description="Per-set changes")
+    remove: bool = Field(default=False, description="Remove this exercise from the session")
+
+    @field_validator('fields')
+    @classmethod
+    def validate_fields(cls, v):
+        """Only plain ExercisePerformance fields; the name and sets have their own delta keys."""
+        unknown = set(v) - (set(ExercisePerformance.model_fields) - {'exercise_name', 'set_details'})
+        if unknown:
+            raise ValueError(f"Unknown exercise fields: {', '.join(sorted(unknown))}")
+        return v
+
+
+class SessionAutosaveRequest(BaseModel):
+    """Delta autosave of an in-progress session (only what changed since the last save)"""
+
+    exercises: List[ExerciseDelta] = Field(default_factory=list, description="Changed exercises")
+    notes: Optional[str] = Field(None, max_length=500, description="Session notes, if changed")
+    exercise_order: Optional[List[str]] = Field(None, description="Custom exercise order, if changed")
+
+
+class SessionAutosaveResponse(BaseModel):
+    """Merged session state after an autosave"""
+
+    session: WorkoutSession = Field(..., description="Session with all deltas applied")
+    revision: int = Field(..., description="Autosave revision, incremented by every write")
+    coalesced: int = Field(default=1, description="Number of autosaves applied in the same write")
+
+
 class CompleteSessionRequest(BaseModel):
     """Request to finalize a workout session"""
 
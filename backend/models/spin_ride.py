@@ -22,6 +22,13 @@ class GenerateSpinRideRequest(BaseModel):
         default=None,
         description="Requested ride difficulty. If omitted, AI chooses based on ride theme.",
     )
+    engine: Literal["auto", "ai", "local"] = Field(
+        default="auto",
+        description=(
+            "auto: plan library / Gemini, falling back to the local generator when the model is "
+            "slow, rate limited, or unavailable. ai: Gemini only. local: local generator only."
+        ),
+    )
 
 
 class SpinRideSegment(BaseModel):
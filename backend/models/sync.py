@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+from .template import WorkoutTemplate
+from .program import Program
+from .session import WorkoutSession
+from .cardio import CardioSession
+
+
+class SyncTombstone(BaseModel):
+    """A document deleted since the client's cursor"""
+    collection: str = Field(..., description="workouts, programs, workout_sessions or cardio_sessions")
+    id: str = Field(..., description="ID of the deleted document")
+    deleted_at: Optional[datetime] = Field(None, description="When it was deleted")
+
+
+class SyncChangesResponse(BaseModel):
+    """Documents created, modified or deleted after the client's cursor"""
+    workouts: List[WorkoutTemplate] = Field(default_factory=list)
+    programs: List[Program] = Field(default_factory=list)
+    workout_sessions: List[WorkoutSession] = Field(default_factory=list)
+    cardio_sessions: List[CardioSession] = Field(default_factory=list)
+    deleted: List[SyncTombstone] = Field(default_factory=list)
+    cursor: str = Field(..., description="Pass as 'since' on the next call")
+    has_more: bool = Field(default=False, description="More changes are waiting; call again with the new cursor")
+    reset: bool = Field(
+        default=False,
+        description="Full snapshot (no or expired cursor): replace local data instead of merging"
+    )
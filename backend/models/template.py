@@ -1,9 +1,17 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Dict, Iterable, Optional, List
 from datetime import datetime
 from uuid import uuid4
 
-from .workout import ExerciseGroup, WorkoutSection
+from .workout import (
+    ExerciseGroup, WorkoutSection,
+    migrate_exercise_groups_to_sections, migrate_sections_to_exercise_groups
+)
+
+# Storage format for workout documents. Version 2 docs have sections and
+# exercise_groups both populated at write time, so reads decode them as-is.
+# Docs without a schema_version are legacy (version 1).
+CURRENT_WORKOUT_SCHEMA_VERSION = 2
 
 
 class TemplateNote(BaseModel):
@@ -121,6 +129,48 @@ class WorkoutTemplate(BaseModel):
         description="When the workout was archived"
     )
 
+    schema_version: int = Field(
+        default=1,
+        description="Storage format version (see CURRENT_WORKOUT_SCHEMA_VERSION); stamped on write"
+    )
+
+
+def normalize_workout_schema(
+    workout: WorkoutTemplate,
+    changed_fields: Optional[Iterable[str]] = None
+) -> WorkoutTemplate:
+    """Sync sections and exercise_groups and stamp the current schema version.
+
+    Call on every write path. For partial updates, pass the fields the update
+    touched: when only one non-empty representation changed, the other is
+    rebuilt from it instead of keeping a stale copy.
+    """
+    changed = set(changed_fields or ())
+    if 'sections' in changed and 'exercise_groups' not in changed and workout.sections:
+        workout.exercise_groups = []
+    elif 'exercise_groups' in changed and 'sections' not in changed and workout.exercise_groups:
+        workout.sections = None
+
+    if not workout.sections and workout.exercise_groups:
+        workout.sections = migrate_exercise_groups_to_sections(workout.exercise_groups)
+    elif workout.sections and not workout.exercise_groups:
+        workout.exercise_groups = migrate_sections_to_exercise_groups(workout.sections)
+
+    workout.schema_version = CURRENT_WORKOUT_SCHEMA_VERSION
+    return workout
+
+
+def decode_workout(workout_data: Dict[str, Any]) -> WorkoutTemplate:
+    """Build a WorkoutTemplate from a stored document.
+
+    Current-version docs are decoded as-is. Legacy docs are normalized in
+    memory until the schema migration job rewrites them.
+    """
+    workout = WorkoutTemplate(**workout_data)
+    if workout.schema_version < CURRENT_WORKOUT_SCHEMA_VERSION:
+        normalize_workout_schema(workout)
+    return workout
+
 
 class CreateWorkoutRequest(BaseModel):
     """Request model for creating a new workout"""
@@ -0,0 +1,75 @@
+"""
+Backfill Sync Fields
+Stamps modified_date on workouts, programs, workout sessions and cardio
+sessions that were written before every write went through a unit of work
+(or that store it as a string). The changes-since feed orders by
+modified_date, so documents without a timestamp there are invisible to it.
+
+Backfilled documents look modified "now" once; devices pick them up on their
+next sync.
+
+Usage:
+    python backend/scripts/backfill_sync_fields.py --user-id <uid>
+    python backend/scripts/backfill_sync_fields.py --all-users --dry-run
+"""
+
+import sys
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv(project_root / '.env')
+
+from backend.services.unit_of_work import SYNCED_COLLECTIONS, MAX_BATCH_WRITES  # noqa: E402
+
+
+def backfill_user(db, user_id: str, dry_run: bool) -> int:
+    """Stamp every synced doc of one user lacking a timestamp modified_date. Returns docs stamped."""
+    from firebase_admin import firestore
+
+    user_ref = db.collection('users').document(user_id)
+    stale = []
+    for collection in SYNCED_COLLECTIONS:
+        for doc in user_ref.collection(collection).select(['modified_date']).stream():
+            if not isinstance((doc.to_dict() or {}).get('modified_date'), datetime):
+                stale.append(doc.reference)
+
+    if not dry_run:
+        for start in range(0, len(stale), MAX_BATCH_WRITES):
+            batch = db.batch()
+            for ref in stale[start:start + MAX_BATCH_WRITES]:
+                batch.update(ref, {'modified_date': firestore.SERVER_TIMESTAMP})
+            batch.commit()
+    return len(stale)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stamp modified_date on documents the sync feed cannot see yet')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--user-id', help='Backfill a single user')
+    group.add_argument('--all-users', action='store_true', help='Backfill every user')
+    parser.add_argument('--dry-run', action='store_true', help='Count documents without writing')
+    args = parser.parse_args()
+
+    from firebase_admin import firestore
+    from backend.config.firebase_config import get_firebase_app
+
+    app = get_firebase_app()
+    if not app:
+        print("ERROR: Failed to initialize Firebase", file=sys.stderr)
+        sys.exit(2)
+
+    db = firestore.client(app=app)
+    user_ids = [args.user_id] if args.user_id else [ref.id for ref in db.collection('users').list_documents()]
+    total = 0
+    for user_id in user_ids:
+        stamped = backfill_user(db, user_id, args.dry_run)
+        total += stamped
+        if stamped:
+            print(f"{user_id}: {stamped} document(s) {'to stamp' if args.dry_run else 'stamped'}")
+    print(f"{'[DRY RUN] ' if args.dry_run else ''}{total} document(s) across {len(user_ids)} user(s)")
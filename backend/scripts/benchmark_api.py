@@ -0,0 +1,517 @@
+"""
+API Benchmark
+Runs the whole API in-process on the in-memory Firestore backend
+(FIRESTORE_BACKEND=memory, simulated RPC latency) against a synthetic user
+population built with demo_data_builder, drives a realistic request mix and
+reports p50/p95/p99 latency and Firestore operations per endpoint.
+
+The population mixes casual users (3 months of history), regulars (1 year)
+and veterans (--years). Each virtual client repeatedly picks a scenario:
+browsing, a full workout (start, autosave bursts, complete), exercise
+search, program progress and analytics, history, sync and exports.
+
+Results are compared with the stored baseline: an endpoint regresses when
+its p95 latency grows beyond --tolerance, or when it makes more Firestore
+reads/writes/deletes per request than --ops-tolerance allows. Operation
+counts don't depend on the machine; latencies do, so compare against a
+baseline recorded on the same hardware.
+
+Usage:
+    python backend/scripts/benchmark_api.py                    # run and compare with the baseline
+    python backend/scripts/benchmark_api.py --users 5000 --requests 50000 --concurrency 64
+    python backend/scripts/benchmark_api.py --save-baseline    # record a new baseline
+    python backend/scripts/benchmark_api.py --json results.json
+
+Exit status is 1 when an endpoint regressed against the baseline.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+from datetime import datetime, timezone, timedelta
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+DEFAULT_BASELINE = project_root / 'backend' / 'data' / 'benchmark_baseline.json'
+
+# (profile, share of users, years of history; None = --years)
+POPULATION = (
+    ('casual', 0.6, 0.25),
+    ('regular', 0.3, 1.0),
+    ('veteran', 0.1, None),
+)
+
+# (scenario, weight)
+SCENARIOS = (
+    ('browse', 25),
+    ('workout', 20),
+    ('exercise_search', 20),
+    ('progress', 15),
+    ('history', 10),
+    ('sync', 5),
+    ('export', 5),
+)
+
+EQUIPMENT = ('Barbell', 'Dumbbell', 'Cable', 'Machine', 'Kettlebell', 'Smith Machine', 'Band')
+MOVEMENTS = ('Bench Press', 'Incline Press', 'Row', 'Curl', 'Shoulder Press', 'Squat', 'Lunge',
+             'Deadlift', 'Romanian Deadlift', 'Lateral Raise', 'Tricep Extension', 'Fly', 'Pullover',
+             'Shrug', 'Calf Raise', 'Hip Thrust', 'Split Squat', 'Upright Row', 'Face Pull', 'Good Morning')
+VARIANTS = ('', 'Single Arm ', 'Seated ', 'Standing ', 'Incline ', 'Decline ', 'Close Grip ',
+            'Wide Grip ', 'Paused ')
+MUSCLE_GROUPS = ('Chest', 'Back', 'Shoulders', 'Biceps', 'Triceps', 'Quadriceps', 'Hamstrings', 'Glutes', 'Calves')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark the API on an in-memory Firestore')
+    parser.add_argument('--users', type=int, default=1000, help='Synthetic users (default 1000)')
+    parser.add_argument('--years', type=float, default=3.0, help='History of veteran users, in years (default 3)')
+    parser.add_argument('--requests', type=int, default=5000, help='Measured requests (default 5000)')
+    parser.add_argument('--concurrency', type=int, default=32, help='Concurrent virtual clients (default 32)')
+    parser.add_argument('--latency-ms', type=float, default=8.0, help='Median simulated Firestore RPC latency (default 8)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the population and request mix')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='Baseline file to compare with or save')
+    parser.add_argument('--save-baseline', action='store_true', help='Write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed p95 latency growth (default 0.25 = 25%%)')
+    parser.add_argument('--ops-tolerance', type=float, default=0.10, help='Allowed Firestore ops growth per request (default 0.10)')
+    parser.add_argument('--json', type=Path, help='Also write the results to this file')
+    return parser.parse_args()
+
+
+# Must be set before the app is imported: services pick their backend at import
+args = parse_args()
+os.environ['FIRESTORE_BACKEND'] = 'memory'
+os.environ['FIRESTORE_MEMORY_LATENCY_MS'] = str(args.latency_ms)
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('LOG_RATE_LIMIT', '5')
+
+from fastapi import Request  # noqa: E402
+
+from backend.main import app  # noqa: E402
+from backend.middleware.auth import get_current_user, get_current_user_optional  # noqa: E402
+from backend.services.demo_data_builder import (  # noqa: E402
+    build_workouts, build_program, build_sessions,
+    build_exercise_history, build_cardio_sessions,
+    build_personal_records,
+)
+from backend.services.exercise_analytics import exercise_analytics_service  # noqa: E402
+from backend.services.exercise_catalog_snapshot import (  # noqa: E402
+    METADATA_COLLECTION, METADATA_DOC, build_snapshot, upload_snapshot,
+)
+from backend.services.firestore_clients import firestore_clients  # noqa: E402
+from backend.services.firestore_usage import track_usage  # noqa: E402
+from backend.services.memory_firestore import LatencyModel  # noqa: E402
+
+
+# ── Population ─────────────────────────────────────────────────────────────
+
+def build_user(uid: str, years: float, now: datetime) -> Tuple[Dict[str, Dict], Dict[str, Any]]:
+    """Documents for one user (by path) and what the scenarios need to know about them"""
+    workouts = build_workouts()
+    program = build_program(workouts[0]['id'], workouts[1]['id'], workouts[2]['id'], now)
+
+    # build_sessions/build_cardio_sessions cover ~6-7 weeks; repeat them back in time
+    sessions, cardio = [], []
+    for block in range(max(1, round(years * 52 / 7))):
+        block_end = now - timedelta(weeks=7 * block)
+        sessions.extend(build_sessions(workouts, program['id'], block_end))
+        cardio.extend(build_cardio_sessions(block_end))
+    history = build_exercise_history(sessions)
+    personal_records = build_personal_records(sessions, now)
+
+    base = f'users/{uid}'
+    documents = {
+        base: {
+            'displayName': f'Benchmark {uid}',
+            'created_at': now - timedelta(days=365 * years),
+            'updated_at': now,
+            'preferences': {'theme': 'dark', 'defaultUnits': 'imperial'},
+            'active_program_id': program['id'],
+        },
+        f"{base}/programs/{program['id']}": {**program, 'modified_date': now},
+        f'{base}/data/personal_records': personal_records,
+    }
+    for workout in workouts:
+        # Stored as the API writes them (the demo builder uses ISO strings)
+        documents[f"{base}/workouts/{workout['id']}"] = {**workout, 'created_date': now, 'modified_date': now}
+    for session in sessions:
+        documents[f"{base}/workout_sessions/{session['id']}"] = {**session, 'modified_date': session['completed_at']}
+    for record in history:
+        documents[f"{base}/exercise_history/{record['id']}"] = record
+    for session in cardio:
+        documents[f"{base}/cardio_sessions/{session['id']}"] = {**session, 'modified_date': now}
+
+    profile = {
+        'uid': uid,
+        'workouts': [(w['id'], w['name'], w['exercise_groups']) for w in workouts],
+        'program_id': program['id'],
+        'exercises': sorted({g['exercises']['a'] for w in workouts for g in w['exercise_groups']}),
+        # Exercises with completed sets, so with an analytics series
+        'tracked': sorted({e['exercise_name'] for s in sessions for e in s['exercises_performed']}),
+    }
+    return documents, profile
+
+
+def build_catalog() -> List[Dict[str, Any]]:
+    """A global exercise catalog of production-like size, including every demo exercise"""
+    names = {f'{variant}{equipment} {movement}'
+             for equipment in EQUIPMENT for movement in MOVEMENTS for variant in VARIANTS}
+    names.update(g['exercises']['a'] for w in build_workouts() for g in w['exercise_groups'])
+    catalog = []
+    for i, name in enumerate(sorted(names)):
+        catalog.append({
+            'id': f'exercise-bench-{i:05d}',
+            'name': name,
+            'nameSearchTokens': name.lower().split(),
+            'exerciseTier': 1 + i % 3,
+            'targetMuscleGroup': MUSCLE_GROUPS[i % len(MUSCLE_GROUPS)],
+            'primaryEquipment': name.split()[0],
+            'isGlobal': True,
+        })
+    return catalog
+
+
+def seed(db, users: int, veteran_years: float) -> List[Dict[str, Any]]:
+    """Load the population and catalog, then build analytics series. Returns user profiles."""
+    now = datetime.now(timezone.utc)
+    profiles = []
+    thresholds, total = [], 0.0
+    for name, share, years in POPULATION:
+        total += share
+        thresholds.append((total, name, years if years is not None else veteran_years))
+
+    for i in range(users):
+        draw = random.random() * total
+        _, profile_name, years = next(t for t in thresholds if draw <= t[0])
+        documents, profile = build_user(f'bench-user-{i:05d}', years, now)
+        profile['profile'] = profile_name
+        db.load(documents)
+        profiles.append(profile)
+
+    catalog = build_catalog()
+    db.load({f"global_exercises/{exercise['id']}": exercise for exercise in catalog})
+    version = 'benchmark'
+    db.document(METADATA_COLLECTION, METADATA_DOC).set({'version': version, 'count': len(catalog)})
+    upload_snapshot(db, build_snapshot(catalog, version), version, len(catalog))
+
+    for profile in profiles:
+        exercise_analytics_service.rebuild(profile['uid'])
+    return profiles
+
+
+# ── Requests ───────────────────────────────────────────────────────────────
+
+class Recorder:
+    """Latency and Firestore operations per endpoint"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[Tuple[float, int, int, int, int, bool]]] = {}
+        self.measuring = False
+        self.measured = 0
+
+    def add(self, endpoint: str, seconds: float, usage, ok: bool) -> None:
+        if not self.measuring:
+            return
+        self.measured += 1
+        self.samples.setdefault(endpoint, []).append(
+            (seconds, usage.reads, usage.writes, usage.deletes, usage.rpcs, ok))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        endpoints = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            latencies = sorted(sample[0] * 1000 for sample in samples)
+            count = len(samples)
+            endpoints[endpoint] = {
+                'count': count,
+                'errors': sum(1 for sample in samples if not sample[5]),
+                'p50_ms': round(percentile(latencies, 50), 2),
+                'p95_ms': round(percentile(latencies, 95), 2),
+                'p99_ms': round(percentile(latencies, 99), 2),
+                'reads': round(sum(sample[1] for sample in samples) / count, 2),
+                'writes': round(sum(sample[2] for sample in samples) / count, 2),
+                'deletes': round(sum(sample[3] for sample in samples) / count, 2),
+                'rpcs': round(sum(sample[4] for sample in samples) / count, 2),
+            }
+        return endpoints
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+async def request(recorder: Recorder, uid: str, method: str, template: str,
+                  params: Optional[Dict[str, str]] = None, query: Optional[Dict[str, Any]] = None,
+                  body: Any = None) -> Tuple[int, Any]:
+    """One request straight into the ASGI app; returns (status, decoded JSON or None)"""
+    path = template.format(**(params or {}))
+    payload = json.dumps(body, default=str).encode() if body is not None else b''
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'root_path': '',
+        'path': path, 'raw_path': quote(path).encode(),
+        'query_string': urlencode(query or {}).encode(),
+        'headers': [(b'content-type', b'application/json'), (b'x-benchmark-user', uid.encode())],
+        'server': ('benchmark', 80), 'client': ('127.0.0.1', 0),
+    }
+    status, chunks, sent = 500, [], False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            # The client stays connected until the response ends; an early
+            # disconnect would cancel streaming responses
+            await finished.wait()
+            return {'type': 'http.disconnect'}
+        sent = True
+        return {'type': 'http.request', 'body': payload, 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                finished.set()
+
+    # Counts every Firestore call the request makes, including while it streams
+    with track_usage() as usage:
+        started = time.perf_counter()
+        await app(scope, receive, send)
+        elapsed = time.perf_counter() - started
+    recorder.add(f'{method} {template}', elapsed, usage, ok=status < 400)
+
+    data = b''.join(chunks)
+    try:
+        return status, json.loads(data) if data else None
+    except ValueError:
+        return status, None
+
+
+def benchmark_user(request_info: Request) -> Dict[str, Any]:
+    """Stands in for Firebase auth: the user is named by the X-Benchmark-User header"""
+    uid = request_info.headers.get('x-benchmark-user')
+    return {'uid': uid, 'email': f'{uid}@benchmark.invalid', 'email_verified': True}
+
+
+# ── Scenarios ──────────────────────────────────────────────────────────────
+
+def misspell(name: str) -> str:
+    """Drop or swap one letter, like a typed exercise name"""
+    if len(name) < 4:
+        return name
+    i = random.randrange(1, len(name) - 2)
+    if random.random() < 0.5:
+        return name[:i] + name[i + 1:]
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+async def browse(recorder: Recorder, user: Dict[str, Any]) -> None:
+    uid = user['uid']
+    await request(recorder, uid, 'GET', '/api/v3/firebase/workouts')
+    await request(recorder, uid, 'GET', '/api/v3/firebase/programs')
+    await request(recorder, uid, 'GET', '/api/v3/workout-sessions', query={'page_size': 20})
+
+
+async def workout(recorder: Recorder, user: Dict[str, Any]) -> None:
+    """Start a session, autosave in bursts (some concurrent, as the client retries), complete it"""
+    uid = user['uid']
+    workout_id, workout_name, groups = random.choice(user['workouts'])
+    status, session = await request(recorder, uid, 'POST', '/api/v3/workout-sessions', body={
+        'workout_id': workout_id, 'workout_name': workout_name, 'program_id': user['program_id'],
+    })
+    if status >= 400 or not session:
+        return
+    params = {'session_id': session['id']}
+    autosave = '/api/v3/workout-sessions/{session_id}/autosave'
+
+    performed = []
+    for group in groups:
+        name = group['exercises']['a']
+        weight = str(random.randrange(45, 315, 5))
+        burst = [
+            request(recorder, uid, 'POST', autosave, params, body={
+                'exercises': [{'exercise_name': name, 'fields': {
+                    'group_id': group['group_id'], 'weight': weight, 'sets_completed': sets,
+                }}],
+            })
+            for sets in range(1, random.randint(2, 4))
+        ]
+        await asyncio.gather(*burst)
+        performed.append({
+            'exercise_name': name, 'order_index': len(performed), 'group_id': group['group_id'], 'weight': weight,
+            'sets_completed': int(group['sets']) if str(group['sets']).isdigit() else 3,
+            'target_sets': str(group['sets']), 'target_reps': str(group['reps']),
+        })
+
+    await request(recorder, uid, 'POST', '/api/v3/workout-sessions/{session_id}/complete', params, body={
+        'exercises_performed': performed,
+    })
+
+
+async def exercise_search(recorder: Recorder, user: Dict[str, Any]) -> None:
+    uid = user['uid']
+    await request(recorder, uid, 'GET', '/api/v3/exercises', query={'page': 1, 'page_size': 100,
+                                                                   'max_tier': random.randint(1, 3)})
+    names = [misspell(name) for name in random.sample(user['exercises'], min(5, len(user['exercises'])))]
+    await request(recorder, uid, 'POST', '/api/v3/exercises/resolve', body={'names': names})
+
+
+async def progress(recorder: Recorder, user: Dict[str, Any]) -> None:
+    uid = user['uid']
+    await request(recorder, uid, 'GET', '/api/v3/firebase/programs/{program_id}/progress',
+                  {'program_id': user['program_id']})
+    await request(recorder, uid, 'GET', '/api/v3/analytics/exercises')
+    await request(recorder, uid, 'GET', '/api/v3/analytics/exercises/{exercise_name}',
+                  {'exercise_name': random.choice(user['tracked'])}, query={'period': 'week'})
+
+
+async def history(recorder: Recorder, user: Dict[str, Any]) -> None:
+    uid = user['uid']
+    workout_id = random.choice(user['workouts'])[0]
+    await request(recorder, uid, 'GET', '/api/v3/workout-sessions/history/workout/{workout_id}',
+                  {'workout_id': workout_id})
+    await request(recorder, uid, 'GET', '/api/v3/users/me/personal-records')
+
+
+async def sync(recorder: Recorder, user: Dict[str, Any]) -> None:
+    uid = user['uid']
+    status, page = await request(recorder, uid, 'GET', '/api/v3/sync/changes', query={'limit': 100})
+    if status < 400 and page and page.get('cursor'):
+        await request(recorder, uid, 'GET', '/api/v3/sync/changes', query={'since': page['cursor'], 'limit': 100})
+
+
+async def export(recorder: Recorder, user: Dict[str, Any]) -> None:
+    uid = user['uid']
+    await request(recorder, uid, 'GET', '/api/v3/export/text/{workout_id}',
+                  {'workout_id': random.choice(user['workouts'])[0]})
+    if random.random() < 0.2:
+        await request(recorder, uid, 'GET', '/api/v3/user/data/export')
+
+
+SCENARIO_FUNCTIONS = {
+    'browse': browse, 'workout': workout, 'exercise_search': exercise_search,
+    'progress': progress, 'history': history, 'sync': sync, 'export': export,
+}
+
+
+async def client(recorder: Recorder, users: List[Dict[str, Any]], target: int) -> None:
+    names = [name for name, _ in SCENARIOS]
+    weights = [weight for _, weight in SCENARIOS]
+    while recorder.measured < target:
+        scenario = random.choices(names, weights)[0]
+        await SCENARIO_FUNCTIONS[scenario](recorder, random.choice(users))
+
+
+async def run(users: List[Dict[str, Any]], requests: int, concurrency: int) -> Tuple[Recorder, float]:
+    recorder = Recorder()
+    # Warm-up pass (lazy connections, caches), not measured
+    for scenario in SCENARIO_FUNCTIONS.values():
+        await scenario(recorder, users[0])
+
+    recorder.measuring = True
+    started = time.perf_counter()
+    await asyncio.gather(*(client(recorder, users, requests) for _ in range(concurrency)))
+    return recorder, time.perf_counter() - started
+
+
+# ── Report ─────────────────────────────────────────────────────────────────
+
+def print_report(results: Dict[str, Any]) -> None:
+    print(f"\n{'Endpoint':<62} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'reads':>7} {'writes':>7} {'dels':>5} {'rpcs':>6} {'err':>4}")
+    for endpoint, stats in results['endpoints'].items():
+        print(f"{endpoint:<62} {stats['count']:>6} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+              f"{stats['p99_ms']:>8.1f} {stats['reads']:>7.1f} {stats['writes']:>7.1f} "
+              f"{stats['deletes']:>5.1f} {stats['rpcs']:>6.1f} {stats['errors']:>4}")
+    run_info = results['run']
+    print(f"\n{run_info['requests']} requests in {run_info['seconds']:.1f}s "
+          f"({run_info['requests_per_second']:.0f} req/s, concurrency {run_info['concurrency']})")
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, ops_tolerance: float) -> List[str]:
+    """Regressions of results against baseline, one line each"""
+    regressions = []
+    for endpoint, stats in results['endpoints'].items():
+        base = baseline.get('endpoints', {}).get(endpoint)
+        if base is None:
+            continue
+        # Ignore sub-millisecond noise on fast endpoints
+        if stats['p95_ms'] > base['p95_ms'] * (1 + tolerance) and stats['p95_ms'] - base['p95_ms'] > 1:
+            regressions.append(f"{endpoint}: p95 {base['p95_ms']:.1f}ms -> {stats['p95_ms']:.1f}ms")
+        for op in ('reads', 'writes', 'deletes'):
+            if stats[op] > base[op] * (1 + ops_tolerance) + 0.5:
+                regressions.append(f"{endpoint}: {op}/request {base[op]:.1f} -> {stats[op]:.1f}")
+        if stats['errors'] and not base.get('errors'):
+            regressions.append(f"{endpoint}: {stats['errors']} failed requests")
+    return regressions
+
+
+async def main() -> int:
+    random.seed(args.seed)
+    app.dependency_overrides[get_current_user] = benchmark_user
+    app.dependency_overrides[get_current_user_optional] = benchmark_user
+
+    await app.router.startup()
+    db = firestore_clients.client()
+    latency = db.latency
+    db.latency = LatencyModel(0, 0)  # seeding runs at memory speed
+
+    started = time.perf_counter()
+    users = seed(db, args.users, args.years)
+    print(f"Seeded {len(users)} users ({db.document_count()} documents) in {time.perf_counter() - started:.1f}s")
+
+    db.latency = latency
+    recorder, seconds = await run(users, args.requests, args.concurrency)
+    await app.router.shutdown()
+
+    results = {
+        'run': {
+            'users': args.users, 'years': args.years, 'requests': recorder.measured,
+            'concurrency': args.concurrency, 'latency_ms': args.latency_ms, 'seed': args.seed,
+            'seconds': round(seconds, 2), 'requests_per_second': round(recorder.measured / seconds, 1),
+            'python': platform.python_version(),
+            'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        },
+        'endpoints': recorder.summary(),
+    }
+    print_report(results)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + '\n')
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2) + '\n')
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare(results, baseline, args.tolerance, args.ops_tolerance)
+    if regressions:
+        print(f"\nREGRESSIONS against {args.baseline.name} ({baseline['run']['recorded_at']}):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions against {args.baseline.name} ({baseline['run']['recorded_at']})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,105 @@
+"""
+Build the Exercise Catalog Snapshot
+Reads global_exercises, encodes it as a compact dictionary-encoded snapshot
+(see backend/services/exercise_catalog_snapshot.py), writes the local artifact
+and publishes it to Firestore: chunk docs under
+exercises_metadata/global/snapshot_chunks and the checksum/version under
+exercises_metadata/global.snapshot.
+
+Run it after any catalog import or update script; until then workers notice
+the catalog version moved past the snapshot and read from Firestore.
+
+Usage:
+    python backend/scripts/build_exercise_snapshot.py
+    python backend/scripts/build_exercise_snapshot.py --dry-run
+    python backend/scripts/build_exercise_snapshot.py --output /tmp/snapshot.json.gz --no-upload
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv(project_root / '.env')
+
+from backend.services.exercise_catalog_snapshot import (  # noqa: E402
+    SNAPSHOT_PATH,
+    build_snapshot,
+    snapshot_checksum,
+    upload_snapshot,
+    write_snapshot_file,
+)
+
+PAGE_SIZE = 500
+
+
+def iter_exercises(db):
+    """Every global_exercises doc, paged by document ID"""
+    from google.cloud.firestore_v1.field_path import FieldPath
+
+    last_doc = None
+    while True:
+        query = db.collection('global_exercises').order_by(FieldPath.document_id()).limit(PAGE_SIZE)
+        if last_doc is not None:
+            query = query.start_after(last_doc)
+        docs = list(query.stream())
+        for doc in docs:
+            data = doc.to_dict()
+            data.setdefault('id', doc.id)
+            yield data
+        if len(docs) < PAGE_SIZE:
+            return
+        last_doc = docs[-1]
+
+
+def build(db, output: Path, upload: bool, dry_run: bool) -> int:
+    metadata_doc = db.collection('exercises_metadata').document('global').get()
+    metadata = metadata_doc.to_dict() if metadata_doc.exists else {}
+    version = metadata.get('version')
+
+    exercises = list(iter_exercises(db))
+    blob = build_snapshot(exercises, version)
+    checksum = snapshot_checksum(blob)
+    raw_size = len(json.dumps(exercises, default=str).encode('utf-8'))
+
+    print(f"Catalog v{version}: {len(exercises)} exercises")
+    print(f"Snapshot: {len(blob):,} bytes (plain JSON ~{raw_size:,} bytes), sha256 {checksum[:16]}")
+
+    previous = metadata.get('snapshot') or {}
+    if previous.get('checksum') == checksum:
+        print("Snapshot unchanged since the last build")
+
+    if dry_run:
+        print("[DRY RUN] Nothing written")
+        return 0
+
+    write_snapshot_file(blob, output)
+    print(f"Wrote {output}")
+
+    if upload:
+        snapshot_meta = upload_snapshot(db, blob, version, len(exercises))
+        print(f"Published {snapshot_meta['chunks']} chunk(s) to exercises_metadata/global")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build and publish the exercise catalog snapshot')
+    parser.add_argument('--output', type=Path, default=SNAPSHOT_PATH, help='Local artifact path')
+    parser.add_argument('--no-upload', action='store_true', help='Write the local artifact only')
+    parser.add_argument('--dry-run', action='store_true', help='Build and report sizes without writing anything')
+    args = parser.parse_args()
+
+    from firebase_admin import firestore
+    from backend.config.firebase_config import get_firebase_app
+
+    app = get_firebase_app()
+    if not app:
+        print("ERROR: Failed to initialize Firebase", file=sys.stderr)
+        sys.exit(2)
+
+    sys.exit(build(firestore.client(app=app), args.output, not args.no_upload, args.dry_run))
@@ -0,0 +1,113 @@
+"""
+Build the Spin Ride / Tabata Kettlebell Plan Library
+Pre-generates validated plans for common parameter tuples so the generate
+endpoints can serve them without calling Gemini.
+
+Spin rides are checked with spin_ride_validator.validate_spin_ride_plan and
+tabata plans against the TabataKettlebellPlan schema; invalid plans are dropped.
+Output goes to backend/data/plan_library/<kind>.json and is merged with any
+existing file, so the script can be re-run to top up pools.
+
+Usage:
+    python backend/scripts/build_plan_library.py --kind spin_ride --variants 5
+    python backend/scripts/build_plan_library.py --kind tabata_kettlebell --variants 3
+    python backend/scripts/build_plan_library.py --kind spin_ride --durations 20 30 --dry-run
+"""
+
+import sys
+import argparse
+import itertools
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv(project_root / '.env')
+
+from backend.services.plan_library import (  # noqa: E402
+    PlanLibrary,
+    _validate_spin_ride,
+    _validate_tabata_kettlebell,
+    spin_ride_key,
+    tabata_kettlebell_key,
+)
+
+SPIN_DURATIONS = [10, 15, 20, 30, 45, 60]
+SPIN_DIFFICULTIES = ["easy", "moderate", "hard", "intense"]
+
+TABATA_PROTOCOLS = ["20/10", "40/20"]
+TABATA_FOCUS_AREAS = ["upper_body", "lower_body", "chest", "back", "core", "full_body", "conditioning"]
+TABATA_SETS = [1, 2, 3, 4]
+
+
+def spin_ride_jobs(durations):
+    """(key, generate kwargs) for every common spin ride tuple"""
+    for duration, difficulty, all_outs in itertools.product(durations, SPIN_DIFFICULTIES, [False, True]):
+        key = spin_ride_key(duration, all_outs, difficulty)
+        yield key, {"duration_minutes": duration, "include_all_outs": all_outs, "difficulty": difficulty}
+
+
+def tabata_jobs(set_counts):
+    """(key, generate kwargs) for single-focus, classic 8-round tabata tuples"""
+    for protocol, focus, sets in itertools.product(TABATA_PROTOCOLS, TABATA_FOCUS_AREAS, set_counts):
+        key = tabata_kettlebell_key(protocol, [focus], sets, 8)
+        yield key, {"protocol": protocol, "focus_areas": [focus], "sets": sets, "rounds_per_set": 8}
+
+
+def build(kind: str, variants: int, max_attempts: int, durations, set_counts, dry_run: bool) -> int:
+    if kind == "spin_ride":
+        from backend.services.spin_ride_generator import get_spin_ride_generator
+        generator = get_spin_ride_generator()
+        library = PlanLibrary(kind, _validate_spin_ride, pool_size=variants)
+        jobs = list(spin_ride_jobs(durations))
+    else:
+        from backend.services.tabata_kettlebell_generator import get_tabata_kettlebell_generator
+        generator = get_tabata_kettlebell_generator()
+        library = PlanLibrary(kind, _validate_tabata_kettlebell, pool_size=variants)
+        jobs = list(tabata_jobs(set_counts))
+
+    print(f"{len(jobs)} parameter tuples, {variants} variants each")
+    if dry_run:
+        for key, _ in jobs:
+            print(f"  [DRY RUN] {key}")
+        return 0
+
+    if not generator.is_available():
+        print("ERROR: GEMINI_API_KEY is not configured - cannot generate.", file=sys.stderr)
+        return 2
+
+    added = rejected = failed = 0
+    for key, kwargs in jobs:
+        attempts = 0
+        while not library.is_full(key) and attempts < max_attempts:
+            attempts += 1
+            try:
+                plan = generator.generate(**kwargs)
+            except Exception as e:
+                failed += 1
+                print(f"  FAIL {key}: {e}")
+                continue
+            if library.add(key, plan):
+                added += 1
+            else:
+                rejected += 1
+        print(f"  {key}: {'full' if library.is_full(key) else 'incomplete'} after {attempts} call(s)")
+
+    path = library.save()
+    print(f"\nAdded {added} plans ({rejected} rejected, {failed} failed) -> {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-generate validated spin ride / tabata plans')
+    parser.add_argument('--kind', choices=['spin_ride', 'tabata_kettlebell'], default='spin_ride')
+    parser.add_argument('--variants', type=int, default=5, help='Plans to keep per parameter tuple')
+    parser.add_argument('--max-attempts', type=int, default=8, help='Model calls allowed per tuple')
+    parser.add_argument('--durations', type=int, nargs='+', default=SPIN_DURATIONS, help='Spin ride durations (minutes)')
+    parser.add_argument('--sets', type=int, nargs='+', default=TABATA_SETS, help='Tabata set counts')
+    parser.add_argument('--dry-run', action='store_true', help='List parameter tuples without calling the model')
+    args = parser.parse_args()
+
+    sys.exit(build(args.kind, args.variants, args.max_attempts, args.durations, args.sets, args.dry_run))
@@ -0,0 +1,61 @@
+"""
+Migrate Workout Documents to the Current Schema Version
+Rewrites legacy workout docs (exercise_groups-only or sections-only) with both
+formats populated and stamps schema_version, so API reads never convert.
+
+Progress is checkpointed in Firestore (migrations/workout_schema_v<N>); an
+interrupted run picks up where it left off.
+
+Usage:
+    python backend/scripts/migrate_workout_schema.py --dry-run     # Count legacy docs without writing
+    python backend/scripts/migrate_workout_schema.py               # Migrate (resumes from checkpoint)
+    python backend/scripts/migrate_workout_schema.py --max-docs 5000
+    python backend/scripts/migrate_workout_schema.py --reset       # Rescan from the beginning
+    python backend/scripts/migrate_workout_schema.py --status      # Show the stored checkpoint
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv(project_root / '.env')
+
+from backend.services.workout_schema_migration import (  # noqa: E402
+    MigrationLeaseHeld,
+    WorkoutSchemaMigration,
+    WORKOUT_MIGRATION_PAGE_SIZE,
+)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rewrite legacy workout docs to the current schema version')
+    parser.add_argument('--dry-run', action='store_true', help='Count docs that would change without writing')
+    parser.add_argument('--max-docs', type=int, default=None, help='Stop after scanning this many docs')
+    parser.add_argument('--page-size', type=int, default=WORKOUT_MIGRATION_PAGE_SIZE, help='Docs per page / batch (max 500)')
+    parser.add_argument('--reset', action='store_true', help='Ignore the checkpoint and scan from the beginning')
+    parser.add_argument('--status', action='store_true', help='Print the stored checkpoint and exit')
+    args = parser.parse_args()
+
+    migration = WorkoutSchemaMigration(page_size=args.page_size)
+    if not migration.is_available():
+        print("ERROR: Firestore is not configured - check Firebase environment variables.", file=sys.stderr)
+        sys.exit(2)
+
+    if args.status:
+        print(json.dumps(migration.get_status(), indent=2, default=str))
+        sys.exit(0)
+
+    try:
+        result = migration.run(max_docs=args.max_docs, dry_run=args.dry_run, reset=args.reset)
+    except MigrationLeaseHeld as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    prefix = "[DRY RUN] " if args.dry_run else ""
+    print(f"{prefix}Scanned {result['scanned']} docs, migrated {result['migrated']}, failed {result['failed']}")
+    print(f"{prefix}{'Completed' if result['completed'] else 'Stopped early - re-run to resume'}")
@@ -0,0 +1,41 @@
+"""
+Rebuild Exercise Analytics Series
+Recomputes users/{uid}/analytics/* from workout_sessions. Use it to backfill
+series for sessions logged before analytics existed, or to repair drift.
+
+Usage:
+    python backend/scripts/rebuild_exercise_analytics.py --user-id <uid>
+    python backend/scripts/rebuild_exercise_analytics.py --all-users
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv(project_root / '.env')
+
+from backend.services.exercise_analytics import ExerciseAnalyticsService  # noqa: E402
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild per-exercise analytics series from workout sessions')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--user-id', help='Rebuild a single user')
+    group.add_argument('--all-users', action='store_true', help='Rebuild every user')
+    args = parser.parse_args()
+
+    service = ExerciseAnalyticsService()
+    if not service.is_available():
+        print("ERROR: Firestore is not configured - check Firebase environment variables.", file=sys.stderr)
+        sys.exit(2)
+
+    user_ids = [args.user_id] if args.user_id else [ref.id for ref in service.db.collection('users').list_documents()]
+    for user_id in user_ids:
+        result = service.rebuild(user_id)
+        print(f"{user_id}: {result['series']} series from {result['sessions_scanned']} sessions "
+              f"({result['removed']} stale removed)")
@@ -23,6 +23,7 @@ load_dotenv(project_root / '.env')
 
 from backend.config.firebase_config import get_firebase_app
 from firebase_admin import firestore
+from backend.services.catalog_sync import apply_field_updates
 
 
 EXCEL_PATH = Path(__file__).parent / "analysis_results" / "matched_exercises_with_videos.xlsx"
@@ -81,29 +82,17 @@ def update_firestore(exercises, dry_run=False):
         return False
 
     db = firestore.client(app=app)
-    updated = 0
-    not_found = []
-
-    for i, ex in enumerate(exercises, 1):
-        doc_ref = db.collection('global_exercises').document(ex['id'])
-
-        if dry_run:
-            # Verify document exists
-            doc = doc_ref.get()
-            exists = doc.exists
-            status = "OK" if exists else "NOT FOUND"
-            if not exists:
-                not_found.append(ex)
-            fields = ', '.join(f"{k}" for k in ex['videos'])
-            print(f"  [{i}/{len(exercises)}] {status} | {ex['name']} | {fields}")
-            updated += 1 if exists else 0
-        else:
-            try:
-                doc_ref.update(ex['videos'])
-                print(f"  [{i}/{len(exercises)}] Updated: {ex['name']}")
-                updated += 1
-            except Exception as e:
-                print(f"  [{i}/{len(exercises)}] FAILED: {ex['name']} — {e}")
+    result = apply_field_updates(
+        db, 'global_exercises',
+        [(ex['id'], ex['videos']) for ex in exercises],
+        dry_run=dry_run,
+        progress=lambda done, total: print(f"  Progress: {done}/{total}")
+    )
+    updated = result['would_update'] if dry_run else result['updated']
+    missing = set(result['missing'])
+    not_found = [ex for ex in exercises if ex['id'] in missing]
+    for doc_id, error in result['failed']:
+        print(f"  FAILED: {doc_id} — {error}")
 
     # Summary
     short_count = sum(1 for ex in exercises if 'shortVideoUrl' in ex['videos'])
@@ -116,12 +105,16 @@ def update_firestore(exercises, dry_run=False):
     print(f"  Short video URLs:      {short_count}")
     print(f"  Detailed video URLs:   {detailed_count}")
     print(f"{'Updated' if not dry_run else 'Would update'}: {updated}")
+    if not dry_run:
+        print(f"Batch commits:           {result['commits']}")
+        if result['failed']:
+            print(f"Failed:                  {len(result['failed'])}")
     if not_found:
         print(f"Not found in Firestore:  {len(not_found)}")
         for ex in not_found:
             print(f"    - {ex['name']} ({ex['id']})")
 
-    return len(not_found) == 0
+    return len(not_found) == 0 and not result['failed']
 
 
 def main():
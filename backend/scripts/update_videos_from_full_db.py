@@ -24,6 +24,7 @@ load_dotenv(project_root / '.env')
 
 from backend.config.firebase_config import get_firebase_app
 from firebase_admin import firestore
+from backend.services.catalog_sync import apply_field_updates
 
 
 EXCEL_PATH = project_root / "full exercise db rip.xlsx"
@@ -114,21 +115,18 @@ def match_and_update(excel_exercises, name_index, db, dry_run=False):
                 print(f"  - {name}")
         return len(matched)
 
-    # Individual updates (safer than batches if any doc is missing)
-    updated = 0
-    failed = 0
-
-    for i, m in enumerate(matched, 1):
-        try:
-            doc_ref = db.collection('global_exercises').document(m['doc_id'])
-            doc_ref.update(m['videos'])
-            updated += 1
-        except Exception as e:
-            failed += 1
-            print(f"  FAILED [{i}]: {m['name']} ({m['doc_id']}) — {e}")
-
-        if updated % 100 == 0:
-            print(f"  Progress: {updated} updated ({i}/{len(matched)})")
+    # Batched updates; missing docs are skipped and a failed batch falls back to per-doc updates
+    result = apply_field_updates(
+        db, 'global_exercises',
+        [(m['doc_id'], m['videos']) for m in matched],
+        progress=lambda done, total: print(f"  Progress: {done}/{total}")
+    )
+    updated = result['updated']
+    failed = len(result['failed'])
+    for doc_id, error in result['failed']:
+        print(f"  FAILED: {doc_id} — {error}")
+    if result['missing']:
+        print(f"  Missing in Firestore: {len(result['missing'])}")
 
     # Summary
     short_count = sum(1 for m in matched if 'shortVideoUrl' in m['videos'])
@@ -140,7 +138,7 @@ def match_and_update(excel_exercises, name_index, db, dry_run=False):
     print(f"Total matched:           {len(matched)}")
     print(f"  Short video URLs:      {short_count}")
     print(f"  Detailed video URLs:   {detailed_count}")
-    print(f"Updated:                 {updated}")
+    print(f"Updated:                 {updated} ({result['commits']} batch commits)")
     if failed:
         print(f"Failed:                  {failed}")
     print(f"Unmatched (no Firestore): {len(unmatched)}")
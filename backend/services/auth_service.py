@@ -9,16 +9,7 @@ import logging
 from typing import Dict, Optional, Any
 from datetime import datetime
 
-try:
-    import firebase_admin
-    from firebase_admin import auth
-    FIREBASE_AVAILABLE = True
-except ImportError:
-    FIREBASE_AVAILABLE = False
-    firebase_admin = None
-    auth = None
-
-from ..config.firebase_config import get_firebase_app, is_firebase_available
+from ..config.firebase_config import FIREBASE_AVAILABLE, firebase_auth as auth, get_firebase_app
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +19,12 @@ class AuthService:
     def __init__(self):
         self._available = False
         self.app = None
-        self._initialize()
+        self._checked = False
+    
+    @property
+    def initialized(self) -> bool:
+        """Whether Firebase Auth has been checked yet (never triggers a check)"""
+        return self._checked
     
     def _initialize(self):
         """Initialize Firebase Auth service using centralized config"""
@@ -55,8 +51,11 @@ class AuthService:
         if not FIREBASE_AVAILABLE:
             return False
         
-        # Re-check Firebase app availability if not available
-        if not self._available:
+        if not self._checked:
+            self._checked = True
+            self._initialize()
+        elif not self._available:
+            # Re-check Firebase app availability if not available
             self.app = get_firebase_app()
             self._available = self.app is not None
             if self._available:
@@ -83,7 +82,7 @@ class AuthService:
                 'firebase_claims': decoded_token
             }
             
-            logger.info(f"✅ Token verified for user: {user_info['uid']}")
+            logger.debug(f"✅ Token verified for user: {user_info['uid']}")
             return user_info
             
         except auth.InvalidIdTokenError:
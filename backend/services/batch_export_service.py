@@ -0,0 +1,164 @@
+"""
+Batch Export Service for Ghost Gym
+Renders many workouts concurrently and packages them as one merged PDF or a streamed ZIP archive
+"""
+
+import asyncio
+import io
+import logging
+import os
+import zipfile
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from backend.models import WorkoutTemplate
+from .export_service import ExportService
+from .v2.gotenberg_client import GotenbergClient
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on simultaneous Gotenberg conversions per batch (Chromium renders are CPU-heavy)
+GOTENBERG_MAX_CONCURRENCY = int(os.getenv("GOTENBERG_MAX_CONCURRENCY", "4"))
+
+FORMAT_EXTENSIONS = {"simple": "pdf", "log": "pdf", "image": "png", "docx": "docx"}
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, non-seekable buffer so zipfile can emit an archive incrementally"""
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        """Return everything written since the last drain"""
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class BatchExportService:
+    """Concurrent multi-workout export on top of ExportService"""
+
+    def __init__(self, export_service: ExportService, max_concurrency: int = GOTENBERG_MAX_CONCURRENCY):
+        self.export_service = export_service
+        self.max_concurrency = max(1, max_concurrency)
+
+    @staticmethod
+    def part_filename(index: int, workout: WorkoutTemplate, export_format: str) -> str:
+        """Archive entry name; the index prefix keeps program order when unzipped"""
+        safe_name = workout.name.replace(' ', '_').replace('/', '-')[:30]
+        return f"{index + 1:03d}_{safe_name}.{FORMAT_EXTENSIONS[export_format]}"
+
+    def _render_part_sync(
+        self,
+        client: Optional[GotenbergClient],
+        workout: WorkoutTemplate,
+        export_format: str,
+        include_weights: bool,
+        exercise_weights: Optional[dict]
+    ) -> bytes:
+        """Render a single Gotenberg-backed workout to bytes (runs in a worker thread)"""
+        html_content = self.export_service.render_export_html(
+            workout, export_format, include_weights, exercise_weights
+        )
+        if export_format == "image":
+            return client.html_to_image_bytes(html_content)
+        return client.html_to_pdf_bytes(html_content)
+
+    def _start_renders(
+        self,
+        client: Optional[GotenbergClient],
+        workouts: List[WorkoutTemplate],
+        export_format: str,
+        include_weights: bool,
+        weights_by_workout: Optional[Dict[str, dict]]
+    ) -> List["asyncio.Task"]:
+        """Schedule every part at once; the semaphore bounds how many hit Gotenberg together"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def render(index: int, workout: WorkoutTemplate) -> Tuple[int, Optional[bytes], Optional[str]]:
+            exercise_weights = (weights_by_workout or {}).get(workout.id)
+            async with semaphore:
+                try:
+                    if export_format == "docx":
+                        data = await self.export_service.generate_docx_bytes(workout)
+                    else:
+                        data = await asyncio.to_thread(
+                            self._render_part_sync, client, workout, export_format,
+                            include_weights, exercise_weights
+                        )
+                    return index, data, None
+                except Exception as e:
+                    logger.warning(f"Batch export failed for workout {workout.id}: {str(e)}")
+                    return index, None, str(e)
+
+        return [asyncio.create_task(render(i, w)) for i, w in enumerate(workouts)]
+
+    async def render_merged_pdf(
+        self,
+        client: GotenbergClient,
+        workouts: List[WorkoutTemplate],
+        export_format: str,
+        include_weights: bool = False,
+        weights_by_workout: Optional[Dict[str, dict]] = None
+    ) -> Tuple[bytes, List[str]]:
+        """
+        Render all workouts concurrently and merge them into one PDF in request order.
+
+        Returns:
+            Tuple of (merged PDF bytes, IDs of workouts that failed to render)
+        """
+        tasks = self._start_renders(client, workouts, export_format, include_weights, weights_by_workout)
+        results = sorted(await asyncio.gather(*tasks), key=lambda r: r[0])
+
+        parts = [data for _, data, error in results if error is None]
+        failed = [workouts[index].id for index, _, error in results if error is not None]
+        if not parts:
+            raise Exception("No workouts could be rendered")
+
+        merged = await asyncio.to_thread(client.merge_pdfs, parts)
+        logger.info(f"Batch export merged {len(parts)} PDFs ({len(failed)} failed)")
+        return merged, failed
+
+    async def stream_zip(
+        self,
+        client: Optional[GotenbergClient],
+        workouts: List[WorkoutTemplate],
+        export_format: str,
+        include_weights: bool = False,
+        weights_by_workout: Optional[Dict[str, dict]] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield a ZIP archive chunk by chunk, adding each part as soon as it finishes rendering.
+        Failed parts are listed in an errors.txt entry instead of aborting the download.
+        """
+        tasks = self._start_renders(client, workouts, export_format, include_weights, weights_by_workout)
+        sink = _ZipSink()
+        failed = []
+
+        try:
+            # Parts are already compressed (PDF/PNG/DOCX), so store rather than deflate
+            with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+                for next_part in asyncio.as_completed(tasks):
+                    index, data, error = await next_part
+                    if error is not None:
+                        failed.append(f"{workouts[index].id} ({workouts[index].name}): {error}")
+                        continue
+                    archive.writestr(self.part_filename(index, workouts[index], export_format), data)
+                    yield sink.drain()
+
+                if failed:
+                    archive.writestr("errors.txt", "\n".join(failed) + "\n")
+            yield sink.drain()
+            logger.info(f"Batch export streamed {len(workouts) - len(failed)} parts ({len(failed)} failed)")
+        finally:
+            # Client disconnected or generator closed early - stop outstanding renders
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,263 @@
+"""
+Catalog Sync - Shared helpers for exercise catalog maintenance scripts.
+
+- download_media: fetches media files (exercise GIFs) through a bounded thread
+  pool with per-file retries. A content-hash manifest in the output directory
+  records what's on disk; files whose bytes still match the manifest are
+  skipped, and the manifest is checkpointed as downloads finish so an
+  interrupted run resumes where it stopped.
+- apply_field_updates: pushes field updates to a Firestore collection in
+  batched commits. Missing docs are filtered out up front, and if a batch
+  still fails its docs are retried one by one, so a single bad document
+  can't sink the rest of the batch.
+
+Used by scripts/download-exercise-gifs.py and the backend/scripts/update_*
+video scripts.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+DEFAULT_DOWNLOAD_WORKERS = 8
+DEFAULT_DOWNLOAD_RETRIES = 3
+DOWNLOAD_TIMEOUT_SECONDS = 30
+
+# Save the manifest after this many completed downloads
+MANIFEST_CHECKPOINT_EVERY = 25
+
+# Firestore caps a batch at 500 writes
+UPDATE_BATCH_SIZE = 400
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class MediaManifest:
+    """filename -> {sha256, size, url, downloaded_at}, persisted as JSON next to the media"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8")).get("files", {})
+            except (ValueError, OSError) as e:
+                logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.entries.get(filename)
+
+    def record(self, filename: str, sha256: str, size: int, url: str) -> None:
+        with self._lock:
+            self.entries[filename] = {
+                "sha256": sha256,
+                "size": size,
+                "url": url,
+                "downloaded_at": datetime.now(timezone.utc).isoformat(),
+            }
+
+    def save(self) -> None:
+        """Atomic write (temp file + rename) so a crash never leaves a torn manifest"""
+        with self._lock:
+            data = {"version": MANIFEST_VERSION, "files": dict(sorted(self.entries.items()))}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def _fetch_url(url: str) -> bytes:
+    request = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+    with urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT_SECONDS) as response:
+        return response.read()
+
+
+def _is_current(path: Path, entry: Optional[Dict[str, Any]]) -> bool:
+    """File on disk matches its manifest entry (size check first, hash to confirm)"""
+    if not entry or not path.exists() or path.stat().st_size != entry.get("size"):
+        return False
+    return sha256_file(path) == entry.get("sha256")
+
+
+def download_media(
+    jobs: Iterable[Tuple[str, str]],
+    output_dir: Path,
+    max_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+    retries: int = DEFAULT_DOWNLOAD_RETRIES,
+    fetch: Callable[[str], bytes] = _fetch_url,
+    progress: Optional[Callable[[str, str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Download (filename, url) jobs into output_dir.
+
+    Files matching the manifest are skipped. Files already on disk but missing
+    from the manifest (e.g. from older runs) are hashed and adopted rather than
+    re-downloaded. Downloads are written to a temp file and renamed, so a
+    partial file is never mistaken for a finished one.
+
+    Args:
+        jobs: (filename, url) pairs
+        output_dir: Destination directory (holds manifest.json)
+        max_workers: Concurrent downloads
+        retries: Attempts per file
+        fetch: url -> bytes (injectable for tests)
+        progress: Optional callback(filename, status) with status in
+            'downloaded', 'unchanged', 'skipped', 'adopted', 'failed'
+
+    Returns:
+        Dict with counts per status and the failed (filename, error) pairs
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = MediaManifest(output_dir / MANIFEST_FILENAME)
+
+    counts = {"downloaded": 0, "unchanged": 0, "skipped": 0, "adopted": 0, "failed": 0}
+    failures: List[Tuple[str, str]] = []
+    pending: List[Tuple[str, str]] = []
+
+    for filename, url in jobs:
+        path = output_dir / filename
+        entry = manifest.get(filename)
+        if _is_current(path, entry) and entry.get("url") == url:
+            counts["skipped"] += 1
+            if progress:
+                progress(filename, "skipped")
+        elif entry is None and path.exists() and path.stat().st_size > 0:
+            manifest.record(filename, sha256_file(path), path.stat().st_size, url)
+            counts["adopted"] += 1
+            if progress:
+                progress(filename, "adopted")
+        else:
+            pending.append((filename, url))
+
+    def download(filename: str, url: str) -> str:
+        path = output_dir / filename
+        last_error = None
+        for attempt in range(1, retries + 1):
+            try:
+                data = fetch(url)
+                if not data:
+                    raise ValueError("empty response")
+                sha = hashlib.sha256(data).hexdigest()
+                previous = manifest.get(filename)
+                if previous and previous.get("sha256") == sha and _is_current(path, previous):
+                    manifest.record(filename, sha, len(data), url)
+                    return "unchanged"
+                tmp = path.with_name(path.name + ".part")
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+                manifest.record(filename, sha, len(data), url)
+                return "downloaded"
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                last_error = e
+                if attempt < retries:
+                    time.sleep(min(2 ** attempt, 30) * (0.5 + random.random()))
+        raise RuntimeError(f"{last_error}")
+
+    completed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            futures = {pool.submit(download, filename, url): filename for filename, url in pending}
+            for future in as_completed(futures):
+                filename = futures[future]
+                try:
+                    status = future.result()
+                except Exception as e:
+                    status = "failed"
+                    failures.append((filename, str(e)))
+                counts[status] += 1
+                if progress:
+                    progress(filename, status)
+
+                completed += 1
+                if completed % MANIFEST_CHECKPOINT_EVERY == 0:
+                    manifest.save()
+    finally:
+        manifest.save()
+
+    return {**counts, "total": counts["skipped"] + counts["adopted"] + len(pending), "failures": failures}
+
+
+def apply_field_updates(
+    db,
+    collection: str,
+    updates: List[Tuple[str, Dict[str, Any]]],
+    batch_size: int = UPDATE_BATCH_SIZE,
+    dry_run: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Apply (doc_id, fields) updates to a collection in batched commits.
+
+    Docs that don't exist are reported instead of failing the batch. If a
+    commit still fails, that batch's docs are updated individually so only
+    the offending docs are reported as failed.
+
+    Returns:
+        Dict with updated (or would_update, for a dry run) count, missing
+        doc IDs, (doc_id, error) failures and the number of batch commits
+    """
+    batch_size = max(1, min(batch_size, 500))
+    col = db.collection(collection)
+    result = {"updated": 0, "would_update": 0, "missing": [], "failed": [], "commits": 0}
+
+    for start in range(0, len(updates), batch_size):
+        chunk = updates[start:start + batch_size]
+        refs = [col.document(doc_id) for doc_id, _ in chunk]
+        exists = {doc.id for doc in db.get_all(refs, field_paths=[]) if doc.exists}
+
+        present = []
+        for (doc_id, fields), ref in zip(chunk, refs):
+            if doc_id in exists:
+                present.append((doc_id, ref, fields))
+            else:
+                result["missing"].append(doc_id)
+
+        if dry_run:
+            result["would_update"] += len(present)
+            continue
+        if not present:
+            continue
+
+        try:
+            batch = db.batch()
+            for _, ref, fields in present:
+                batch.update(ref, fields)
+            batch.commit()
+            result["commits"] += 1
+            result["updated"] += len(present)
+        except Exception as e:
+            logger.warning(f"Batch of {len(present)} {collection} updates failed ({e}); retrying individually")
+            for doc_id, ref, fields in present:
+                try:
+                    ref.update(fields)
+                    result["updated"] += 1
+                except Exception as doc_error:
+                    result["failed"].append((doc_id, str(doc_error)))
+
+        if progress:
+            progress(min(start + batch_size, len(updates)), len(updates))
+
+    return result
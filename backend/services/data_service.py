@@ -3,7 +3,7 @@ import os
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from ..models import Program, WorkoutTemplate, CreateWorkoutRequest, CreateProgramRequest, UpdateWorkoutRequest, UpdateProgramRequest, migrate_exercise_groups_to_sections, migrate_sections_to_exercise_groups
+from ..models import Program, WorkoutTemplate, CreateWorkoutRequest, CreateProgramRequest, UpdateWorkoutRequest, UpdateProgramRequest, normalize_workout_schema, decode_workout
 
 class DataService:
     """JSON-based data persistence service for programs and workouts"""
@@ -54,11 +54,8 @@ class DataService:
             template_notes=workout_request.template_notes if hasattr(workout_request, 'template_notes') else []
         )
 
-        # Auto-migrate between formats to keep both in sync
-        if not workout.sections and workout.exercise_groups:
-            workout.sections = migrate_exercise_groups_to_sections(workout.exercise_groups)
-        elif workout.sections and not workout.exercise_groups:
-            workout.exercise_groups = migrate_sections_to_exercise_groups(workout.sections)
+        # Store both formats so reads never have to convert
+        normalize_workout_schema(workout)
 
         # Load existing workouts
         data = self._read_json(self.workouts_file)
@@ -79,11 +76,7 @@ class DataService:
         
         for workout_data in workouts:
             if workout_data.get("id") == workout_id:
-                workout = WorkoutTemplate(**workout_data)
-                # Auto-migrate to sections if missing
-                if not workout.sections and workout.exercise_groups:
-                    workout.sections = migrate_exercise_groups_to_sections(workout.exercise_groups)
-                return workout
+                return decode_workout(workout_data)
 
         return None
     
@@ -93,12 +86,7 @@ class DataService:
         workouts = data.get("workouts", [])
         
         # Convert to WorkoutTemplate objects
-        workout_objects = [WorkoutTemplate(**w) for w in workouts]
-
-        # Auto-migrate to sections if missing
-        for workout in workout_objects:
-            if not workout.sections and workout.exercise_groups:
-                workout.sections = migrate_exercise_groups_to_sections(workout.exercise_groups)
+        workout_objects = [decode_workout(w) for w in workouts]
 
         # Filter by tags if provided
         if tags:
@@ -128,9 +116,11 @@ class DataService:
                 
                 # Update fields that were provided
                 update_data = update_request.dict(exclude_unset=True)
-                for field, value in update_data.items():
-                    setattr(workout, field, value)
-                
+                for field in update_data:
+                    # Assign the parsed value so nested sections/groups stay models
+                    setattr(workout, field, getattr(update_request, field))
+                normalize_workout_schema(workout, changed_fields=update_data.keys())
+
                 # Update modified date
                 workout.modified_date = datetime.now()
                 
@@ -416,10 +406,7 @@ class DataService:
         matching_workouts = []
         
         for workout_data in workouts:
-            workout = WorkoutTemplate(**workout_data)
-            # Auto-migrate to sections if missing
-            if not workout.sections and workout.exercise_groups:
-                workout.sections = migrate_exercise_groups_to_sections(workout.exercise_groups)
+            workout = decode_workout(workout_data)
 
             # Search in name, description, and tags
             if (query_lower in workout.name.lower() or
@@ -54,11 +54,11 @@ def provision_demo_user(db, uid: str) -> Dict[str, Any]:
         batch.set(user_ref.collection('workouts').document(w['id']), w)
 
     # Program
-    batch.set(user_ref.collection('programs').document(data['program']['id']), data['program'])
+    batch.set(user_ref.collection('programs').document(data['program']['id']), {**data['program'], 'modified_date': now})
 
     # Sessions
     for s in data['sessions']:
-        batch.set(user_ref.collection('workout_sessions').document(s['id']), s)
+        batch.set(user_ref.collection('workout_sessions').document(s['id']), {**s, 'modified_date': now})
 
     # Exercise history
     for eh in data['exercise_history']:
@@ -66,7 +66,7 @@ def provision_demo_user(db, uid: str) -> Dict[str, Any]:
 
     # Cardio sessions
     for cs in data['cardio_sessions']:
-        batch.set(user_ref.collection('cardio_sessions').document(cs['id']), cs)
+        batch.set(user_ref.collection('cardio_sessions').document(cs['id']), {**cs, 'modified_date': now})
 
     # Personal records
     batch.set(user_ref.collection('data').document('personal_records'), data['personal_records'])
@@ -0,0 +1,125 @@
+"""
+DOCX Export Service for Ghost Gym
+Renders Word gym logs in a process pool from an in-memory template, returning bytes instead of files
+"""
+
+import asyncio
+import importlib.util
+import io
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..config.cpu import cpu_quota, server_workers
+
+logger = logging.getLogger(__name__)
+
+# docxtpl is only imported by the render workers (and export_service when it renders)
+DOCXTPL_AVAILABLE = importlib.util.find_spec("docxtpl") is not None
+
+DEFAULT_DOCX_TEMPLATE = Path(__file__).parent.parent / "templates" / "docx" / "master_doc.docx"
+
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+# Render processes per server worker when DOCX_MAX_WORKERS isn't set
+DOCX_DEFAULT_WORKER_CAP = 2
+
+
+def _default_max_workers() -> int:
+    """
+    This server worker's share of the container's CPU quota, at most
+    DOCX_DEFAULT_WORKER_CAP. Every gunicorn worker builds its own pool, and
+    CPU affinity reports all of the host's CPUs, not the container's quota.
+    """
+    return max(1, min(DOCX_DEFAULT_WORKER_CAP, math.ceil(cpu_quota() / server_workers())))
+
+
+# 0 (default) = this worker's share of the CPU quota, capped at DOCX_DEFAULT_WORKER_CAP
+DOCX_MAX_WORKERS = int(os.getenv("DOCX_MAX_WORKERS", "0")) or _default_max_workers()
+
+
+# ── Worker-process side ──────────────────────────────────────────────────
+# Each worker keeps one DocxTemplate per template path, backed by the .docx
+# bytes in memory, so renders never touch disk after the first load.
+
+_worker_templates: Dict[str, "DocxTemplate"] = {}
+
+
+def _render_docx_in_worker(template_path: str, context: dict) -> bytes:
+    """Render a docx template with context and return the document bytes"""
+    template = _worker_templates.get(template_path)
+    if template is None:
+        from docxtpl import DocxTemplate
+        template = DocxTemplate(io.BytesIO(Path(template_path).read_bytes()))
+        _worker_templates[template_path] = template
+
+    template.render(context)
+    output = io.BytesIO()
+    template.save(output)
+    return output.getvalue()
+
+
+# ── Event-loop side ──────────────────────────────────────────────────────
+
+class DocxExportService:
+    """Async front end for DOCX rendering; CPU work runs in a lazily started process pool"""
+
+    def __init__(self, max_workers: int = DOCX_MAX_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def is_available(self) -> bool:
+        """Check if docxtpl is installed"""
+        return DOCXTPL_AVAILABLE
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that already holds gRPC/Firebase threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Started DOCX render pool with {self.max_workers} workers")
+        return self._pool
+
+    async def render(self, context: dict, template_path: Optional[str] = None) -> bytes:
+        """
+        Render a docx template in the process pool.
+
+        Args:
+            context: Placeholder values for the template
+            template_path: Optional path to custom template. Defaults to master_doc.docx
+
+        Returns:
+            Bytes of the rendered .docx document
+        """
+        if not DOCXTPL_AVAILABLE:
+            raise Exception("docxtpl library is not installed. Run: pip install docxtpl")
+
+        path = Path(template_path) if template_path else DEFAULT_DOCX_TEMPLATE
+        if not path.exists():
+            raise Exception(f"Template file not found: {path}")
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), _render_docx_in_worker, str(path), context)
+        except RuntimeError as e:
+            # Pool broken or shut down (e.g. worker killed) - start a fresh one next time
+            logger.warning(f"DOCX render pool unavailable, resetting: {str(e)}")
+            self.shutdown()
+            raise
+
+    def shutdown(self):
+        """Stop worker processes (called on application shutdown)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Global DOCX export service instance
+docx_export_service = DocxExportService()
@@ -0,0 +1,530 @@
+"""
+Exercise Analytics - Compact per-exercise time series for progress charts.
+
+Each exercise a user logs gets one doc at users/{uid}/analytics/{exercise_key}
+holding parallel, date-sorted columns (day, session key, top set weight/reps,
+volume, estimated 1RM, sets) packed as little-endian bytes from stdlib arrays.
+Years of history fit in a few tens of KB, so a chart query is a single doc read
+followed by one pass over the columns for weekly/monthly rollups and moving
+averages.
+
+Series are maintained when sessions are completed, edited, deleted or bulk
+imported; backend/scripts/rebuild_exercise_analytics.py rebuilds them from
+workout_sessions.
+"""
+
+import logging
+import re
+import sys
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config.firebase_config import firestore, FieldPath
+
+logger = logging.getLogger(__name__)
+
+SERIES_FORMAT_VERSION = 1
+EPOCH = date(1970, 1, 1)
+KG_PER_LB = 0.45359237
+
+# Epley is unreliable past this many reps; such sets don't contribute to e1RM
+MAX_E1RM_REPS = 12
+
+# Column name -> array typecode
+COLUMNS = {
+    "day": "i",         # days since 1970-01-01
+    "session": "I",     # crc32 of the session ID
+    "top_weight": "f",
+    "top_reps": "H",
+    "volume": "f",      # sum of weight x reps
+    "e1rm": "f",
+    "sets": "H",
+}
+
+METRICS = ("top_weight", "e1rm", "volume", "sets")
+PERIODS = ("day", "week", "month")
+
+
+def exercise_key(exercise_name: str) -> str:
+    """Doc ID for an exercise (case and punctuation insensitive)"""
+    return re.sub(r"[^a-z0-9]+", "-", exercise_name.strip().lower()).strip("-")[:120] or "exercise"
+
+
+def session_key(session_id: str) -> int:
+    return zlib.crc32(session_id.encode("utf-8"))
+
+
+def epoch_day(value: Any) -> int:
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - EPOCH).days
+
+
+def day_to_date(day: int) -> date:
+    return EPOCH + timedelta(days=day)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _first_int(value: Any) -> Optional[int]:
+    match = re.search(r"\d+", str(value or ""))
+    return int(match.group()) if match else None
+
+
+def estimate_1rm(weight: float, reps: int) -> Optional[float]:
+    """Epley estimate; None when reps are out of the useful range"""
+    if weight <= 0 or reps < 1 or reps > MAX_E1RM_REPS:
+        return None
+    return weight if reps == 1 else weight * (1 + reps / 30)
+
+
+def exercise_metrics(exercise: Any) -> Optional[Dict[str, float]]:
+    """
+    Top set, volume and e1RM for one ExercisePerformance (model or dict).
+
+    Uses per-set details when logged, otherwise the exercise weight x completed
+    sets x the first number of the target reps. Returns None for skipped
+    exercises and non-numeric weights (e.g. 'BW+25').
+    """
+    get = exercise.get if isinstance(exercise, dict) else lambda k, d=None: getattr(exercise, k, d)
+    if get("is_skipped"):
+        return None
+
+    sets = []
+    for detail in get("set_details") or []:
+        detail_get = detail.get if isinstance(detail, dict) else lambda k, d=None: getattr(detail, k, d)
+        weight = _to_float(detail_get("weight"))
+        reps = detail_get("reps_completed")
+        if weight is not None and reps:
+            sets.append((weight, int(reps)))
+
+    if not sets:
+        weight = _to_float(get("weight"))
+        reps = _first_int(get("target_reps"))
+        count = get("sets_completed") or 0
+        if weight is None or not reps or not count:
+            return None
+        sets = [(weight, reps)] * int(count)
+
+    top_weight, top_reps = max(sets)
+    if top_weight <= 0:
+        return None
+    e1rms = [e for e in (estimate_1rm(w, r) for w, r in sets) if e is not None]
+    return {
+        "top_weight": top_weight,
+        "top_reps": top_reps,
+        "volume": sum(w * r for w, r in sets),
+        "e1rm": max(e1rms) if e1rms else 0.0,
+        "sets": len(sets),
+    }
+
+
+def _convert(value: float, from_unit: str, to_unit: str) -> float:
+    if from_unit == to_unit:
+        return value
+    return value * KG_PER_LB if to_unit == "kg" else value / KG_PER_LB
+
+
+def merge_metrics(metrics: Dict[str, float], unit: str, other: Dict[str, float], other_unit: str) -> Dict[str, float]:
+    """
+    Combine two entries for the same exercise in one session (in unit): the
+    best top set and e1RM, summed volume and sets. A session has one entry
+    per exercise in a series.
+    """
+    other_top = _convert(other["top_weight"], other_unit, unit)
+    top_weight, top_reps = max((metrics["top_weight"], metrics["top_reps"]), (other_top, other["top_reps"]))
+    return {
+        "top_weight": top_weight,
+        "top_reps": top_reps,
+        "volume": metrics["volume"] + _convert(other["volume"], other_unit, unit),
+        "e1rm": max(metrics["e1rm"], _convert(other["e1rm"], other_unit, unit)),
+        "sets": metrics["sets"] + other["sets"],
+    }
+
+
+def _add_entry(entries: Dict[int, Tuple[int, Dict[str, float], str, str]], day: int, key: int,
+               metrics: Dict[str, float], unit: str, name: str) -> None:
+    """Add a session's entry to one exercise's entries, merging with one already there"""
+    existing = entries.get(key)
+    if existing is not None:
+        metrics = merge_metrics(existing[1], existing[2], metrics, unit)
+        day, unit, name = existing[0], existing[2], existing[3]
+    entries[key] = (day, metrics, unit, name)
+
+
+class ExerciseSeries:
+    """Date-sorted columnar series for one exercise"""
+
+    def __init__(self, exercise_name: str, unit: str = "lbs"):
+        self.exercise_name = exercise_name
+        self.unit = unit
+        self.columns = {name: array(code) for name, code in COLUMNS.items()}
+
+    def __len__(self) -> int:
+        return len(self.columns["day"])
+
+    # ── Encoding ─────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_doc(cls, data: Dict[str, Any]) -> "ExerciseSeries":
+        series = cls(data.get("exercise_name", ""), data.get("unit", "lbs"))
+        for name, column in series.columns.items():
+            raw = data.get(name)
+            if raw:
+                column.frombytes(bytes(raw))
+                if sys.byteorder == "big":
+                    column.byteswap()
+        return series
+
+    def to_doc(self) -> Dict[str, Any]:
+        data = {
+            "exercise_name": self.exercise_name,
+            "unit": self.unit,
+            "count": len(self),
+            "first_day": self.columns["day"][0] if len(self) else None,
+            "last_day": self.columns["day"][-1] if len(self) else None,
+            "format_version": SERIES_FORMAT_VERSION,
+        }
+        for name, column in self.columns.items():
+            if sys.byteorder == "big":
+                column = array(column.typecode, column)
+                column.byteswap()
+            data[name] = column.tobytes()
+        return data
+
+    # ── Mutation ─────────────────────────────────────────────────────────
+
+    def remove(self, key: int) -> bool:
+        try:
+            index = self.columns["session"].index(key)
+        except ValueError:
+            return False
+        for column in self.columns.values():
+            del column[index]
+        return True
+
+    def upsert(self, day: int, key: int, metrics: Dict[str, float], unit: str = "lbs") -> None:
+        """Insert (or replace) a session's entry, keeping the columns sorted by day"""
+        self.remove(key)
+        index = bisect_right(self.columns["day"], day)
+        values = {
+            "day": day,
+            "session": key,
+            "top_weight": _convert(metrics["top_weight"], unit, self.unit),
+            "top_reps": min(int(metrics["top_reps"]), 65535),
+            "volume": _convert(metrics["volume"], unit, self.unit),
+            "e1rm": _convert(metrics["e1rm"], unit, self.unit),
+            "sets": min(int(metrics["sets"]), 65535),
+        }
+        for name, column in self.columns.items():
+            column.insert(index, values[name])
+
+    # ── Queries ──────────────────────────────────────────────────────────
+
+    def window(self, start_day: Optional[int] = None, end_day: Optional[int] = None) -> Tuple[int, int]:
+        days = self.columns["day"]
+        lo = bisect_left(days, start_day) if start_day is not None else 0
+        hi = bisect_right(days, end_day) if end_day is not None else len(days)
+        return lo, hi
+
+    def rollup(
+        self,
+        period: str = "week",
+        start_day: Optional[int] = None,
+        end_day: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate entries into day/week (Monday)/month buckets in one pass.
+
+        Each point has the bucket start date, best top_weight and e1rm, summed
+        volume and sets, and the number of sessions.
+        """
+        lo, hi = self.window(start_day, end_day)
+        c = self.columns
+        points: List[Dict[str, Any]] = []
+        current = None
+
+        for i in range(lo, hi):
+            day = c["day"][i]
+            if period == "week":
+                bucket = day - (day + 3) % 7  # 1970-01-01 was a Thursday
+            elif period == "month":
+                d = day_to_date(day)
+                bucket = epoch_day(d.replace(day=1))
+            else:
+                bucket = day
+
+            if current is None or current["_bucket"] != bucket:
+                current = {"_bucket": bucket, "top_weight": 0.0, "e1rm": 0.0, "volume": 0.0, "sets": 0, "sessions": 0}
+                points.append(current)
+
+            current["top_weight"] = max(current["top_weight"], c["top_weight"][i])
+            current["e1rm"] = max(current["e1rm"], c["e1rm"][i])
+            current["volume"] += c["volume"][i]
+            current["sets"] += c["sets"][i]
+            current["sessions"] += 1
+
+        for point in points:
+            point["period_start"] = day_to_date(point.pop("_bucket")).isoformat()
+            for metric in ("top_weight", "e1rm", "volume"):
+                point[metric] = round(point[metric], 1)
+        return points
+
+
+def moving_average(values: List[float], window: int) -> List[Optional[float]]:
+    """Trailing moving average (None until the window fills)"""
+    result: List[Optional[float]] = []
+    total = 0.0
+    for i, value in enumerate(values):
+        total += value
+        if i >= window:
+            total -= values[i - window]
+        result.append(round(total / window, 1) if i >= window - 1 else None)
+    return result
+
+
+class ExerciseAnalyticsService:
+    """Maintains and queries per-exercise series under users/{uid}/analytics"""
+
+    def __init__(self, db=None):
+        self._db = db
+
+    @property
+    def db(self):
+        if self._db is None:
+            from .firestore_data_service import firestore_data_service
+            self._db = firestore_data_service.db
+        return self._db
+
+    def is_available(self) -> bool:
+        return firestore is not None and self.db is not None
+
+    def _collection(self, user_id: str):
+        return self.db.collection('users').document(user_id).collection('analytics')
+
+    # ── Maintenance ──────────────────────────────────────────────────────
+
+    def apply_sessions(self, user_id: str, sessions: Iterable[Any], removed: Iterable[Any] = ()) -> int:
+        """
+        Upsert sessions' exercises and drop removed sessions, with one read and
+        one batched write per affected exercise. Blocking.
+
+        Args:
+            sessions: Completed sessions (models or dicts) to record
+            removed: Sessions (models or dicts) to drop - deleted ones, or the
+                pre-edit version of an edited one
+
+        Returns:
+            Number of series written
+        """
+        # exercise key -> session key -> (day, metrics, unit, name)
+        entries: Dict[str, Dict[int, Tuple[int, Dict[str, float], str, str]]] = {}
+        touched: Dict[str, set] = {}
+
+        def exercises_of(session):
+            get = session.get if isinstance(session, dict) else lambda k, d=None: getattr(session, k, d)
+            key = session_key(get("id") or "")
+            for exercise in get("exercises_performed") or []:
+                ex_get = exercise.get if isinstance(exercise, dict) else lambda k, d=None: getattr(exercise, k, d)
+                name = ex_get("exercise_name") or ""
+                if name:
+                    touched.setdefault(exercise_key(name), set()).add(key)
+                    yield get, key, name, exercise, ex_get
+
+        for session in removed:
+            for _ in exercises_of(session):
+                pass
+
+        for session in sessions:
+            for get, key, name, exercise, ex_get in exercises_of(session):
+                when = get("completed_at") or get("started_at")
+                if get("status") != "completed" or not isinstance(when, datetime):
+                    continue
+                metrics = exercise_metrics(exercise)
+                unit = ex_get("weight_unit") or "lbs"
+                if metrics and unit in ("lbs", "kg"):
+                    _add_entry(entries.setdefault(exercise_key(name), {}), epoch_day(when), key, metrics, unit, name)
+
+        if not touched:
+            return 0
+
+        collection = self._collection(user_id)
+        batch = self.db.batch()
+        pending = written = 0
+        for doc in self.db.get_all([collection.document(doc_id) for doc_id in touched]):
+            doc_id = doc.reference.id
+            new_entries = entries.get(doc_id, {})
+            if doc.exists:
+                series = ExerciseSeries.from_doc(doc.to_dict())
+            elif new_entries:
+                _, _, unit, name = next(iter(new_entries.values()))
+                series = ExerciseSeries(name, unit)
+            else:
+                continue
+
+            changed = False
+            for key in touched[doc_id]:
+                changed = series.remove(key) or changed
+            for key, (day, metrics, unit, _) in new_entries.items():
+                series.upsert(day, key, metrics, unit)
+                changed = True
+            if not changed:
+                continue
+
+            data = series.to_doc()
+            data['updated_at'] = firestore.SERVER_TIMESTAMP
+            batch.set(doc.reference, data)
+            pending += 1
+            written += 1
+            if pending == 400:
+                batch.commit()
+                batch = self.db.batch()
+                pending = 0
+
+        if pending:
+            batch.commit()
+        return written
+
+    async def record_sessions(self, user_id: str, sessions: List[Any], replaced: List[Any] = ()) -> bool:
+        """Update series for completed sessions (replaced: their previous versions, when edited)"""
+        if not self.is_available():
+            return False
+        try:
+            written = self.apply_sessions(user_id, sessions, removed=replaced)
+            logger.debug(f"Updated {written} analytics series for user {user_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update exercise analytics: {str(e)}")
+            return False
+
+    async def remove_sessions(self, user_id: str, sessions: List[Any]) -> bool:
+        """Drop deleted sessions from their exercises' series"""
+        if not self.is_available():
+            return False
+        try:
+            self.apply_sessions(user_id, [], removed=sessions)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to remove sessions from exercise analytics: {str(e)}")
+            return False
+
+    def rebuild(self, user_id: str, page_size: int = 500) -> Dict[str, int]:
+        """Recompute every series from workout_sessions (paged). Blocking."""
+        all_series: Dict[str, ExerciseSeries] = {}
+        sessions_ref = self.db.collection('users').document(user_id).collection('workout_sessions')
+        scanned = 0
+        last_doc = None
+        while True:
+            query = sessions_ref.order_by(FieldPath.document_id()).limit(page_size)
+            if last_doc is not None:
+                query = query.start_after(last_doc)
+            docs = list(query.stream())
+            for doc in docs:
+                scanned += 1
+                data = doc.to_dict() or {}
+                when = data.get('completed_at') or data.get('started_at')
+                if data.get('status') != 'completed' or not isinstance(when, datetime):
+                    continue
+                key = session_key(data.get('id') or doc.id)
+                entries: Dict[str, Dict[int, Tuple[int, Dict[str, float], str, str]]] = {}
+                for exercise in data.get('exercises_performed') or []:
+                    name = exercise.get('exercise_name') or ''
+                    metrics = exercise_metrics(exercise)
+                    unit = exercise.get('weight_unit') or 'lbs'
+                    if not name or not metrics or unit not in ('lbs', 'kg'):
+                        continue
+                    _add_entry(entries.setdefault(exercise_key(name), {}), epoch_day(when), key, metrics, unit, name)
+                for doc_id, session_entries in entries.items():
+                    day, metrics, unit, name = session_entries[key]
+                    series = all_series.setdefault(doc_id, ExerciseSeries(name, unit))
+                    series.upsert(day, key, metrics, unit)
+            if len(docs) < page_size:
+                break
+            last_doc = docs[-1]
+
+        collection = self._collection(user_id)
+        stale = [doc.reference for doc in collection.stream() if doc.id not in all_series]
+        writes = [(collection.document(doc_id), series.to_doc()) for doc_id, series in all_series.items()]
+        for start in range(0, max(len(writes), len(stale)), 400):
+            batch = self.db.batch()
+            for ref, data in writes[start:start + 400]:
+                data['updated_at'] = firestore.SERVER_TIMESTAMP
+                batch.set(ref, data)
+            for ref in stale[start:start + 400]:
+                batch.delete(ref)
+            batch.commit()
+
+        logger.info(f"Rebuilt {len(writes)} analytics series from {scanned} sessions for user {user_id}")
+        return {"sessions_scanned": scanned, "series": len(writes), "removed": len(stale)}
+
+    # ── Queries ──────────────────────────────────────────────────────────
+
+    async def list_exercises(self, user_id: str) -> List[Dict[str, Any]]:
+        """Exercises with a series, most recently trained first"""
+        if not self.is_available():
+            return []
+        docs = self._collection(user_id).select(['exercise_name', 'unit', 'count', 'first_day', 'last_day']).stream()
+        items = []
+        for doc in docs:
+            data = doc.to_dict() or {}
+            if not data.get('count'):
+                continue
+            items.append({
+                "exercise_key": doc.id,
+                "exercise_name": data.get('exercise_name'),
+                "unit": data.get('unit'),
+                "sessions": data.get('count'),
+                "first_date": day_to_date(data['first_day']).isoformat(),
+                "last_date": day_to_date(data['last_day']).isoformat(),
+            })
+        items.sort(key=lambda item: item["last_date"], reverse=True)
+        return items
+
+    async def get_trend(
+        self,
+        user_id: str,
+        exercise_name: str,
+        period: str = "week",
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        moving_average_window: Optional[int] = None,
+        metric: str = "e1rm"
+    ) -> Optional[Dict[str, Any]]:
+        """Rolled-up trend for one exercise from a single doc read, or None if never logged"""
+        if not self.is_available():
+            return None
+        doc = self._collection(user_id).document(exercise_key(exercise_name)).get()
+        if not doc.exists:
+            return None
+
+        series = ExerciseSeries.from_doc(doc.to_dict())
+        points = series.rollup(
+            period,
+            epoch_day(start) if start else None,
+            epoch_day(end) if end else None
+        )
+        if moving_average_window:
+            averages = moving_average([p[metric] for p in points], moving_average_window)
+            for point, value in zip(points, averages):
+                point["moving_average"] = value
+
+        return {
+            "exercise_name": series.exercise_name,
+            "unit": series.unit,
+            "period": period,
+            "metric": metric,
+            "total_sessions": len(series),
+            "points": points,
+        }
+
+
+# Global exercise analytics service instance
+exercise_analytics_service = ExerciseAnalyticsService()
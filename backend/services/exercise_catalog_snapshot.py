@@ -0,0 +1,332 @@
+"""
+Exercise Catalog Snapshot - Versioned, compact copy of the global exercise catalog.
+
+Built offline by backend/scripts/build_exercise_snapshot.py from
+global_exercises and shipped two ways:
+- as a local artifact (backend/data/exercise_catalog/snapshot.json.gz) that
+  workers load at startup instead of paging the collection, and
+- as chunk docs under exercises_metadata/global/snapshot_chunks, so a worker
+  without the artifact (or with a stale one) needs a handful of reads, not one
+  per exercise.
+
+The blob is gzip-compressed columnar JSON. Each exercise is validated through
+the Exercise model first, so every field is present and decoding yields the
+same models the Firestore path would. Categorical fields (muscle groups,
+equipment, posture, grip, movement patterns, planes of motion, mechanics, ...)
+and tag/token lists are dictionary-encoded: the distinct values are stored
+once, most frequent first, and each row holds a small integer code.
+
+    {"format": 1, "version": "<catalog version>", "count": n,
+     "dictionaries": {"<field>": [value, ...]},
+     "columns": {"<field>": [value or code per row, ...]}}
+
+exercises_metadata/global.snapshot records {version, checksum, count, size,
+chunks, builtAt}. The checksum is the sha256 of the blob; builtAt is kept out
+of the blob so rebuilding an unchanged catalog produces an identical blob (and
+clients' cached copies stay valid). A snapshot is only served while its
+version matches the catalog version in the metadata doc.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..models import Exercise
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_MEDIA_TYPE = "application/json"
+
+SNAPSHOT_DIR = Path(__file__).parent.parent / "data" / "exercise_catalog"
+SNAPSHOT_PATH = Path(os.getenv("EXERCISE_SNAPSHOT_PATH", str(SNAPSHOT_DIR / "snapshot.json.gz")))
+
+METADATA_COLLECTION = "exercises_metadata"
+METADATA_DOC = "global"
+CHUNK_COLLECTION = "snapshot_chunks"
+
+# Firestore caps a document at 1 MiB
+CHUNK_BYTES = 900 * 1024
+
+# How long a worker trusts its snapshot before re-reading the metadata doc
+SNAPSHOT_RECHECK_SECONDS = int(os.getenv("EXERCISE_SNAPSHOT_RECHECK_SECONDS", "300"))
+
+# Single-valued fields stored as dictionary codes
+CATEGORICAL_FIELDS = (
+    "difficultyLevel",
+    "targetMuscleGroup", "primeMoverMuscle", "secondaryMuscle", "tertiaryMuscle",
+    "primaryEquipment", "secondaryEquipment",
+    "posture", "armType", "armPattern", "grip", "loadPosition", "footElevation",
+    "combinationExercise",
+    "movementPattern1", "movementPattern2", "movementPattern3",
+    "planeOfMotion1", "planeOfMotion2", "planeOfMotion3",
+    "bodyRegion", "forceType", "mechanics", "laterality", "classification",
+)
+
+# List fields whose items are stored as dictionary codes
+CATEGORICAL_LIST_FIELDS = ("nameSearchTokens", "classificationTags")
+
+# Fields filled by a default factory (e.g. createdAt = now) are stored as null when
+# the doc lacks them and re-defaulted on decode, so the blob doesn't change per build
+_FACTORY_FIELDS = {name for name, field in Exercise.model_fields.items() if field.default_factory is not None}
+
+
+def snapshot_checksum(blob: bytes) -> str:
+    return hashlib.sha256(blob).hexdigest()
+
+
+def build_snapshot(exercises: Iterable[Dict[str, Any]], version: Optional[str]) -> bytes:
+    """
+    Encode exercise docs into a snapshot blob.
+
+    Docs that don't validate as an Exercise are skipped (the Firestore path
+    skips them too). Rows are ordered by name, matching get_all_exercises.
+    """
+    rows = []
+    for data in exercises:
+        try:
+            row = Exercise(**data).model_dump(mode="json")
+            row.update({field: None for field in _FACTORY_FIELDS if data.get(field) is None})
+            rows.append(row)
+        except Exception as e:
+            logger.warning(f"Skipping exercise {data.get('id')} in snapshot: {e}")
+    rows.sort(key=lambda row: (row["name"], row["id"]))
+
+    fields = list(Exercise.model_fields)
+    dictionaries: Dict[str, List[Any]] = {}
+    columns: Dict[str, List[Any]] = {}
+
+    for field in fields:
+        values = [row.get(field) for row in rows]
+        if field in CATEGORICAL_FIELDS:
+            counts = Counter(v for v in values if v is not None)
+            dictionary = [v for v, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+            codes = {v: i for i, v in enumerate(dictionary)}
+            dictionaries[field] = dictionary
+            columns[field] = [None if v is None else codes[v] for v in values]
+        elif field in CATEGORICAL_LIST_FIELDS:
+            counts = Counter(item for v in values for item in (v or []))
+            dictionary = [v for v, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+            codes = {v: i for i, v in enumerate(dictionary)}
+            dictionaries[field] = dictionary
+            columns[field] = [[codes[item] for item in (v or [])] for v in values]
+        else:
+            columns[field] = values
+
+    payload = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "count": len(rows),
+        "dictionaries": dictionaries,
+        "columns": columns,
+    }
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    # mtime=0 keeps the blob (and its checksum) deterministic
+    return gzip.compress(raw, compresslevel=9, mtime=0)
+
+
+def decode_snapshot(blob: bytes) -> Dict[str, Any]:
+    """Decode a blob into {"version", "count", "exercises": [dict, ...]}"""
+    payload = json.loads(gzip.decompress(blob))
+    if payload.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {payload.get('format')}")
+
+    count = payload["count"]
+    dictionaries = payload.get("dictionaries", {})
+    decoded: Dict[str, List[Any]] = {}
+    for field, column in payload["columns"].items():
+        if len(column) != count:
+            raise ValueError(f"Snapshot column {field} has {len(column)} rows, expected {count}")
+        dictionary = dictionaries.get(field)
+        if dictionary is None:
+            decoded[field] = column
+        elif field in CATEGORICAL_LIST_FIELDS:
+            decoded[field] = [[dictionary[code] for code in codes] for codes in column]
+        else:
+            decoded[field] = [None if code is None else dictionary[code] for code in column]
+
+    exercises = []
+    for i in range(count):
+        row = {}
+        for field, column in decoded.items():
+            value = column[i]
+            if value is not None or field not in _FACTORY_FIELDS:
+                row[field] = value
+        exercises.append(row)
+    return {"version": payload.get("version"), "count": count, "exercises": exercises}
+
+
+class CatalogSnapshot:
+    """A decoded snapshot: Exercise models ordered by name plus an id index"""
+
+    def __init__(self, blob: bytes):
+        self.blob = blob
+        self.checksum = snapshot_checksum(blob)
+        decoded = decode_snapshot(blob)
+        self.version: Optional[str] = decoded["version"]
+        self.exercises: List[Exercise] = [Exercise(**data) for data in decoded["exercises"]]
+        self.by_id: Dict[str, Exercise] = {ex.id: ex for ex in self.exercises}
+
+    def filter(self, max_tier: Optional[int] = None) -> List[Exercise]:
+        if max_tier is None:
+            return self.exercises
+        return [ex for ex in self.exercises if ex.exerciseTier is not None and ex.exerciseTier <= max_tier]
+
+
+def write_snapshot_file(blob: bytes, path: Path = SNAPSHOT_PATH) -> None:
+    """Atomic write (temp file + rename)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(blob)
+    os.replace(tmp, path)
+
+
+def upload_snapshot(db, blob: bytes, version: Optional[str], count: int) -> Dict[str, Any]:
+    """
+    Store the blob as chunk docs and record it in exercises_metadata/global.
+
+    Chunks are written (and leftovers from a larger previous build deleted)
+    before the metadata points at them; a worker that reads the chunks in
+    between sees a checksum mismatch and keeps using Firestore.
+    """
+    checksum = snapshot_checksum(blob)
+    metadata_ref = db.collection(METADATA_COLLECTION).document(METADATA_DOC)
+    chunks_ref = metadata_ref.collection(CHUNK_COLLECTION)
+
+    # One write per chunk: a batch of near-1 MiB docs would hit the request size limit
+    pieces = [blob[i:i + CHUNK_BYTES] for i in range(0, len(blob), CHUNK_BYTES)]
+    for i, piece in enumerate(pieces):
+        chunks_ref.document(f"{i:04d}").set({"index": i, "checksum": checksum, "data": piece})
+    for doc in chunks_ref.stream():
+        if doc.id >= f"{len(pieces):04d}":
+            doc.reference.delete()
+
+    snapshot_meta = {
+        "version": version,
+        "checksum": checksum,
+        "count": count,
+        "size": len(blob),
+        "chunks": len(pieces),
+        "builtAt": datetime.now(timezone.utc).isoformat(),
+    }
+    metadata_ref.set({"snapshot": snapshot_meta}, merge=True)
+    return snapshot_meta
+
+
+class CatalogSnapshotStore:
+    """The snapshot this worker serves from, kept in step with exercises_metadata/global"""
+
+    def __init__(self, path: Path = SNAPSHOT_PATH):
+        self.path = Path(path)
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self.checked_at = 0.0
+        self._failed_checksum: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def needs_check(self) -> bool:
+        return time.time() - self.checked_at > SNAPSHOT_RECHECK_SECONDS
+
+    def _read_file(self, checksum: str) -> Optional[bytes]:
+        try:
+            blob = self.path.read_bytes()
+        except OSError:
+            return None
+        if snapshot_checksum(blob) != checksum:
+            logger.info(f"Local exercise snapshot {self.path} is not the current build, ignoring it")
+            return None
+        return blob
+
+    def _read_chunks(self, db, snapshot_meta: Dict[str, Any]) -> Optional[bytes]:
+        chunks_ref = db.collection(METADATA_COLLECTION).document(METADATA_DOC).collection(CHUNK_COLLECTION)
+        refs = [chunks_ref.document(f"{i:04d}") for i in range(int(snapshot_meta.get("chunks") or 0))]
+        pieces = []
+        for doc in db.get_all(refs):
+            data = doc.to_dict() if doc.exists else None
+            if not data or data.get("checksum") != snapshot_meta["checksum"]:
+                return None
+            pieces.append((data["index"], data["data"]))
+        blob = b"".join(piece for _, piece in sorted(pieces, key=lambda p: p[0]))
+        if snapshot_checksum(blob) != snapshot_meta["checksum"]:
+            return None
+        return blob
+
+    def sync(self, db, metadata: Optional[Dict[str, Any]]) -> Optional[CatalogSnapshot]:
+        """
+        Make the served snapshot match the metadata doc: keep it, load the
+        current build (local artifact first, then chunk docs), or drop it
+        when no build matches the catalog version.
+        """
+        with self._lock:
+            self.checked_at = time.time()
+            if not metadata:
+                return self.snapshot
+
+            snapshot_meta = metadata.get("snapshot") or {}
+            checksum = snapshot_meta.get("checksum")
+            if not checksum or snapshot_meta.get("version") != metadata.get("version"):
+                if self.snapshot is not None:
+                    logger.info("Exercise catalog changed since the last snapshot build - serving from Firestore")
+                self.snapshot = None
+                return None
+
+            if self.snapshot is not None and self.snapshot.checksum == checksum:
+                return self.snapshot
+            if checksum == self._failed_checksum:
+                return None
+
+            start = time.perf_counter()
+            blob = self._read_file(checksum)
+            source = "file"
+            if blob is None and db is not None:
+                blob = self._read_chunks(db, snapshot_meta)
+                source = "firestore"
+
+            try:
+                if blob is None:
+                    raise ValueError("no copy matches the published checksum")
+                self.snapshot = CatalogSnapshot(blob)
+            except Exception as e:
+                logger.warning(f"Could not load exercise catalog snapshot {checksum[:12]}: {e}")
+                self._failed_checksum = checksum
+                self.snapshot = None
+                return None
+
+            logger.info(
+                f"Loaded exercise catalog snapshot v{self.snapshot.version} from {source}: "
+                f"{len(self.snapshot.exercises)} exercises, {len(blob)} bytes "
+                f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+            )
+            return self.snapshot
+
+    def preload_file(self) -> Optional[CatalogSnapshot]:
+        """
+        Decode the local artifact without consulting Firestore, e.g. in a
+        pre-fork server master so workers share the decoded catalog. It isn't
+        trusted yet: checked_at stays unset, so each worker's first lookup
+        verifies it against the metadata doc (and keeps it if it matches).
+        """
+        with self._lock:
+            try:
+                blob = self.path.read_bytes()
+                self.snapshot = CatalogSnapshot(blob)
+            except OSError:
+                return None
+            except Exception as e:
+                logger.warning(f"Could not preload exercise catalog snapshot {self.path}: {e}")
+                return None
+            logger.info(f"Preloaded exercise catalog snapshot v{self.snapshot.version}: "
+                        f"{len(self.snapshot.exercises)} exercises")
+            return self.snapshot
+
+
+# Global snapshot store instance
+catalog_snapshot_store = CatalogSnapshotStore()
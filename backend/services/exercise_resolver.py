@@ -0,0 +1,373 @@
+"""
+Exercise Resolver - Typo-tolerant matching of free-text exercise names.
+
+Imports and the universal logger hand us names like "DB bench press",
+"Bnech Press" or "push-ups". Resolving them one at a time with Firestore
+queries missed typos (creating duplicate custom exercises) and cost several
+round trips per name. The resolver matches against in-memory indexes instead:
+
+- names are normalized (case, punctuation, common abbreviations, plurals)
+- a trigram index finds candidates that share fragments or word order
+- a BK-tree over the index vocabulary corrects misspelled words ("bnech" ->
+  "bench"), and names containing the corrected words become candidates
+
+The global index is built once per catalog snapshot (or, without one, from a
+single pass over global_exercises, refreshed hourly). The user's custom
+exercises are indexed per call, so a whole workout costs one read pass.
+
+Scores:
+    1.00  same name after normalization
+    0.95  same words in a different order
+    0.90  one word off by a single typo (edit/transposition, words of 4+ letters)
+    <0.85 similarity-ranked suggestions (never auto-matched)
+
+Only scores >= AUTO_MATCH_SCORE are treated as the same exercise; "Incline"
+vs "Decline" differ by two edits and stay separate. A word is only a typo
+if it isn't a word itself: "Abduction" is one edit from "Adduction" and
+"Hack Squat" from "Back Squat", but a query word found in the indexes (or
+in DISTINCT_WORDS) is never auto-matched to another word.
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..models import Exercise
+
+logger = logging.getLogger(__name__)
+
+AUTO_MATCH_SCORE = 0.9
+SUGGESTION_MIN_SCORE = 0.5
+DEFAULT_CANDIDATES = 3
+
+# Edit distance searched in the BK-tree: 1 for words of 4+ letters, 2 from 8 letters
+MIN_CORRECTABLE_WORD = 4
+LONG_WORD = 8
+
+# Candidates scored per query (by shared trigrams, and again by shared corrected words)
+TRIGRAM_CANDIDATES = 25
+
+# Exercise words one edit away from another exercise word. They are words, not
+# typos, even when the catalog only holds the other one of the pair
+DISTINCT_WORDS = frozenset({
+    "abduction", "adduction",
+    "back", "hack", "rack",
+    "band", "hand", "hang",
+    "full", "pull",
+    "high", "thigh",
+    "side", "wide",
+})
+
+# Fallback global index lifetime when no catalog snapshot is loaded
+GLOBAL_INDEX_TTL_SECONDS = 3600
+
+ABBREVIATIONS = {
+    "db": "dumbbell",
+    "dbs": "dumbbell",
+    "bb": "barbell",
+    "kb": "kettlebell",
+    "kbs": "kettlebell",
+    "sl": "single leg",
+    "rdl": "romanian deadlift",
+    "ohp": "overhead press",
+    "bw": "bodyweight",
+    "flye": "fly",
+    "flyes": "fly",
+    "flies": "fly",
+    "pushup": "push up",
+    "pullup": "pull up",
+    "situp": "sit up",
+    "chinup": "chin up",
+    "ups": "up",
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _singular(token: str) -> str:
+    if token.endswith("sses"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip punctuation, expand abbreviations and drop plural s"""
+    tokens = []
+    for token in _NON_WORD.sub(" ", (name or "").lower()).split():
+        token = ABBREVIATIONS.get(token) or ABBREVIATIONS.get(_singular(token)) or token
+        tokens.extend(_singular(t) for t in token.split())
+    return " ".join(tokens)
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions).
+    Returns max_distance + 1 early once the distance is known to exceed it.
+    """
+    if a == b:
+        return 0
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def score_names(query: str, candidate: str, is_word: Optional[Callable[[str], bool]] = None) -> float:
+    """
+    Similarity of two normalized names (see module docstring for the scale).
+    is_word tells whether a query word is a known word, so not a typo.
+    """
+    if query == candidate:
+        return 1.0
+    query_tokens, candidate_tokens = query.split(), candidate.split()
+    if sorted(query_tokens) == sorted(candidate_tokens):
+        return 0.95
+
+    if len(query_tokens) == len(candidate_tokens):
+        differing = [(q, c) for q, c in zip(query_tokens, candidate_tokens) if q != c]
+        if len(differing) == 1:
+            q, c = differing[0]
+            known = q in DISTINCT_WORDS or (is_word is not None and is_word(q))
+            if not known and min(len(q), len(c)) >= 4 and edit_distance(q, c, 1) <= 1:
+                return 0.9
+
+    query_grams, candidate_grams = trigrams(query), trigrams(candidate)
+    similarity = 2 * len(query_grams & candidate_grams) / (len(query_grams) + len(candidate_grams))
+    # Edit similarity refines names that already share fragments (typos); it only
+    # matters if it can beat the trigram score, which bounds the distance searched
+    longest = max(len(query), len(candidate))
+    max_distance = int(longest * (1 - similarity))
+    if similarity >= 0.4 and max_distance > 0:
+        distance = edit_distance(query, candidate, max_distance)
+        if distance <= max_distance:
+            similarity = max(similarity, 1 - distance / longest)
+    return round(0.85 * similarity, 4)
+
+
+class _BKTree:
+    """Burkhard-Keller tree over words, searched by edit distance"""
+
+    def __init__(self):
+        self.root: Optional[Tuple[str, Dict[int, tuple]]] = None
+
+    def add(self, word: str) -> None:
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> List[str]:
+        if self.root is None:
+            return []
+        found, stack = [], [self.root]
+        while stack:
+            node_word, children = stack.pop()
+            distance = edit_distance(word, node_word)
+            if distance <= max_distance:
+                found.append(node_word)
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return found
+
+
+class ExerciseNameIndex:
+    """Trigram index over names plus a BK-tree over their words"""
+
+    def __init__(self, exercises: Iterable[Exercise], source: str):
+        self.source = source
+        self.by_name: Dict[str, List[Exercise]] = {}
+        for exercise in exercises:
+            key = normalize_name(exercise.name)
+            if key:
+                self.by_name.setdefault(key, []).append(exercise)
+
+        self._grams: Dict[str, List[str]] = {}
+        self._words: Dict[str, List[str]] = {}
+        self._vocabulary = _BKTree()
+        for key in self.by_name:
+            for gram in trigrams(key):
+                self._grams.setdefault(gram, []).append(key)
+            for word in set(key.split()):
+                if word not in self._words and len(word) >= MIN_CORRECTABLE_WORD and word.isalpha():
+                    self._vocabulary.add(word)
+                self._words.setdefault(word, []).append(key)
+
+    def __len__(self) -> int:
+        return len(self.by_name)
+
+    def knows(self, word: str) -> bool:
+        """Whether word appears in an indexed name"""
+        return word in self._words
+
+    def _correct(self, query: str) -> str:
+        """query with words missing from the vocabulary replaced by their closest known word"""
+        words = []
+        for word in query.split():
+            if word not in self._words and len(word) >= MIN_CORRECTABLE_WORD:
+                max_distance = 2 if len(word) >= LONG_WORD else 1
+                matches = self._vocabulary.search(word, max_distance)
+                if matches:
+                    word = min(matches, key=lambda m: (edit_distance(word, m), -len(self._words[m]), m))
+            words.append(word)
+        return " ".join(words)
+
+    def _top(self, counts: Dict[str, int]) -> List[str]:
+        return sorted(counts, key=lambda key: (-counts[key], len(key)))[:TRIGRAM_CANDIDATES]
+
+    def candidates(self, query: str, is_word: Optional[Callable[[str], bool]] = None) -> List[Tuple[float, str]]:
+        """
+        (score, normalized name) for the names worth scoring against query.
+        is_word recognizes known words (default: this index's vocabulary).
+        """
+        if not query:
+            return []
+        is_word = is_word or self.knows
+        if query in self.by_name:
+            return [(1.0, query)]
+
+        overlap: Dict[str, int] = {}
+        for gram in trigrams(query):
+            for key in self._grams.get(gram, ()):
+                overlap[key] = overlap.get(key, 0) + 1
+        keys = set(self._top(overlap))
+
+        corrected = self._correct(query)
+        if corrected != query:
+            shared: Dict[str, int] = {}
+            for word in set(corrected.split()):
+                for key in self._words.get(word, ()):
+                    shared[key] = shared.get(key, 0) + 1
+            keys.update(self._top(shared))
+
+        scored = []
+        for key in keys:
+            score = score_names(query, key, is_word)
+            if corrected != query and score < AUTO_MATCH_SCORE:
+                # Ranked on the corrected spelling, but never promoted to an auto-match
+                score = max(score, min(0.95 * score_names(corrected, key), 0.85))
+            scored.append((score, key))
+        return scored
+
+
+class ExerciseResolver:
+    """Resolves batches of exercise names against the global catalog and a user's custom exercises"""
+
+    def __init__(self, exercise_service=None):
+        self._exercise_service = exercise_service
+        self._global_index: Optional[ExerciseNameIndex] = None
+        self._global_key: Optional[str] = None
+        self._global_built_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def exercise_service(self):
+        if self._exercise_service is None:
+            from .exercise_service import exercise_service
+            self._exercise_service = exercise_service
+        return self._exercise_service
+
+    def _load_global_exercises(self) -> List[Exercise]:
+        exercises = []
+        for doc in self.exercise_service.db.collection('global_exercises').stream():
+            try:
+                exercises.append(Exercise(**doc.to_dict()))
+            except Exception as e:
+                logger.warning(f"Failed to parse exercise {doc.id}: {str(e)}")
+        return exercises
+
+    def global_index(self) -> ExerciseNameIndex:
+        """Index over the global catalog, rebuilt when the snapshot changes or the fallback expires"""
+        snapshot = self.exercise_service.get_catalog_snapshot()
+        with self._lock:
+            if snapshot is not None:
+                if self._global_key != snapshot.checksum:
+                    self._global_index = ExerciseNameIndex(snapshot.exercises, "global")
+                    self._global_key = snapshot.checksum
+                    logger.info(f"Built exercise name index from snapshot: {len(self._global_index)} names")
+                return self._global_index
+
+            if self._global_index is None or self._global_key is not None or \
+                    time.time() - self._global_built_at > GLOBAL_INDEX_TTL_SECONDS:
+                self._global_index = ExerciseNameIndex(self._load_global_exercises(), "global")
+                self._global_key = None
+                self._global_built_at = time.time()
+                logger.info(f"Built exercise name index from Firestore: {len(self._global_index)} names")
+            return self._global_index
+
+    def resolve_many(
+        self,
+        names: Sequence[str],
+        user_id: Optional[str] = None,
+        limit: int = DEFAULT_CANDIDATES,
+        min_score: float = SUGGESTION_MIN_SCORE,
+    ) -> Dict[str, List[Tuple[Exercise, float, str]]]:
+        """
+        Score candidates for every name in one pass.
+
+        Returns:
+            name -> [(exercise, score, source), ...] best first, where source is
+            'global' or 'custom'. Global wins ties, as it always has.
+        """
+        indexes = [self.global_index()]
+        if user_id:
+            custom = self.exercise_service.get_user_custom_exercises(user_id, limit=1000)
+            indexes.append(ExerciseNameIndex(custom, "custom"))
+
+        def is_word(word: str) -> bool:
+            # A word of either index is not a typo of a word of the other
+            return any(index.knows(word) for index in indexes)
+
+        results: Dict[str, List[Tuple[Exercise, float, str]]] = {}
+        for name in names:
+            if name in results:
+                continue
+            query = normalize_name(name)
+            scored = []
+            for rank, index in enumerate(indexes):
+                for score, key in index.candidates(query, is_word):
+                    if score >= min_score:
+                        for exercise in index.by_name[key]:
+                            scored.append((score, rank, exercise, index.source))
+            scored.sort(key=lambda item: (-item[0], item[1], item[2].name))
+            results[name] = [(exercise, score, source) for score, _, exercise, source in scored[:limit]]
+        return results
+
+    def match_many(self, names: Sequence[str], user_id: Optional[str] = None) -> Dict[str, Optional[Exercise]]:
+        """name -> confidently matched exercise, or None when the name is new"""
+        resolved = self.resolve_many(names, user_id, limit=1, min_score=AUTO_MATCH_SCORE)
+        return {name: (candidates[0][0] if candidates else None) for name, candidates in resolved.items()}
+
+
+# Global exercise resolver instance
+exercise_resolver = ExerciseResolver()
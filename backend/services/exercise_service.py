@@ -4,6 +4,7 @@ Handles exercise database operations including CSV import, search, and CRUD oper
 """
 
 import logging
+import os
 import time
 import traceback
 from typing import List, Optional, Dict, Any, Set
@@ -12,18 +13,14 @@ from datetime import datetime
 # Set up logging
 logger = logging.getLogger(__name__)
 
-try:
-    from firebase_admin import firestore
-    FIRESTORE_AVAILABLE = True
-    logger.info("✅ Exercise service: firestore module imported successfully")
-except ImportError as e:
-    FIRESTORE_AVAILABLE = False
-    firestore = None
-    logger.error(f"❌ Exercise service: Failed to import firestore - {str(e)}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
-
-from ..config.firebase_config import get_firebase_app
+from ..config.firebase_config import firestore
 from ..models import Exercise, CreateExerciseRequest, ExerciseListResponse, ExerciseSearchResponse
+from .exercise_catalog_snapshot import CatalogSnapshot, catalog_snapshot_store
+from .lazy_firestore import LazyFirestoreService
+from .user_cache import UserCache, request_snapshot
+from .exercise_resolver import (
+    AUTO_MATCH_SCORE, DEFAULT_CANDIDATES, ExerciseNameIndex, exercise_resolver, normalize_name
+)
 
 
 class _ExerciseMemoryCache:
@@ -59,7 +56,18 @@ class _ExerciseMemoryCache:
 _exercise_cache = _ExerciseMemoryCache(ttl_seconds=3600)
 
 
-class ExerciseService:
+# user_id -> (custom exercises ordered by name, whether that's the whole collection)
+_custom_exercise_cache = UserCache(
+    "custom_exercises",
+    max_users=int(os.getenv("CUSTOM_EXERCISE_CACHE_USERS", "500")),
+    ttl_seconds=int(os.getenv("CUSTOM_EXERCISE_CACHE_TTL", "300")),
+)
+
+# Custom exercises read per user when filling the cache
+CUSTOM_EXERCISE_FETCH_LIMIT = 1000
+
+
+class ExerciseService(LazyFirestoreService):
     """
     Service for managing exercises in Firestore
     Handles both global exercises and user-specific custom exercises
@@ -76,30 +84,8 @@ class ExerciseService:
     # Validation constants
     MAX_EXERCISE_NAME_LENGTH = 200
     MIN_EXERCISE_NAME_LENGTH = 1
-    
-    def __init__(self):
-        """Initialize Exercise service"""
-        if not FIRESTORE_AVAILABLE:
-            logger.warning("Firebase Admin SDK not available - Exercise service disabled")
-            self.db = None
-            self.available = False
-            self.app = None
-            return
-        
-        try:
-            self.app = get_firebase_app()
-            if self.app:
-                self.db = firestore.client(app=self.app)
-                self.available = True
-                logger.info("Exercise service initialized successfully")
-            else:
-                self.db = None
-                self.available = False
-                logger.warning("Exercise service not available - Firebase not initialized")
-        except Exception as e:
-            logger.error(f"Failed to initialize Exercise service: {str(e)}")
-            self.db = None
-            self.available = False
+
+    service_name = "Exercise"
     
     def is_available(self) -> bool:
         """Check if Exercise service is available"""
@@ -146,6 +132,20 @@ class ExerciseService:
             if metadata:
                 _exercise_cache.check_version(metadata.get('version'))
 
+            # Serve from the catalog snapshot when it matches the catalog version
+            snapshot = self.get_catalog_snapshot(metadata)
+            if snapshot is not None:
+                matching = snapshot.filter(max_tier)
+                offset = (page - 1) * limit
+                result = ExerciseListResponse(
+                    exercises=matching[offset:offset + limit],
+                    total_count=len(matching),
+                    page=page,
+                    page_size=limit
+                )
+                _exercise_cache.set(cache_key, result)
+                return result
+
             # Calculate offset
             offset = (page - 1) * limit
 
@@ -176,7 +176,7 @@ class ExerciseService:
             # Get total count from metadata (avoids full collection scan)
             total_count = self._get_exercise_count_from_metadata(metadata, max_tier)
 
-            logger.info(f"Retrieved {len(exercises)} exercises (page {page}, max_tier={max_tier})")
+            logger.debug(f"Retrieved {len(exercises)} exercises (page {page}, max_tier={max_tier})")
 
             result = ExerciseListResponse(
                 exercises=exercises,
@@ -207,6 +207,19 @@ class ExerciseService:
             logger.warning(f"Failed to read exercise metadata: {e}")
             return None
 
+    def get_catalog_snapshot(self, metadata: Optional[Dict] = None) -> Optional[CatalogSnapshot]:
+        """
+        The catalog snapshot this worker serves from, or None to use Firestore.
+
+        Re-synced against the metadata doc whenever one has just been read,
+        otherwise at most every SNAPSHOT_RECHECK_SECONDS.
+        """
+        if metadata is None and not catalog_snapshot_store.needs_check():
+            return catalog_snapshot_store.snapshot
+        if metadata is None and self.is_available():
+            metadata = self._get_metadata()
+        return catalog_snapshot_store.sync(self.db, metadata)
+
     def _get_exercise_count_from_metadata(
         self, metadata: Optional[Dict], max_tier: Optional[int] = None
     ) -> int:
@@ -293,9 +306,8 @@ class ExerciseService:
             if user_id and len(exercises) > 0:
                 from ..services.favorites_service import favorites_service
                 if favorites_service.is_available():
-                    exercise_ids = [ex.id for ex in exercises]
-                    favorites_dict = favorites_service.bulk_check_favorites(user_id, exercise_ids)
-                    user_favorites = {ex_id for ex_id, is_fav in favorites_dict.items() if is_fav}
+                    favorite_ids = favorites_service.get_favorites_snapshot(user_id).ids
+                    user_favorites = {ex.id for ex in exercises if ex.id in favorite_ids}
             
             # Apply ranking algorithm
             ranked_exercises = self._rank_exercises(exercises, query_lower, user_favorites)
@@ -333,6 +345,11 @@ class ExerciseService:
             return None
         
         try:
+            # Exercises added since the snapshot was built fall through to Firestore
+            snapshot = catalog_snapshot_store.snapshot
+            if snapshot is not None and exercise_id in snapshot.by_id:
+                return snapshot.by_id[exercise_id]
+
             exercise_ref = self.db.collection('global_exercises').document(exercise_id)
             doc = exercise_ref.get()
             
@@ -393,6 +410,7 @@ class ExerciseService:
             exercise_data['updatedAt'] = firestore.SERVER_TIMESTAMP
             
             exercise_ref.set(exercise_data)
+            self.invalidate_custom_exercises(user_id)
             
             logger.info(f"Created custom exercise {exercise.id} for user {user_id}")
             return exercise
@@ -443,6 +461,13 @@ class ExerciseService:
             if existing_exercise:
                 return existing_exercise
             
+            # The cached custom list may predate an exercise created on another
+            # worker; re-read it once before creating a possible duplicate
+            self.invalidate_custom_exercises(user_id)
+            existing_exercise = self._find_existing_exercise(exercise_name, user_id)
+            if existing_exercise:
+                return existing_exercise
+            
             # Create new custom exercise with defaults
             logger.info(f"Creating new custom exercise: '{exercise_name}'")
             return self._create_default_custom_exercise(user_id, exercise_name)
@@ -460,6 +485,9 @@ class ExerciseService:
         """
         Get all custom exercises for a user
         
+        Served from the per-user cache (pinned for the rest of the request
+        once read); a miss reads the collection once.
+        
         Args:
             user_id: ID of the user
             limit: Maximum number of exercises to return
@@ -470,17 +498,27 @@ class ExerciseService:
         if not self.is_available():
             return []
         
+        cached = _custom_exercise_cache.get(user_id)
+        if cached is not None:
+            exercises, complete = cached
+            if complete or limit <= len(exercises):
+                return exercises[:limit]
+        
         try:
+            generation = _custom_exercise_cache.generation(user_id)
+            fetch_limit = max(limit, CUSTOM_EXERCISE_FETCH_LIMIT)
             exercises_ref = (self.db.collection('users')
                            .document(user_id)
                            .collection('custom_exercises')
                            .order_by('name')
-                           .limit(limit))
+                           .limit(fetch_limit))
             
             docs = exercises_ref.stream()
             exercises = []
+            doc_count = 0
             
             for doc in docs:
+                doc_count += 1
                 try:
                     exercise_data = doc.to_dict()
                     exercise = Exercise(**exercise_data)
@@ -489,13 +527,28 @@ class ExerciseService:
                     logger.warning(f"Failed to parse custom exercise {doc.id}: {str(e)}")
                     continue
             
-            logger.info(f"Retrieved {len(exercises)} custom exercises for user {user_id}")
-            return exercises
+            _custom_exercise_cache.set(user_id, (exercises, doc_count < fetch_limit), generation)
+            
+            logger.debug(f"Retrieved {len(exercises)} custom exercises for user {user_id}")
+            return exercises[:limit]
             
         except Exception as e:
             logger.error(f"Failed to get user custom exercises: {str(e)}")
             return []
     
+    def invalidate_custom_exercises(self, user_id: str) -> None:
+        """Drop the user's cached custom exercises (call after any write to custom_exercises)"""
+        _custom_exercise_cache.invalidate(user_id)
+    
+    def custom_exercises_snapshot(self):
+        """
+        Memoize custom exercise lists for the duration of the block, so
+        repeated lookups see one consistent list. Every HTTP request already
+        runs inside one (see middleware/request_snapshot.py); use this for
+        scripts and background work.
+        """
+        return request_snapshot()
+    
     def update_custom_exercise(
         self,
         user_id: str,
@@ -552,6 +605,7 @@ class ExerciseService:
             update_data['updatedAt'] = firestore.SERVER_TIMESTAMP
 
             exercise_ref.update(update_data)
+            self.invalidate_custom_exercises(user_id)
 
             # Read back the updated document
             updated_doc = exercise_ref.get()
@@ -595,6 +649,7 @@ class ExerciseService:
                 return False
 
             exercise_ref.delete()
+            self.invalidate_custom_exercises(user_id)
             logger.info(f"Deleted custom exercise {exercise_id} for user {user_id}")
             return True
 
@@ -610,6 +665,9 @@ class ExerciseService:
         """
         Search for existing exercise in global database and user's custom exercises
         
+        Matching is typo-tolerant (see exercise_resolver); global exercises
+        win ties with custom ones.
+        
         Args:
             exercise_name: Name of the exercise to find
             user_id: User ID to search custom exercises
@@ -617,20 +675,86 @@ class ExerciseService:
         Returns:
             Exercise if found, None otherwise
         """
-        # Check global database first (more likely to have matches)
-        global_results = self.search_exercises(exercise_name, limit=1)
-        if global_results.exercises:
-            logger.info(f"Found '{exercise_name}' in global database")
-            return global_results.exercises[0]
+        existing = exercise_resolver.match_many([exercise_name], user_id)[exercise_name]
+        if existing:
+            logger.info(f"Matched '{exercise_name}' to existing exercise '{existing.name}'")
+        return existing
+    
+    def auto_create_or_get_custom_exercises(
+        self,
+        user_id: str,
+        exercise_names: List[str]
+    ) -> Dict[str, Optional[Exercise]]:
+        """
+        Bulk version of auto_create_or_get_custom_exercise for a whole workout.
+        
+        All names are matched in one resolver pass; names that resolve to the
+        same new exercise (e.g. "Bnech Press" and "bench press") share a
+        single created custom exercise.
+        
+        Returns:
+            Dict of requested name -> Exercise (None for invalid names or failures)
+        """
+        if not self.is_available():
+            logger.warning("Firestore not available - cannot auto-create custom exercises")
+            return {name: None for name in exercise_names}
         
-        # Check user's custom exercises
-        custom_exercises = self.get_user_custom_exercises(user_id, limit=1000)
-        for exercise in custom_exercises:
-            if exercise.name.lower() == exercise_name.lower():
-                logger.info(f"Found '{exercise_name}' in user's custom exercises")
-                return exercise
+        with self.custom_exercises_snapshot():
+            return self._auto_create_or_get_custom_exercises(user_id, exercise_names)
+    
+    def _auto_create_or_get_custom_exercises(
+        self,
+        user_id: str,
+        exercise_names: List[str]
+    ) -> Dict[str, Optional[Exercise]]:
+        valid_names = []
+        for name in exercise_names:
+            is_valid, error_msg = self._validate_exercise_name(name)
+            if is_valid:
+                valid_names.append(name.strip())
+            else:
+                logger.error(f"Invalid exercise name: {error_msg}")
+        
+        try:
+            matches = exercise_resolver.match_many(valid_names, user_id)
+            unmatched = [name for name in valid_names if matches[name] is None]
+            if unmatched:
+                # Re-read custom exercises once before creating (see auto_create_or_get_custom_exercise)
+                self.invalidate_custom_exercises(user_id)
+                matches.update(exercise_resolver.match_many(unmatched, user_id))
+        except Exception as e:
+            logger.error(f"Failed to resolve exercise names: {str(e)}")
+            return {name: None for name in exercise_names}
+        
+        created: List[Exercise] = []
+        for name in valid_names:
+            if matches[name] is not None:
+                continue
+            # Reuse an exercise created earlier in this batch for a near-identical name
+            earlier = ExerciseNameIndex(created, "custom")
+            candidates = earlier.candidates(normalize_name(name))
+            best = max(candidates, default=None)
+            if best and best[0] >= AUTO_MATCH_SCORE:
+                matches[name] = earlier.by_name[best[1]][0]
+                continue
+            
+            logger.info(f"Creating new custom exercise: '{name}'")
+            matches[name] = self._create_default_custom_exercise(user_id, name)
+            if matches[name]:
+                created.append(matches[name])
         
-        return None
+        return {name: matches.get(name.strip()) if name and name.strip() else None for name in exercise_names}
+    
+    def resolve_exercise_names(
+        self,
+        exercise_names: List[str],
+        user_id: Optional[str] = None,
+        limit: int = DEFAULT_CANDIDATES
+    ) -> Dict[str, List[tuple]]:
+        """Scored candidates per name (see ExerciseResolver.resolve_many)"""
+        if not self.is_available():
+            return {name: [] for name in exercise_names}
+        return exercise_resolver.resolve_many(exercise_names, user_id, limit=limit)
     
     def _validate_exercise_name(self, exercise_name: str) -> tuple[bool, Optional[str]]:
         """
@@ -695,6 +819,7 @@ class ExerciseService:
             exercise_data['updatedAt'] = firestore.SERVER_TIMESTAMP
             
             exercise_ref.set(exercise_data)
+            self.invalidate_custom_exercises(user_id)
             
             logger.info(f"✅ Auto-created custom exercise: {exercise.id} - '{exercise_name}'")
             return exercise
@@ -5,27 +5,21 @@ Handles generation of shareable images, text exports, and printable PDFs
 
 from typing import Optional
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
 import os
 import tempfile
 import time
 
 from backend.models import WorkoutTemplate, migrate_exercise_groups_to_sections
-
-try:
-    from docxtpl import DocxTemplate
-    DOCXTPL_AVAILABLE = True
-except ImportError:
-    DOCXTPL_AVAILABLE = False
+from backend.services.v2.template_registry import template_registry
+from backend.services.docx_export_service import DOCXTPL_AVAILABLE, docx_export_service
 
 
 class ExportService:
     """Service for generating various export formats for workouts"""
 
     def __init__(self):
-        # Set up Jinja2 environment for templates
-        template_dir = Path(__file__).parent.parent / "templates" / "html"
-        self.jinja_env = Environment(loader=FileSystemLoader(str(template_dir)))
+        # Templates are rendered through the shared, precompiled registry
+        self.jinja_env = template_registry.env
 
     def _resolve_weight(self, exercise_name: str, default_weight, default_weight_unit,
                         include_weights: bool, exercise_weights: dict = None) -> Optional[str]:
@@ -164,6 +158,45 @@ class ExportService:
 
         return "\n".join(lines)
 
+    def render_export_html(
+        self,
+        workout: WorkoutTemplate,
+        export_format: str,
+        include_weights: bool = False,
+        exercise_weights: dict = None
+    ) -> str:
+        """
+        Render the HTML for a Gotenberg-backed export without converting it.
+
+        Args:
+            workout: The workout template to export
+            export_format: 'simple' (reference sheet), 'log' (4-week gym log) or 'image' (story image)
+            include_weights: Whether to include exercise weights
+            exercise_weights: Dict of {exercise_name: ExerciseHistory} with last weights
+
+        Returns:
+            Rendered HTML string ready for Gotenberg
+        """
+        if export_format == "image":
+            template_name, label = "share_image_template.html", "share image"
+            prepare = self._prepare_image_template_data
+        elif export_format == "log":
+            template_name, label = "gym_log_export_template.html", "gym log"
+            prepare = self._prepare_gym_log_data
+        elif export_format == "simple":
+            template_name, label = "print_simple_template.html", "print"
+            prepare = self._prepare_print_template_data
+        else:
+            raise ValueError(f"Unknown export format: {export_format}")
+
+        try:
+            template_registry.get_template(template_name)
+        except Exception as e:
+            raise Exception(f"Failed to load {label} template: {str(e)}")
+
+        template_data = prepare(workout, include_weights, exercise_weights)
+        return template_registry.render(template_name, **template_data)
+
     def generate_shareable_image(
         self,
         workout: WorkoutTemplate,
@@ -185,19 +218,7 @@ class ExportService:
         # Import here to avoid circular imports
         from backend.services.v2.gotenberg_client import GotenbergClient
 
-        # Load and render the template
-        try:
-            template = self.jinja_env.get_template("share_image_template.html")
-        except Exception as e:
-            raise Exception(f"Failed to load share image template: {str(e)}")
-
-        # Prepare template data
-        template_data = self._prepare_image_template_data(
-            workout,
-            include_weights=include_weights,
-            exercise_weights=exercise_weights
-        )
-        html_content = template.render(**template_data)
+        html_content = self.render_export_html(workout, "image", include_weights, exercise_weights)
 
         # Generate image using Gotenberg
         client = GotenbergClient()
@@ -277,19 +298,7 @@ class ExportService:
         # Import here to avoid circular imports
         from backend.services.v2.gotenberg_client import GotenbergClient
 
-        # Load and render the template
-        try:
-            template = self.jinja_env.get_template("print_simple_template.html")
-        except Exception as e:
-            raise Exception(f"Failed to load print template: {str(e)}")
-
-        # Prepare template data
-        template_data = self._prepare_print_template_data(
-            workout,
-            include_weights=include_weights,
-            exercise_weights=exercise_weights
-        )
-        html_content = template.render(**template_data)
+        html_content = self.render_export_html(workout, "simple", include_weights, exercise_weights)
 
         # Generate PDF using Gotenberg
         client = GotenbergClient()
@@ -325,13 +334,7 @@ class ExportService:
         """Generate a gym-log-style PDF with exercise table and 4-week progress tracking."""
         from backend.services.v2.gotenberg_client import GotenbergClient
 
-        try:
-            template = self.jinja_env.get_template("gym_log_export_template.html")
-        except Exception as e:
-            raise Exception(f"Failed to load gym log template: {str(e)}")
-
-        template_data = self._prepare_gym_log_data(workout, include_weights, exercise_weights)
-        html_content = template.render(**template_data)
+        html_content = self.render_export_html(workout, "log", include_weights, exercise_weights)
 
         client = GotenbergClient()
         if not client.is_available():
@@ -402,6 +405,7 @@ class ExportService:
         context = self._prepare_docx_context(workout)
 
         # Load template and render
+        from docxtpl import DocxTemplate
         doc = DocxTemplate(str(template_path))
         doc.render(context)
 
@@ -416,6 +420,22 @@ class ExportService:
 
         return output_path
 
+    async def generate_docx_bytes(self, workout: WorkoutTemplate, template_path: Optional[str] = None) -> bytes:
+        """
+        Generate a Word document workout log in memory.
+        Same output as generate_docx_log, but rendered in the DOCX worker pool
+        from a cached template so the event loop is never blocked.
+
+        Args:
+            workout: The workout template to export
+            template_path: Optional path to custom template. Defaults to master_doc.docx
+
+        Returns:
+            Bytes of the generated .docx file
+        """
+        context = self._prepare_docx_context(workout)
+        return await docx_export_service.render(context, template_path)
+
     def _prepare_docx_context(self, workout: WorkoutTemplate) -> dict:
         """
         Prepare context dictionary for docx template.
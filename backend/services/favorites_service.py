@@ -4,60 +4,123 @@ Handles user favorite exercises with optimized Firestore operations
 """
 
 import logging
-import traceback
+import os
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-try:
-    from firebase_admin import firestore
-    FIRESTORE_AVAILABLE = True
-    logger.info("✅ Favorites service: firestore module imported successfully")
-except ImportError as e:
-    FIRESTORE_AVAILABLE = False
-    firestore = None
-    logger.error(f"❌ Favorites service: Failed to import firestore - {str(e)}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
-
-from ..config.firebase_config import get_firebase_app
+from ..config.firebase_config import firestore, FieldPath
 from ..models import FavoriteExercise, UserFavorites, Exercise
+from .lazy_firestore import LazyFirestoreService
+from .user_cache import UserCache
+
+
+class FavoritesSnapshot:
+    """
+    Compact view of a user's favorites doc: the id set for membership checks,
+    with the denormalized exercise map parsed only when something needs it.
+    """
+
+    __slots__ = ("ids", "exercise_ids", "last_updated", "legacy_keys", "_raw", "_exercises")
+
+    def __init__(self, data: Optional[Dict[str, Any]]):
+        data = data or {}
+        # Legacy docs stored favorites as literal "exercises.<id>" fields; a doc
+        # favorited into since then has both, with the nested map taking precedence
+        self.legacy_keys = [key for key in data if key.startswith('exercises.')]
+        raw = {key[len('exercises.'):]: data[key] for key in self.legacy_keys}
+        raw.update(data.get('exercises') or {})
+        self._raw = raw
+        self._exercises: Optional[Dict[str, FavoriteExercise]] = None
+        self.exercise_ids: List[str] = list(data.get('exerciseIds') or [])
+        self.ids = frozenset(self.exercise_ids)
+        self.last_updated = data.get('lastUpdated') or datetime.now()
+
+    def __contains__(self, exercise_id: str) -> bool:
+        return exercise_id in self.ids
+
+    @property
+    def exercises(self) -> Dict[str, FavoriteExercise]:
+        if self._exercises is None:
+            exercises = {}
+            for ex_id, ex_data in self._raw.items():
+                try:
+                    exercises[ex_id] = FavoriteExercise(**ex_data)
+                except Exception as e:
+                    logger.warning(f"Failed to parse favorite exercise {ex_id}: {str(e)}")
+            self._exercises = exercises
+        return self._exercises
+
+    def to_user_favorites(self) -> UserFavorites:
+        return UserFavorites(
+            exerciseIds=self.exercise_ids,
+            exercises=self.exercises,
+            lastUpdated=self.last_updated,
+            count=len(self.exercise_ids)
+        )
+
 
-class FavoritesService:
+# user_id -> (doc update_time, FavoritesSnapshot). Entries are revalidated against
+# the doc's update_time once per request, so the doc is re-parsed only after a write.
+_favorites_cache = UserCache(
+    "favorites",
+    max_users=int(os.getenv("FAVORITES_CACHE_USERS", "1000")),
+    ttl_seconds=int(os.getenv("FAVORITES_CACHE_TTL", "3600")),
+)
+
+
+class FavoritesService(LazyFirestoreService):
     """
     Service for managing user favorite exercises
     Uses optimized single-document structure for fast reads and writes
     """
     
-    def __init__(self):
-        """Initialize Favorites service"""
-        if not FIRESTORE_AVAILABLE:
-            logger.warning("Firebase Admin SDK not available - Favorites service disabled")
-            self.db = None
-            self.available = False
-            self.app = None
-            return
-        
-        try:
-            self.app = get_firebase_app()
-            if self.app:
-                self.db = firestore.client(app=self.app)
-                self.available = True
-                logger.info("Favorites service initialized successfully")
-            else:
-                self.db = None
-                self.available = False
-                logger.warning("Favorites service not available - Firebase not initialized")
-        except Exception as e:
-            logger.error(f"Failed to initialize Favorites service: {str(e)}")
-            self.db = None
-            self.available = False
+    service_name = "Favorites"
     
     def is_available(self) -> bool:
         """Check if Favorites service is available"""
         return self.available and self.db is not None
     
+    def _favorites_ref(self, user_id: str):
+        return (self.db.collection('users')
+                .document(user_id)
+                .collection('data')
+                .document('favorites'))
+    
+    def get_favorites_snapshot(self, user_id: str) -> FavoritesSnapshot:
+        """
+        Compact favorites for a user, read at most once per request.
+        
+        The doc is re-read on each new request (so writes from other workers
+        are seen) but only re-parsed when its update_time has changed.
+        """
+        if not self.is_available():
+            return FavoritesSnapshot(None)
+        
+        pinned = _favorites_cache.get_pinned(user_id)
+        if pinned is not None:
+            return pinned[1]
+        
+        try:
+            generation = _favorites_cache.generation(user_id)
+            doc = self._favorites_ref(user_id).get()
+            version = getattr(doc, 'update_time', None) if doc.exists else None
+            
+            cached = _favorites_cache.get(user_id)
+            if cached is not None and version is not None and cached[0] == version:
+                return cached[1]
+            
+            snapshot = FavoritesSnapshot(doc.to_dict() if doc.exists else None)
+            _favorites_cache.set(user_id, (version, snapshot), generation)
+            logger.debug(f"Loaded {len(snapshot.ids)} favorites for user {user_id}")
+            return snapshot
+            
+        except Exception as e:
+            logger.error(f"Error getting favorites for user {user_id}: {str(e)}")
+            return FavoritesSnapshot(None)
+    
     def get_user_favorites(self, user_id: str) -> UserFavorites:
         """
         Get all favorites for a user
@@ -72,61 +135,7 @@ class FavoritesService:
             logger.warning("Firestore not available - cannot get favorites")
             return UserFavorites()
         
-        try:
-            doc_ref = (self.db.collection('users')
-                      .document(user_id)
-                      .collection('data')
-                      .document('favorites'))
-            
-            doc = doc_ref.get()
-            
-            if doc.exists:
-                data = doc.to_dict()
-                logger.info(f"📦 Raw Firestore data keys: {list(data.keys())}")
-                
-                # Convert exercises dict to FavoriteExercise objects
-                exercises = {}
-                
-                # Handle both nested map structure AND dotted field paths (for backward compatibility)
-                exercises_data = data.get('exercises', {})
-                
-                if exercises_data:
-                    # New structure: exercises is a nested map
-                    logger.info(f"✅ Found nested exercises map with {len(exercises_data)} items")
-                    for ex_id, ex_data in exercises_data.items():
-                        try:
-                            exercises[ex_id] = FavoriteExercise(**ex_data)
-                        except Exception as e:
-                            logger.warning(f"Failed to parse favorite exercise {ex_id}: {str(e)}")
-                            continue
-                else:
-                    # Old structure: exercises stored as dotted field paths
-                    logger.info("⚠️ Using legacy dotted field path structure")
-                    for key, value in data.items():
-                        if key.startswith('exercises.'):
-                            ex_id = key.replace('exercises.', '')
-                            try:
-                                exercises[ex_id] = FavoriteExercise(**value)
-                                logger.info(f"📦 Parsed legacy favorite: {ex_id}")
-                            except Exception as e:
-                                logger.warning(f"Failed to parse legacy favorite {ex_id}: {str(e)}")
-                                continue
-                
-                logger.info(f"✅ Parsed {len(exercises)} favorite exercises total")
-                
-                return UserFavorites(
-                    exerciseIds=data.get('exerciseIds', []),
-                    exercises=exercises,
-                    lastUpdated=data.get('lastUpdated', datetime.now()),
-                    count=data.get('count', len(exercises))
-                )
-            else:
-                logger.info(f"No favorites found for user {user_id}")
-                return UserFavorites()
-                
-        except Exception as e:
-            logger.error(f"Error getting favorites for user {user_id}: {str(e)}")
-            return UserFavorites()
+        return self.get_favorites_snapshot(user_id).to_user_favorites()
     
     def add_favorite(self, user_id: str, exercise_id: str, exercise: Exercise) -> bool:
         """
@@ -145,10 +154,7 @@ class FavoritesService:
             return False
         
         try:
-            doc_ref = (self.db.collection('users')
-                      .document(user_id)
-                      .collection('data')
-                      .document('favorites'))
+            doc_ref = self._favorites_ref(user_id)
             
             # Create favorite exercise object
             favorite = FavoriteExercise(
@@ -160,27 +166,16 @@ class FavoritesService:
                 favoritedAt=datetime.now()
             )
             
-            # Get current document to check structure
-            current_doc = doc_ref.get()
-            
-            if current_doc.exists:
-                # Update existing document with nested structure
-                doc_ref.update({
-                    'exerciseIds': firestore.ArrayUnion([exercise_id]),
-                    f'exercises.{exercise_id}': favorite.model_dump(),
-                    'lastUpdated': firestore.SERVER_TIMESTAMP,
-                    'count': firestore.Increment(1)
-                })
-            else:
-                # Create new document with proper nested structure
-                doc_ref.set({
-                    'exerciseIds': [exercise_id],
-                    'exercises': {
-                        exercise_id: favorite.model_dump()
-                    },
-                    'lastUpdated': firestore.SERVER_TIMESTAMP,
-                    'count': 1
-                })
+            # Single atomic write; merge creates the doc if needed and merges the nested map
+            doc_ref.set({
+                'exerciseIds': firestore.ArrayUnion([exercise_id]),
+                'exercises': {
+                    exercise_id: favorite.model_dump()
+                },
+                'lastUpdated': firestore.SERVER_TIMESTAMP,
+                'count': firestore.Increment(1)
+            }, merge=True)
+            _favorites_cache.invalidate(user_id)
             
             # Optionally increment favorite count on the exercise itself
             try:
@@ -214,18 +209,23 @@ class FavoritesService:
             return False
         
         try:
-            doc_ref = (self.db.collection('users')
-                      .document(user_id)
-                      .collection('data')
-                      .document('favorites'))
+            doc_ref = self._favorites_ref(user_id)
             
-            # Remove from favorites using Firestore atomic operations
-            doc_ref.update({
+            # Quoted paths: ids such as "exercise-1a2b" aren't valid bare field names
+            update = {
                 'exerciseIds': firestore.ArrayRemove([exercise_id]),
-                f'exercises.{exercise_id}': firestore.DELETE_FIELD,
+                FieldPath('exercises', exercise_id).to_api_repr(): firestore.DELETE_FIELD,
                 'lastUpdated': firestore.SERVER_TIMESTAMP,
                 'count': firestore.Increment(-1)
-            })
+            }
+            # Legacy docs hold a literal "exercises.<id>" field, which needs a quoted path
+            legacy_key = f'exercises.{exercise_id}'
+            if legacy_key in self.get_favorites_snapshot(user_id).legacy_keys:
+                update[FieldPath(legacy_key).to_api_repr()] = firestore.DELETE_FIELD
+            
+            # Remove from favorites using Firestore atomic operations
+            doc_ref.update(update)
+            _favorites_cache.invalidate(user_id)
             
             # Optionally decrement favorite count on the exercise itself
             try:
@@ -254,8 +254,7 @@ class FavoritesService:
         Returns:
             True if favorited, False otherwise
         """
-        favorites = self.get_user_favorites(user_id)
-        return exercise_id in favorites.exerciseIds
+        return exercise_id in self.get_favorites_snapshot(user_id)
     
     def bulk_check_favorites(self, user_id: str, exercise_ids: List[str]) -> Dict[str, bool]:
         """
@@ -268,11 +267,11 @@ class FavoritesService:
         Returns:
             Dictionary mapping exercise IDs to favorite status
         """
-        favorites = self.get_user_favorites(user_id)
+        favorite_ids = self.get_favorites_snapshot(user_id).ids
         return {
-            exercise_id: exercise_id in favorites.exerciseIds
+            exercise_id: exercise_id in favorite_ids
             for exercise_id in exercise_ids
         }
 
 # Global service instance
-favorites_service = FavoritesService()
\ No newline at end of file
+favorites_service = FavoritesService()
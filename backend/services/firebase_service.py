@@ -9,54 +9,19 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
-try:
-    import firebase_admin
-    from firebase_admin import credentials, firestore
-    FIREBASE_AVAILABLE = True
-except ImportError:
-    FIREBASE_AVAILABLE = False
-    firebase_admin = None
-    credentials = None
-    firestore = None
-
-from ..config.firebase_config import get_firebase_app, is_firebase_available
+from ..config.firebase_config import firestore
+from .lazy_firestore import LazyFirestoreService
 
 logger = logging.getLogger(__name__)
 
-class FirebaseService:
+class FirebaseService(LazyFirestoreService):
     """Firebase service for Firestore operations"""
     
-    def __init__(self):
-        self.db = None
-        self.app = None
-        self._available = False
-        self._initialize()
-    
-    def _initialize(self):
-        """Initialize Firebase service using centralized config"""
-        if not FIREBASE_AVAILABLE:
-            logger.warning("Firebase Admin SDK not available - install firebase-admin package")
-            return
-        
-        try:
-            # Use centralized Firebase configuration
-            self.app = get_firebase_app()
-            
-            if self.app:
-                self.db = firestore.client(app=self.app)
-                self._available = True
-                logger.info("✅ Firebase service connected successfully")
-            else:
-                logger.warning("❌ Firebase app not available - check configuration")
-                self._available = False
-            
-        except Exception as e:
-            logger.error(f"❌ Firebase service initialization failed: {e}")
-            self._available = False
+    service_name = "Firebase"
     
     def is_available(self) -> bool:
         """Check if Firebase service is available"""
-        return self._available and self.db is not None
+        return self.available and self.db is not None
 
     def get_firestore(self):
         """Get the Firestore client"""
@@ -139,7 +104,7 @@ class FirebaseService:
                 program['id'] = doc.id
                 programs.append(program)
             
-            logger.info(f"✅ Retrieved {len(programs)} programs for user {user_id}")
+            logger.debug(f"✅ Retrieved {len(programs)} programs for user {user_id}")
             return programs
             
         except Exception as e:
@@ -189,7 +154,7 @@ class FirebaseService:
                 workout['id'] = doc.id
                 workouts.append(workout)
             
-            logger.info(f"✅ Retrieved {len(workouts)} workouts for user {user_id}")
+            logger.debug(f"✅ Retrieved {len(workouts)} workouts for user {user_id}")
             return workouts
             
         except Exception as e:
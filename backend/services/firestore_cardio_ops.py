@@ -6,10 +6,7 @@ Mixin providing cardio session CRUD functionality
 import logging
 from typing import List, Optional, Any
 
-try:
-    from firebase_admin import firestore
-except ImportError:
-    firestore = None
+from ..config.firebase_config import firestore
 
 logger = logging.getLogger(__name__)
 
@@ -57,7 +54,8 @@ class FirestoreCardioOps:
             session_data['started_at'] = session.started_at
             session_data['created_at'] = firestore.SERVER_TIMESTAMP
 
-            session_ref.set(session_data)
+            with self.unit_of_work(user_id) as uow:
+                uow.set(session_ref, session_data)
 
             logger.info(f"Created cardio session {session.id} for user {user_id}")
             return session
@@ -128,7 +126,7 @@ class FirestoreCardioOps:
                     logger.warning(f"Failed to parse cardio session {doc.id}: {str(e)}")
                     continue
 
-            logger.info(f"Retrieved {len(sessions)} cardio sessions for user {user_id}")
+            logger.debug(f"Retrieved {len(sessions)} cardio sessions for user {user_id}")
             return sessions
 
         except Exception as e:
@@ -155,10 +153,12 @@ class FirestoreCardioOps:
             # Prepare update data
             update_data = update_request.model_dump(exclude_unset=True)
 
-            session_ref.update(update_data)
+            with self.unit_of_work(user_id) as uow:
+                uow.update(session_ref, update_data)
 
-            # Get updated session
-            return await self.get_cardio_session(user_id, session_id)
+            # Return the merged state instead of reading it back
+            from ..models import CardioSession
+            return CardioSession(**{**current_doc.to_dict(), **update_data})
 
         except Exception as e:
             logger.error(f"Failed to update cardio session: {str(e)}")
@@ -195,10 +195,12 @@ class FirestoreCardioOps:
                     ca = new_completed.replace(tzinfo=None) if hasattr(new_completed, 'replace') and getattr(new_completed, 'tzinfo', None) else new_completed
                     update_data['duration_minutes'] = max(1, int((ca - sa).total_seconds() / 60))
 
-            session_ref.update(update_data)
+            with self.unit_of_work(user_id) as uow:
+                uow.update(session_ref, update_data)
 
             logger.info(f"Edited cardio session {session_id} for user {user_id}")
-            return await self.get_cardio_session(user_id, session_id)
+            from ..models import CardioSession
+            return CardioSession(**{**current_doc.to_dict(), **update_data})
 
         except Exception as e:
             logger.error(f"Failed to edit cardio session: {str(e)}")
@@ -215,7 +217,8 @@ class FirestoreCardioOps:
                           .collection('cardio_sessions')
                           .document(session_id))
 
-            session_ref.delete()
+            with self.unit_of_work(user_id) as uow:
+                uow.delete(session_ref)
 
             logger.info(f"Deleted cardio session {session_id} for user {user_id}")
             return True
@@ -0,0 +1,294 @@
+"""
+Firestore Clients - one shared, instrumented Firestore client per Firebase app.
+
+Services, routes and cron jobs used to call firestore.client() themselves.
+firebase_admin happens to cache that client per app, but the channel it
+builds uses library defaults and nothing can see what is in flight on it.
+The registry owns the client instead:
+
+- one client per Firebase app, created on first use (never in the gunicorn
+  master: gRPC channels don't survive fork)
+- its gRPC channel uses CHANNEL_OPTIONS: keepalive that notices dropped
+  idle connections, and short reconnect backoff so a worker recovers in
+  seconds after a network blip instead of backing off for up to 2 minutes
+- every RPC passes through an interceptor that tracks in-flight calls,
+  errors and latency per method, reported in /api/health, and counts the
+  documents it reads or writes for the current request (firestore_usage.py)
+
+One channel is enough: it multiplexes up to ~100 concurrent streams over
+one HTTP/2 connection, and a worker runs at most its thread pool's worth
+(32) of blocking Firestore calls at a time. More throughput comes from more
+workers, not more channels.
+
+With FIRESTORE_BACKEND=memory every caller gets one in-memory client
+instead (memory_firestore.py), and no Firebase app is needed.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from ..config.firebase_config import get_firebase_app
+from .firestore_usage import current_usage, record
+
+logger = logging.getLogger(__name__)
+
+FIRESTORE_KEEPALIVE_MS = int(os.getenv("FIRESTORE_KEEPALIVE_MS", "30000"))
+
+# "firestore" (default) or "memory"
+FIRESTORE_BACKEND = os.getenv("FIRESTORE_BACKEND", "firestore").lower()
+MEMORY_CLIENT = "(memory)"
+
+CHANNEL_OPTIONS = (
+    ("grpc.keepalive_time_ms", FIRESTORE_KEEPALIVE_MS),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.initial_reconnect_backoff_ms", 250),
+    ("grpc.max_reconnect_backoff_ms", 10000),
+    ("grpc.max_send_message_length", -1),
+    ("grpc.max_receive_message_length", -1),
+)
+
+# Streaming RPCs whose responses are billed as document reads
+READ_STREAMS = {"RunQuery", "RunAggregationQuery", "BatchGetDocuments"}
+# RPCs whose request carries billed writes and deletes
+WRITE_METHODS = {"Commit", "BatchWrite"}
+
+
+class RpcMetrics:
+    """In-flight and completed Firestore RPCs for this worker (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        # method -> [calls, errors, total seconds]
+        self._methods: Dict[str, list] = {}
+
+    def started(self) -> float:
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return time.perf_counter()
+
+    def finished(self, method: str, started: float, ok: bool) -> float:
+        """Record a completed call; returns its duration in seconds"""
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.in_flight -= 1
+            self.calls += 1
+            stats = self._methods.setdefault(method, [0, 0, 0.0])
+            stats[0] += 1
+            stats[2] += elapsed
+            if not ok:
+                self.errors += 1
+                stats[1] += 1
+        return elapsed
+
+    def methods(self) -> Dict[str, Tuple[int, int, float]]:
+        """method -> (calls, errors, total seconds)"""
+        with self._lock:
+            return {method: tuple(stats) for method, stats in self._methods.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "calls": self.calls,
+                "errors": self.errors,
+                "methods": {
+                    method: {"calls": calls, "errors": errors, "avg_ms": round(total * 1000 / calls, 1)}
+                    for method, (calls, errors, total) in sorted(self._methods.items())
+                },
+            }
+
+
+def _count_writes(request) -> Tuple[int, int]:
+    """(writes, deletes) in a Commit/BatchWrite request"""
+    writes = deletes = 0
+    for write in request.writes:
+        if type(write).pb(write).WhichOneof("operation") == "delete":
+            deletes += 1
+        else:
+            writes += 1
+    return writes, deletes
+
+
+class _CountingStream:
+    """Streaming call that counts the documents it yields as reads"""
+
+    def __init__(self, call, method: str, usage):
+        self._call = call
+        self._method = method
+        self._usage = usage
+        self._reads = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            response = next(self._call)
+        except StopIteration:
+            # Empty queries and aggregations are billed one read
+            if self._reads == 0 and self._method != "BatchGetDocuments":
+                record(reads=1, usage=self._usage)
+            raise
+        if self._method == "RunQuery":
+            is_read = "document" in response
+        elif self._method == "BatchGetDocuments":
+            is_read = "found" in response or "missing" in response
+        else:
+            is_read = False
+        if is_read:
+            self._reads += 1
+            record(reads=1, usage=self._usage)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._call, name)
+
+
+def _metrics_interceptor(metrics: RpcMetrics):
+    """gRPC client interceptor feeding metrics (grpc is imported with the Firestore SDK)"""
+    import grpc
+
+    class MetricsInterceptor(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor):
+        def _intercept(self, continuation, client_call_details, request):
+            method = client_call_details.method.rsplit("/", 1)[-1]
+            # Captured here: done callbacks run on gRPC threads, outside the request's context
+            usage = current_usage()
+            started = metrics.started()
+            try:
+                call = continuation(client_call_details, request)
+            except Exception:
+                record(rpcs=1, rpc_seconds=metrics.finished(method, started, ok=False), usage=usage)
+                raise
+
+            def on_done(done):
+                ok = done.code() == grpc.StatusCode.OK
+                writes, deletes = _count_writes(request) if ok and method in WRITE_METHODS else (0, 0)
+                record(writes=writes, deletes=deletes, rpcs=1,
+                       rpc_seconds=metrics.finished(method, started, ok), usage=usage)
+
+            # Fires when a unary call completes, or when a stream ends or is cancelled
+            call.add_done_callback(on_done)
+            if method in READ_STREAMS:
+                return _CountingStream(call, method, usage)
+            return call
+
+        def intercept_unary_unary(self, continuation, client_call_details, request):
+            return self._intercept(continuation, client_call_details, request)
+
+        def intercept_unary_stream(self, continuation, client_call_details, request):
+            return self._intercept(continuation, client_call_details, request)
+
+    return MetricsInterceptor()
+
+
+class FirestoreClientRegistry:
+    """Process-wide Firestore clients, one per Firebase app"""
+
+    def __init__(self, backend: str = FIRESTORE_BACKEND):
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.metrics = RpcMetrics()
+        self.backend = backend
+
+    @property
+    def in_memory(self) -> bool:
+        return self.backend == "memory"
+
+    def client(self, app=None):
+        """
+        The shared client for app (the default Firebase app if None).
+
+        Returns:
+            A google.cloud.firestore Client, or None if Firebase isn't configured.
+            With the memory backend, the in-memory client whatever the app.
+        """
+        if self.in_memory:
+            return self._memory_client()
+        if app is None:
+            app = get_firebase_app()
+            if app is None:
+                return None
+        client = self._clients.get(app.name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(app.name)
+                if client is None:
+                    client = self._clients[app.name] = self._create_client(app)
+        return client
+
+    def _memory_client(self):
+        client = self._clients.get(MEMORY_CLIENT)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(MEMORY_CLIENT)
+                if client is None:
+                    from .memory_firestore import MemoryFirestore
+
+                    client = self._clients[MEMORY_CLIENT] = MemoryFirestore(metrics=self.metrics)
+                    logger.warning("Using the in-memory Firestore backend (FIRESTORE_BACKEND=memory); data is not persisted")
+        return client
+
+    def _create_client(self, app):
+        from google.cloud import firestore as cloud_firestore
+
+        if not app.project_id:
+            raise ValueError("Project ID is required to access Firestore")
+        client = cloud_firestore.Client(credentials=app.credential.get_credential(), project=app.project_id)
+        if client._emulator_host is None:
+            try:
+                self._attach_channel(client)
+            except Exception as e:
+                logger.warning(f"Using the default Firestore channel (no RPC metrics): {str(e)}")
+        logger.info(f"Created shared Firestore client for app '{app.name}' (project {app.project_id})")
+        return client
+
+    def _attach_channel(self, client) -> None:
+        """
+        Give the client a channel with CHANNEL_OPTIONS and the metrics
+        interceptor. The Client only accepts a channel through the GAPIC
+        transport it otherwise builds lazily, so this builds it up front the
+        same way (Client._firestore_api_helper).
+        """
+        import grpc
+        from google.cloud.firestore_v1.services.firestore import client as firestore_client
+        from google.cloud.firestore_v1.services.firestore.transports.grpc import FirestoreGrpcTransport
+
+        channel = FirestoreGrpcTransport.create_channel(
+            client._target, credentials=client._credentials, options=list(CHANNEL_OPTIONS)
+        )
+        channel = grpc.intercept_channel(channel, _metrics_interceptor(self.metrics))
+        client._transport = FirestoreGrpcTransport(host=client._target, channel=channel)
+        client._firestore_api_internal = firestore_client.FirestoreClient(
+            transport=client._transport, client_options=client._client_options
+        )
+        firestore_client._client_info = client._client_info
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "clients": len(self._clients), **self.metrics.to_dict()}
+
+    def close(self) -> None:
+        """Close every client's channel (application shutdown)"""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            try:
+                # Client.close() only closes its HTTP session; the channel belongs to the transport
+                transport = getattr(client, "_transport", None)
+                if transport is not None:
+                    transport.close()
+                client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Firestore client for app '{name}': {str(e)}")
+
+
+# Global Firestore client registry
+firestore_clients = FirestoreClientRegistry()
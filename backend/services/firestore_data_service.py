@@ -8,27 +8,19 @@ Domain operations are provided by mixin classes:
   - FirestoreProgramOps:  program CRUD + program-workout management (firestore_program_ops.py)
   - FirestoreSessionOps:  workout sessions + exercise history (firestore_session_ops.py)
   - FirestoreCardioOps:   cardio sessions (firestore_cardio_ops.py)
+
+Mutations go through unit_of_work() so entity writes, stat counters and
+lastActivity land in one batched commit (unit_of_work.py).
 """
 
 import logging
-import traceback
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-try:
-    from firebase_admin import firestore
-    FIRESTORE_AVAILABLE = True
-    logger.info("Firestore data service: firestore module imported successfully")
-except ImportError as e:
-    FIRESTORE_AVAILABLE = False
-    firestore = None
-    logger.error(f"Firestore data service: Failed to import firestore - {str(e)}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
-
-from ..config.firebase_config import get_firebase_app
+from ..config.firebase_config import firestore
 from ..models import (
     Program, WorkoutTemplate, CreateWorkoutRequest, CreateProgramRequest,
     UpdateWorkoutRequest, UpdateProgramRequest, ProgramWorkout
@@ -38,9 +30,13 @@ from .firestore_workout_ops import FirestoreWorkoutOps
 from .firestore_program_ops import FirestoreProgramOps
 from .firestore_session_ops import FirestoreSessionOps
 from .firestore_cardio_ops import FirestoreCardioOps
+from .lazy_firestore import LazyFirestoreService
+from .migration_pipeline import MigrationPipeline
+from .unit_of_work import UnitOfWork
 
 
 class FirestoreDataService(
+    LazyFirestoreService,
     FirestoreWorkoutOps,
     FirestoreProgramOps,
     FirestoreSessionOps,
@@ -51,29 +47,7 @@ class FirestoreDataService(
     Supports real-time sync, conflict resolution, and offline capabilities.
     """
 
-    def __init__(self):
-        """Initialize Firestore data service"""
-        if not FIRESTORE_AVAILABLE:
-            logger.warning("Firebase Admin SDK not available - Firestore data service disabled")
-            self.db = None
-            self.available = False
-            self.app = None
-            return
-
-        try:
-            self.app = get_firebase_app()
-            if self.app:
-                self.db = firestore.client(app=self.app)
-                self.available = True
-                logger.info("Firestore data service initialized successfully")
-            else:
-                self.db = None
-                self.available = False
-                logger.warning("Firestore data service not available - Firebase not initialized")
-        except Exception as e:
-            logger.error(f"Failed to initialize Firestore data service: {str(e)}")
-            self.db = None
-            self.available = False
+    service_name = "Firestore data"
 
     def is_available(self) -> bool:
         """Check if Firestore service is available"""
@@ -109,13 +83,14 @@ class FirestoreDataService(
                     'expiresAt': None
                 },
                 'stats': {
-                    'totalPrograms': 0,
-                    'totalWorkouts': 0,
+                    # Increment(0) keeps counts already recorded on a stats-only doc
+                    'totalPrograms': firestore.Increment(0),
+                    'totalWorkouts': firestore.Increment(0),
                     'lastActivity': firestore.SERVER_TIMESTAMP
                 }
             }
 
-            user_ref.set(profile_data)
+            user_ref.set(profile_data, merge=True)
             logger.info(f"Created user profile for user: {user_id}")
             return True
 
@@ -213,147 +188,34 @@ class FirestoreDataService(
     # ========================================================================
 
     async def migrate_anonymous_data(self, user_id: str, programs_data: List[Dict], workouts_data: List[Dict]) -> Dict[str, Any]:
-        """Migrate anonymous user data to authenticated account"""
+        """
+        Migrate anonymous user data to authenticated account.
+        Writes are chunked under the batch limit and checkpointed, so a failed
+        migration resumes when the same data is submitted again.
+        """
         if not self.is_available():
             logger.warning("Firestore not available - cannot migrate data")
             return {"success": False, "error": "Firestore not available"}
 
         try:
-            batch = self.db.batch()
-            migrated_programs = 0
-            migrated_workouts = 0
-            errors = []
-
-            # Migrate workouts first
-            for workout_data in workouts_data:
-                try:
-                    # Remove old IDs and timestamps
-                    workout_data.pop('id', None)
-                    workout_data.pop('created_date', None)
-                    workout_data.pop('modified_date', None)
-
-                    # Create new workout
-                    workout = WorkoutTemplate(**workout_data)
-                    workout_ref = (self.db.collection('users')
-                                 .document(user_id)
-                                 .collection('workouts')
-                                 .document(workout.id))
-
-                    workout_dict = workout.model_dump()
-                    workout_dict['created_date'] = firestore.SERVER_TIMESTAMP
-                    workout_dict['modified_date'] = firestore.SERVER_TIMESTAMP
-                    workout_dict['migrated_at'] = firestore.SERVER_TIMESTAMP
-                    workout_dict['version'] = 1
-                    workout_dict['sync_status'] = 'synced'
-
-                    batch.set(workout_ref, workout_dict)
-                    migrated_workouts += 1
-
-                except Exception as e:
-                    logger.warning(f"Failed to migrate workout: {str(e)}")
-                    errors.append(f"Workout migration error: {str(e)}")
-                    continue
-
-            # Migrate programs
-            for program_data in programs_data:
-                try:
-                    # Remove old IDs and timestamps
-                    program_data.pop('id', None)
-                    program_data.pop('created_date', None)
-                    program_data.pop('modified_date', None)
-
-                    # Create new program
-                    program = Program(**program_data)
-                    program_ref = (self.db.collection('users')
-                                 .document(user_id)
-                                 .collection('programs')
-                                 .document(program.id))
-
-                    program_dict = program.model_dump()
-                    program_dict['created_date'] = firestore.SERVER_TIMESTAMP
-                    program_dict['modified_date'] = firestore.SERVER_TIMESTAMP
-                    program_dict['migrated_at'] = firestore.SERVER_TIMESTAMP
-                    program_dict['version'] = 1
-                    program_dict['sync_status'] = 'synced'
-
-                    batch.set(program_ref, program_dict)
-                    migrated_programs += 1
-
-                except Exception as e:
-                    logger.warning(f"Failed to migrate program: {str(e)}")
-                    errors.append(f"Program migration error: {str(e)}")
-                    continue
-
-            # Commit batch
-            batch.commit()
-
-            # Update user stats
-            await self.update_user_stats(user_id, {
-                'totalPrograms': migrated_programs,
-                'totalWorkouts': migrated_workouts,
-                'lastMigration': firestore.SERVER_TIMESTAMP
-            })
-
-            logger.info(f"Successfully migrated data for user {user_id}: {migrated_programs} programs, {migrated_workouts} workouts")
-
-            return {
-                "success": True,
-                "migrated_programs": migrated_programs,
-                "migrated_workouts": migrated_workouts,
-                "errors": errors
-            }
-
+            return await MigrationPipeline(self).run(user_id, programs_data, workouts_data)
         except Exception as e:
             logger.error(f"Failed to migrate anonymous data: {str(e)}")
             return {"success": False, "error": str(e)}
 
+    async def get_migration_progress(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Checkpoint of the user's latest anonymous data migration, or None"""
+        if not self.is_available():
+            return None
+        return await MigrationPipeline(self).get_progress(user_id)
+
     # ========================================================================
-    # Private Stat Counter Helpers
+    # Unit of Work
     # ========================================================================
 
-    async def _increment_user_program_count(self, user_id: str):
-        """Increment user program count"""
-        try:
-            user_ref = self.db.collection('users').document(user_id)
-            user_ref.update({
-                'stats.totalPrograms': firestore.Increment(1),
-                'stats.lastActivity': firestore.SERVER_TIMESTAMP
-            })
-        except Exception as e:
-            logger.warning(f"Failed to increment program count: {str(e)}")
-
-    async def _decrement_user_program_count(self, user_id: str):
-        """Decrement user program count"""
-        try:
-            user_ref = self.db.collection('users').document(user_id)
-            user_ref.update({
-                'stats.totalPrograms': firestore.Increment(-1),
-                'stats.lastActivity': firestore.SERVER_TIMESTAMP
-            })
-        except Exception as e:
-            logger.warning(f"Failed to decrement program count: {str(e)}")
-
-    async def _increment_user_workout_count(self, user_id: str):
-        """Increment user workout count"""
-        try:
-            user_ref = self.db.collection('users').document(user_id)
-            user_ref.update({
-                'stats.totalWorkouts': firestore.Increment(1),
-                'stats.lastActivity': firestore.SERVER_TIMESTAMP
-            })
-        except Exception as e:
-            logger.warning(f"Failed to increment workout count: {str(e)}")
-
-    async def _decrement_user_workout_count(self, user_id: str):
-        """Decrement user workout count"""
-        try:
-            user_ref = self.db.collection('users').document(user_id)
-            user_ref.update({
-                'stats.totalWorkouts': firestore.Increment(-1),
-                'stats.lastActivity': firestore.SERVER_TIMESTAMP
-            })
-        except Exception as e:
-            logger.warning(f"Failed to decrement workout count: {str(e)}")
+    def unit_of_work(self, user_id: str, touch_activity: bool = True) -> UnitOfWork:
+        """Batch for one mutating operation: entity writes + user stats in a single commit"""
+        return UnitOfWork(self.db, user_id, touch_activity=touch_activity)
 
 
 # Global Firestore data service instance
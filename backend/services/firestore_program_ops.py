@@ -4,12 +4,10 @@ Mixin providing program create/read/update/delete and program-workout management
 """
 
 import logging
+from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
 
-try:
-    from firebase_admin import firestore
-except ImportError:
-    firestore = None
+from ..config.firebase_config import firestore
 
 from ..models import Program, CreateProgramRequest, UpdateProgramRequest, ProgramWorkout
 
@@ -51,10 +49,9 @@ class FirestoreProgramOps:
             program_data['version'] = 1
             program_data['sync_status'] = 'synced'
 
-            program_ref.set(program_data)
-
-            # Update user stats
-            await self._increment_user_program_count(user_id)
+            with self.unit_of_work(user_id) as uow:
+                uow.set(program_ref, program_data)
+                uow.increment_stat('totalPrograms')
 
             logger.info(f"Created program {program.id} for user {user_id}")
             return program
@@ -87,7 +84,7 @@ class FirestoreProgramOps:
                     logger.warning(f"Failed to parse program {doc.id}: {str(e)}")
                     continue
 
-            logger.info(f"Retrieved {len(programs)} programs for user {user_id}")
+            logger.debug(f"Retrieved {len(programs)} programs for user {user_id}")
             return programs
 
         except Exception as e:
@@ -144,10 +141,11 @@ class FirestoreProgramOps:
             update_data['version'] = current_version + 1
             update_data['sync_status'] = 'synced'
 
-            program_ref.update(update_data)
+            with self.unit_of_work(user_id) as uow:
+                uow.update(program_ref, update_data)
 
-            # Get updated program
-            return await self.get_program(user_id, program_id)
+            # Return the merged state instead of reading it back
+            return Program(**{**current_data, **update_data, 'modified_date': datetime.now(timezone.utc)})
 
         except Exception as e:
             logger.error(f"Failed to update program: {str(e)}")
@@ -164,10 +162,9 @@ class FirestoreProgramOps:
                           .collection('programs')
                           .document(program_id))
 
-            program_ref.delete()
-
-            # Update user stats
-            await self._decrement_user_program_count(user_id)
+            with self.unit_of_work(user_id) as uow:
+                uow.delete(program_ref)
+                uow.increment_stat('totalPrograms', -1)
 
             logger.info(f"Deleted program {program_id} for user {user_id}")
             return True
@@ -8,10 +8,8 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 
-try:
-    from firebase_admin import firestore
-except ImportError:
-    firestore = None
+from ..config.firebase_config import firestore
+from .exercise_analytics import exercise_analytics_service
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +50,8 @@ class FirestoreSessionOps:
             session_data['started_at'] = session.started_at
             session_data['created_at'] = firestore.SERVER_TIMESTAMP
 
-            session_ref.set(session_data)
+            with self.unit_of_work(user_id) as uow:
+                uow.set(session_ref, session_data)
 
             logger.info(f"Created workout session {session.id} for user {user_id}")
             return session
@@ -114,10 +113,12 @@ class FirestoreSessionOps:
                     for ex in update_data['exercises_performed']
                 ]
 
-            session_ref.update(update_data)
+            with self.unit_of_work(user_id) as uow:
+                uow.update(session_ref, update_data)
 
-            # Get updated session
-            return await self.get_workout_session(user_id, session_id)
+            # Return the merged state instead of reading it back
+            from ..models import WorkoutSession
+            return WorkoutSession(**{**current_doc.to_dict(), **update_data})
 
         except Exception as e:
             logger.error(f"Failed to update workout session: {str(e)}")
@@ -168,10 +169,21 @@ class FirestoreSessionOps:
                     ca = new_completed.replace(tzinfo=None) if hasattr(new_completed, 'replace') and getattr(new_completed, 'tzinfo', None) else new_completed
                     update_data['duration_minutes'] = max(1, int((ca - sa).total_seconds() / 60))
 
-            session_ref.update(update_data)
+            with self.unit_of_work(user_id) as uow:
+                uow.update(session_ref, update_data)
 
             logger.info(f"Edited workout session {session_id} for user {user_id}")
-            return await self.get_workout_session(user_id, session_id)
+            from ..models import WorkoutSession
+            edited_session = WorkoutSession(**{**current_data, **update_data})
+
+            # Keep analytics series in step with edited exercises/dates
+            if edited_session and edited_session.status == 'completed' and (
+                update_data.keys() & {'exercises_performed', 'started_at', 'completed_at'}
+            ):
+                current_data.setdefault('id', session_id)
+                await exercise_analytics_service.record_sessions(user_id, [edited_session], replaced=[current_data])
+
+            return edited_session
 
         except Exception as e:
             logger.error(f"Failed to edit workout session: {str(e)}")
@@ -256,11 +268,11 @@ class FirestoreSessionOps:
                 completion_data['calories'] = complete_request.calories
                 logger.info(f"Saving session calories: {complete_request.calories}")
 
-            # Update session
-            session_ref.update(completion_data)
+            with self.unit_of_work(user_id) as uow:
+                uow.update(session_ref, completion_data)
 
-            # Get completed session
-            completed_session = await self.get_workout_session(user_id, session_id)
+            # Return the merged state instead of reading it back
+            completed_session = WorkoutSession(**{**current_data, **completion_data})
 
             # Update exercise histories in the background to avoid timeout
             if completed_session:
@@ -280,6 +292,7 @@ class FirestoreSessionOps:
         try:
             await self._update_exercise_histories_batch(user_id, completed_session)
             await self._auto_update_personal_records(user_id, completed_session)
+            await exercise_analytics_service.record_sessions(user_id, [completed_session])
             logger.info(f"Background history updates completed for session {session_id}")
         except Exception as e:
             logger.error(f"Background history update failed for session {session_id}: {str(e)}")
@@ -344,7 +357,8 @@ class FirestoreSessionOps:
 
             session_data = session.model_dump()
             session_data['created_at'] = firestore.SERVER_TIMESTAMP
-            session_ref.set(session_data)
+            with self.unit_of_work(user_id) as uow:
+                uow.set(session_ref, session_data)
 
             logger.info(f"Atomically created and completed session {session.id} for user {user_id}")
 
@@ -401,7 +415,7 @@ class FirestoreSessionOps:
                     logger.warning(f"Failed to parse workout session {doc.id}: {str(e)}")
                     continue
 
-            logger.info(f"Retrieved {len(sessions)} workout sessions for user {user_id}")
+            logger.debug(f"Retrieved {len(sessions)} workout sessions for user {user_id}")
             return sessions
 
         except Exception as e:
@@ -419,7 +433,14 @@ class FirestoreSessionOps:
                           .collection('workout_sessions')
                           .document(session_id))
 
-            session_ref.delete()
+            current_doc = session_ref.get()
+            with self.unit_of_work(user_id) as uow:
+                uow.delete(session_ref)
+
+            if current_doc.exists:
+                session_data = current_doc.to_dict()
+                session_data.setdefault('id', session_id)
+                await exercise_analytics_service.remove_sessions(user_id, [session_data])
 
             logger.info(f"Deleted workout session {session_id} for user {user_id}")
             return True
@@ -458,13 +479,49 @@ class FirestoreSessionOps:
                     logger.warning(f"Failed to parse exercise history {doc.id}: {str(e)}")
                     continue
 
-            logger.info(f"Retrieved {len(histories)} exercise histories for workout {workout_id}")
+            logger.debug(f"Retrieved {len(histories)} exercise histories for workout {workout_id}")
             return histories
 
         except Exception as e:
             logger.error(f"Failed to get exercise history for workout: {str(e)}")
             return {}
 
+    async def get_exercise_histories_for_workouts(
+        self,
+        user_id: str,
+        workout_ids: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Last weights for several workouts: workout ID -> {exercise name -> history}"""
+        if not self.is_available():
+            return {}
+
+        try:
+            from ..models import ExerciseHistory
+
+            histories: Dict[str, Dict[str, Any]] = {workout_id: {} for workout_id in workout_ids}
+            unique_ids = list(histories)
+            # Firestore `in` queries are limited to 30 values
+            BATCH = 30
+            for i in range(0, len(unique_ids), BATCH):
+                history_ref = (self.db.collection('users')
+                              .document(user_id)
+                              .collection('exercise_history')
+                              .where('workout_id', 'in', unique_ids[i:i + BATCH]))
+                for doc in history_ref.stream():
+                    try:
+                        history = ExerciseHistory(**doc.to_dict())
+                        histories[history.workout_id][history.exercise_name] = history
+                    except Exception as e:
+                        logger.warning(f"Failed to parse exercise history {doc.id}: {str(e)}")
+                        continue
+
+            logger.debug(f"Retrieved exercise histories for {len(unique_ids)} workouts")
+            return histories
+
+        except Exception as e:
+            logger.error(f"Failed to get exercise history for workouts: {str(e)}")
+            return {}
+
     async def get_exercise_history(
         self,
         user_id: str,
@@ -837,7 +894,7 @@ class FirestoreSessionOps:
                 reverse=True
             )
 
-            logger.info(f"Retrieved {len(sessions)} program sessions for program {program_id}")
+            logger.debug(f"Retrieved {len(sessions)} program sessions for program {program_id}")
             return sessions
 
         except Exception as e:
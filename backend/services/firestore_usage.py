@@ -0,0 +1,162 @@
+"""
+Firestore Usage - document reads, writes and deletes per request and per route.
+
+Firestore bills per document operation, so the shared client's interceptor
+(firestore_clients.py) reports every RPC here:
+
+- reads: documents returned by queries and batch gets. A get of a missing
+  document, a query with no results and an aggregation each count as one
+  read, as billed (aggregations are billed per 1000 index entries; one is
+  the floor)
+- writes / deletes: the operations in each successful Commit or BatchWrite
+- rpcs: calls and the time spent in them
+
+Counts go to the current request's FirestoreUsage, set up by
+FirestoreUsageMiddleware and inherited by asyncio.to_thread workers, which
+reports it in a Server-Timing header. When the request ends its usage is
+added to its route's totals; work outside any request (startup warm-up,
+background migrations) is totalled as route "background". /metrics exposes
+the totals in Prometheus text format.
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+BACKGROUND_ROUTE = "background"
+
+
+class FirestoreUsage:
+    """Firestore operations made while serving one request (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.deletes = 0
+        self.rpcs = 0
+        self.rpc_seconds = 0.0
+
+    def add(self, reads: int = 0, writes: int = 0, deletes: int = 0, rpcs: int = 0, rpc_seconds: float = 0.0) -> None:
+        with self._lock:
+            self.reads += reads
+            self.writes += writes
+            self.deletes += deletes
+            self.rpcs += rpcs
+            self.rpc_seconds += rpc_seconds
+
+    def server_timing(self, total_seconds: float) -> str:
+        """
+        Server-Timing header value. firestore's duration is summed over RPCs,
+        so it can exceed the request's total when queries run in parallel.
+        """
+        return (
+            f'firestore;dur={self.rpc_seconds * 1000:.1f};'
+            f'desc="rpcs={self.rpcs} reads={self.reads} writes={self.writes} deletes={self.deletes}", '
+            f'total;dur={total_seconds * 1000:.1f}'
+        )
+
+
+class RouteTotals:
+    """Counters for one route (or the background bucket)"""
+
+    __slots__ = ("requests", "server_errors", "seconds", "reads", "writes", "deletes", "rpcs", "rpc_seconds")
+
+    def __init__(self):
+        self.requests = 0
+        self.server_errors = 0
+        self.seconds = 0.0
+        self.reads = 0
+        self.writes = 0
+        self.deletes = 0
+        self.rpcs = 0
+        self.rpc_seconds = 0.0
+
+    def add_usage(self, usage: FirestoreUsage) -> None:
+        self.reads += usage.reads
+        self.writes += usage.writes
+        self.deletes += usage.deletes
+        self.rpcs += usage.rpcs
+        self.rpc_seconds += usage.rpc_seconds
+
+
+class UsageStats:
+    """Per-route totals for this worker, read by /metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, RouteTotals] = {}
+
+    def _totals(self, route: str) -> RouteTotals:
+        totals = self._routes.get(route)
+        if totals is None:
+            totals = self._routes[route] = RouteTotals()
+        return totals
+
+    def record_request(self, route: str, status: int, seconds: float, usage: FirestoreUsage) -> None:
+        with self._lock:
+            totals = self._totals(route)
+            totals.requests += 1
+            totals.seconds += seconds
+            if status >= 500:
+                totals.server_errors += 1
+            totals.add_usage(usage)
+
+    def record_background(self, usage: FirestoreUsage) -> None:
+        with self._lock:
+            self._totals(BACKGROUND_ROUTE).add_usage(usage)
+
+    def routes(self) -> Dict[str, RouteTotals]:
+        """Copy of the per-route totals"""
+        with self._lock:
+            snapshot = {}
+            for route, totals in self._routes.items():
+                copy = RouteTotals()
+                for field in RouteTotals.__slots__:
+                    setattr(copy, field, getattr(totals, field))
+                snapshot[route] = copy
+            return snapshot
+
+
+_current_usage: contextvars.ContextVar[Optional[FirestoreUsage]] = \
+    contextvars.ContextVar("firestore_usage", default=None)
+
+
+@contextmanager
+def track_usage():
+    """Count Firestore operations made inside the block (re-entrant)"""
+    usage = _current_usage.get()
+    if usage is not None:
+        yield usage
+        return
+    usage = FirestoreUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def record(reads: int = 0, writes: int = 0, deletes: int = 0, rpcs: int = 0, rpc_seconds: float = 0.0,
+           usage: Optional[FirestoreUsage] = None) -> None:
+    """
+    Count operations against usage (captured by the caller when the RPC
+    started; gRPC callbacks run outside the request's context), falling
+    back to the current request, else the background bucket.
+    """
+    usage = usage or _current_usage.get()
+    if usage is not None:
+        usage.add(reads, writes, deletes, rpcs, rpc_seconds)
+        return
+    background = FirestoreUsage()
+    background.add(reads, writes, deletes, rpcs, rpc_seconds)
+    usage_stats.record_background(background)
+
+
+def current_usage() -> Optional[FirestoreUsage]:
+    return _current_usage.get()
+
+
+# Global usage stats instance
+usage_stats = UsageStats()
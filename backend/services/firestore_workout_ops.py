@@ -4,14 +4,15 @@ Mixin providing workout template create/read/update/delete functionality
 """
 
 import logging
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
-try:
-    from firebase_admin import firestore
-except ImportError:
-    firestore = None
+from ..config.firebase_config import firestore
 
-from ..models import WorkoutTemplate, CreateWorkoutRequest, UpdateWorkoutRequest, migrate_exercise_groups_to_sections, migrate_sections_to_exercise_groups
+from ..models import (
+    WorkoutTemplate, CreateWorkoutRequest, UpdateWorkoutRequest,
+    CURRENT_WORKOUT_SCHEMA_VERSION, normalize_workout_schema, decode_workout
+)
 
 logger = logging.getLogger(__name__)
 
@@ -37,11 +38,8 @@ class FirestoreWorkoutOps:
                 template_notes=workout_request.template_notes if hasattr(workout_request, 'template_notes') else []
             )
 
-            # Auto-migrate between formats to keep both in sync
-            if not workout.sections and workout.exercise_groups:
-                workout.sections = migrate_exercise_groups_to_sections(workout.exercise_groups)
-            elif workout.sections and not workout.exercise_groups:
-                workout.exercise_groups = migrate_sections_to_exercise_groups(workout.sections)
+            # Store both formats so reads never have to convert
+            normalize_workout_schema(workout)
 
             # Save to Firestore
             workout_ref = self.db.collection('users').document(user_id).collection('workouts').document(workout.id)
@@ -53,10 +51,9 @@ class FirestoreWorkoutOps:
             workout_data['version'] = 1
             workout_data['sync_status'] = 'synced'
 
-            workout_ref.set(workout_data)
-
-            # Update user stats
-            await self._increment_user_workout_count(user_id)
+            with self.unit_of_work(user_id) as uow:
+                uow.set(workout_ref, workout_data)
+                uow.increment_stat('totalWorkouts')
 
             logger.info(f"Created workout {workout.id} for user {user_id}")
             return workout
@@ -87,17 +84,13 @@ class FirestoreWorkoutOps:
             for doc in docs:
                 try:
                     workout_data = doc.to_dict()
-                    workout = WorkoutTemplate(**workout_data)
-                    # Auto-migrate to sections if missing
-                    if not workout.sections and workout.exercise_groups:
-                        workout.sections = migrate_exercise_groups_to_sections(workout.exercise_groups)
-                    workouts.append(workout)
+                    workouts.append(decode_workout(workout_data))
                 except Exception as e:
                     logger.error(f"Failed to parse workout {doc.id}: {str(e)}, "
                                  f"group_types: {[g.get('group_type') for g in workout_data.get('exercise_groups', [])]}")
                     continue
 
-            logger.info(f"Retrieved {len(workouts)} workouts for user {user_id}")
+            logger.debug(f"Retrieved {len(workouts)} workouts for user {user_id}")
             return workouts
 
         except Exception as e:
@@ -118,12 +111,7 @@ class FirestoreWorkoutOps:
             doc = workout_ref.get()
 
             if doc.exists:
-                workout_data = doc.to_dict()
-                workout = WorkoutTemplate(**workout_data)
-                # Auto-migrate to sections if missing
-                if not workout.sections and workout.exercise_groups:
-                    workout.sections = migrate_exercise_groups_to_sections(workout.exercise_groups)
-                return workout
+                return decode_workout(doc.to_dict())
             else:
                 logger.info(f"Workout {workout_id} not found for user {user_id}")
                 return None
@@ -132,6 +120,24 @@ class FirestoreWorkoutOps:
             logger.error(f"Failed to get workout: {str(e)}")
             return None
 
+    async def get_workouts_by_ids(self, user_id: str, workout_ids: List[str]) -> Dict[str, WorkoutTemplate]:
+        """Get several workouts in one batched read. Missing IDs are absent from the result."""
+        if not self.is_available() or not workout_ids:
+            return {}
+
+        try:
+            workouts_ref = self.db.collection('users').document(user_id).collection('workouts')
+            workouts = {}
+            for doc in self.db.get_all([workouts_ref.document(workout_id) for workout_id in workout_ids]):
+                if doc.exists:
+                    workouts[doc.id] = decode_workout(doc.to_dict())
+            logger.debug(f"Retrieved {len(workouts)}/{len(workout_ids)} workouts for user {user_id}")
+            return workouts
+
+        except Exception as e:
+            logger.error(f"Failed to get workouts: {str(e)}")
+            return {}
+
     async def update_workout(self, user_id: str, workout_id: str, update_request: UpdateWorkoutRequest) -> Optional[WorkoutTemplate]:
         """Update a workout. Returns None if not found. Raises on transient errors."""
         if not self.is_available():
@@ -157,16 +163,34 @@ class FirestoreWorkoutOps:
             update_data['modified_date'] = firestore.SERVER_TIMESTAMP
             update_data['version'] = current_version + 1
             update_data['sync_status'] = 'synced'
+            self._sync_workout_formats(current_data, update_data)
 
-            workout_ref.update(update_data)
+            with self.unit_of_work(user_id) as uow:
+                uow.update(workout_ref, update_data)
 
-            # Get updated workout
-            return await self.get_workout(user_id, workout_id)
+            # Return the merged state instead of reading it back
+            return decode_workout({**current_data, **update_data, 'modified_date': datetime.now(timezone.utc)})
 
         except Exception as e:
             logger.error(f"Failed to update workout: {str(e)}")
             raise
 
+    @staticmethod
+    def _sync_workout_formats(current_data: dict, update_data: dict):
+        """
+        Keep sections/exercise_groups in sync for a partial update.
+        Also upgrades legacy docs the first time they are written.
+        """
+        layout = {k: update_data[k] for k in ('sections', 'exercise_groups') if k in update_data}
+        if not layout and current_data.get('schema_version', 1) >= CURRENT_WORKOUT_SCHEMA_VERSION:
+            return
+
+        workout = WorkoutTemplate(**{**current_data, **layout})
+        normalize_workout_schema(workout, changed_fields=layout.keys())
+        update_data['sections'] = [s.model_dump() for s in workout.sections] if workout.sections else None
+        update_data['exercise_groups'] = [g.model_dump() for g in workout.exercise_groups]
+        update_data['schema_version'] = CURRENT_WORKOUT_SCHEMA_VERSION
+
     async def delete_workout(self, user_id: str, workout_id: str) -> bool:
         """Soft-delete (archive) a workout"""
         if not self.is_available():
@@ -178,11 +202,12 @@ class FirestoreWorkoutOps:
                           .collection('workouts')
                           .document(workout_id))
 
-            workout_ref.update({
-                'is_archived': True,
-                'archived_at': firestore.SERVER_TIMESTAMP,
-                'modified_date': firestore.SERVER_TIMESTAMP
-            })
+            with self.unit_of_work(user_id) as uow:
+                uow.update(workout_ref, {
+                    'is_archived': True,
+                    'archived_at': firestore.SERVER_TIMESTAMP,
+                    'modified_date': firestore.SERVER_TIMESTAMP
+                })
 
             logger.info(f"Archived workout {workout_id} for user {user_id}")
             return True
@@ -202,11 +227,12 @@ class FirestoreWorkoutOps:
                           .collection('workouts')
                           .document(workout_id))
 
-            workout_ref.update({
-                'is_archived': False,
-                'archived_at': None,
-                'modified_date': firestore.SERVER_TIMESTAMP
-            })
+            with self.unit_of_work(user_id) as uow:
+                uow.update(workout_ref, {
+                    'is_archived': False,
+                    'archived_at': None,
+                    'modified_date': firestore.SERVER_TIMESTAMP
+                })
 
             logger.info(f"Restored workout {workout_id} for user {user_id}")
             return True
@@ -226,10 +252,9 @@ class FirestoreWorkoutOps:
                           .collection('workouts')
                           .document(workout_id))
 
-            workout_ref.delete()
-
-            # Update user stats
-            await self._decrement_user_workout_count(user_id)
+            with self.unit_of_work(user_id) as uow:
+                uow.delete(workout_ref)
+                uow.increment_stat('totalWorkouts', -1)
 
             logger.info(f"Permanently deleted workout {workout_id} for user {user_id}")
             return True
@@ -0,0 +1,150 @@
+"""
+History Export Service - Streams a user's complete training history as NDJSON.
+
+Walks the user's profile doc and every subcollection under users/{uid}
+(workouts, programs, workout_sessions, exercise_history, cardio_sessions,
+custom_exercises, data/*, ...) one page at a time, ordered by document ID and
+continued with a start_after cursor, and yields one JSON record per line.
+Only a single page is held in memory, so the cost of an export doesn't grow
+with the size of the user's history.
+
+Record layout (one per line):
+    {"type": "export", "user_id": ..., "exported_at": ..., "format_version": 1}
+    {"type": "profile", "id": <uid>, "data": {...}}
+    {"type": "<collection>", "id": <doc id>, "data": {...}}
+    {"type": "summary", "counts": {"<collection>": n, ...}}
+
+The generators are synchronous (the Firestore client is); StreamingResponse
+iterates them in a worker thread.
+"""
+
+import base64
+import json
+import logging
+import os
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict, Iterator
+
+from ..config.firebase_config import firestore, FieldPath
+
+logger = logging.getLogger(__name__)
+
+# Documents fetched per query page
+EXPORT_PAGE_SIZE = max(1, min(int(os.getenv("EXPORT_PAGE_SIZE", "500")), 1000))
+
+EXPORT_FORMAT_VERSION = 1
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Lines are coalesced into chunks of about this size; each chunk is one thread hop
+# for StreamingResponse, so per-line chunks would dominate the cost of large exports
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize Firestore value types that json can't handle natively"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    if hasattr(value, "path"):  # DocumentReference
+        return value.path
+    if hasattr(value, "latitude") and hasattr(value, "longitude"):  # GeoPoint
+        return {"latitude": value.latitude, "longitude": value.longitude}
+    return str(value)
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """One NDJSON line"""
+    return (json.dumps(record, default=_json_default, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class HistoryExportService:
+    """Cursor-paged, constant-memory export of everything stored under a user"""
+
+    def __init__(self, db=None, page_size: int = EXPORT_PAGE_SIZE):
+        self._db = db
+        self.page_size = max(1, page_size)
+
+    @property
+    def db(self):
+        if self._db is None:
+            from .firestore_data_service import firestore_data_service
+            self._db = firestore_data_service.db
+        return self._db
+
+    def is_available(self) -> bool:
+        return firestore is not None and self.db is not None
+
+    def _iter_collection(self, collection_ref) -> Iterator[Any]:
+        """Yield every doc in a collection, one page at a time"""
+        last_doc = None
+        while True:
+            query = collection_ref.order_by(FieldPath.document_id()).limit(self.page_size)
+            if last_doc is not None:
+                query = query.start_after(last_doc)
+
+            docs = list(query.stream())
+            yield from docs
+            if len(docs) < self.page_size:
+                return
+            last_doc = docs[-1]
+
+    def iter_records(self, user_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield export records for the user in a stable order"""
+        user_ref = self.db.collection("users").document(user_id)
+        counts: Dict[str, int] = {}
+
+        yield {
+            "type": "export",
+            "user_id": user_id,
+            "exported_at": datetime.now().isoformat(),
+            "format_version": EXPORT_FORMAT_VERSION,
+        }
+
+        profile = user_ref.get()
+        if profile.exists:
+            counts["profile"] = 1
+            yield {"type": "profile", "id": user_id, "data": profile.to_dict()}
+
+        for collection_ref in sorted(user_ref.collections(), key=lambda c: c.id):
+            count = 0
+            for doc in self._iter_collection(collection_ref):
+                count += 1
+                yield {"type": collection_ref.id, "id": doc.id, "data": doc.to_dict()}
+            counts[collection_ref.id] = count
+
+        logger.info(f"Exported history for user {user_id}: {counts}")
+        yield {"type": "summary", "counts": counts}
+
+    def iter_ndjson(self, user_id: str) -> Iterator[bytes]:
+        """NDJSON as byte chunks of whole lines (about EXPORT_CHUNK_BYTES each)"""
+        buffer = bytearray()
+        for record in self.iter_records(user_id):
+            buffer += encode_record(record)
+            if len(buffer) >= EXPORT_CHUNK_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+    def iter_ndjson_gzip(self, user_id: str) -> Iterator[bytes]:
+        """NDJSON as a single gzip member, sync-flushed per chunk so clients can decode as it arrives"""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in self.iter_ndjson(user_id):
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+    def export_to_file(self, user_id: str, path: str, compress: bool = True) -> int:
+        """Stream the export to a file. Returns bytes written."""
+        written = 0
+        chunks = self.iter_ndjson_gzip(user_id) if compress else self.iter_ndjson(user_id)
+        with open(path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+        return written
+
+
+# Global history export service instance
+history_export_service = HistoryExportService()
@@ -0,0 +1,92 @@
+"""
+Lazy Firestore - services connect to Firestore on first use, not at import.
+
+Each Firestore-backed service used to build its client in __init__, so
+importing the app initialized Firebase and imported the SDK before the
+server could answer a health check. Services now inherit
+LazyFirestoreService: db, app and available resolve the first time any of
+them is read, and the connection time is recorded in the startup report.
+All of them share the app's client from firestore_clients (or its
+in-memory client, which needs no Firebase app).
+"""
+
+import logging
+import threading
+import time
+
+from ..config.firebase_config import FIREBASE_AVAILABLE, get_firebase_app
+from .firestore_clients import firestore_clients
+from .startup_timing import startup_timing
+
+logger = logging.getLogger(__name__)
+
+_connect_lock = threading.Lock()
+
+
+class LazyFirestoreService:
+    """Mixin providing db/app/available, connected on first access"""
+
+    # Used in log messages, e.g. "Favorites service initialized successfully"
+    service_name = "Firestore"
+
+    _db = None
+    _app = None
+    _available = None  # None until the first connection attempt
+
+    def _connect(self) -> None:
+        if self._available is not None:
+            return
+        with _connect_lock:
+            if self._available is not None:
+                return
+            if not FIREBASE_AVAILABLE:
+                logger.warning(f"Firebase Admin SDK not available - {self.service_name} service disabled")
+                self._available = False
+                return
+
+            started = time.perf_counter()
+            try:
+                self._app = None if firestore_clients.in_memory else get_firebase_app()
+                if self._app or firestore_clients.in_memory:
+                    self._db = firestore_clients.client(self._app)
+                    logger.info(f"{self.service_name} service initialized successfully")
+                else:
+                    logger.warning(f"{self.service_name} service not available - Firebase not initialized")
+            except Exception as e:
+                logger.error(f"Failed to initialize {self.service_name} service: {str(e)}")
+                self._db = None
+            self._available = self._db is not None
+            startup_timing.record_deferred(f"{self.service_name} service", time.perf_counter() - started)
+
+    @property
+    def initialized(self) -> bool:
+        """Whether the first connection attempt has happened (never triggers one)"""
+        return self._available is not None
+
+    @property
+    def db(self):
+        self._connect()
+        return self._db
+
+    @db.setter
+    def db(self, value):
+        self._db = value
+        self._available = value is not None
+
+    @property
+    def app(self):
+        self._connect()
+        return self._app
+
+    @app.setter
+    def app(self, value):
+        self._app = value
+
+    @property
+    def available(self) -> bool:
+        self._connect()
+        return self._available
+
+    @available.setter
+    def available(self, value: bool):
+        self._available = value
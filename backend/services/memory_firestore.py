@@ -0,0 +1,778 @@
+"""
+Memory Firestore - an in-memory stand-in for the Firestore client.
+
+Services only ever talk to Firestore through the client that
+firestore_clients hands out, so the client API is the storage interface:
+with FIRESTORE_BACKEND=memory the registry hands out a MemoryFirestore
+instead, and the whole API runs without Firebase (load tests, benchmarks,
+local development).
+
+It implements the subset of google.cloud.firestore.Client the app uses:
+
+- collection/document references at any depth, auto ids, collection
+  groups, list_documents and collections
+- queries: where (==, !=, <, <=, >, >=, in, not-in, array_contains,
+  array_contains_any, including FieldPath.document_id()), order_by, limit,
+  offset, start_after (snapshot or dict cursor), select
+- get, get_all, set (with merge), update (dotted and FieldPath keys),
+  delete, write_option(last_update_time=...) preconditions and atomic
+  batches of up to 500 writes
+- SERVER_TIMESTAMP, DELETE_FIELD, Increment, ArrayUnion, ArrayRemove,
+  Maximum and Minimum
+
+Query results follow Firestore's semantics where the app can tell:
+documents missing an order_by field are left out, values order by type
+first, ties break on document path, naive datetimes are stored as UTC.
+
+Every call is one simulated RPC: it sleeps for the latency model's sample
+and is counted like a real RPC (per-method metrics in /api/health and
+/metrics, and per-request reads/writes/deletes in Server-Timing), so
+benchmarks see realistic timing and Firestore usage.
+
+Environment:
+    FIRESTORE_MEMORY_LATENCY_MS          Median latency per RPC (default 8, 0 = none)
+    FIRESTORE_MEMORY_LATENCY_PER_DOC_MS  Extra latency per document read or written (default 0.05)
+"""
+
+import functools
+import os
+import random
+import string
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from google.api_core import exceptions
+from google.cloud.firestore_v1 import transforms
+from google.cloud.firestore_v1.field_path import FieldPath, parse_field_path
+
+from .firestore_clients import RpcMetrics
+from .firestore_usage import record
+
+# Firestore's limit on writes per commit
+MAX_WRITES_PER_COMMIT = 500
+
+DOCUMENT_ID = FieldPath.document_id()
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
+
+_AUTO_ID_CHARS = string.ascii_letters + string.digits
+_MISSING = object()
+
+
+class LatencyModel:
+    """Simulated RPC latency: log-normal around a median, plus a cost per document"""
+
+    def __init__(self, median_ms: float = 8.0, per_document_ms: float = 0.05, spread: float = 0.35):
+        self.median_ms = median_ms
+        self.per_document_ms = per_document_ms
+        # Log-normal sigma; 0.35 puts p99 at ~2.3x the median
+        self.spread = spread
+
+    @classmethod
+    def from_env(cls) -> "LatencyModel":
+        return cls(
+            median_ms=float(os.getenv("FIRESTORE_MEMORY_LATENCY_MS", "8")),
+            per_document_ms=float(os.getenv("FIRESTORE_MEMORY_LATENCY_PER_DOC_MS", "0.05")),
+        )
+
+    def sample(self, documents: int = 0) -> float:
+        """Seconds one RPC touching documents takes"""
+        ms = documents * self.per_document_ms
+        if self.median_ms > 0:
+            ms += self.median_ms * random.lognormvariate(0, self.spread)
+        return ms / 1000
+
+
+# ---------------------------------------------------------------------------
+# Values: storage copies, field paths, ordering
+# ---------------------------------------------------------------------------
+
+def _stored(value):
+    """Copy of a value as Firestore would store it"""
+    if isinstance(value, dict):
+        return {key: _stored(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_stored(item) for item in value]
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+    return value
+
+
+def _copy(value):
+    """Copy handed to callers, so they can't change stored data"""
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+def _split(field_path) -> List[str]:
+    if isinstance(field_path, FieldPath):
+        return list(field_path.parts)
+    return parse_field_path(field_path)
+
+
+def _lookup(data: Dict[str, Any], parts: List[str]):
+    value = data
+    for part in parts:
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _type_rank(value) -> int:
+    """Firestore's cross-type order: null, bool, number, timestamp, string, bytes, reference, array, map"""
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, DocumentReference):
+        return 6
+    if isinstance(value, list):
+        return 8
+    if isinstance(value, dict):
+        return 9
+    return 7  # GeoPoint and anything else
+
+
+def _sort_key(value):
+    rank = _type_rank(value)
+    if rank == 3:
+        return rank, _stored(value)
+    if rank == 6:
+        return rank, tuple(value._parts)
+    if rank == 8:
+        return rank, tuple(_sort_key(item) for item in value)
+    if rank == 9:
+        return rank, tuple((key, _sort_key(item)) for key, item in sorted(value.items()))
+    if rank == 7:
+        return rank, repr(value)
+    return rank, value
+
+
+def _compare(a, b) -> int:
+    key_a, key_b = _sort_key(a), _sort_key(b)
+    return (key_a > key_b) - (key_a < key_b)
+
+
+def _equal(a, b) -> bool:
+    return _type_rank(a) == _type_rank(b) and _compare(a, b) == 0
+
+
+def _matches(value, op: str, operand) -> bool:
+    if value is _MISSING:
+        return False
+    if op == "==":
+        return _equal(value, operand)
+    if op == "!=":
+        return value is not None and not _equal(value, operand)
+    if op in ("<", "<=", ">", ">="):
+        if _type_rank(value) != _type_rank(operand):
+            return False
+        result = _compare(value, operand)
+        return {"<": result < 0, "<=": result <= 0, ">": result > 0, ">=": result >= 0}[op]
+    if op == "in":
+        return any(_equal(value, item) for item in operand)
+    if op == "not-in":
+        return value is not None and not any(_equal(value, item) for item in operand)
+    if op == "array_contains":
+        return isinstance(value, list) and any(_equal(item, operand) for item in value)
+    if op == "array_contains_any":
+        return isinstance(value, list) and any(_equal(item, wanted) for item in value for wanted in operand)
+    raise exceptions.InvalidArgument(f"Unsupported filter operator: {op}")
+
+
+# ---------------------------------------------------------------------------
+# Writes
+# ---------------------------------------------------------------------------
+
+_DELETE = object()
+
+
+def _transform(current, value, commit_time: datetime):
+    """The stored value after writing value over current (resolves sentinels)"""
+    if value is transforms.SERVER_TIMESTAMP:
+        return commit_time
+    if value is transforms.DELETE_FIELD:
+        return _DELETE
+    if isinstance(value, transforms.Increment):
+        if isinstance(current, (int, float)) and not isinstance(current, bool):
+            return current + value.value
+        return value.value
+    if isinstance(value, transforms.Maximum):
+        if isinstance(current, (int, float)) and not isinstance(current, bool):
+            return max(current, value.value)
+        return value.value
+    if isinstance(value, transforms.Minimum):
+        if isinstance(current, (int, float)) and not isinstance(current, bool):
+            return min(current, value.value)
+        return value.value
+    if isinstance(value, transforms.ArrayUnion):
+        result = list(current) if isinstance(current, list) else []
+        for item in value.values:
+            if not any(_equal(item, existing) for existing in result):
+                result.append(_stored(item))
+        return result
+    if isinstance(value, transforms.ArrayRemove):
+        if not isinstance(current, list):
+            return []
+        return [item for item in current if not any(_equal(item, removed) for removed in value.values)]
+    if isinstance(value, dict):
+        resolved = {}
+        for key, item in value.items():
+            item = _transform(_MISSING, item, commit_time)
+            if item is _DELETE:
+                raise exceptions.InvalidArgument("DELETE_FIELD is only allowed in update() or set(merge=True)")
+            resolved[key] = item
+        return resolved
+    return _stored(value)
+
+
+def _write_field(data: Dict[str, Any], parts: List[str], value, commit_time: datetime) -> None:
+    """Write value at a field path, creating intermediate maps"""
+    for part in parts[:-1]:
+        child = data.get(part)
+        if not isinstance(child, dict):
+            child = data[part] = {}
+        data = child
+    result = _transform(data.get(parts[-1], _MISSING), value, commit_time)
+    if result is _DELETE:
+        data.pop(parts[-1], None)
+    else:
+        data[parts[-1]] = result
+
+
+def _merge(data: Dict[str, Any], values: Dict[str, Any], commit_time: datetime) -> None:
+    """set(merge=True): nested maps merge field by field"""
+    for key, value in values.items():
+        if isinstance(value, dict) and value:
+            child = data.get(key)
+            if not isinstance(child, dict):
+                child = data[key] = {}
+            _merge(child, value, commit_time)
+        else:
+            _write_field(data, [key], value, commit_time)
+
+
+class WriteResult:
+    def __init__(self, update_time: datetime):
+        self.update_time = update_time
+
+
+class _Precondition:
+    def __init__(self, last_update_time: Optional[datetime] = None, exists: Optional[bool] = None):
+        self.last_update_time = last_update_time
+        self.exists = exists
+
+
+class _StoredDocument:
+    __slots__ = ("data", "create_time", "update_time")
+
+    def __init__(self, data: Dict[str, Any], create_time: datetime, update_time: datetime):
+        self.data = data
+        self.create_time = create_time
+        self.update_time = update_time
+
+
+# ---------------------------------------------------------------------------
+# Snapshots and references
+# ---------------------------------------------------------------------------
+
+class DocumentSnapshot:
+    def __init__(self, reference: "DocumentReference", data: Optional[Dict[str, Any]],
+                 create_time: Optional[datetime] = None, update_time: Optional[datetime] = None,
+                 read_time: Optional[datetime] = None):
+        self.reference = reference
+        self._data = data
+        self.create_time = create_time
+        self.update_time = update_time
+        self.read_time = read_time
+
+    @property
+    def id(self) -> str:
+        return self.reference.id
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return _copy(self._data) if self._data is not None else None
+
+    def get(self, field_path):
+        value = _lookup(self._data or {}, _split(field_path))
+        if value is _MISSING:
+            raise KeyError(f"'{field_path}' is not contained in the data")
+        return _copy(value)
+
+
+class DocumentReference:
+    def __init__(self, client: "MemoryFirestore", parts: Tuple[str, ...]):
+        self._client = client
+        self._parts = parts
+
+    @property
+    def id(self) -> str:
+        return self._parts[-1]
+
+    @property
+    def path(self) -> str:
+        return "/".join(self._parts)
+
+    @property
+    def parent(self) -> "CollectionReference":
+        return CollectionReference(self._client, self._parts[:-1])
+
+    def __eq__(self, other):
+        return isinstance(other, DocumentReference) and other._parts == self._parts
+
+    def __hash__(self):
+        return hash(self._parts)
+
+    def __repr__(self):
+        return f"<DocumentReference {self.path}>"
+
+    def collection(self, collection_id: str) -> "CollectionReference":
+        return CollectionReference(self._client, self._parts + tuple(collection_id.split("/")))
+
+    def collections(self) -> Iterator["CollectionReference"]:
+        return iter(self._client._child_collections(self._parts))
+
+    def get(self, field_paths: Optional[List[str]] = None) -> DocumentSnapshot:
+        return self._client._rpc("BatchGetDocuments", lambda: self._client._get_many([self], field_paths))[0]
+
+    def create(self, document_data: Dict[str, Any]) -> WriteResult:
+        return self._client._commit([("create", self, document_data, None)])[0]
+
+    def set(self, document_data: Dict[str, Any], merge: bool = False) -> WriteResult:
+        return self._client._commit([("set", self, document_data, merge)])[0]
+
+    def update(self, field_updates: Dict[str, Any], option: Optional[_Precondition] = None) -> WriteResult:
+        return self._client._commit([("update", self, field_updates, option)])[0]
+
+    def delete(self, option: Optional[_Precondition] = None) -> datetime:
+        return self._client._commit([("delete", self, None, option)])[0].update_time
+
+
+class Query:
+    """Immutable query; each method returns a new one, like the SDK's"""
+
+    def __init__(self, client: "MemoryFirestore", parts: Tuple[str, ...], all_descendants: bool = False,
+                 filters: Tuple = (), orders: Tuple = (), limit: Optional[int] = None, offset: int = 0,
+                 cursor: Optional[Tuple[Any, ...]] = None, projection: Optional[List[List[str]]] = None):
+        self._client = client
+        self._parts = parts
+        self._all_descendants = all_descendants
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit
+        self._offset = offset
+        self._cursor = cursor
+        self._projection = projection
+
+    def _copy(self, **changes) -> "Query":
+        fields = dict(filters=self._filters, orders=self._orders, limit=self._limit, offset=self._offset,
+                      cursor=self._cursor, projection=self._projection)
+        fields.update(changes)
+        return Query(self._client, self._parts, self._all_descendants, **fields)
+
+    def where(self, field_path=None, op_string: Optional[str] = None, value=None, *, filter=None) -> "Query":
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction: str = ASCENDING) -> "Query":
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count: int) -> "Query":
+        return self._copy(limit=count)
+
+    def offset(self, num_to_skip: int) -> "Query":
+        return self._copy(offset=num_to_skip)
+
+    def select(self, field_paths: Iterable[str]) -> "Query":
+        return self._copy(projection=[_split(field_path) for field_path in field_paths])
+
+    def start_after(self, document_fields_or_snapshot) -> "Query":
+        return self._copy(cursor=document_fields_or_snapshot)
+
+    def stream(self, transaction=None) -> Iterator[DocumentSnapshot]:
+        return iter(self._client._rpc("RunQuery", lambda: self._client._run_query(self)))
+
+    def get(self, transaction=None) -> List[DocumentSnapshot]:
+        return list(self.stream())
+
+
+class CollectionReference(Query):
+    def __init__(self, client: "MemoryFirestore", parts: Tuple[str, ...]):
+        super().__init__(client, parts)
+
+    @property
+    def id(self) -> str:
+        return self._parts[-1]
+
+    @property
+    def path(self) -> str:
+        return "/".join(self._parts)
+
+    @property
+    def parent(self) -> Optional[DocumentReference]:
+        return DocumentReference(self._client, self._parts[:-1]) if len(self._parts) > 1 else None
+
+    def document(self, document_id: Optional[str] = None) -> DocumentReference:
+        if document_id is None:
+            document_id = "".join(random.choices(_AUTO_ID_CHARS, k=20))
+        return DocumentReference(self._client, self._parts + tuple(document_id.split("/")))
+
+    def add(self, document_data: Dict[str, Any], document_id: Optional[str] = None) -> Tuple[datetime, DocumentReference]:
+        reference = self.document(document_id)
+        return reference.create(document_data).update_time, reference
+
+    def list_documents(self, page_size: Optional[int] = None) -> Iterator[DocumentReference]:
+        return iter(self._client._rpc("ListDocuments", lambda: self._client._list_documents(self._parts)))
+
+
+class WriteBatch:
+    def __init__(self, client: "MemoryFirestore"):
+        self._client = client
+        self._writes: List[Tuple] = []
+
+    def __len__(self) -> int:
+        return len(self._writes)
+
+    def create(self, reference: DocumentReference, document_data: Dict[str, Any]) -> None:
+        self._writes.append(("create", reference, document_data, None))
+
+    def set(self, reference: DocumentReference, document_data: Dict[str, Any], merge: bool = False) -> None:
+        self._writes.append(("set", reference, document_data, merge))
+
+    def update(self, reference: DocumentReference, field_updates: Dict[str, Any],
+               option: Optional[_Precondition] = None) -> None:
+        self._writes.append(("update", reference, field_updates, option))
+
+    def delete(self, reference: DocumentReference, option: Optional[_Precondition] = None) -> None:
+        self._writes.append(("delete", reference, None, option))
+
+    def commit(self) -> List[WriteResult]:
+        writes, self._writes = self._writes, []
+        return self._client._commit(writes)
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+class MemoryFirestore:
+    """In-memory Firestore client (thread-safe)"""
+
+    def __init__(self, latency: Optional[LatencyModel] = None, metrics: Optional[RpcMetrics] = None):
+        self.latency = latency if latency is not None else LatencyModel.from_env()
+        self.metrics = metrics if metrics is not None else RpcMetrics()
+        self._lock = threading.RLock()
+        # collection path parts -> document id -> stored document
+        self._collections: Dict[Tuple[str, ...], Dict[str, _StoredDocument]] = {}
+        self._clock = datetime.now(timezone.utc)
+
+    # References ------------------------------------------------------------
+
+    def collection(self, *collection_path: str) -> CollectionReference:
+        return CollectionReference(self, tuple("/".join(collection_path).split("/")))
+
+    def document(self, *document_path: str) -> DocumentReference:
+        return DocumentReference(self, tuple("/".join(document_path).split("/")))
+
+    def collection_group(self, collection_id: str) -> Query:
+        return Query(self, (collection_id,), all_descendants=True)
+
+    def collections(self) -> Iterator[CollectionReference]:
+        return iter(self._child_collections(()))
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+    def write_option(self, **kwargs) -> _Precondition:
+        return _Precondition(**kwargs)
+
+    def get_all(self, references: Iterable[DocumentReference], field_paths: Optional[List[str]] = None,
+                transaction=None) -> Iterator[DocumentSnapshot]:
+        references = list(references)
+        return iter(self._rpc("BatchGetDocuments", lambda: self._get_many(references, field_paths)))
+
+    def close(self) -> None:
+        pass
+
+    # Seeding (no simulated RPCs) --------------------------------------------
+
+    def load(self, documents: Dict[str, Dict[str, Any]]) -> None:
+        """Store documents by path ("users/u1/workouts/w1"), as plain data"""
+        with self._lock:
+            now = self._tick()
+            for path, data in documents.items():
+                parts = tuple(path.split("/"))
+                stored = _transform(_MISSING, data, now)
+                self._collections.setdefault(parts[:-1], {})[parts[-1]] = _StoredDocument(stored, now, now)
+
+    def document_count(self) -> int:
+        with self._lock:
+            return sum(len(documents) for documents in self._collections.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._collections.clear()
+
+    # Internals ---------------------------------------------------------------
+
+    def _tick(self) -> datetime:
+        """Strictly increasing commit time (caller holds the lock)"""
+        now = datetime.now(timezone.utc)
+        self._clock = now if now > self._clock else self._clock + timedelta(microseconds=1)
+        return self._clock
+
+    def _rpc(self, method: str, operation: Callable[[], Tuple[Any, Dict[str, int]]]):
+        """
+        Run operation as one simulated RPC. operation returns (result,
+        counts) where counts has reads/writes/deletes.
+        """
+        started = self.metrics.started()
+        try:
+            result, counts = operation()
+        except Exception:
+            time.sleep(self.latency.sample())
+            record(rpcs=1, rpc_seconds=self.metrics.finished(method, started, ok=False))
+            raise
+        delay = self.latency.sample(sum(counts.values()))
+        if delay:
+            time.sleep(delay)
+        record(rpcs=1, rpc_seconds=self.metrics.finished(method, started, ok=True), **counts)
+        return result
+
+    def _snapshot(self, reference: DocumentReference, stored: Optional[_StoredDocument],
+                  projection: Optional[List[List[str]]], read_time: datetime) -> DocumentSnapshot:
+        if stored is None:
+            return DocumentSnapshot(reference, None, read_time=read_time)
+        if projection is None:
+            data = _copy(stored.data)
+        else:
+            data = {}
+            for parts in projection:
+                value = _lookup(stored.data, parts)
+                if value is not _MISSING:
+                    _write_field(data, parts, _copy(value), read_time)
+        return DocumentSnapshot(reference, data, stored.create_time, stored.update_time, read_time)
+
+    def _get_many(self, references: List[DocumentReference], field_paths: Optional[List[str]]):
+        projection = [_split(field_path) for field_path in field_paths] if field_paths is not None else None
+        with self._lock:
+            read_time = self._tick()
+            snapshots = [
+                self._snapshot(reference, self._collections.get(reference._parts[:-1], {}).get(reference.id),
+                               projection, read_time)
+                for reference in references
+            ]
+        # A missing document is billed as a read too
+        return snapshots, {"reads": len(references)}
+
+    def _list_documents(self, parts: Tuple[str, ...]):
+        with self._lock:
+            ids = sorted(self._collections.get(parts, {}))
+        return [DocumentReference(self, parts + (document_id,)) for document_id in ids], {"reads": len(ids)}
+
+    def _child_collections(self, parts: Tuple[str, ...]) -> List[CollectionReference]:
+        with self._lock:
+            ids = {path[len(parts)] for path, documents in self._collections.items()
+                   if documents and len(path) == len(parts) + 1 and path[:len(parts)] == parts}
+        return [CollectionReference(self, parts + (collection_id,)) for collection_id in sorted(ids)]
+
+    def _name_parts(self, value, query: Query) -> Tuple[str, ...]:
+        """Document name for a FieldPath.document_id() filter or cursor: a reference, path or bare id"""
+        if isinstance(value, DocumentReference):
+            return value._parts
+        value = str(value)
+        if "/" in value or query._all_descendants:
+            return tuple(value.split("/"))
+        return query._parts + (value,)
+
+    def _orders(self, query: Query) -> List[Tuple[Any, str]]:
+        """Explicit orders, then implicit ones: inequality fields, then document name"""
+        orders = list(query._orders)
+        if not orders:
+            for field_path, op, _ in query._filters:
+                if op in ("<", "<=", ">", ">=", "!=", "not-in") and field_path != DOCUMENT_ID:
+                    orders.append((field_path, ASCENDING))
+                    break
+        if not any(field_path == DOCUMENT_ID for field_path, _ in orders):
+            orders.append((DOCUMENT_ID, orders[-1][1] if orders else ASCENDING))
+        return orders
+
+    def _run_query(self, query: Query):
+        orders = self._orders(query)
+
+        def value_of(parts: Tuple[str, ...], data: Dict[str, Any], field_path):
+            if field_path == DOCUMENT_ID:
+                return parts
+            return _lookup(data, _split(field_path))
+
+        def compare_values(a, b, field_path) -> int:
+            if field_path == DOCUMENT_ID:
+                return (a > b) - (a < b)
+            return _compare(a, b)
+
+        with self._lock:
+            read_time = self._tick()
+            if query._all_descendants:
+                sources = [(path, documents) for path, documents in self._collections.items()
+                           if path[-1] == query._parts[0]]
+            else:
+                sources = [(query._parts, self._collections.get(query._parts, {}))]
+
+            rows = []
+            for path, documents in sources:
+                for document_id, stored in documents.items():
+                    parts = path + (document_id,)
+                    matched = True
+                    for field_path, op, operand in query._filters:
+                        if field_path == DOCUMENT_ID:
+                            operands = operand if op in ("in", "not-in") else [operand]
+                            names = [self._name_parts(item, query) for item in operands]
+                            matched = {"==": parts == names[0], "!=": parts != names[0],
+                                       "<": parts < names[0], "<=": parts <= names[0],
+                                       ">": parts > names[0], ">=": parts >= names[0],
+                                       "in": parts in names, "not-in": parts not in names}[op]
+                        else:
+                            matched = _matches(_lookup(stored.data, _split(field_path)), op, operand)
+                        if not matched:
+                            break
+                    if not matched:
+                        continue
+                    key = [value_of(parts, stored.data, field_path) for field_path, _ in orders]
+                    if any(value is _MISSING for value in key):
+                        continue  # Firestore leaves out documents without an order_by field
+                    rows.append((key, parts, stored))
+
+            def compare_rows(a, b) -> int:
+                for index, (field_path, direction) in enumerate(orders):
+                    result = compare_values(a[0][index], b[0][index], field_path)
+                    if result:
+                        return -result if direction == DESCENDING else result
+                return 0
+
+            rows.sort(key=functools.cmp_to_key(compare_rows))
+
+            if query._cursor is not None:
+                cursor = self._cursor_values(query._cursor, orders, query)
+
+                def after_cursor(row) -> bool:
+                    for index, value in enumerate(cursor):
+                        field_path, direction = orders[index]
+                        result = compare_values(row[0][index], value, field_path)
+                        if result:
+                            return (result < 0) if direction == DESCENDING else (result > 0)
+                    return False
+
+                rows = [row for row in rows if after_cursor(row)]
+
+            rows = rows[query._offset:]
+            if query._limit is not None:
+                rows = rows[:query._limit]
+
+            snapshots = [
+                self._snapshot(DocumentReference(self, parts), stored, query._projection, read_time)
+                for _, parts, stored in rows
+            ]
+        # A query is billed at least one read, even with no results
+        return snapshots, {"reads": max(1, len(snapshots) + query._offset)}
+
+    def _cursor_values(self, cursor, orders: List[Tuple[Any, str]], query: Query) -> List[Any]:
+        """Values to start after, one per leading order field"""
+        if isinstance(cursor, DocumentSnapshot):
+            data = cursor._data or {}
+            values = []
+            for field_path, _ in orders:
+                if field_path == DOCUMENT_ID:
+                    values.append(cursor.reference._parts)
+                else:
+                    values.append(_lookup(data, _split(field_path)))
+            return values
+        values = []
+        for field_path, _ in orders:
+            key = field_path.to_api_repr() if isinstance(field_path, FieldPath) else field_path
+            if key not in cursor:
+                break
+            value = cursor[key]
+            values.append(self._name_parts(value, query) if field_path == DOCUMENT_ID else _stored(value))
+        return values
+
+    def _commit(self, writes: List[Tuple]) -> List[WriteResult]:
+        if len(writes) > MAX_WRITES_PER_COMMIT:
+            raise exceptions.InvalidArgument(f"A commit may contain at most {MAX_WRITES_PER_COMMIT} writes")
+        return self._rpc("Commit", lambda: self._apply(writes))
+
+    def _apply(self, writes: List[Tuple]):
+        """Apply writes atomically: every precondition is checked before anything changes"""
+        with self._lock:
+            commit_time = self._tick()
+            # Documents as the batch leaves them, so later writes see earlier ones
+            pending: Dict[Tuple[str, ...], Optional[_StoredDocument]] = {}
+
+            def current(reference: DocumentReference) -> Optional[_StoredDocument]:
+                if reference._parts in pending:
+                    return pending[reference._parts]
+                return self._collections.get(reference._parts[:-1], {}).get(reference.id)
+
+            deletes = 0
+            for kind, reference, data, option in writes:
+                existing = current(reference)
+                if isinstance(option, _Precondition):
+                    if option.exists is not None and option.exists != (existing is not None):
+                        raise exceptions.FailedPrecondition(f"Document {reference.path} existence precondition failed")
+                    if option.last_update_time is not None and (
+                            existing is None or existing.update_time != _stored(option.last_update_time)):
+                        raise exceptions.FailedPrecondition(f"Document {reference.path} was updated since it was read")
+
+                if kind == "delete":
+                    pending[reference._parts] = None
+                    deletes += 1
+                    continue
+                if kind == "create" and existing is not None:
+                    raise exceptions.AlreadyExists(f"Document already exists: {reference.path}")
+                if kind == "update" and existing is None:
+                    raise exceptions.NotFound(f"No document to update: {reference.path}")
+
+                if kind == "update":
+                    updated = _copy(existing.data)
+                    for field_path, value in data.items():
+                        _write_field(updated, _split(field_path), value, commit_time)
+                elif kind == "set" and option:  # merge=True
+                    updated = _copy(existing.data) if existing is not None else {}
+                    _merge(updated, data, commit_time)
+                else:
+                    updated = _transform(_MISSING, data, commit_time)
+                create_time = existing.create_time if existing is not None else commit_time
+                pending[reference._parts] = _StoredDocument(updated, create_time, commit_time)
+
+            for parts, stored in pending.items():
+                if stored is None:
+                    documents = self._collections.get(parts[:-1])
+                    if documents is not None:
+                        documents.pop(parts[-1], None)
+                        if not documents:
+                            del self._collections[parts[:-1]]
+                else:
+                    self._collections.setdefault(parts[:-1], {})[parts[-1]] = stored
+
+        results = [WriteResult(commit_time) for _ in writes]
+        return results, {"writes": len(writes) - deletes, "deletes": deletes}
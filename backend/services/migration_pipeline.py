@@ -0,0 +1,244 @@
+"""
+Migration Pipeline - Chunked, resumable anonymous-to-cloud data migration.
+
+Local programs and workouts are turned into a fixed, ordered list of document
+writes and split into chunks below Firestore's 500-writes-per-batch limit.
+Chunks are committed concurrently (bounded by a semaphore); each chunk's batch
+also adds its index to the user's progress doc (users/{uid}/data/migration),
+so a chunk and its checkpoint land atomically. Migrated counts are derived
+from the committed chunk indexes, never incremented, so a commit retried after
+an ambiguous failure can't count its writes twice.
+
+Document IDs come from the local data (or a content hash when missing), so
+re-posting the same payload after a failure skips committed chunks and
+overwrites, never duplicates, anything in flight.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.firebase_config import firestore
+from ..models import Program, WorkoutTemplate, normalize_workout_schema
+
+logger = logging.getLogger(__name__)
+
+# Data writes per batch; one slot is reserved for the progress checkpoint
+MIGRATION_BATCH_SIZE = min(int(os.getenv("MIGRATION_BATCH_SIZE", "400")), 499)
+MIGRATION_MAX_CONCURRENT_COMMITS = int(os.getenv("MIGRATION_MAX_CONCURRENT_COMMITS", "4"))
+MIGRATION_COMMIT_RETRIES = 2
+
+# Errors kept on the progress doc (the full list is returned to the caller)
+MAX_STORED_ERRORS = 50
+
+
+def _stable_id(prefix: str, data: Dict[str, Any]) -> str:
+    """Keep the local ID (programs reference workouts by it); hash the content if there is none"""
+    existing = data.get('id')
+    if isinstance(existing, str) and existing and '/' not in existing:
+        return existing
+    digest = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    return f"{prefix}-{digest[:8]}"
+
+
+class MigrationPipeline:
+    """Plans, commits and checkpoints a user's anonymous data migration"""
+
+    def __init__(
+        self,
+        firestore_service,
+        batch_size: int = MIGRATION_BATCH_SIZE,
+        max_concurrency: int = MIGRATION_MAX_CONCURRENT_COMMITS
+    ):
+        self.firestore_service = firestore_service
+        self.batch_size = max(1, min(batch_size, 499))
+        self.max_concurrency = max(1, max_concurrency)
+
+    @property
+    def db(self):
+        return self.firestore_service.db
+
+    def _progress_ref(self, user_id: str):
+        return self.db.collection('users').document(user_id).collection('data').document('migration')
+
+    # ── Planning ─────────────────────────────────────────────────────────
+
+    def plan_writes(
+        self,
+        user_id: str,
+        programs_data: List[Dict],
+        workouts_data: List[Dict]
+    ) -> Tuple[List[Tuple[str, Any, Dict[str, Any]]], List[str]]:
+        """
+        Build the ordered (kind, doc_ref, data) writes for a payload.
+
+        Returns:
+            Tuple of (writes, errors for items that failed validation)
+        """
+        user_ref = self.db.collection('users').document(user_id)
+        writes = []
+        errors = []
+
+        # Workouts first so programs never point at workouts that aren't there yet
+        for workout_data in workouts_data:
+            try:
+                data = dict(workout_data)
+                workout_id = _stable_id('workout', data)
+                for field in ('id', 'created_date', 'modified_date'):
+                    data.pop(field, None)
+                workout = normalize_workout_schema(WorkoutTemplate(id=workout_id, **data))
+
+                workout_dict = workout.model_dump()
+                workout_dict['created_date'] = firestore.SERVER_TIMESTAMP
+                workout_dict['modified_date'] = firestore.SERVER_TIMESTAMP
+                workout_dict['migrated_at'] = firestore.SERVER_TIMESTAMP
+                workout_dict['version'] = 1
+                workout_dict['sync_status'] = 'synced'
+                writes.append(('workout', user_ref.collection('workouts').document(workout.id), workout_dict))
+            except Exception as e:
+                logger.warning(f"Failed to migrate workout: {str(e)}")
+                errors.append(f"Workout migration error: {str(e)}")
+
+        for program_data in programs_data:
+            try:
+                data = dict(program_data)
+                program_id = _stable_id('program', data)
+                for field in ('id', 'created_date', 'modified_date'):
+                    data.pop(field, None)
+                program = Program(id=program_id, **data)
+
+                program_dict = program.model_dump()
+                program_dict['created_date'] = firestore.SERVER_TIMESTAMP
+                program_dict['modified_date'] = firestore.SERVER_TIMESTAMP
+                program_dict['migrated_at'] = firestore.SERVER_TIMESTAMP
+                program_dict['version'] = 1
+                program_dict['sync_status'] = 'synced'
+                writes.append(('program', user_ref.collection('programs').document(program.id), program_dict))
+            except Exception as e:
+                logger.warning(f"Failed to migrate program: {str(e)}")
+                errors.append(f"Program migration error: {str(e)}")
+
+        return writes, errors
+
+    @staticmethod
+    def _fingerprint(writes: List[Tuple[str, Any, Dict[str, Any]]]) -> str:
+        """Identifies a plan so a resumed run can tell whether it's the same payload"""
+        paths = "\n".join(ref.path for _, ref, _ in writes)
+        return hashlib.sha1(paths.encode('utf-8')).hexdigest()
+
+    # ── Execution ────────────────────────────────────────────────────────
+
+    async def get_progress(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Stored checkpoint for the user's latest migration, or None"""
+        doc = await asyncio.to_thread(self._progress_ref(user_id).get)
+        return doc.to_dict() if doc.exists else None
+
+    def _commit_chunk(self, user_id: str, index: int, chunk: List[Tuple[str, Any, Dict[str, Any]]]):
+        """Commit one chunk together with its checkpoint update (runs in a worker thread)"""
+        last_error = None
+        for attempt in range(MIGRATION_COMMIT_RETRIES + 1):
+            try:
+                batch = self.db.batch()
+                for _, ref, data in chunk:
+                    batch.set(ref, data)
+                batch.set(self._progress_ref(user_id), {
+                    'committed_chunks': firestore.ArrayUnion([index]),
+                    'updated_at': firestore.SERVER_TIMESTAMP
+                }, merge=True)
+                batch.commit()
+                return
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Migration chunk {index} for user {user_id} failed (attempt {attempt + 1}): {str(e)}")
+        raise last_error
+
+    async def run(self, user_id: str, programs_data: List[Dict], workouts_data: List[Dict]) -> Dict[str, Any]:
+        """
+        Migrate a payload, resuming from the user's checkpoint when it's the same payload.
+
+        Returns:
+            Dict with success flag, migrated counts, chunk counts and per-item errors
+        """
+        writes, errors = self.plan_writes(user_id, programs_data, workouts_data)
+        chunks = [writes[i:i + self.batch_size] for i in range(0, len(writes), self.batch_size)]
+        fingerprint = self._fingerprint(writes)
+        progress_ref = self._progress_ref(user_id)
+
+        checkpoint = await self.get_progress(user_id) or {}
+        if checkpoint.get('fingerprint') == fingerprint:
+            done = set(checkpoint.get('committed_chunks') or [])
+        else:
+            done = set()
+            await asyncio.to_thread(progress_ref.set, {
+                'fingerprint': fingerprint,
+                'status': 'running',
+                'total_chunks': len(chunks),
+                'total_workouts': sum(1 for kind, _, _ in writes if kind == 'workout'),
+                'total_programs': sum(1 for kind, _, _ in writes if kind == 'program'),
+                'committed_chunks': [],
+                'migrated_workouts': 0,
+                'migrated_programs': 0,
+                'errors': errors[:MAX_STORED_ERRORS],
+                'started_at': firestore.SERVER_TIMESTAMP,
+                'updated_at': firestore.SERVER_TIMESTAMP
+            })
+
+        pending = [i for i in range(len(chunks)) if i not in done]
+        if done:
+            await asyncio.to_thread(progress_ref.update, {'status': 'running', 'updated_at': firestore.SERVER_TIMESTAMP})
+            logger.info(f"Resuming migration for user {user_id}: {len(done)}/{len(chunks)} chunks already committed")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def commit(index: int) -> Optional[str]:
+            async with semaphore:
+                try:
+                    await asyncio.to_thread(self._commit_chunk, user_id, index, chunks[index])
+                    return None
+                except Exception as e:
+                    return f"Chunk {index + 1}/{len(chunks)} failed: {str(e)}"
+
+        chunk_errors = [e for e in await asyncio.gather(*(commit(i) for i in pending)) if e]
+        success = not chunk_errors
+
+        progress = await self.get_progress(user_id) or {}
+        committed = {i for i in progress.get('committed_chunks') or [] if 0 <= i < len(chunks)}
+        migrated_workouts = sum(1 for i in committed for kind, _, _ in chunks[i] if kind == 'workout')
+        migrated_programs = sum(len(chunks[i]) for i in committed) - migrated_workouts
+
+        final_update = {
+            'status': 'completed' if success else 'failed',
+            'migrated_workouts': migrated_workouts,
+            'migrated_programs': migrated_programs,
+            'errors': (errors + chunk_errors)[:MAX_STORED_ERRORS],
+            'updated_at': firestore.SERVER_TIMESTAMP
+        }
+        if success:
+            final_update['completed_at'] = firestore.SERVER_TIMESTAMP
+        await asyncio.to_thread(progress_ref.update, final_update)
+
+        if success:
+            await self.firestore_service.update_user_stats(user_id, {
+                'totalPrograms': migrated_programs,
+                'totalWorkouts': migrated_workouts,
+                'lastMigration': firestore.SERVER_TIMESTAMP
+            })
+            logger.info(f"Migrated data for user {user_id}: {migrated_programs} programs, "
+                        f"{migrated_workouts} workouts in {len(chunks)} chunks ({len(done)} resumed)")
+        else:
+            logger.error(f"Migration for user {user_id} incomplete: {len(chunk_errors)} chunk(s) failed")
+
+        result = {
+            "success": success,
+            "migrated_programs": migrated_programs,
+            "migrated_workouts": migrated_workouts,
+            "total_chunks": len(chunks),
+            "resumed_chunks": len(done),
+            "errors": errors + chunk_errors
+        }
+        if not success:
+            result["error"] = "Some chunks failed to commit - retry to resume the migration"
+        return result
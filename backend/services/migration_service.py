@@ -3,6 +3,7 @@ Data Migration Service for Ghost Gym V3 Phase 2
 Handles migration from anonymous localStorage to authenticated Firestore accounts
 """
 
+import asyncio
 import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
@@ -22,6 +23,8 @@ class MigrationService:
         """Initialize migration service"""
         self.unified_service = unified_data_service
         self.firestore_service = firestore_data_service
+        # Strong references to background migrations so they aren't garbage collected mid-run
+        self._background_tasks = set()
         logger.info("Migration service initialized")
     
     async def check_migration_eligibility(self, user_id: str) -> Dict[str, Any]:
@@ -161,8 +164,12 @@ class MigrationService:
         try:
             logger.info(f"Starting migration for user {user_id}: {len(programs_data)} programs, {len(workouts_data)} workouts")
             
+            # An interrupted migration already wrote some cloud data; let it resume
+            progress = await self.firestore_service.get_migration_progress(user_id)
+            resuming = bool(progress) and progress.get("status") in ("running", "failed")
+
             # Validate user eligibility one more time
-            eligibility = await self.check_migration_eligibility(user_id)
+            eligibility = {"eligible": True} if resuming else await self.check_migration_eligibility(user_id)
             if not eligibility["eligible"]:
                 return {
                     "success": False,
@@ -172,13 +179,29 @@ class MigrationService:
                 }
             
             # Create user profile if it doesn't exist
+            # (a doc holding only stats was started by a unit of work before the profile existed)
             existing_profile = await self.firestore_service.get_user_profile(user_id)
-            if not existing_profile:
+            if not existing_profile or set(existing_profile) <= {'stats'}:
                 await self.firestore_service.create_user_profile(user_id, {
                     "email": options.get("email"),
                     "displayName": options.get("displayName")
                 })
             
+            if options.get("background", False):
+                # Large libraries: return immediately, client polls /migration/progress
+                task = asyncio.create_task(
+                    self.firestore_service.migrate_anonymous_data(user_id, programs_data, workouts_data)
+                )
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+                return {
+                    "success": True,
+                    "status": "running",
+                    "resuming": resuming,
+                    "migrated_programs": 0,
+                    "migrated_workouts": 0
+                }
+
             # Execute migration using Firestore service
             migration_result = await self.firestore_service.migrate_anonymous_data(
                 user_id, programs_data, workouts_data
@@ -188,8 +211,9 @@ class MigrationService:
                 return {
                     "success": False,
                     "error": migration_result.get("error", "Migration failed"),
-                    "migrated_programs": 0,
-                    "migrated_workouts": 0
+                    "migrated_programs": migration_result.get("migrated_programs", 0),
+                    "migrated_workouts": migration_result.get("migrated_workouts", 0),
+                    "errors": migration_result.get("errors", [])
                 }
             
             migration_end = datetime.now()
@@ -211,6 +235,8 @@ class MigrationService:
                 "migrated_programs": migration_result.get("migrated_programs", 0),
                 "migrated_workouts": migration_result.get("migrated_workouts", 0),
                 "errors": migration_result.get("errors", []),
+                "total_chunks": migration_result.get("total_chunks", 0),
+                "resumed_chunks": migration_result.get("resumed_chunks", 0),
                 "migration_duration": migration_duration,
                 "migration_timestamp": migration_end.isoformat(),
                 "local_storage_cleared": options.get("clear_local_after_success", False)
@@ -226,6 +252,37 @@ class MigrationService:
                 "migration_duration": (datetime.now() - migration_start).total_seconds()
             }
     
+    async def get_migration_progress(self, user_id: str) -> Dict[str, Any]:
+        """
+        Get chunk-level progress of the user's latest migration
+        
+        Args:
+            user_id: Firebase user ID
+            
+        Returns:
+            Dict with status, chunk counts and migrated item counts
+        """
+        progress = await self.firestore_service.get_migration_progress(user_id)
+        if not progress:
+            return {"status": "not_started"}
+
+        total_chunks = progress.get("total_chunks", 0)
+        committed = len(progress.get("committed_chunks") or [])
+        return {
+            "status": progress.get("status", "unknown"),
+            "total_chunks": total_chunks,
+            "committed_chunks": committed,
+            "percent_complete": round(100 * committed / total_chunks, 1) if total_chunks else 100.0,
+            "total_workouts": progress.get("total_workouts", 0),
+            "total_programs": progress.get("total_programs", 0),
+            "migrated_workouts": progress.get("migrated_workouts", 0),
+            "migrated_programs": progress.get("migrated_programs", 0),
+            "errors": progress.get("errors", []),
+            "started_at": progress.get("started_at"),
+            "updated_at": progress.get("updated_at"),
+            "completed_at": progress.get("completed_at")
+        }
+    
     async def get_migration_status(self, user_id: str) -> Dict[str, Any]:
         """
         Get current migration status for a user
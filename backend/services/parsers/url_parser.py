@@ -6,8 +6,6 @@ Uses trafilatura for content extraction, then AI for workout parsing.
 import logging
 import re
 
-import trafilatura
-
 from .base_parser import ParseResult
 from .ai_parser import get_ai_parser
 
@@ -40,6 +38,9 @@ class URLParser:
             return ParseResult(errors=["Invalid URL format"])
 
         try:
+            # Imported here: trafilatura costs ~0.15s and only URL imports need it
+            import trafilatura
+
             # Download and extract main content
             downloaded = trafilatura.fetch_url(url)
             if not downloaded:
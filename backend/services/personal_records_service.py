@@ -11,16 +11,9 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-try:
-    from firebase_admin import firestore
-    FIRESTORE_AVAILABLE = True
-except ImportError as e:
-    FIRESTORE_AVAILABLE = False
-    firestore = None
-    logger.error(f"Personal records service: Failed to import firestore - {str(e)}")
-
-from ..config.firebase_config import get_firebase_app
+from ..config.firebase_config import firestore
 from ..models import PersonalRecord, UserPersonalRecords
+from .lazy_firestore import LazyFirestoreService
 
 
 def _normalize_pr_id(pr_type: str, exercise_name: str) -> str:
@@ -29,32 +22,13 @@ def _normalize_pr_id(pr_type: str, exercise_name: str) -> str:
     return f"{pr_type}_{normalized}"
 
 
-class PersonalRecordsService:
+class PersonalRecordsService(LazyFirestoreService):
     """
     Service for managing user personal records
     Uses single-document structure matching the favorites pattern
     """
 
-    def __init__(self):
-        if not FIRESTORE_AVAILABLE:
-            logger.warning("Firebase Admin SDK not available - Personal records service disabled")
-            self.db = None
-            self.available = False
-            return
-
-        try:
-            self.app = get_firebase_app()
-            if self.app:
-                self.db = firestore.client(app=self.app)
-                self.available = True
-                logger.info("Personal records service initialized successfully")
-            else:
-                self.db = None
-                self.available = False
-        except Exception as e:
-            logger.error(f"Failed to initialize Personal records service: {str(e)}")
-            self.db = None
-            self.available = False
+    service_name = "Personal records"
 
     def is_available(self) -> bool:
         return self.available and self.db is not None
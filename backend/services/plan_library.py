@@ -0,0 +1,277 @@
+"""
+Plan Library - Cache of validated spin-ride and tabata plans keyed by request parameters.
+
+Most generate requests repeat the same (duration, difficulty, options) tuple, so
+once a key has a full pool of validated plans we serve them round-robin instead
+of calling Gemini. Pools are seeded offline by backend/scripts/build_plan_library.py
+(JSON files under backend/data/plan_library/) and topped up at runtime from
+model responses on cache misses.
+
+In-memory per process; runtime additions are lost on restart, which is acceptable
+because the offline pool is reloaded from disk.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .spin_ride_validator import validate_spin_ride_plan
+
+logger = logging.getLogger(__name__)
+
+PLAN_LIBRARY_DIR = Path(__file__).parent.parent / "data" / "plan_library"
+
+# Plans kept per parameter key; a key is served from the library once its pool is full
+PLAN_POOL_SIZE = int(os.getenv("PLAN_POOL_SIZE", "5"))
+
+LIBRARY_FILE_VERSION = 1
+
+
+def _fingerprint(plan: Dict[str, Any]) -> str:
+    """Stable hash of a plan's content, used to drop duplicates"""
+    return hashlib.sha1(json.dumps(plan, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class PlanLibrary:
+    """Thread-safe pools of validated plans with round-robin rotation per key"""
+
+    def __init__(
+        self,
+        kind: str,
+        validator: Callable[[str, Dict[str, Any]], bool],
+        pool_size: int = PLAN_POOL_SIZE,
+        library_path: Optional[Path] = None,
+    ):
+        self.kind = kind
+        self.validator = validator
+        self.pool_size = max(1, pool_size)
+        self.library_path = library_path or PLAN_LIBRARY_DIR / f"{kind}.json"
+
+        self._pools: Dict[str, List[Dict[str, Any]]] = {}
+        self._fingerprints: Dict[str, set] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self.load()
+
+    # ── Pool access ──────────────────────────────────────────────────────
+
+    def is_full(self, key: str) -> bool:
+        """True when the key has enough plans to be served without the model"""
+        with self._lock:
+            return len(self._pools.get(key, [])) >= self.pool_size
+
+    def next_plan(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the next plan for key in rotation (a copy), or None if the pool is empty"""
+        with self._lock:
+            pool = self._pools.get(key)
+            if not pool:
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = (cursor + 1) % len(pool)
+            return copy.deepcopy(pool[cursor % len(pool)])
+
+    def add(self, key: str, plan: Dict[str, Any], capped: bool = True) -> bool:
+        """
+        Validate and add a plan to the key's pool.
+
+        Args:
+            key: Parameter key the plan was generated for
+            plan: Normalized plan dict
+            capped: Respect pool_size (offline pools loaded from disk may be larger)
+
+        Returns:
+            True if the plan was added, False if invalid, duplicate, or the pool is full
+        """
+        if not self.validator(key, plan):
+            return False
+
+        fingerprint = _fingerprint(plan)
+        with self._lock:
+            pool = self._pools.setdefault(key, [])
+            seen = self._fingerprints.setdefault(key, set())
+            if fingerprint in seen or (capped and len(pool) >= self.pool_size):
+                return False
+            pool.append(copy.deepcopy(plan))
+            seen.add(fingerprint)
+            return True
+
+    def get_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Serve a plan from the library, or call generate() on a cache miss.
+
+        A full pool is served round-robin. Otherwise the model is called and a
+        valid result is added to the pool. If the model fails, any plan already
+        in the pool is served instead of surfacing the error.
+
+        Returns:
+            Tuple of (plan, source) where source is "library" or "model"
+        """
+        if self.is_full(key):
+            plan = self.next_plan(key)
+            if plan is not None:
+                self.hits += 1
+                return plan, "library"
+
+        self.misses += 1
+        try:
+            plan = generate()
+        except Exception as e:
+            fallback = self.next_plan(key)
+            if fallback is None:
+                raise
+            logger.warning(f"{self.kind} generation failed for {key}, serving library plan: {str(e)}")
+            return fallback, "library"
+
+        if self.add(key, plan):
+            logger.info(f"Added {self.kind} plan to library for {key}")
+        return plan, "model"
+
+    # ── Persistence ──────────────────────────────────────────────────────
+
+    def load(self, path: Optional[Path] = None) -> int:
+        """Load pre-generated plans from disk (invalid entries are skipped). Returns plans loaded."""
+        path = Path(path or self.library_path)
+        if not path.exists():
+            return 0
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to read {self.kind} plan library {path}: {str(e)}")
+            return 0
+
+        loaded = 0
+        for key, plans in (data.get("plans") or {}).items():
+            for plan in plans:
+                if self.add(key, plan, capped=False):
+                    loaded += 1
+        logger.info(f"Loaded {loaded} {self.kind} plans across {len(self._pools)} keys from {path}")
+        return loaded
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        """Write all pools to disk in the library file format"""
+        path = Path(path or self.library_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {
+                "version": LIBRARY_FILE_VERSION,
+                "kind": self.kind,
+                "pool_size": self.pool_size,
+                "plans": {key: pool for key, pool in sorted(self._pools.items())},
+            }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+        return path
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool sizes and hit/miss counters"""
+        with self._lock:
+            pools = {key: len(pool) for key, pool in self._pools.items()}
+        return {
+            "kind": self.kind,
+            "pool_size": self.pool_size,
+            "keys": len(pools),
+            "full_keys": sum(1 for n in pools.values() if n >= self.pool_size),
+            "plans": sum(pools.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# ── Spin ride ─────────────────────────────────────────────────────────────
+
+def spin_ride_key(duration_minutes: int, include_all_outs: bool, difficulty: Optional[str]) -> str:
+    """Library key for a spin ride request"""
+    return f"{duration_minutes}|{difficulty or 'auto'}|{'all_outs' if include_all_outs else 'no_all_outs'}"
+
+
+def _validate_spin_ride(key: str, plan: Dict[str, Any]) -> bool:
+    duration, difficulty, all_outs = key.split("|")
+    result = validate_spin_ride_plan(plan, include_all_outs=(all_outs == "all_outs"))
+    if not result.ok:
+        logger.info(f"Rejected spin ride plan for library ({key}): {result.errors[0]}")
+        return False
+    if plan.get("duration_minutes") != int(duration):
+        return False
+    return difficulty == "auto" or plan.get("difficulty") == difficulty
+
+
+# ── Tabata kettlebell ─────────────────────────────────────────────────────
+
+def tabata_kettlebell_key(
+    protocol: str,
+    focus_areas: List[str],
+    sets: int,
+    rounds_per_set: int,
+    include_exercises: Optional[List[str]] = None,
+    exclude_exercises: Optional[List[str]] = None,
+) -> str:
+    """Library key for a tabata request; focus and exercise lists are order-insensitive"""
+    def _norm(names):
+        return ",".join(sorted({n.strip().lower() for n in (names or []) if n.strip()}))
+
+    return "|".join([
+        protocol,
+        ",".join(sorted(set(focus_areas))),
+        str(sets),
+        str(rounds_per_set),
+        _norm(include_exercises),
+        _norm(exclude_exercises),
+    ])
+
+
+def _validate_tabata_kettlebell(key: str, plan: Dict[str, Any]) -> bool:
+    from ..models.tabata_kettlebell import TabataKettlebellPlan
+
+    protocol, _, sets, rounds_per_set, _, exclude = key.split("|")
+    try:
+        TabataKettlebellPlan(**plan)
+    except Exception as e:
+        logger.info(f"Rejected tabata plan for library ({key}): {str(e)}")
+        return False
+    if plan.get("protocol") != protocol or plan.get("sets") != int(sets) \
+            or plan.get("rounds_per_set") != int(rounds_per_set):
+        return False
+    if plan.get("total_seconds") != sum(s.get("duration_seconds", 0) for s in plan.get("segments", [])):
+        return False
+
+    # Never cache a plan that slipped an excluded exercise past the model
+    excluded = {name for name in exclude.split(",") if name}
+    return not any(
+        seg.get("exercise", "").strip().lower() in excluded for seg in plan.get("segments", [])
+    )
+
+
+# ── Singletons ────────────────────────────────────────────────────────────
+
+_spin_ride_library = None
+_tabata_kettlebell_library = None
+
+
+def get_spin_ride_library() -> PlanLibrary:
+    """Get or create the singleton spin ride PlanLibrary."""
+    global _spin_ride_library
+    if _spin_ride_library is None:
+        _spin_ride_library = PlanLibrary("spin_ride", _validate_spin_ride)
+    return _spin_ride_library
+
+
+def get_tabata_kettlebell_library() -> PlanLibrary:
+    """Get or create the singleton tabata kettlebell PlanLibrary."""
+    global _tabata_kettlebell_library
+    if _tabata_kettlebell_library is None:
+        _tabata_kettlebell_library = PlanLibrary("tabata_kettlebell", _validate_tabata_kettlebell)
+    return _tabata_kettlebell_library
@@ -0,0 +1,238 @@
+"""
+Session Autosave - Delta autosaves of in-progress workout sessions.
+
+The PUT autosave read the session, rewrote the whole exercises_performed list
+and read it back: three round trips per tap. Autosaves here carry only the
+exercises and sets that changed, and:
+
+- requests for the same session arriving within AUTOSAVE_COALESCE_MS are
+  merged and written together
+- the last written state of each session is kept in memory, so a save is one
+  update() guarded by the document's update_time; if another worker (or the
+  PUT/complete endpoints) wrote in between, the precondition fails and the
+  deltas are re-applied to a fresh read
+- the merged state is returned from memory, without reading it back
+
+Sessions are still stored as one exercises_performed array, so Firestore
+rewrites that field; what moves over the wire from the client is the delta.
+"""
+
+import asyncio
+import logging
+import os
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.firebase_config import firestore
+from ..models import ExercisePerformance, WorkoutSession
+from .user_cache import UserCache
+
+logger = logging.getLogger(__name__)
+
+AUTOSAVE_COALESCE_MS = int(os.getenv("AUTOSAVE_COALESCE_MS", "200"))
+AUTOSAVE_CACHE_SESSIONS = int(os.getenv("AUTOSAVE_CACHE_SESSIONS", "1000"))
+AUTOSAVE_CACHE_TTL = int(os.getenv("AUTOSAVE_CACHE_TTL", "1800"))
+
+# Writes attempted before giving up when other writers keep moving the session
+MAX_WRITE_ATTEMPTS = 3
+
+
+class SessionNotInProgress(ValueError):
+    """Autosave targeted a session that is completed or abandoned"""
+
+
+class _PendingSave:
+    """Autosaves collected for one session during the coalescing window"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.requests: List[Any] = []
+        self.future = loop.create_future()
+        self.task: Optional[asyncio.Future] = None
+
+
+class SessionAutosaver:
+    """Coalesces delta autosaves and applies them with one guarded write per batch"""
+
+    def __init__(self, data_service=None, coalesce_ms: int = AUTOSAVE_COALESCE_MS):
+        self._data_service = data_service
+        self.coalesce_seconds = coalesce_ms / 1000
+        # "user_id/session_id" -> (update_time, session dict) as last read or written
+        self._states = UserCache("autosave_sessions", AUTOSAVE_CACHE_SESSIONS, AUTOSAVE_CACHE_TTL)
+        self._pending: Dict[str, _PendingSave] = {}
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    @property
+    def data_service(self):
+        if self._data_service is None:
+            from .firestore_data_service import firestore_data_service
+            self._data_service = firestore_data_service
+        return self._data_service
+
+    async def autosave(self, user_id: str, session_id: str, request) -> Optional[Dict[str, Any]]:
+        """
+        Apply one autosave request, together with any others for the same session
+        arriving within the coalescing window.
+
+        Returns:
+            {'session', 'revision', 'coalesced'}, or None if the session doesn't exist.
+
+        Raises:
+            SessionNotInProgress: the session is no longer in progress.
+            ValueError: this request's deltas don't produce a valid session.
+        """
+        key = f"{user_id}/{session_id}"
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingSave(asyncio.get_running_loop())
+            # The batch is written by its own task, so a client that disconnects
+            # (whichever request started the batch) only stops waiting for it
+            pending.task = asyncio.ensure_future(self._flush(key, pending, user_id, session_id))
+        index = len(pending.requests)
+        pending.requests.append(request)
+
+        result, errors = await asyncio.shield(pending.future)
+        if index in errors:
+            raise errors[index]
+        return result
+
+    async def _flush(self, key: str, pending: _PendingSave, user_id: str, session_id: str) -> None:
+        """Wait out the coalescing window, then apply the batch and resolve its future"""
+        try:
+            await asyncio.sleep(self.coalesce_seconds)
+            # Saves arriving from here on start the next batch
+            if self._pending.get(key) is pending:
+                del self._pending[key]
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = asyncio.Lock()
+            async with lock:
+                outcome = await asyncio.to_thread(self._apply, user_id, session_id, pending.requests)
+        except asyncio.CancelledError:
+            # Only at shutdown: nothing else cancels this task
+            if self._pending.get(key) is pending:
+                del self._pending[key]
+            pending.future.cancel()
+            raise
+        except Exception as e:
+            pending.future.set_exception(e)
+            pending.future.exception()  # mark retrieved in case every waiter went away
+            return
+        pending.future.set_result(outcome)
+
+    def _apply(self, user_id: str, session_id: str, requests: List[Any]) -> Tuple[Optional[Dict[str, Any]], Dict[int, Exception]]:
+        """Merge the batch into the session and write it (runs in a worker thread)"""
+        db = self.data_service.db
+        key = f"{user_id}/{session_id}"
+        session_ref = (db.collection('users')
+                      .document(user_id)
+                      .collection('workout_sessions')
+                      .document(session_id))
+
+        for attempt in range(MAX_WRITE_ATTEMPTS):
+            generation = self._states.generation(key)
+            state = self._states.get(key) if attempt == 0 else None
+            if state is None:
+                doc = session_ref.get()
+                if not doc.exists:
+                    self._states.invalidate(key)
+                    return None, {}
+                state = (doc.update_time, doc.to_dict())
+                self._states.set(key, state, generation)
+            update_time, data = state
+
+            if data.get('status', 'in_progress') != 'in_progress':
+                error = SessionNotInProgress(f"Session is {data.get('status')}; only in-progress sessions autosave")
+                return None, {i: error for i in range(len(requests))}
+
+            merged, errors = dict(data), {}
+            for i, request in enumerate(requests):
+                try:
+                    merged = merge_autosave(merged, request)
+                except ValueError as e:
+                    errors[i] = e
+            if len(errors) == len(requests):
+                return None, errors
+
+            revision = int(data.get('autosave_revision') or 0) + 1
+            merged['autosave_revision'] = revision
+            changes = {field: merged[field] for field in ('exercises_performed', 'notes', 'exercise_order')
+                       if field in merged and merged[field] != data.get(field)}
+            changes['autosave_revision'] = revision
+            changes['modified_date'] = firestore.SERVER_TIMESTAMP  # picked up by the sync feed
+
+            try:
+                write_result = session_ref.update(changes, option=db.write_option(last_update_time=update_time))
+            except Exception as e:
+                from google.api_core.exceptions import FailedPrecondition
+                if isinstance(e, FailedPrecondition):
+                    logger.info(f"Session {session_id} changed since it was cached; re-reading (attempt {attempt + 1})")
+                    self._states.invalidate(key)
+                    continue
+                raise
+
+            self._states.invalidate(key)
+            self._states.set(key, (write_result.update_time, merged), self._states.generation(key))
+            result = {
+                'session': WorkoutSession(**merged),
+                'revision': revision,
+                'coalesced': len(requests) - len(errors),
+            }
+            if len(requests) > 1:
+                logger.info(f"Autosaved {len(requests)} coalesced updates to session {session_id} in one write")
+            return result, errors
+
+        raise RuntimeError(f"Session {session_id} kept changing during autosave")
+
+    def forget(self, user_id: str, session_id: str) -> None:
+        """Drop the cached state after a write through another endpoint"""
+        self._states.invalidate(f"{user_id}/{session_id}")
+
+
+def merge_autosave(data: Dict[str, Any], request) -> Dict[str, Any]:
+    """Session dict with one autosave request's deltas applied (data is not modified)"""
+    merged = dict(data)
+    exercises = [dict(ex) for ex in (data.get('exercises_performed') or [])]
+    positions = {ex.get('exercise_name'): i for i, ex in enumerate(exercises)}
+
+    removed = set()
+    for delta in request.exercises:
+        position = positions.get(delta.exercise_name)
+        if delta.remove:
+            if position is not None:
+                removed.add(position)
+            continue
+
+        if position is None or position in removed:
+            exercise = {'exercise_name': delta.exercise_name, 'order_index': len(exercises)}
+            positions[delta.exercise_name] = position = len(exercises)
+            exercises.append(exercise)
+        else:
+            exercise = exercises[position]
+        exercise.update(delta.fields)
+
+        if delta.set_details:
+            sets = {s['set_number']: dict(s) for s in exercise.get('set_details') or []}
+            for set_delta in delta.set_details:
+                if set_delta.remove:
+                    sets.pop(set_delta.set_number, None)
+                else:
+                    current = sets.setdefault(set_delta.set_number, {'set_number': set_delta.set_number})
+                    current.update(set_delta.model_dump(exclude_unset=True, exclude={'remove'}))
+            exercise['set_details'] = [sets[n] for n in sorted(sets)]
+
+        try:
+            exercises[position] = ExercisePerformance(**exercise).model_dump()
+        except ValueError as e:
+            raise ValueError(f"Invalid update for '{delta.exercise_name}': {e}")
+
+    merged['exercises_performed'] = [ex for i, ex in enumerate(exercises) if i not in removed]
+    if 'notes' in request.model_fields_set:
+        merged['notes'] = request.notes
+    if 'exercise_order' in request.model_fields_set:
+        merged['exercise_order'] = request.exercise_order
+    WorkoutSession(**merged)  # raises ValueError if the result isn't a valid session
+    return merged
+
+
+# Global session autosaver instance
+session_autosaver = SessionAutosaver()
@@ -0,0 +1,588 @@
+"""
+Session Importer - Bulk import of historical sessions from other tracking apps.
+
+Accepts CSV (Strong/Hevy-style, one row per set or per exercise) or NDJSON
+exports. Rows are parsed straight off the upload stream and folded into one
+session per (date, workout) and one exercise entry per (date, workout,
+exercise); that triple is the dedupe key, both within the file and against
+sessions the user already has. Imported session IDs are derived from the key,
+so re-importing the same file overwrites rather than duplicates.
+
+Writes are grouped into batched commits: sessions first, then the merged
+exercise_history docs, then a single personal records update computed from
+the best weight per exercise across the whole import (instead of one PR pass
+per session as /complete does).
+"""
+
+import asyncio
+import codecs
+import csv
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..config.firebase_config import firestore, FieldPath
+from .exercise_analytics import ExerciseAnalyticsService
+from ..models import ExerciseHistory, ExercisePerformance, SetDetail, WorkoutSession
+
+logger = logging.getLogger(__name__)
+
+# Writes per batched commit (Firestore caps a batch at 500)
+IMPORT_BATCH_SIZE = 400
+
+# Page size when reading the user's existing sessions, workouts and exercise history
+IMPORT_SCAN_PAGE_SIZE = 500
+
+MAX_IMPORT_ERRORS = 50
+RECENT_SESSIONS_KEPT = 5
+
+# Known column names (lowercase) across common app exports
+COLUMN_ALIASES = {
+    "date": ["date", "start_time", "started_at", "workout date", "day", "datetime"],
+    "workout": ["workout", "workout_name", "workout name", "title", "routine", "routine name"],
+    "exercise": ["exercise", "exercise_name", "exercise name", "exercise_title", "movement"],
+    "set": ["set", "set_order", "set order", "set_index", "set_number", "set #"],
+    "weight": ["weight", "load", "weight_lbs", "weight_kg"],
+    "weight_unit": ["weight_unit", "weight unit", "unit", "units"],
+    "reps": ["reps", "repetitions", "rep"],
+    "duration": ["duration", "duration_minutes", "duration (min)"],
+    "notes": ["notes", "note", "exercise notes"],
+}
+
+DATE_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y",
+    "%d %b %Y, %H:%M",
+    "%d %b %Y",
+]
+
+DEFAULT_WORKOUT_NAME = "Imported Workout"
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return parsed.replace(tzinfo=None)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_number(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return None
+
+
+def _format_weight(value: float) -> str:
+    return str(int(value)) if value == int(value) else str(round(value, 2))
+
+
+def _parse_duration(value: Any) -> Optional[int]:
+    """Minutes from '45', '45m' or '1h 5m'"""
+    if value is None or value == "":
+        return None
+    number = _parse_number(value)
+    if number is not None:
+        return int(number)
+    match = re.fullmatch(r"\s*(?:(\d+)\s*h)?\s*(?:(\d+)\s*m(?:in)?)?\s*", str(value))
+    if match and any(match.groups()):
+        return int(match.group(1) or 0) * 60 + int(match.group(2) or 0)
+    return None
+
+
+def _sort_date(value: Any) -> datetime:
+    """Comparable naive datetime (stored dates come back tz-aware, parsed ones are naive)"""
+    if not isinstance(value, datetime):
+        return datetime.min
+    return value.replace(tzinfo=None)
+
+
+def _session_id(day: str, workout_key: str) -> str:
+    digest = hashlib.sha1(f"{day}|{workout_key}".encode("utf-8")).hexdigest()
+    return f"session-import-{day.replace('-', '')}-{digest[:8]}"
+
+
+def dedupe_key(day: str, workout_name: str, exercise_name: str) -> Tuple[str, str, str]:
+    return (day, workout_name.strip().lower(), exercise_name.strip().lower())
+
+
+class ImportedRow:
+    """One normalized row (a set, or a whole exercise when the export has no set column)"""
+
+    __slots__ = ("started_at", "workout", "exercise", "set_number", "weight", "weight_unit", "reps", "duration", "notes")
+
+    def __init__(self, started_at, workout, exercise, set_number, weight, weight_unit, reps, duration, notes):
+        self.started_at = started_at
+        self.workout = workout
+        self.exercise = exercise
+        self.set_number = set_number
+        self.weight = weight
+        self.weight_unit = weight_unit
+        self.reps = reps
+        self.duration = duration
+        self.notes = notes
+
+    @property
+    def day(self) -> str:
+        return self.started_at.date().isoformat()
+
+
+def _normalize_row(raw: Dict[str, Any], columns: Dict[str, str]) -> ImportedRow:
+    """Map a raw row onto ImportedRow using the resolved column names"""
+    def get(field):
+        column = columns.get(field)
+        value = raw.get(column) if column else None
+        return value.strip() if isinstance(value, str) else value
+
+    started_at = _parse_date(str(get("date") or ""))
+    if started_at is None:
+        raise ValueError(f"unrecognized date '{get('date')}'")
+    exercise = get("exercise")
+    if not exercise:
+        raise ValueError("missing exercise name")
+
+    weight_unit = (get("weight_unit") or "").lower()
+    if weight_unit not in ("lbs", "kg"):
+        weight_unit = "kg" if (columns.get("weight") or "").endswith("kg") or weight_unit in ("kgs", "kilograms") else "lbs"
+
+    # Checked here so a bad row is counted as invalid instead of failing the
+    # whole import when the session models are built (negative weights are how
+    # some apps record assisted lifts)
+    set_number = _parse_number(get("set"))
+    reps = _parse_number(get("reps"))
+    if reps is not None and reps < 0:
+        raise ValueError(f"negative reps '{get('reps')}'")
+    weight = _parse_number(get("weight"))
+    if weight is not None and weight < 0:
+        raise ValueError(f"negative weight '{get('weight')}'")
+    duration = _parse_duration(get("duration"))
+    if duration is not None and duration < 0:
+        raise ValueError(f"negative duration '{get('duration')}'")
+    return ImportedRow(
+        started_at=started_at,
+        workout=str(get("workout") or DEFAULT_WORKOUT_NAME)[:100],
+        exercise=str(exercise)[:100],
+        set_number=int(set_number) + (1 if columns.get("set") == "set_index" else 0) if set_number is not None else None,
+        weight=weight,
+        weight_unit=weight_unit,
+        reps=int(reps) if reps is not None else None,
+        duration=duration,
+        notes=str(get("notes"))[:200] if get("notes") else None,
+    )
+
+
+def _resolve_columns(fieldnames) -> Dict[str, str]:
+    lowered = {name.strip().lower(): name for name in fieldnames if name}
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lowered:
+                columns[field] = lowered[alias]
+                break
+    return columns
+
+
+def iter_rows(stream, fmt: str, report: Dict[str, Any]) -> Iterator[ImportedRow]:
+    """
+    Stream normalized rows from a binary file object.
+
+    Unparseable rows are skipped, counted in report["invalid_rows"] and
+    described in report["errors"] (capped at MAX_IMPORT_ERRORS).
+    """
+    text = codecs.getreader("utf-8-sig")(stream, errors="replace")
+    line_number = 0
+    report.setdefault("invalid_rows", 0)
+    report.setdefault("errors", [])
+
+    def fail(message):
+        report["invalid_rows"] += 1
+        if len(report["errors"]) < MAX_IMPORT_ERRORS:
+            report["errors"].append(f"Line {line_number}: {message}")
+
+    if fmt == "ndjson":
+        # Objects may carry different keys; resolve columns once per key set
+        columns_by_keys: Dict[frozenset, Dict[str, str]] = {}
+        for line in text:
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                raw = json.loads(line)
+                if not isinstance(raw, dict):
+                    raise ValueError("expected a JSON object")
+                keys = frozenset(raw)
+                columns = columns_by_keys.get(keys)
+                if columns is None:
+                    columns = columns_by_keys[keys] = _resolve_columns(keys)
+                yield _normalize_row(raw, columns)
+            except ValueError as e:
+                fail(str(e))
+        return
+
+    reader = csv.DictReader(text)
+    columns = _resolve_columns(reader.fieldnames or [])
+    missing = [field for field in ("date", "exercise") if field not in columns]
+    if missing:
+        raise ValueError(f"CSV is missing required column(s): {', '.join(missing)}")
+
+    for raw in reader:
+        line_number = reader.line_num
+        try:
+            yield _normalize_row(raw, columns)
+        except ValueError as e:
+            fail(str(e))
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or (content_type or "").endswith(("ndjson", "jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+class SessionImporter:
+    """Folds exported rows into sessions and writes them with batched commits"""
+
+    def __init__(self, firestore_service, batch_size: int = IMPORT_BATCH_SIZE):
+        self.firestore_service = firestore_service
+        self.batch_size = max(1, min(batch_size, 500))
+
+    @property
+    def db(self):
+        return self.firestore_service.db
+
+    def _user_ref(self, user_id: str):
+        return self.db.collection('users').document(user_id)
+
+    def _iter_docs(self, collection_ref) -> Iterator[Any]:
+        last_doc = None
+        while True:
+            query = collection_ref.order_by(FieldPath.document_id()).limit(IMPORT_SCAN_PAGE_SIZE)
+            if last_doc is not None:
+                query = query.start_after(last_doc)
+            docs = list(query.stream())
+            yield from docs
+            if len(docs) < IMPORT_SCAN_PAGE_SIZE:
+                return
+            last_doc = docs[-1]
+
+    # ── Existing data ────────────────────────────────────────────────────
+
+    def _existing_keys(self, user_id: str) -> set:
+        """Dedupe keys for sessions logged in the app (imported sessions are overwritten by ID instead)"""
+        keys = set()
+        for doc in self._iter_docs(self._user_ref(user_id).collection('workout_sessions')):
+            if doc.id.startswith("session-import-"):
+                continue
+            data = doc.to_dict() or {}
+            started_at = data.get('started_at')
+            if not isinstance(started_at, datetime):
+                continue
+            day = started_at.date().isoformat()
+            for exercise in data.get('exercises_performed') or []:
+                keys.add(dedupe_key(day, data.get('workout_name') or "", exercise.get('exercise_name') or ""))
+        return keys
+
+    def _workout_ids_by_name(self, user_id: str) -> Dict[str, str]:
+        ids = {}
+        for doc in self._iter_docs(self._user_ref(user_id).collection('workouts')):
+            name = ((doc.to_dict() or {}).get('name') or "").strip().lower()
+            if name:
+                ids.setdefault(name, doc.id)
+        return ids
+
+    # ── Folding ──────────────────────────────────────────────────────────
+
+    def fold_rows(self, rows: Iterator[ImportedRow], existing_keys: set) -> Tuple[Dict[Tuple[str, str], Dict[str, Any]], Dict[str, int]]:
+        """
+        Group rows into sessions keyed by (day, workout) with exercises keyed by name.
+
+        Returns:
+            Tuple of (sessions, counters)
+        """
+        sessions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        counters = {"rows": 0, "duplicate_rows": 0, "skipped_existing": 0}
+
+        for row in rows:
+            counters["rows"] += 1
+            key = dedupe_key(row.day, row.workout, row.exercise)
+            if key in existing_keys:
+                counters["skipped_existing"] += 1
+                continue
+
+            session = sessions.setdefault(key[:2], {
+                "workout_name": row.workout, "started_at": row.started_at, "duration": None, "exercises": {},
+            })
+            session["started_at"] = min(session["started_at"], row.started_at)
+            if row.duration:
+                session["duration"] = max(session["duration"] or 0, row.duration)
+
+            exercise = session["exercises"].setdefault(key[2], {
+                "name": row.exercise, "weight_unit": row.weight_unit, "sets": {}, "notes": row.notes,
+            })
+            set_number = row.set_number or len(exercise["sets"]) + 1
+            if set_number in exercise["sets"]:
+                counters["duplicate_rows"] += 1
+                continue
+            exercise["sets"][set_number] = (row.weight, row.reps)
+
+        return sessions, counters
+
+    def build_session(self, day: str, workout_key: str, folded: Dict[str, Any], workout_id: str) -> WorkoutSession:
+        exercises = []
+        for index, exercise in enumerate(folded["exercises"].values()):
+            sets = sorted(exercise["sets"].items())
+            weights = [w for _, (w, _) in sets if w is not None]
+            top = max(weights) if weights else None
+            top_reps = next((r for _, (w, r) in sets if w == top and r is not None), None) if top is not None else None
+            reps = [r for _, (_, r) in sets if r is not None]
+
+            exercises.append(ExercisePerformance(
+                exercise_name=exercise["name"],
+                group_id=f"group-{index + 1}",
+                sets_completed=len(sets),
+                target_sets=str(len(sets)),
+                target_reps=str(top_reps or (max(reps) if reps else "")) or "8-12",
+                weight=_format_weight(top) if top is not None else None,
+                weight_unit=exercise["weight_unit"],
+                set_details=[
+                    SetDetail(set_number=n, reps_completed=r, weight=w)
+                    for n, (w, r) in sets if n >= 1
+                ],
+                notes=exercise["notes"],
+                order_index=index,
+            ))
+
+        started_at = folded["started_at"]
+        duration = folded["duration"]
+        return WorkoutSession(
+            id=_session_id(day, workout_key),
+            workout_id=workout_id,
+            workout_name=folded["workout_name"],
+            started_at=started_at,
+            completed_at=started_at + timedelta(minutes=duration or 0),
+            duration_minutes=duration,
+            exercises_performed=exercises,
+            status="completed",
+            session_mode="quick_log",
+            created_at=datetime.now(),
+        )
+
+    # ── Writes ───────────────────────────────────────────────────────────
+
+    def _commit(self, writes: List[Tuple[Any, Dict[str, Any]]]) -> int:
+        """Commit writes in batches. Returns the number of commits."""
+        commits = 0
+        for start in range(0, len(writes), self.batch_size):
+            batch = self.db.batch()
+            for ref, data in writes[start:start + self.batch_size]:
+                batch.set(ref, data)
+            batch.commit()
+            commits += 1
+        return commits
+
+    def _existing_session_ids(self, user_id: str, sessions: List[WorkoutSession]) -> set:
+        """IDs of sessions in this import that an earlier import already wrote"""
+        session_col = self._user_ref(user_id).collection('workout_sessions')
+        existing = set()
+        for start in range(0, len(sessions), IMPORT_SCAN_PAGE_SIZE):
+            refs = [session_col.document(s.id) for s in sessions[start:start + IMPORT_SCAN_PAGE_SIZE]]
+            existing.update(doc.id for doc in self.db.get_all(refs) if doc.exists)
+        return existing
+
+    def _merged_histories(
+        self,
+        user_id: str,
+        sessions: List[WorkoutSession],
+        previously_imported: set
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        """One exercise_history doc per (workout_id, exercise), merged with what's already stored"""
+        entries: Dict[str, List[Dict[str, Any]]] = {}
+        for session in sessions:
+            for exercise in session.exercises_performed:
+                entries.setdefault(f"{session.workout_id}_{exercise.exercise_name}", []).append({
+                    'session_id': session.id,
+                    'date': session.completed_at,
+                    'weight': exercise.weight,
+                    'weight_unit': exercise.weight_unit,
+                    'sets': exercise.sets_completed,
+                    '_workout_id': session.workout_id,
+                    '_exercise_name': exercise.exercise_name,
+                })
+
+        history_col = self._user_ref(user_id).collection('exercise_history')
+        refs = {history_id: history_col.document(history_id) for history_id in entries}
+        history_ids = list(refs)
+        stored: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(history_ids), IMPORT_SCAN_PAGE_SIZE):
+            page = [refs[history_id] for history_id in history_ids[start:start + IMPORT_SCAN_PAGE_SIZE]]
+            stored.update((doc.id, doc.to_dict()) for doc in self.db.get_all(page) if doc.exists)
+
+        writes = []
+        for history_id, imported in entries.items():
+            ref = refs[history_id]
+            current = stored.get(history_id, {})
+            workout_id, exercise_name = imported[0]['_workout_id'], imported[0]['_exercise_name']
+            imported = [{k: v for k, v in e.items() if not k.startswith('_')} for e in imported]
+
+            # Sessions written by an earlier import were already counted; only new ones add to the total
+            imported_ids = {e['session_id'] for e in imported}
+            recent = [s for s in current.get('recent_sessions', []) if s.get('session_id') not in imported_ids]
+            timeline = sorted(recent + imported, key=lambda s: _sort_date(s.get('date')), reverse=True)
+            latest = timeline[0]
+            added = sum(1 for e in imported if e['session_id'] not in previously_imported)
+
+            weighted = [s for s in timeline if _parse_number(s.get('weight')) is not None]
+            best = max(weighted, key=lambda s: _parse_number(s['weight']), default=None)
+            current_best = _parse_number(current.get('best_weight'))
+            if best is not None and current_best is not None and current_best >= _parse_number(best['weight']):
+                best = {'weight': current.get('best_weight'), 'date': current.get('best_weight_date')}
+
+            dates = [s['date'] for s in imported] + ([current['first_session_date']] if current.get('first_session_date') else [])
+            history = ExerciseHistory(
+                id=history_id,
+                workout_id=workout_id,
+                exercise_name=exercise_name,
+                last_weight=latest.get('weight'),
+                last_weight_unit=latest.get('weight_unit', 'lbs'),
+                last_session_id=latest.get('session_id'),
+                last_session_date=latest.get('date'),
+                last_weight_direction=current.get('last_weight_direction') if latest in recent else None,
+                total_sessions=current.get('total_sessions', 0) + added,
+                first_session_date=min(dates, key=_sort_date),
+                best_weight=best['weight'] if best else current.get('best_weight'),
+                best_weight_date=best['date'] if best else current.get('best_weight_date'),
+                recent_sessions=timeline[:RECENT_SESSIONS_KEPT],
+            )
+            data = history.model_dump()
+            data['updated_at'] = firestore.SERVER_TIMESTAMP
+            writes.append((ref, data))
+        return writes
+
+    def _rebuild_personal_records(self, user_id: str, sessions: List[WorkoutSession]) -> int:
+        """Raise tracked weight PRs to the best imported weight, in one update. Returns PRs updated."""
+        pr_ref = self._user_ref(user_id).collection('data').document('personal_records')
+        pr_doc = pr_ref.get()
+        if not pr_doc.exists:
+            return 0
+        records = (pr_doc.to_dict() or {}).get('records', {})
+        tracked = {
+            (pr.get('exercise_name') or '').lower(): (pr_id, pr)
+            for pr_id, pr in records.items() if pr.get('pr_type') == 'weight'
+        }
+        if not tracked:
+            return 0
+
+        # Best imported weight per exercise name
+        bests: Dict[str, Tuple[float, WorkoutSession, ExercisePerformance]] = {}
+        for session in sessions:
+            for exercise in session.exercises_performed:
+                weight = _parse_number(exercise.weight)
+                name = exercise.exercise_name.lower()
+                if weight is not None and (name not in bests or weight > bests[name][0]):
+                    bests[name] = (weight, session, exercise)
+
+        updates = {}
+        for name, (weight, session, exercise) in bests.items():
+            match = tracked.get(name) or next(
+                (m for tracked_name, m in tracked.items() if tracked_name in name or name in tracked_name), None
+            )
+            if not match:
+                continue
+            pr_id, pr = match
+            current_value = _parse_number(pr.get('value')) or 0
+            if f'records.{pr_id}.value' in updates:
+                current_value = max(current_value, float(updates[f'records.{pr_id}.value']))
+            if weight <= current_value:
+                continue
+            updates[f'records.{pr_id}.value'] = exercise.weight
+            updates[f'records.{pr_id}.session_id'] = session.id
+            updates[f'records.{pr_id}.session_date'] = session.completed_at
+            updates[f'records.{pr_id}.marked_at'] = datetime.now().isoformat()
+            updates[f'records.{pr_id}.is_manual'] = False
+
+        if not updates:
+            return 0
+        updates['lastUpdated'] = firestore.SERVER_TIMESTAMP
+        pr_ref.update(updates)
+        return sum(1 for k in updates if k.endswith('.value'))
+
+    # ── Entry point ──────────────────────────────────────────────────────
+
+    def run(self, user_id: str, stream, fmt: str = "csv", dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Import sessions from a binary stream. Blocking; call via asyncio.to_thread.
+
+        Returns:
+            Dict with row/session counters, commits and (capped) per-row errors
+        """
+        report: Dict[str, Any] = {}
+        existing_keys = self._existing_keys(user_id)
+        folded, counters = self.fold_rows(iter_rows(stream, fmt, report), existing_keys)
+
+        workout_ids = self._workout_ids_by_name(user_id)
+        sessions = []
+        for (day, workout_key), data in sorted(folded.items()):
+            if not data["exercises"]:
+                continue
+            workout_id = workout_ids.get(workout_key) or f"imported-{re.sub(r'[^a-z0-9]+', '-', workout_key).strip('-') or 'workout'}"
+            sessions.append(self.build_session(day, workout_key, data, workout_id))
+
+        result = {
+            **counters,
+            "invalid_rows": report["invalid_rows"],
+            "sessions": len(sessions),
+            "exercises": sum(len(s.exercises_performed) for s in sessions),
+            "dry_run": dry_run,
+            "errors": report["errors"],
+        }
+        if dry_run or not sessions:
+            return {**result, "histories": 0, "personal_records_updated": 0, "commits": 0}
+
+        previously_imported = self._existing_session_ids(user_id, sessions)
+        session_col = self._user_ref(user_id).collection('workout_sessions')
+        session_writes = []
+        for session in sessions:
+            data = session.model_dump()
+            data['created_at'] = firestore.SERVER_TIMESTAMP
+            data['modified_date'] = firestore.SERVER_TIMESTAMP
+            session_writes.append((session_col.document(session.id), data))
+        commits = self._commit(session_writes)
+
+        history_writes = self._merged_histories(user_id, sessions, previously_imported)
+        commits += self._commit(history_writes)
+
+        prs_updated = self._rebuild_personal_records(user_id, sessions)
+
+        try:
+            ExerciseAnalyticsService(self.db).apply_sessions(user_id, sessions)
+        except Exception as e:
+            logger.error(f"Failed to update exercise analytics after import: {str(e)}")
+
+        logger.info(f"Imported {len(sessions)} sessions ({result['exercises']} exercises) for user {user_id} "
+                    f"in {commits} commits; {prs_updated} PRs updated")
+        return {**result, "histories": len(history_writes), "personal_records_updated": prs_updated, "commits": commits}
+
+
+async def import_sessions(firestore_service, user_id: str, stream, fmt: str = "csv", dry_run: bool = False) -> Dict[str, Any]:
+    """Run a SessionImporter off the event loop"""
+    importer = SessionImporter(firestore_service)
+    return await asyncio.to_thread(importer.run, user_id, stream, fmt, dry_run)
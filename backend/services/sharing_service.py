@@ -11,44 +11,18 @@ from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
-try:
-    from firebase_admin import firestore
-    FIRESTORE_AVAILABLE = True
-except ImportError:
-    FIRESTORE_AVAILABLE = False
-    firestore = None
-
-from ..config.firebase_config import get_firebase_app
+from ..config.firebase_config import firestore
 from ..models import (
     PublicWorkout, PrivateShare, SharedWorkoutStats,
     ShareWorkoutPublicRequest, ShareWorkoutPrivateRequest,
     SavePublicWorkoutRequest, WorkoutTemplate
 )
+from .lazy_firestore import LazyFirestoreService
 
-class SharingService:
+class SharingService(LazyFirestoreService):
     """Service for workout sharing operations"""
     
-    def __init__(self):
-        """Initialize sharing service"""
-        if not FIRESTORE_AVAILABLE:
-            logger.warning("Firestore not available - sharing service disabled")
-            self.db = None
-            self.available = False
-            return
-        
-        try:
-            app = get_firebase_app()
-            if app:
-                self.db = firestore.client(app=app)
-                self.available = True
-                logger.info("Sharing service initialized successfully")
-            else:
-                self.db = None
-                self.available = False
-        except Exception as e:
-            logger.error(f"Failed to initialize sharing service: {str(e)}")
-            self.db = None
-            self.available = False
+    service_name = "Sharing"
     
     def is_available(self) -> bool:
         """Check if service is available"""
@@ -208,7 +182,7 @@ class SharingService:
                     logger.warning(f"Failed to parse public workout {doc.id}: {str(e)}")
                     continue
             
-            logger.info(f"Retrieved {len(workouts)} public workouts (page {page})")
+            logger.debug(f"Retrieved {len(workouts)} public workouts (page {page})")
             
             return {
                 "workouts": workouts,
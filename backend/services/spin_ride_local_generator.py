@@ -0,0 +1,552 @@
+"""
+Local Spin Ride Generator - Builds spin ride plans without calling Gemini.
+
+Rides are assembled from the rules the Gemini prompt in spin_ride_generator.py
+describes: a progressive warm-up, then build/peak cycles drawn from the prompt's
+interval patterns (rolling hills, ladder, heavy climb block, surges, attack
+series), each cycle peaking higher than the last, ending on a final push.
+All-outs are placed after hard efforts and followed by recovery or flat road.
+
+Every plan is checked with validate_spin_ride_plan before it is returned. No
+network calls and no rate limit, so it doubles as the fallback when Gemini is
+slow or unavailable.
+"""
+
+import logging
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from .spin_ride_validator import _all_out_count_for_duration, validate_spin_ride_plan
+
+logger = logging.getLogger(__name__)
+
+# Fresh layouts tried before giving up on a request
+MAX_ATTEMPTS = 8
+
+# Duration bounds per segment type (seconds); all-outs and warm-ups are fixed length
+_DURATION_BOUNDS = {
+    "flat": (30, 240),
+    "climb": (30, 240),
+    "sprint": (30, 120),
+    "recovery": (30, 120),
+}
+
+# Resistance ranges per difficulty, taken from the prompt's difficulty profiles.
+# Climb and power sprint resistance escalates from the low end (first cycle)
+# to the high end (final cycle).
+_PROFILES = {
+    "easy": {
+        "flat": (4, 5), "climb": (5, 6), "sprint": (4, 5), "all_out": (5, 6),
+        "standing": False, "kcal_per_min": 8,
+        "patterns": ["rolling_hills", "surge"],
+    },
+    "moderate": {
+        "flat": (5, 6), "climb": (6, 8), "sprint": (4, 6), "all_out": (5, 7),
+        "standing": True, "kcal_per_min": 9,
+        "patterns": ["rolling_hills", "ladder", "surge", "heavy_climb"],
+    },
+    "hard": {
+        "flat": (5, 7), "climb": (7, 9), "sprint": (5, 7), "all_out": (6, 8),
+        "standing": True, "kcal_per_min": 11,
+        "patterns": ["rolling_hills", "ladder", "surge", "heavy_climb", "attack"],
+    },
+    "intense": {
+        "flat": (6, 8), "climb": (8, 10), "sprint": (5, 8), "all_out": (7, 8),
+        "standing": True, "kcal_per_min": 12,
+        "patterns": ["ladder", "surge", "heavy_climb", "attack"],
+    },
+}
+
+# Segment grammar: each pattern is a sequence of (segment_type, nominal seconds, role).
+# Nominal lengths are scaled to fit the cycle's time budget.
+_PATTERNS = {
+    "rolling_hills": [
+        ("flat", 90, "flat"), ("climb", 90, "climb_base"), ("recovery", 60, "recovery"),
+        ("climb", 90, "climb_peak"), ("recovery", 60, "recovery"),
+    ],
+    "ladder": [
+        ("sprint", 30, "sprint_light"), ("recovery", 45, "recovery"),
+        ("sprint", 45, "sprint_light"), ("recovery", 45, "recovery"),
+        ("sprint", 60, "sprint_power"), ("recovery", 60, "recovery"),
+    ],
+    "heavy_climb": [
+        ("climb", 90, "climb_base"), ("climb", 60, "climb_mid"),
+        ("climb", 60, "climb_peak"), ("recovery", 90, "recovery"),
+    ],
+    "surge": [
+        ("flat", 90, "flat"), ("climb", 30, "surge"), ("flat", 60, "flat"),
+        ("climb", 30, "surge_peak"), ("recovery", 60, "recovery"),
+    ],
+    "attack": [
+        ("sprint", 30, "sprint_power"), ("recovery", 30, "recovery"),
+        ("sprint", 30, "sprint_power"), ("recovery", 30, "recovery"),
+        ("sprint", 30, "sprint_power"), ("recovery", 30, "recovery"),
+    ],
+}
+
+_NAMES = {
+    "warmup": ["Warm Up", "Easy Spin In", "Roll Out"],
+    "flat": ["Flat Road", "Steady Build", "Tempo Road", "Open Road", "Cruise Control", "Settle In"],
+    "climb_seated": ["Seated Climb", "Hill Climb", "Rolling Hill", "Long Grind", "Gradient Build"],
+    "climb_standing": ["Standing Climb", "Heavy Hill", "Summit Push", "Standing Grind", "Mountain Pass"],
+    "surge": ["Surge", "Power Surge", "Pickup"],
+    "sprint_light": ["Speed Sprint", "Quick Feet", "Cadence Burst", "Spin Up"],
+    "sprint_power": ["Power Sprint", "Attack Sprint", "Heavy Sprint", "Breakaway"],
+    "recovery": ["Recovery", "Easy Spin", "Active Recovery", "Shake It Out", "Reset"],
+    "all_out": ["All Out", "Max Effort", "Empty the Tank", "Full Gas"],
+    "final": ["Final Push", "Finish Line", "Last Effort", "Peak Push"],
+}
+
+_CUES = {
+    "warmup": [
+        "Easy spin, find your rhythm",
+        "Start light and add a little resistance each minute",
+        "Loosen up, steady breaths, settle into the saddle",
+    ],
+    "flat": [
+        "Steady road, find a cadence you can hold",
+        "Smooth circles, stay relaxed through the shoulders",
+        "Building into the next effort, keep it controlled",
+        "Light grip on the bars, quiet upper body",
+        "Settle in and breathe, the work is coming",
+    ],
+    "climb_seated": [
+        "Sit heavy in the saddle and drive through your heels",
+        "Imagine the hill steepening, stay seated and strong",
+        "Slow grind, exhale on each push",
+        "Legs are heavy but strong, keep the pedals turning",
+    ],
+    "climb_standing": [
+        "Out of the saddle, hands wide on the bars",
+        "Standing, heavy legs, push through the top of the stroke",
+        "This is the steep part, breathe through it",
+        "Stay tall, let your body weight drive the pedals",
+    ],
+    "surge": [
+        "Add resistance and surge, short and sharp",
+        "Quick pickup, then we settle back down",
+        "Push the pace for this one, you can hold anything for 30s",
+    ],
+    "sprint_light": [
+        "Light on the saddle, spin those legs",
+        "Quick feet, stay in control",
+        "Fast cadence, keep your hips still",
+    ],
+    "sprint_power": [
+        "Heavy and fast, this is a power sprint",
+        "Chase the rider in front of you",
+        "Drive the pedals down, don't let the cadence drop",
+    ],
+    "recovery": [
+        "Shake it out, easy spin",
+        "Easy spin, let your heart rate come down",
+        "You earned this rest, breathe deep",
+        "Drop the resistance and recover fully",
+        "Sip of water, reset for what's next",
+    ],
+    "all_out": [
+        "Everything you have, right now!",
+        "Max effort, empty the tank!",
+        "All out, leave nothing on the bike!",
+    ],
+    "final": [
+        "Last effort, finish strong!",
+        "This is what you trained for, push to the line",
+        "Give it everything on the way home",
+    ],
+}
+
+_TITLES = [
+    "Rolling Thunder", "Summit Push", "Cadence Burner", "Hill Repeats", "Peak Chaser",
+    "Valley to Summit", "Power Pyramid", "Breakaway", "Climb and Conquer", "Road Rhythm",
+    "Tempo Trail", "Switchback Session", "Heartbeat Hills", "Full Throttle", "Staircase Ride",
+]
+
+
+def _warmup_seconds(duration_minutes: int) -> int:
+    """2-4 min for short rides, 4-5 min for 30+ min rides"""
+    if duration_minutes < 10:
+        return 120
+    if duration_minutes < 20:
+        return 180
+    if duration_minutes < 30:
+        return 240
+    return 300
+
+
+def _cycle_count(duration_minutes: int) -> int:
+    """Build/peak cycles per the prompt's energy curve by ride length"""
+    if duration_minutes <= 15:
+        return 1
+    if duration_minutes <= 25:
+        return 2
+    if duration_minutes <= 45:
+        return 3
+    if duration_minutes <= 60:
+        return 4
+    return 5
+
+
+def _split_budget(total: int, parts: int) -> List[int]:
+    """Split seconds into near-equal multiples of 15, remainder to the last part"""
+    share = (total // parts) // 15 * 15
+    return [share] * (parts - 1) + [total - share * (parts - 1)]
+
+
+def _escalate(bounds: Tuple[int, int], level: float) -> int:
+    """Pick a value between low and high bounds for an energy level in 0..1"""
+    low, high = bounds
+    return low + round((high - low) * level)
+
+
+class _Picker:
+    """Rotates through name/cue pools so a ride avoids repeating itself"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self._queues: Dict[str, List[str]] = {}
+        self._name_counts: Dict[str, int] = {}
+
+    def _next(self, pool_name: str, pool: Dict[str, List[str]]) -> str:
+        queue = self._queues.setdefault(f"{id(pool)}:{pool_name}", [])
+        if not queue:
+            queue.extend(self.rng.sample(pool[pool_name], len(pool[pool_name])))
+        return queue.pop()
+
+    def name(self, pool_name: str) -> str:
+        name = self._next(pool_name, _NAMES)
+        count = self._name_counts.get(name, 0) + 1
+        self._name_counts[name] = count
+        return name if count == 1 else f"{name} {count}"
+
+    def cue(self, pool_name: str) -> str:
+        return self._next(pool_name, _CUES)
+
+
+class LocalSpinRideGenerator:
+    """Builds spin ride plans from segment grammars and energy-curve templates."""
+
+    def is_available(self) -> bool:
+        """Always available - no API key or network needed."""
+        return True
+
+    def generate(
+        self,
+        duration_minutes: int,
+        include_all_outs: bool = False,
+        difficulty: Optional[str] = None,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Generate a spin ride plan for the given duration.
+
+        Args:
+            duration_minutes: Ride duration in minutes (5-120)
+            include_all_outs: If True, include all-out segments, bounded by duration
+            difficulty: Requested difficulty level (easy/moderate/hard/intense).
+                        If None, defaults to moderate.
+            seed: Optional seed for a reproducible ride
+
+        Returns:
+            Dict matching SpinRidePlan schema
+        """
+        resolved_difficulty = difficulty or "moderate"
+        if resolved_difficulty not in _PROFILES:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        if duration_minutes < 5:
+            raise ValueError("Rides must be at least 5 minutes")
+
+        rng = random.Random(seed)
+        last_problem = None
+        for _ in range(MAX_ATTEMPTS):
+            plan = self._build_plan(rng, duration_minutes, include_all_outs, resolved_difficulty)
+            if plan is None:
+                last_problem = "segments could not be fitted to the ride duration"
+                continue
+
+            result = validate_spin_ride_plan(plan, include_all_outs=include_all_outs)
+            if result.ok and not result.warnings:
+                return plan
+            last_problem = (result.errors or result.warnings)[0]
+
+        raise ValueError(f"Could not build a valid {duration_minutes}-minute ride: {last_problem}")
+
+    # ── Plan assembly ────────────────────────────────────────────────────
+
+    def _build_plan(
+        self,
+        rng: random.Random,
+        duration_minutes: int,
+        include_all_outs: bool,
+        difficulty: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Assemble one candidate ride, or None if the layout can't be fitted"""
+        profile = _PROFILES[difficulty]
+        picker = _Picker(rng)
+        total_seconds = duration_minutes * 60
+        warmup_seconds = _warmup_seconds(duration_minutes)
+        body_seconds = total_seconds - warmup_seconds
+
+        # Compose cycles of slots: (segment_type, nominal seconds, role, energy level)
+        cycles = _cycle_count(duration_minutes)
+        slots: List[Tuple[str, int, str, float]] = []
+        previous_pattern = None
+        for index, budget in enumerate(_split_budget(body_seconds, cycles)):
+            level = index / (cycles - 1) if cycles > 1 else 1.0
+            cycle, previous_pattern = self._compose_cycle(
+                rng, profile, budget, previous_pattern, final=(index == cycles - 1)
+            )
+            slots.extend((seg_type, seconds, role, level) for seg_type, seconds, role in cycle)
+
+        segments = [self._resolve_slot(picker, profile, *slot) for slot in slots]
+
+        if include_all_outs:
+            lo, hi = _all_out_count_for_duration(duration_minutes)
+            self._insert_all_outs(rng, picker, profile, segments, rng.randint(lo, (lo + hi) // 2))
+
+        if not self._fit_durations(segments, body_seconds):
+            return None
+        self._break_moderate_runs(segments, profile)
+
+        plan_segments = self._warmup_segments(picker, warmup_seconds, difficulty) + segments
+        for seg in plan_segments:
+            seg.pop("_nominal", None)
+            seg.pop("_fixed", None)
+
+        return {
+            "title": rng.choice(_TITLES),
+            "duration_minutes": duration_minutes,
+            "total_seconds": total_seconds,
+            "segments": plan_segments,
+            "estimated_calories": profile["kcal_per_min"] * duration_minutes,
+            "difficulty": difficulty,
+        }
+
+    def _compose_cycle(
+        self,
+        rng: random.Random,
+        profile: Dict[str, Any],
+        budget: int,
+        previous_pattern: Optional[str],
+        final: bool,
+    ) -> Tuple[List[Tuple[str, int, str]], Optional[str]]:
+        """Chain patterns until they roughly fill the budget; the final cycle ends on a push"""
+        slots: List[Tuple[str, int, str]] = []
+        while not slots or sum(s[1] for s in slots) < budget * 0.8:
+            choices = [p for p in profile["patterns"] if p != previous_pattern] or profile["patterns"]
+            previous_pattern = rng.choice(choices)
+            slots.extend(_PATTERNS[previous_pattern])
+
+        if final:
+            while slots and slots[-1][0] == "recovery":
+                slots.pop()
+            push_type = rng.choice(["climb", "sprint"])
+            slots.append((push_type, 90 if push_type == "climb" else 60, "final"))
+
+        # Short budgets: drop leading slots so every segment keeps ~40s or more
+        while len(slots) > 2 and len(slots) * 40 > budget:
+            slots.pop(0)
+            while len(slots) > 2 and slots[0][0] == "recovery":
+                slots.pop(0)
+
+        return slots, previous_pattern
+
+    def _resolve_slot(
+        self,
+        picker: _Picker,
+        profile: Dict[str, Any],
+        seg_type: str,
+        seconds: int,
+        role: str,
+        level: float,
+    ) -> Dict[str, Any]:
+        """Turn a grammar slot into a segment with resistance, cadence, name and cue"""
+        climb_peak = _escalate(profile["climb"], level)
+        climb_low = profile["climb"][0]
+
+        if role == "recovery":
+            resistance, rpm, names, cues = 2 if level >= 0.5 else 3, (70, 85), "recovery", "recovery"
+        elif role == "flat":
+            resistance, rpm, names, cues = _escalate(profile["flat"], level), (85, 100), "flat", "flat"
+        elif role in ("sprint_light", "sprint_power") or (role == "final" and seg_type == "sprint"):
+            power = role != "sprint_light"
+            resistance = _escalate(profile["sprint"], level) if power else profile["sprint"][0]
+            if not profile["standing"]:
+                rpm = (90, 100)
+            elif power and resistance >= 6:
+                rpm = (95, 110)
+            else:
+                rpm = (100, 115)
+            names = cues = "final" if role == "final" else role
+        else:
+            offsets = {"climb_base": 2, "surge": 1, "climb_mid": 1, "surge_peak": 0, "climb_peak": 0, "final": 0}
+            resistance = max(climb_low, climb_peak - offsets[role])
+            standing = profile["standing"] and resistance >= 8
+            rpm = (55, 70) if standing else (65, 80)
+            if role == "final":
+                names, cues = "final", "final"
+            elif role.startswith("surge"):
+                names, cues = "surge", "surge"
+            else:
+                names = cues = "climb_standing" if standing else "climb_seated"
+
+        return {
+            "name": picker.name(names),
+            "segment_type": seg_type,
+            "duration_seconds": seconds,
+            "resistance": resistance,
+            "rpm_low": rpm[0],
+            "rpm_high": rpm[1],
+            "cue": picker.cue(cues),
+            "_nominal": seconds,
+            "_fixed": False,
+        }
+
+    def _insert_all_outs(
+        self,
+        rng: random.Random,
+        picker: _Picker,
+        profile: Dict[str, Any],
+        segments: List[Dict[str, Any]],
+        count: int,
+    ):
+        """Place all-outs after hard efforts, spread evenly across the ride"""
+        def all_out() -> Dict[str, Any]:
+            seconds = rng.choice([15, 30, 30, 45])
+            return {
+                "name": picker.name("all_out"),
+                "segment_type": "all_out",
+                "duration_seconds": seconds,
+                "resistance": rng.randint(*profile["all_out"]),
+                "rpm_low": 110,
+                "rpm_high": 130,
+                "cue": picker.cue("all_out"),
+                "_nominal": seconds,
+                "_fixed": True,
+            }
+
+        work = {"climb", "sprint"}
+        # Preferred spots already lead into a recovery or flat; otherwise an
+        # all-out between two work segments brings its own short recovery.
+        preferred = [
+            i for i in range(len(segments) - 1)
+            if segments[i]["segment_type"] in work and segments[i + 1]["segment_type"] in {"recovery", "flat"}
+        ]
+        between_work = [
+            i for i in range(len(segments) - 1)
+            if segments[i]["segment_type"] in work and segments[i + 1]["segment_type"] in work
+        ]
+
+        chosen = self._spread(preferred, count)
+        if len(chosen) < count:
+            chosen += self._spread(between_work, count - len(chosen))
+
+        # Insert back to front so earlier indices stay valid
+        for i in sorted(chosen, reverse=True):
+            inserted = [all_out()]
+            if i in between_work:
+                inserted.append(self._resolve_slot(picker, profile, "recovery", 30, "recovery", 1.0))
+            segments[i + 1:i + 1] = inserted
+
+    @staticmethod
+    def _spread(candidates: List[int], count: int) -> List[int]:
+        """Pick up to count evenly spaced items from candidates"""
+        if count <= 0 or not candidates:
+            return []
+        if count >= len(candidates):
+            return list(candidates)
+        step = len(candidates) / count
+        return [candidates[int(step * k + step / 2)] for k in range(count)]
+
+    @staticmethod
+    def _fit_durations(segments: List[Dict[str, Any]], budget: int) -> bool:
+        """
+        Scale adjustable segments so the body adds up to exactly budget seconds.
+        Durations stay in 15s steps within their type's bounds.
+        """
+        adjustable = [s for s in segments if not s["_fixed"]]
+        if not adjustable:
+            return False
+        fixed_total = sum(s["duration_seconds"] for s in segments if s["_fixed"])
+        nominal_total = sum(s["_nominal"] for s in adjustable)
+        scale = (budget - fixed_total) / nominal_total
+
+        for seg in adjustable:
+            low, high = _DURATION_BOUNDS[seg["segment_type"]]
+            seg["duration_seconds"] = max(low, min(high, round(seg["_nominal"] * scale / 15) * 15))
+
+        diff = budget - sum(s["duration_seconds"] for s in segments)
+        while diff:
+            step = 15 if diff > 0 else -15
+            best, best_room = None, 0
+            for seg in adjustable:
+                low, high = _DURATION_BOUNDS[seg["segment_type"]]
+                room = high - seg["duration_seconds"] if step > 0 else seg["duration_seconds"] - low
+                if room > best_room:
+                    best, best_room = seg, room
+            if best is None:
+                return False
+            best["duration_seconds"] += step
+            diff -= step
+        return True
+
+    @staticmethod
+    def _break_moderate_runs(segments: List[Dict[str, Any]], profile: Dict[str, Any]):
+        """Never sit at resistance 5-6 for more than 2 consecutive segments"""
+        def lift_or_drop(seg: Dict[str, Any]) -> bool:
+            if seg["segment_type"] in ("flat", "sprint"):
+                seg["resistance"] = 4
+            elif seg["segment_type"] == "climb" and profile["climb"][1] >= 7:
+                seg["resistance"] = 7
+            elif seg["segment_type"] == "all_out" and profile["all_out"][1] >= 7:
+                seg["resistance"] = 7
+            else:
+                return False
+            return True
+
+        run = 0
+        for i, seg in enumerate(segments):
+            run = run + 1 if 5 <= seg["resistance"] <= 6 else 0
+            if run <= 2:
+                continue
+            # Fix the latest segment of the run that can move out of the 5-6 band
+            for j in (i, i - 1, i - 2):
+                if lift_or_drop(segments[j]):
+                    run = i - j
+                    break
+
+    @staticmethod
+    def _warmup_segments(picker: _Picker, seconds: int, difficulty: str) -> List[Dict[str, Any]]:
+        """Progressive warm-up; rides with a 4+ minute warm-up build over two segments"""
+        top = 4 if difficulty in ("hard", "intense") else 3
+        if seconds < 240:
+            steps = [(seconds, top)]
+        else:
+            half = seconds // 30 * 15
+            steps = [(half, 2), (seconds - half, top + 1 if top < 4 else top)]
+
+        segments = []
+        for i, (duration, resistance) in enumerate(steps):
+            segments.append({
+                "name": picker.name("warmup") if i == 0 else "Build the Warm Up",
+                "segment_type": "warmup",
+                "duration_seconds": duration,
+                "resistance": resistance,
+                "rpm_low": 80,
+                "rpm_high": 90,
+                "cue": picker.cue("warmup"),
+            })
+        return segments
+
+
+# ── Singleton ─────────────────────────────────────────────────────────────
+
+_local_generator_instance = None
+
+
+def get_local_spin_ride_generator() -> LocalSpinRideGenerator:
+    """Get or create the singleton LocalSpinRideGenerator instance."""
+    global _local_generator_instance
+    if _local_generator_instance is None:
+        _local_generator_instance = LocalSpinRideGenerator()
+    return _local_generator_instance
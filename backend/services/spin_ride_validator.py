@@ -20,6 +20,7 @@ Rules checked:
 - first segment is a warmup
 - ride does not start OR end with an all_out
 - all_out count is within [lo, hi] for the requested duration
+- no more than 2 consecutive segments at resistance 5-6 (the "too average" feel)
 - difficulty is one of the four valid values
 """
 
@@ -39,6 +40,9 @@ ALL_OUT_HARD_MAX_SECONDS = 60
 # Soft rule from the prompt: all-outs should be 15-45s.
 ALL_OUT_SOFT_MIN_SECONDS = 15
 ALL_OUT_SOFT_MAX_SECONDS = 45
+# Prompt rule: never sit at resistance 5-6 for more than 2 consecutive segments.
+MODERATE_RESISTANCE = range(5, 7)
+MAX_CONSECUTIVE_MODERATE = 2
 
 
 def _all_out_count_for_duration(duration_minutes: int) -> tuple[int, int]:
@@ -211,6 +215,16 @@ def validate_spin_ride_plan(
     if last_type == "cooldown":
         result.add_error("ride must not end with a cooldown — end on a working effort")
 
+    # --- Energy curve check ----------------------------------------------
+    run = 0
+    for idx, seg in enumerate(segments):
+        run = run + 1 if seg.get("resistance") in MODERATE_RESISTANCE else 0
+        if run == MAX_CONSECUTIVE_MODERATE + 1:
+            result.add_warning(
+                f"segments[{idx}] ({seg.get('name', '?')!r}): more than "
+                f"{MAX_CONSECUTIVE_MODERATE} consecutive segments at resistance 5-6"
+            )
+
     # --- All-out count check (only if caller told us what was requested) ---
     if include_all_outs is True:
         lo, hi = _all_out_count_for_duration(duration_minutes)
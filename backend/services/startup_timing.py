@@ -0,0 +1,81 @@
+"""
+Startup Timing - where a worker's cold start goes.
+
+main.py marks each phase of import and startup (router imports, app setup,
+each startup hook); services that connect on first use record how long that
+took as deferred work. The report is logged once the worker is ready and is
+included in /api/health, so a slow cold start can be traced to its phase
+without a profiler.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Phases slower than this are called out in the startup log
+SLOW_PHASE_MS = 100
+
+
+class StartupTiming:
+    """Elapsed time per startup phase, measured from when backend.main began importing"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.deferred: List[Tuple[str, float]] = []
+        self.ready_ms: Optional[float] = None
+        self._last = self.started
+        self._lock = threading.Lock()
+
+    def mark(self, phase: str) -> None:
+        """Close a phase that started at the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000))
+        self._last = now
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block (e.g. one startup hook) as its own phase"""
+        self._last = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name)
+
+    def forked(self) -> None:
+        """
+        Called in a production worker right after fork: the phases so far ran
+        once in the master, so the worker's own clock starts now.
+        """
+        self.mark("preloaded in master")
+        self.started = self._last
+
+    def record_deferred(self, name: str, seconds: float) -> None:
+        """Work moved out of startup (first-use connections), timed when it ran"""
+        with self._lock:
+            self.deferred.append((name, seconds * 1000))
+
+    def ready(self) -> None:
+        """Worker is about to accept requests: log the report"""
+        self.ready_ms = (time.perf_counter() - self.started) * 1000
+        slow = ", ".join(f"{name} {ms:.0f}ms" for name, ms in self.phases if ms >= SLOW_PHASE_MS)
+        logger.info(f"Startup ready in {self.ready_ms:.0f}ms" + (f" (slowest: {slow})" if slow else ""))
+        for name, ms in self.phases:
+            logger.debug(f"  {name}: {ms:.1f}ms")
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            deferred = {name: round(ms, 1) for name, ms in self.deferred}
+        return {
+            "ready_ms": round(self.ready_ms, 1) if self.ready_ms is not None else None,
+            "phases": {name: round(ms, 1) for name, ms in self.phases},
+            "deferred": deferred,
+        }
+
+
+# Global startup timing instance
+startup_timing = StartupTiming()
@@ -0,0 +1,164 @@
+"""
+Sync Service - changes-since feed for multi-device clients.
+
+Every write to a synced collection goes through a UnitOfWork, which stamps
+modified_date (commit time) and records deletes as tombstones. A device
+keeps an opaque cursor and asks for what changed after it:
+
+- each collection is read in (modified_date, document id) order, starting
+  after the cursor's position for that collection, so a page boundary inside
+  one batched commit (identical timestamps) never drops documents
+- a query sees every commit up to its read time and later commits get later
+  timestamps, so per-collection positions never miss a write
+- without a cursor, or with one older than the tombstone retention, the
+  response is a full snapshot and reset=True tells the client to replace its
+  local data rather than merge
+
+Documents written before modified_date stamping existed are only visible once
+backend/scripts/backfill_sync_fields.py has run.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models import CardioSession, Program, WorkoutSession, decode_workout
+from .unit_of_work import SYNCED_COLLECTIONS, TOMBSTONE_COLLECTION, TOMBSTONE_RETENTION_DAYS
+
+logger = logging.getLogger(__name__)
+
+CURSOR_VERSION = 1
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 500
+
+_PARSERS = {
+    'workouts': decode_workout,
+    'programs': lambda data: Program(**data),
+    'workout_sessions': lambda data: WorkoutSession(**data),
+    'cardio_sessions': lambda data: CardioSession(**data),
+}
+
+# (modified_date ISO, document id) per collection; an empty id means "after this time"
+Position = Tuple[str, str]
+
+
+def encode_cursor(positions: Dict[str, Position], issued_at: datetime) -> str:
+    payload = {'v': CURSOR_VERSION, 'at': issued_at.isoformat(), 'pos': positions}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Dict[str, Position], datetime]:
+    """Raises ValueError for cursors this server didn't issue"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        version = payload.get('v')
+        positions = {name: (str(pos[0]), str(pos[1])) for name, pos in payload['pos'].items()}
+        issued_at = datetime.fromisoformat(payload['at'])
+    except Exception:
+        raise ValueError("Invalid sync cursor; omit 'since' for a full sync")
+    if version != CURSOR_VERSION:
+        raise ValueError("Sync cursor is from an older version; omit 'since' for a full sync")
+    return positions, issued_at
+
+
+class SyncService:
+    """Builds changes-since pages across a user's synced collections"""
+
+    def __init__(self, data_service=None):
+        self._data_service = data_service
+
+    @property
+    def data_service(self):
+        if self._data_service is None:
+            from .firestore_data_service import firestore_data_service
+            self._data_service = firestore_data_service
+        return self._data_service
+
+    def _read_changes(self, user_id: str, collection: str, position: Optional[Position], limit: int) -> List[Any]:
+        """Up to limit + 1 docs after position, in (modified_date, id) order"""
+        from google.cloud.firestore_v1.field_path import FieldPath
+
+        query = (self.data_service.db.collection('users')
+                 .document(user_id)
+                 .collection(collection)
+                 .order_by('modified_date')
+                 .order_by(FieldPath.document_id()))
+        if position is not None:
+            modified, doc_id = position
+            if doc_id:
+                query = query.start_after({
+                    'modified_date': datetime.fromisoformat(modified),
+                    FieldPath.document_id(): doc_id,
+                })
+            else:
+                query = query.where('modified_date', '>', datetime.fromisoformat(modified))
+        return list(query.limit(limit + 1).stream())
+
+    async def changes_since(self, user_id: str, cursor: Optional[str] = None,
+                            limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        One page of changes after cursor (None for a full snapshot).
+
+        Raises:
+            ValueError: the cursor is malformed.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        now = datetime.now(timezone.utc)
+        positions: Dict[str, Position] = {}
+        reset = True
+        if cursor:
+            positions, issued_at = decode_cursor(cursor)
+            if issued_at.tzinfo is None:
+                issued_at = issued_at.replace(tzinfo=timezone.utc)
+            if now - issued_at <= timedelta(days=TOMBSTONE_RETENTION_DAYS):
+                reset = False
+            else:
+                logger.info(f"Sync cursor for user {user_id} predates tombstone retention; sending full snapshot")
+                positions = {}
+
+        if reset:
+            # Tombstones only matter for data the client already has: from a full
+            # snapshot on, only deletes after it started (with a margin for clock skew)
+            positions[TOMBSTONE_COLLECTION] = ((now - timedelta(minutes=1)).isoformat(), '')
+        sources = list(SYNCED_COLLECTIONS) + [TOMBSTONE_COLLECTION]
+        pages = await asyncio.gather(*[
+            asyncio.to_thread(self._read_changes, user_id, name, positions.get(name), limit)
+            for name in sources
+        ])
+
+        result: Dict[str, Any] = {name: [] for name in SYNCED_COLLECTIONS}
+        result['deleted'] = []
+        has_more = False
+        for name, docs in zip(sources, pages):
+            if len(docs) > limit:
+                has_more = True
+                docs = docs[:limit]
+            for doc in docs:
+                data = doc.to_dict()
+                try:
+                    if name == TOMBSTONE_COLLECTION:
+                        result['deleted'].append(data)
+                    else:
+                        data.setdefault('id', doc.id)
+                        result[name].append(_PARSERS[name](data))
+                except Exception as e:
+                    logger.warning(f"Skipping unparseable {name} doc {doc.id} in sync: {str(e)}")
+            if docs:
+                modified = docs[-1].to_dict().get('modified_date')
+                positions[name] = (modified.isoformat(), docs[-1].id)
+
+        result['cursor'] = encode_cursor(positions, now)
+        result['has_more'] = has_more
+        result['reset'] = reset
+
+        total = sum(len(result[name]) for name in SYNCED_COLLECTIONS) + len(result['deleted'])
+        logger.info(f"Sync for user {user_id}: {total} changes (reset={reset}, has_more={has_more})")
+        return result
+
+
+# Global sync service instance
+sync_service = SyncService()
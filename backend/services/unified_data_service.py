@@ -420,27 +420,15 @@ class UnifiedDataService:
         
         try:
             if is_authenticated:
-                # For Firestore, we'll export the data
-                programs = await service.get_user_programs(user_id, limit=1000)
-                workouts = await service.get_user_workouts(user_id, limit=1000)
-                
-                backup_data = {
-                    "backup_timestamp": datetime.now().isoformat(),
-                    "user_id": user_id,
-                    "programs": [program.dict() for program in programs],
-                    "workouts": [workout.dict() for workout in workouts]
-                }
-                
-                # Save to local backup file
-                import json
+                # Stream the full history export to disk (see GET /api/v3/user/data/export)
+                import asyncio
                 from pathlib import Path
+                from .history_export_service import history_export_service
                 backup_dir = Path("backend/backups")
                 backup_dir.mkdir(exist_ok=True)
-                backup_file = backup_dir / f"firestore_backup_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                
-                with open(backup_file, 'w', encoding='utf-8') as f:
-                    json.dump(backup_data, f, indent=2, default=str)
-                
+                backup_file = backup_dir / f"firestore_backup_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson.gz"
+
+                await asyncio.to_thread(history_export_service.export_to_file, user_id, str(backup_file))
                 return {"message": "Backup created successfully", "backup_file": str(backup_file)}
             else:
                 backup_file = service.backup_data()
@@ -0,0 +1,118 @@
+"""
+Unit of Work - One batched commit per mutating operation.
+
+Creating or deleting a workout/program used to write the entity, then update
+users/{uid} stats in a second round trip; if that second write failed the
+counters drifted. A UnitOfWork collects the entity writes, stat increments and
+the lastActivity stamp and commits them together:
+
+    with self.unit_of_work(user_id) as uow:
+        uow.set(workout_ref, workout_data)
+        uow.increment_stat('totalWorkouts')
+
+The batch is committed when the block exits normally and discarded if it
+raises. Stats are written with set(merge=True), so a user without a profile
+document doesn't fail the whole commit the way update() would; such a user
+gets a stats-only doc that create_user_profile() later fills in.
+
+Writes to the collections clients sync (SYNCED_COLLECTIONS) are stamped with
+modified_date, and deletes leave a tombstone in users/{uid}/sync_tombstones,
+so the changes-since feed (sync_service.py) sees every change.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from ..config.firebase_config import firestore
+
+logger = logging.getLogger(__name__)
+
+# Firestore's limit on writes per batch
+MAX_BATCH_WRITES = 500
+
+SYNCED_COLLECTIONS = ('workouts', 'programs', 'workout_sessions', 'cardio_sessions')
+TOMBSTONE_COLLECTION = 'sync_tombstones'
+# Tombstones carry expires_at for a Firestore TTL policy; cursors older than this get a full resync
+TOMBSTONE_RETENTION_DAYS = 90
+
+
+def _synced_collection(ref) -> Optional[str]:
+    name = ref.parent.id
+    return name if name in SYNCED_COLLECTIONS else None
+
+
+class UnitOfWork:
+    """Collects the writes of one user operation into a single batch"""
+
+    def __init__(self, db, user_id: str, touch_activity: bool = True):
+        self.db = db
+        self.user_id = user_id
+        self.touch_activity = touch_activity
+        self._batch = db.batch()
+        self._writes = 0
+        self._stats: Dict[str, int] = {}
+        self.results: Optional[List[Any]] = None
+
+    def __enter__(self) -> "UnitOfWork":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.commit()
+        return False
+
+    def _count(self) -> None:
+        self._writes += 1
+        if self._writes + 1 > MAX_BATCH_WRITES:  # one write is kept for the stats
+            raise ValueError(f"Unit of work exceeds {MAX_BATCH_WRITES} writes")
+
+    def set(self, ref, data: Dict[str, Any], merge: bool = False) -> None:
+        self._count()
+        self._batch.set(ref, self._stamped(ref, data), merge=merge)
+
+    def update(self, ref, data: Dict[str, Any]) -> None:
+        self._count()
+        self._batch.update(ref, self._stamped(ref, data))
+
+    def delete(self, ref) -> None:
+        self._count()
+        self._batch.delete(ref)
+        collection = _synced_collection(ref)
+        if collection:
+            self._count()
+            tombstone_ref = (self.db.collection('users')
+                            .document(self.user_id)
+                            .collection(TOMBSTONE_COLLECTION)
+                            .document(f"{collection}__{ref.id}"))
+            self._batch.set(tombstone_ref, {
+                'collection': collection,
+                'id': ref.id,
+                'deleted_at': firestore.SERVER_TIMESTAMP,
+                'modified_date': firestore.SERVER_TIMESTAMP,
+                'expires_at': datetime.now(timezone.utc) + timedelta(days=TOMBSTONE_RETENTION_DAYS),
+            })
+
+    @staticmethod
+    def _stamped(ref, data: Dict[str, Any]) -> Dict[str, Any]:
+        if 'modified_date' in data or not _synced_collection(ref):
+            return data
+        return {**data, 'modified_date': firestore.SERVER_TIMESTAMP}
+
+    def increment_stat(self, name: str, amount: int = 1) -> None:
+        """Adjust users/{uid}.stats.<name> in the same commit"""
+        self._stats[name] = self._stats.get(name, 0) + amount
+
+    def commit(self) -> List[Any]:
+        if self.results is not None:
+            return self.results
+
+        stats: Dict[str, Any] = {name: firestore.Increment(amount)
+                                 for name, amount in self._stats.items() if amount}
+        if self.touch_activity or stats:
+            stats['lastActivity'] = firestore.SERVER_TIMESTAMP
+            user_ref = self.db.collection('users').document(self.user_id)
+            self._batch.set(user_ref, {'stats': stats}, merge=True)
+
+        self.results = self._batch.commit()
+        return self.results
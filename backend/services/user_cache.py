@@ -0,0 +1,100 @@
+"""
+User Cache - Per-user in-process caches with a per-request snapshot.
+
+UserCache holds one value per user (e.g. their custom exercises or parsed
+favorites), bounded by LRU and TTL. Writes through the owning service call
+invalidate(); a per-user generation counter makes sure a read that started
+before the invalidation can't store its stale value afterwards.
+
+Inside request_snapshot() (entered for every HTTP request by
+middleware/request_snapshot.py) values are also pinned for the rest of the
+request, so repeated lookups share one value and skip the TTL check.
+Invalidation drops the pinned value too.
+"""
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+# (cache name, user_id) -> value, for the current request
+_request_values: contextvars.ContextVar[Optional[Dict[Tuple[str, str], Any]]] = \
+    contextvars.ContextVar("user_cache_request_values", default=None)
+
+
+@contextmanager
+def request_snapshot():
+    """Pin cached per-user values for the duration of the block (re-entrant)"""
+    if _request_values.get() is not None:
+        yield
+        return
+    token = _request_values.set({})
+    try:
+        yield
+    finally:
+        _request_values.reset(token)
+
+
+class UserCache:
+    """LRU + TTL cache of one value per user, with write invalidation and request pinning"""
+
+    def __init__(self, name: str, max_users: int = 500, ttl_seconds: int = 300):
+        self.name = name
+        self.max_users = max(1, max_users)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # user_id -> (timestamp, value)
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get_pinned(self, user_id: str) -> Optional[Any]:
+        pinned = _request_values.get()
+        return None if pinned is None else pinned.get((self.name, user_id))
+
+    def get(self, user_id: str) -> Optional[Any]:
+        """The request's pinned value, else the cached value if still fresh"""
+        value = self.get_pinned(user_id)
+        if value is not None:
+            return value
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            ts, value = entry
+            if time.time() - ts > self.ttl_seconds:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        self._pin(user_id, value)
+        return value
+
+    def generation(self, user_id: str) -> int:
+        """Take before reading from Firestore; pass to set()"""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def set(self, user_id: str, value: Any, generation: int) -> None:
+        """Store a freshly read value, unless the user was invalidated since the read began"""
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation:
+                return
+            self._entries[user_id] = (time.time(), value)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                # Generations are kept for evicted users: a read still in flight must not reset them
+                self._entries.popitem(last=False)
+        self._pin(user_id, value)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        pinned = _request_values.get()
+        if pinned is not None:
+            pinned.pop((self.name, user_id), None)
+
+    def _pin(self, user_id: str, value: Any) -> None:
+        pinned = _request_values.get()
+        if pinned is not None:
+            pinned[(self.name, user_id)] = value
@@ -7,5 +7,6 @@ that use HTML templates and Gotenberg for PDF generation.
 
 from .document_service_v2 import DocumentServiceV2
 from .gotenberg_client import GotenbergClient
+from .template_registry import TemplateRegistry, template_registry
 
-__all__ = ['DocumentServiceV2', 'GotenbergClient']
+__all__ = ['DocumentServiceV2', 'GotenbergClient', 'TemplateRegistry', 'template_registry']
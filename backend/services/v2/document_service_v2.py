@@ -1,4 +1,3 @@
-from jinja2 import Template, Environment, FileSystemLoader
 from pathlib import Path
 import tempfile
 import os
@@ -6,6 +5,7 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List
 from ...models import WorkoutData, Program, WorkoutTemplate, GenerateProgramDocumentRequest
 from .gotenberg_client import GotenbergClient
+from .template_registry import template_registry
 
 class DocumentServiceV2:
     """V2 Service for processing HTML templates and generating PDFs via Gotenberg"""
@@ -14,14 +14,9 @@ class DocumentServiceV2:
         self.temp_dir = Path("backend/uploads")
         self.temp_dir.mkdir(exist_ok=True)
         
-        # Set up Jinja2 environment for HTML templates
-        self.template_dir = Path("backend/templates/html")
-        self.template_dir.mkdir(exist_ok=True)
-        
-        self.jinja_env = Environment(
-            loader=FileSystemLoader(str(self.template_dir)),
-            autoescape=True
-        )
+        # HTML templates come from the shared, precompiled registry
+        self.template_dir = template_registry.template_dir
+        self.jinja_env = template_registry.env
         
         # Initialize Gotenberg client
         self.gotenberg_client = GotenbergClient()
@@ -38,14 +33,11 @@ class DocumentServiceV2:
             Generated HTML content as string
         """
         try:
-            # Load the HTML template
-            template = self.jinja_env.get_template(template_name)
-            
             # Create replacement dictionary
             template_vars = self._create_template_variables(workout_data)
             
             # Render the template with variables
-            html_content = template.render(**template_vars)
+            html_content = template_registry.render(template_name, **template_vars)
             
             return html_content
             
@@ -255,14 +247,11 @@ class DocumentServiceV2:
             Generated HTML content as string
         """
         try:
-            # Load the program template
-            template = self.jinja_env.get_template("program_template.html")
-            
             # Create template variables for the program
             template_vars = self._create_program_template_variables(program, workouts, request)
             
             # Render the template with variables
-            html_content = template.render(**template_vars)
+            html_content = template_registry.render("program_template.html", **template_vars)
             
             return html_content
             
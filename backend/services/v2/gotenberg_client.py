@@ -1,8 +1,12 @@
 import requests
 import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 import os
+import time
+
+# How long a health-check result is trusted before is_available() re-probes Gotenberg
+AVAILABILITY_TTL_SECONDS = 30
 
 class GotenbergClient:
     """Client for interacting with Gotenberg service for HTML to PDF conversion"""
@@ -15,16 +19,24 @@ class GotenbergClient:
             os.getenv('GOTENBERG_URL') or 
             f"https://{os.getenv('RAILWAY_SERVICE_GOTENBERG_URL', 'localhost:3000')}"
         )
-        self.available = False
-        self._check_availability()
+        self._available = False
+        self._checked_at = None  # probed on first use, not at construction
+    
+    @property
+    def available(self) -> bool:
+        """Last health-check result (probes Gotenberg on first access)"""
+        if self._checked_at is None:
+            self._check_availability()
+        return self._available
     
     def _check_availability(self):
         """Check if Gotenberg service is available"""
         try:
             response = requests.get(f"{self.gotenberg_url}/health", timeout=5)
-            self.available = response.status_code == 200
+            self._available = response.status_code == 200
         except Exception:
-            self.available = False
+            self._available = False
+        self._checked_at = time.monotonic()
     
     def html_to_pdf(self, html_content: str, filename: str = "document.pdf") -> Optional[Path]:
         """
@@ -100,10 +112,128 @@ class GotenbergClient:
             raise Exception(f"Error converting HTML to PDF: {str(e)}")
     
     def is_available(self) -> bool:
-        """Check if Gotenberg service is currently available"""
-        self._check_availability()
+        """Check if Gotenberg service is currently available (re-probed after AVAILABILITY_TTL_SECONDS)"""
+        if self._checked_at is None or time.monotonic() - self._checked_at > AVAILABILITY_TTL_SECONDS:
+            self._check_availability()
         return self.available
 
+    def html_to_pdf_bytes(self, html_content: str) -> bytes:
+        """
+        Convert HTML content to PDF using Gotenberg without touching disk
+
+        Uses the same A5 paper options as html_to_pdf, but uploads the HTML
+        from memory and returns the PDF bytes to the caller.
+
+        Args:
+            html_content: The HTML content to convert
+
+        Returns:
+            Raw PDF bytes
+        """
+        if not self.available:
+            raise Exception("Gotenberg service is not available")
+
+        data = {
+            'paperWidth': '5.83',
+            'paperHeight': '8.27',
+            'marginTop': '0.4',
+            'marginBottom': '0.4',
+            'marginLeft': '0.3',
+            'marginRight': '0.3',
+            'printBackground': 'true',
+            'preferCSSPageSize': 'true'
+        }
+
+        response = requests.post(
+            f"{self.gotenberg_url}/forms/chromium/convert/html",
+            files={'files': ('index.html', html_content.encode('utf-8'), 'text/html')},
+            data=data,
+            timeout=30
+        )
+        if response.status_code != 200:
+            raise Exception(f"Gotenberg conversion failed: {response.status_code} - {response.text}")
+        return response.content
+
+    def html_to_image_bytes(
+        self,
+        html_content: str,
+        width: int = 1080,
+        height: int = 1920,
+        format: str = "png"
+    ) -> bytes:
+        """
+        Convert HTML content to an image using Gotenberg without touching disk
+
+        Args:
+            html_content: The HTML content to convert
+            width: Image width in pixels (default 1080)
+            height: Image height in pixels (default 1920)
+            format: Image format - 'png' or 'jpeg' (default 'png')
+
+        Returns:
+            Raw image bytes
+        """
+        if not self.available:
+            raise Exception("Gotenberg service is not available")
+
+        # Same clip/tiling options as html_to_image (see Gotenberg #1065)
+        data = {
+            'width': str(width),
+            'height': str(height),
+            'clipX': '0',
+            'clipY': '0',
+            'clipWidth': str(width),
+            'clipHeight': str(height),
+            'captureBeyondViewport': 'false',
+            'deviceScaleFactor': '1',
+            'omitBackground': 'false',
+            'format': format,
+            'quality': '90',
+            'optimizeForSpeed': 'false',
+            'skipNetworkIdleEvent': 'false'
+        }
+
+        response = requests.post(
+            f"{self.gotenberg_url}/forms/chromium/screenshot/html",
+            files={'files': ('index.html', html_content.encode('utf-8'), 'text/html')},
+            data=data,
+            timeout=30
+        )
+        if response.status_code != 200:
+            raise Exception(f"Gotenberg screenshot failed: {response.status_code} - {response.text}")
+        return response.content
+
+    def merge_pdfs(self, pdfs: List[bytes]) -> bytes:
+        """
+        Merge several PDFs into one document using Gotenberg's PDF engines
+
+        Gotenberg merges files in alphanumeric filename order, so parts are
+        uploaded as 0001.pdf, 0002.pdf, ... to preserve the given order.
+
+        Args:
+            pdfs: PDF documents in the order they should appear
+
+        Returns:
+            Raw bytes of the merged PDF
+        """
+        if not self.available:
+            raise Exception("Gotenberg service is not available")
+        if len(pdfs) == 1:
+            return pdfs[0]
+
+        files = [
+            ('files', (f"{i:04d}.pdf", pdf, 'application/pdf'))
+            for i, pdf in enumerate(pdfs, start=1)
+        ]
+        response = requests.post(
+            f"{self.gotenberg_url}/forms/pdfengines/merge",
+            files=files,
+            timeout=60
+        )
+        if response.status_code != 200:
+            raise Exception(f"Gotenberg merge failed: {response.status_code} - {response.text}")
+        return response.content
+
     def html_to_image(
         self,
         html_content: str,
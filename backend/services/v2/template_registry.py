@@ -0,0 +1,139 @@
+"""
+Shared Jinja2 template registry for HTML document generation.
+
+One Environment for every template under backend/templates/html, backed by a
+filesystem bytecode cache so compiled templates survive process restarts.
+Render times are recorded per template as fixed-bucket histograms.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).parent.parent.parent / "templates" / "html"
+BYTECODE_CACHE_DIR = Path(
+    os.getenv("JINJA_BYTECODE_CACHE_DIR", str(Path(tempfile.gettempdir()) / "ghostgym_jinja_cache"))
+)
+
+# Histogram bucket upper bounds in milliseconds (last bucket is +Inf)
+RENDER_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class _RenderHistogram:
+    """Cumulative render-time histogram for a single template"""
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(RENDER_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float):
+        for i, bound in enumerate(RENDER_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.bucket_counts[i] += 1
+                break
+        else:
+            self.bucket_counts[-1] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in RENDER_BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.bucket_counts)),
+        }
+
+
+class TemplateRegistry:
+    """Process-wide Jinja2 environment with precompilation and render timing"""
+
+    def __init__(self, template_dir: Path = TEMPLATE_DIR, cache_dir: Optional[Path] = BYTECODE_CACHE_DIR):
+        self.template_dir = Path(template_dir)
+
+        bytecode_cache = None
+        if cache_dir is not None:
+            try:
+                Path(cache_dir).mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+            except OSError as e:
+                logger.warning(f"Jinja bytecode cache disabled ({cache_dir}): {str(e)}")
+
+        self.env = Environment(
+            loader=FileSystemLoader(str(self.template_dir)),
+            autoescape=True,
+            bytecode_cache=bytecode_cache
+        )
+        self._histograms: Dict[str, _RenderHistogram] = {}
+        self._lock = threading.Lock()
+        self.precompiled: List[str] = []
+        self.precompile_ms = 0.0
+
+    def precompile(self) -> int:
+        """
+        Load (and compile, or fetch from bytecode cache) every HTML template.
+
+        Returns:
+            Number of templates compiled
+        """
+        start = time.perf_counter()
+        compiled = []
+        for path in sorted(self.template_dir.glob("*.html")):
+            if path.name.startswith("~"):
+                continue
+            try:
+                self.env.get_template(path.name)
+                compiled.append(path.name)
+            except Exception as e:
+                logger.error(f"Failed to precompile template {path.name}: {str(e)}")
+
+        self.precompiled = compiled
+        self.precompile_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Precompiled {len(compiled)} HTML templates in {self.precompile_ms:.1f}ms")
+        return len(compiled)
+
+    def get_template(self, template_name: str) -> Template:
+        """Get a compiled template from the shared environment"""
+        return self.env.get_template(template_name)
+
+    def render(self, template_name: str, **context) -> str:
+        """Render a template by name, recording the render time"""
+        template = self.env.get_template(template_name)
+        start = time.perf_counter()
+        try:
+            return template.render(**context)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                histogram = self._histograms.get(template_name)
+                if histogram is None:
+                    histogram = self._histograms[template_name] = _RenderHistogram()
+                histogram.observe(elapsed_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Render-time histograms per template plus precompile info"""
+        with self._lock:
+            templates = {name: hist.to_dict() for name, hist in sorted(self._histograms.items())}
+        return {
+            "precompiled_templates": self.precompiled,
+            "precompile_ms": round(self.precompile_ms, 3),
+            "bytecode_cache": self.env.bytecode_cache is not None,
+            "bucket_bounds_ms": list(RENDER_BUCKETS_MS),
+            "templates": templates,
+        }
+
+
+# Global template registry instance
+template_registry = TemplateRegistry()
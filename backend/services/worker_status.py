@@ -0,0 +1,57 @@
+"""
+Worker Status - identity and load of this server process.
+
+Under the production launcher (gunicorn.conf.py) several workers serve the
+app; post_fork() calls start() in each one so /api/health can report which
+worker answered, how long it has run and how close it is to max-requests
+recycling. Under the single-process dev server start() is never called and
+the process reports itself as worker 1.
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+
+class WorkerStatus:
+    """Counters for the current process, updated by WorkerStatusMiddleware"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.worker_id = 1
+        self.server = "uvicorn"
+        self.max_requests = 0
+        self.started_at = time.time()
+        self.requests = 0
+        self.in_flight = 0
+        # Shared state loaded by the server master before forking
+        self.preloaded: List[str] = []
+
+    def start(self, worker_id: int, max_requests: int = 0, server: str = "gunicorn") -> None:
+        """Called in a freshly forked worker; counters inherited from the master are reset"""
+        self.pid = os.getpid()
+        self.worker_id = worker_id
+        self.server = server
+        self.max_requests = max_requests
+        self.started_at = time.time()
+        self.requests = 0
+        self.in_flight = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {
+            "pid": self.pid,
+            "worker_id": self.worker_id,
+            "server": self.server,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "preloaded": self.preloaded,
+        }
+        if self.max_requests:
+            status["max_requests"] = self.max_requests
+            status["requests_until_recycle"] = max(0, self.max_requests - self.requests)
+        return status
+
+
+# Global worker status instance
+worker_status = WorkerStatus()
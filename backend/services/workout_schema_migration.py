@@ -0,0 +1,339 @@
+"""
+Workout Schema Migration - Background job that rewrites legacy workout docs once.
+
+Workouts saved before schema_version existed may have only exercise_groups
+(or only sections). Reads normalize those in memory via decode_workout; this
+job rewrites them in place with both formats populated and stamps
+CURRENT_WORKOUT_SCHEMA_VERSION, after which reads are a straight decode.
+
+The job pages through the `workouts` collection group in document-path order
+and checkpoints the last path it processed to migrations/workout_schema_v<N>, so an
+interrupted run resumes where it stopped. Rewrites are idempotent: running it
+again only touches docs still below the current version.
+
+One process runs it at a time: a run claims a lease on the checkpoint doc
+(lease_owner, lease_expires_at) and renews it with every page checkpoint,
+each write guarded by the doc's update_time. If the owner dies (a recycled or
+crashed worker) the lease expires after WORKOUT_MIGRATION_LEASE_SECONDS and
+any other process can claim it and resume from the checkpoint.
+"""
+
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.firebase_config import firestore, FieldPath
+from ..models import CURRENT_WORKOUT_SCHEMA_VERSION, WorkoutTemplate, normalize_workout_schema
+
+logger = logging.getLogger(__name__)
+
+# Documents read per page; rewrites are committed once per page (Firestore caps batches at 500)
+WORKOUT_MIGRATION_PAGE_SIZE = min(int(os.getenv("WORKOUT_MIGRATION_PAGE_SIZE", "300")), 500)
+
+# Commits of one page before giving up when its workouts keep being saved
+MAX_PAGE_ATTEMPTS = 3
+
+# How long a run's claim survives without a checkpoint write renewing it
+WORKOUT_MIGRATION_LEASE_SECONDS = int(os.getenv("WORKOUT_MIGRATION_LEASE_SECONDS", "120"))
+
+CHECKPOINT_COLLECTION = "migrations"
+CHECKPOINT_DOCUMENT = f"workout_schema_v{CURRENT_WORKOUT_SCHEMA_VERSION}"
+
+
+def _is_user_workout(doc) -> bool:
+    """Only users/{uid}/workouts/{id}; the collection group also matches the legacy root collection"""
+    owner = doc.reference.parent.parent
+    return owner is not None and owner.parent.id == "users"
+
+
+class MigrationLeaseHeld(Exception):
+    """Another process holds (or just took) the migration's lease"""
+
+
+def migrated_workout_fields(workout_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields to write so a legacy workout doc matches the current schema"""
+    workout = normalize_workout_schema(WorkoutTemplate(**workout_data))
+    return {
+        "sections": [s.model_dump() for s in workout.sections] if workout.sections else None,
+        "exercise_groups": [g.model_dump() for g in workout.exercise_groups],
+        "schema_version": CURRENT_WORKOUT_SCHEMA_VERSION,
+    }
+
+
+class WorkoutSchemaMigration:
+    """Resumable, checkpointed rewrite of legacy workout documents"""
+
+    def __init__(self, db=None, page_size: int = WORKOUT_MIGRATION_PAGE_SIZE,
+                 lease_seconds: int = WORKOUT_MIGRATION_LEASE_SECONDS):
+        self._db = db
+        self.page_size = max(1, min(page_size, 500))
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._running = False
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            from .firestore_data_service import firestore_data_service
+            self._db = firestore_data_service.db
+        return self._db
+
+    def is_available(self) -> bool:
+        return firestore is not None and self.db is not None
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def _checkpoint_ref(self):
+        return self.db.collection(CHECKPOINT_COLLECTION).document(CHECKPOINT_DOCUMENT)
+
+    @staticmethod
+    def _owner() -> str:
+        # Read per run: the pid changes when a worker forks
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def _lease_fields(self) -> Dict[str, Any]:
+        return {
+            "lease_owner": self._owner(),
+            "lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds),
+        }
+
+    def _claim(self, reset: bool) -> Tuple[Dict[str, Any], Optional[datetime]]:
+        """
+        Take the lease unless another live owner holds it.
+
+        Returns:
+            (checkpoint, update_time of the claiming write); update_time is None
+            when the migration already completed and nothing was claimed
+
+        Raises:
+            MigrationLeaseHeld: another process holds the lease or claimed it first
+        """
+        checkpoint_ref = self._checkpoint_ref()
+        snapshot = checkpoint_ref.get()
+        checkpoint = snapshot.to_dict() if snapshot.exists else {}
+        if checkpoint.get("completed") and not reset:
+            return checkpoint, None
+
+        owner, expires_at = checkpoint.get("lease_owner"), checkpoint.get("lease_expires_at")
+        if owner and owner != self._owner() and expires_at and expires_at > datetime.now(timezone.utc):
+            raise MigrationLeaseHeld(f"Workout schema migration is running in {owner} (lease until {expires_at})")
+
+        fields = self._lease_fields()
+        if reset or not snapshot.exists:
+            checkpoint = {}
+            fields.update({
+                "cursor": None, "completed": False, "scanned": 0, "migrated": 0,
+                "started_at": firestore.SERVER_TIMESTAMP,
+            })
+        try:
+            if snapshot.exists:
+                write_result = checkpoint_ref.update(
+                    fields, option=self.db.write_option(last_update_time=snapshot.update_time)
+                )
+            else:
+                write_result = checkpoint_ref.create(fields)
+        except Exception as e:
+            from google.api_core.exceptions import AlreadyExists, FailedPrecondition
+            if isinstance(e, (AlreadyExists, FailedPrecondition)):
+                raise MigrationLeaseHeld("Another process claimed the workout schema migration") from e
+            raise
+        logger.info(f"Claimed the workout schema migration lease as {fields['lease_owner']}")
+        return checkpoint, write_result.update_time
+
+    def _write_checkpoint(self, fields: Dict[str, Any], lease_time: datetime) -> datetime:
+        """Update the checkpoint if we still hold the lease; returns the new update_time"""
+        try:
+            write_result = self._checkpoint_ref().update(
+                fields, option=self.db.write_option(last_update_time=lease_time)
+            )
+        except Exception as e:
+            from google.api_core.exceptions import FailedPrecondition
+            if isinstance(e, FailedPrecondition):
+                raise MigrationLeaseHeld("Lost the workout schema migration lease to another process") from e
+            raise
+        return write_result.update_time
+
+    def get_status(self) -> Dict[str, Any]:
+        """Stored checkpoint plus whether a run is active in this process"""
+        status = {"running": self._running, "schema_version": CURRENT_WORKOUT_SCHEMA_VERSION}
+        if self.is_available():
+            doc = self._checkpoint_ref().get()
+            status["checkpoint"] = doc.to_dict() if doc.exists else None
+        if self.last_result:
+            status["last_result"] = self.last_result
+        return status
+
+    def run(self, max_docs: Optional[int] = None, dry_run: bool = False, reset: bool = False) -> Dict[str, Any]:
+        """
+        Rewrite legacy workout docs, resuming from the stored checkpoint.
+
+        Blocking; call from a thread (asyncio.to_thread) when inside the app.
+        Raises MigrationLeaseHeld if another process is running it (dry runs
+        don't write, so they don't need the lease).
+
+        Args:
+            max_docs: Stop after scanning this many docs (the next run resumes from there)
+            dry_run: Count what would change without writing docs or the checkpoint
+            reset: Ignore the stored checkpoint and scan from the beginning
+
+        Returns:
+            Dict with scanned/migrated/failed counts and whether the scan completed
+        """
+        if not self.is_available():
+            raise Exception("Firestore not available - cannot migrate workouts")
+
+        with self._lock:
+            if self._running:
+                raise Exception("Workout schema migration is already running")
+            self._running = True
+
+        try:
+            result = self._run(max_docs, dry_run, reset)
+            self.last_result = result
+            return result
+        finally:
+            self._running = False
+
+    def _run(self, max_docs: Optional[int], dry_run: bool, reset: bool) -> Dict[str, Any]:
+        lease_time = None
+        if dry_run:
+            checkpoint = {} if reset else (self._checkpoint_ref().get().to_dict() or {})
+        else:
+            checkpoint, lease_time = self._claim(reset)
+        if checkpoint.get("completed") and not reset:
+            logger.info("Workout schema migration already completed")
+            return {**checkpoint, "scanned": 0, "migrated": 0, "failed": 0}
+
+        try:
+            return self._migrate(checkpoint, max_docs, dry_run, lease_time)
+        except MigrationLeaseHeld:
+            raise
+        except Exception:
+            if lease_time is not None:
+                self._release(lease_time)
+            raise
+
+    def _release(self, lease_time: datetime) -> None:
+        """Give up the lease early so another process can resume (best effort)"""
+        try:
+            self._write_checkpoint({"lease_owner": None, "lease_expires_at": None}, lease_time)
+        except Exception as e:
+            logger.warning(f"Could not release the workout schema migration lease: {str(e)}")
+
+    @staticmethod
+    def _migrated_fields(doc, totals: Dict[str, int]) -> Optional[Dict[str, Any]]:
+        """Fields to write for a workout snapshot, or None when it's current or unreadable"""
+        data = doc.to_dict() if doc.exists else None
+        if data is None or data.get("schema_version", 1) >= CURRENT_WORKOUT_SCHEMA_VERSION:
+            return None
+        try:
+            return migrated_workout_fields(data)
+        except Exception as e:
+            totals["failed"] += 1
+            logger.warning(f"Skipping workout {doc.reference.path}: {str(e)}")
+            return None
+
+    def _commit_page(self, updates: List[Tuple[Any, Dict[str, Any]]], totals: Dict[str, int]) -> int:
+        """
+        Commit a page's rewrites, each guarded by the update_time it was read
+        at, so a workout saved in between isn't overwritten with stale fields.
+        When one was, the page is re-read: docs the save already brought to the
+        current version are skipped, the rest are retried. Returns docs rewritten.
+        """
+        for attempt in range(MAX_PAGE_ATTEMPTS):
+            batch = self.db.batch()
+            for doc, fields in updates:
+                batch.update(doc.reference, fields, option=self.db.write_option(last_update_time=doc.update_time))
+            try:
+                batch.commit()
+                return len(updates)
+            except Exception as e:
+                from google.api_core.exceptions import FailedPrecondition
+                if not isinstance(e, FailedPrecondition):
+                    raise
+            logger.info(f"Workouts changed while migrating a page; re-reading (attempt {attempt + 1})")
+
+            fresh = list(self.db.get_all([doc.reference for doc, _ in updates]))
+            updates = []
+            for doc in fresh:
+                fields = self._migrated_fields(doc, totals)
+                if fields is not None:
+                    updates.append((doc, fields))
+            if not updates:
+                return 0
+        raise Exception(f"Workouts kept changing during migration ({MAX_PAGE_ATTEMPTS} attempts)")
+
+    def _migrate(self, checkpoint: Dict[str, Any], max_docs: Optional[int], dry_run: bool,
+                 lease_time: Optional[datetime]) -> Dict[str, Any]:
+        cursor_path = checkpoint.get("cursor")
+        totals = {"scanned": 0, "migrated": 0, "failed": 0}
+        completed = False
+
+        while max_docs is None or totals["scanned"] < max_docs:
+            query = self.db.collection_group("workouts").order_by(FieldPath.document_id()).limit(self.page_size)
+            if cursor_path:
+                query = query.start_after({FieldPath.document_id(): self.db.document(cursor_path)})
+
+            docs = list(query.stream())
+            if not docs:
+                completed = True
+                break
+
+            updates = []
+            for doc in docs:
+                totals["scanned"] += 1
+                if _is_user_workout(doc):
+                    fields = self._migrated_fields(doc, totals)
+                    if fields is not None:
+                        updates.append((doc, fields))
+
+            cursor_path = docs[-1].reference.path
+            pending = len(updates)
+            if not dry_run and updates:
+                pending = self._commit_page(updates, totals)
+            totals["migrated"] += pending
+            if not dry_run:
+                lease_time = self._write_checkpoint({
+                    "cursor": cursor_path,
+                    "completed": False,
+                    "updated_at": firestore.SERVER_TIMESTAMP,
+                    "scanned": firestore.Increment(len(docs)),
+                    "migrated": firestore.Increment(pending),
+                    **self._lease_fields(),
+                }, lease_time)
+
+            logger.info(f"Workout schema migration: {totals['scanned']} scanned, {totals['migrated']} migrated")
+            if len(docs) < self.page_size:
+                completed = True
+                break
+
+        if completed and not dry_run:
+            self._write_checkpoint({
+                "completed": True,
+                "completed_at": firestore.SERVER_TIMESTAMP,
+                "updated_at": firestore.SERVER_TIMESTAMP,
+                "lease_owner": None,
+                "lease_expires_at": None,
+            }, lease_time)
+        elif not dry_run:
+            self._release(lease_time)
+
+        result = {
+            **totals,
+            "completed": completed,
+            "dry_run": dry_run,
+            "cursor": cursor_path,
+            "finished_at": datetime.now().isoformat(),
+        }
+        logger.info(f"Workout schema migration finished: {result}")
+        return result
+
+
+# Global workout schema migration instance
+workout_schema_migration = WorkoutSchemaMigration()
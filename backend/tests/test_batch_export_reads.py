@@ -0,0 +1,43 @@
+"""Batch export reads its workouts and weights in batched calls"""
+
+import asyncio
+
+from backend.services.firestore_session_ops import FirestoreSessionOps
+from backend.services.firestore_workout_ops import FirestoreWorkoutOps
+from backend.services.memory_firestore import LatencyModel, MemoryFirestore
+
+
+class _Service(FirestoreWorkoutOps, FirestoreSessionOps):
+    def __init__(self, db):
+        self.db = db
+
+    def is_available(self):
+        return True
+
+
+def _service(workout_count):
+    db = MemoryFirestore(latency=LatencyModel(0, 0))
+    documents = {}
+    for i in range(workout_count):
+        documents[f"users/user/workouts/w{i}"] = {"id": f"w{i}", "name": f"Workout {i}"}
+        documents[f"users/user/exercise_history/w{i}_Squat"] = {
+            "id": f"w{i}_Squat", "workout_id": f"w{i}", "exercise_name": "Squat", "last_weight": str(100 + i),
+        }
+    db.load(documents)
+    return _Service(db)
+
+
+def test_get_workouts_by_ids_skips_missing():
+    service = _service(3)
+    workouts = asyncio.run(service.get_workouts_by_ids("user", ["w2", "missing", "w0"]))
+    assert set(workouts) == {"w0", "w2"}
+    assert workouts["w2"].name == "Workout 2"
+
+
+def test_exercise_histories_span_in_query_batches():
+    service = _service(35)
+    ids = [f"w{i}" for i in range(35)] + ["w-none"]
+    histories = asyncio.run(service.get_exercise_histories_for_workouts("user", ids))
+    assert len(histories) == 36
+    assert histories["w34"]["Squat"].last_weight == "134"
+    assert histories["w-none"] == {}
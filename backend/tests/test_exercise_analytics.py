@@ -0,0 +1,48 @@
+"""An exercise logged twice in one session is one merged entry in its series"""
+
+from datetime import datetime
+
+import pytest
+
+from backend.services.exercise_analytics import KG_PER_LB, ExerciseAnalyticsService, ExerciseSeries
+from backend.services.memory_firestore import LatencyModel, MemoryFirestore
+
+
+def _session():
+    return {
+        "id": "session-1",
+        "status": "completed",
+        "completed_at": datetime(2024, 3, 1, 18, 0),
+        "exercises_performed": [
+            {"exercise_name": "Bench Press", "weight": "100", "weight_unit": "lbs",
+             "sets_completed": 3, "target_reps": "5"},
+            {"exercise_name": "Bench Press", "weight": "50", "weight_unit": "kg",
+             "sets_completed": 2, "target_reps": "8"},
+        ],
+    }
+
+
+def _series(db):
+    doc = db.document("users/user/analytics/bench-press").get()
+    return ExerciseSeries.from_doc(doc.to_dict())
+
+
+def _assert_merged(series):
+    assert len(series) == 1
+    c = series.columns
+    assert c["top_weight"][0] == pytest.approx(50 / KG_PER_LB, rel=1e-4)
+    assert c["volume"][0] == pytest.approx(100 * 5 * 3 + 50 / KG_PER_LB * 8 * 2, rel=1e-4)
+    assert c["sets"][0] == 5
+
+
+def test_apply_sessions_merges_repeated_exercise():
+    db = MemoryFirestore(latency=LatencyModel(0, 0))
+    ExerciseAnalyticsService(db).apply_sessions("user", [_session()])
+    _assert_merged(_series(db))
+
+
+def test_rebuild_merges_repeated_exercise():
+    db = MemoryFirestore(latency=LatencyModel(0, 0))
+    db.load({"users/user/workout_sessions/session-1": _session()})
+    ExerciseAnalyticsService(db).rebuild("user")
+    _assert_merged(_series(db))
@@ -0,0 +1,67 @@
+"""Regression tests for typo-tolerant exercise name matching"""
+
+from backend.models import Exercise
+from backend.services.exercise_resolver import (
+    AUTO_MATCH_SCORE,
+    ExerciseNameIndex,
+    ExerciseResolver,
+    normalize_name,
+    score_names,
+)
+
+
+class _Snapshot:
+    def __init__(self, exercises):
+        self.exercises = exercises
+        self.checksum = "test"
+
+
+class _ExerciseService:
+    def __init__(self, names, custom_names=()):
+        self.snapshot = _Snapshot([Exercise(id=f"global-{i}", name=name) for i, name in enumerate(names)])
+        self.custom = [Exercise(id=f"custom-{i}", name=name) for i, name in enumerate(custom_names)]
+
+    def get_catalog_snapshot(self):
+        return self.snapshot
+
+    def get_user_custom_exercises(self, user_id, limit=1000):
+        return self.custom
+
+
+def _match(catalog, name, custom_names=()):
+    resolver = ExerciseResolver(_ExerciseService(catalog, custom_names))
+    return resolver.match_many([name], user_id="user" if custom_names else None)[name]
+
+
+def test_typo_still_auto_matches():
+    matched = _match(["Barbell Bench Press"], "Barbell Bnech Press")
+    assert matched is not None and matched.name == "Barbell Bench Press"
+
+
+def test_abduction_is_not_adduction():
+    assert _match(["Lever Seated Hip Adduction"], "Lever Seated Hip Abduction") is None
+    assert _match(["Lever Seated Hip Abduction"], "Lever Seated Hip Adduction") is None
+
+
+def test_hack_squat_is_not_back_squat():
+    assert _match(["Back Squat"], "Hack Squat") is None
+    assert _match(["Hack Squat"], "Back Squat") is None
+
+
+def test_word_known_to_either_index_is_not_a_typo():
+    # "Brunch" is only in the user's custom names, one edit from the global "Crunch"
+    assert _match(["Cable Crunch"], "Cable Brunch", custom_names=["Brunch Walk"]) is None
+
+
+def test_known_word_is_still_suggested():
+    index = ExerciseNameIndex([Exercise(id="1", name="Lever Seated Hip Adduction")], "global")
+    query = normalize_name("Lever Seated Hip Abduction")
+    scores = dict((key, score) for score, key in index.candidates(query))
+    assert 0.5 <= scores[normalize_name("Lever Seated Hip Adduction")] < AUTO_MATCH_SCORE
+
+
+def test_score_names_scale():
+    assert score_names("bench press", "bench press") == 1.0
+    assert score_names("press bench", "bench press") == 0.95
+    assert score_names("bnech press", "bench press") == 0.9
+    assert score_names("hack squat", "back squat") < AUTO_MATCH_SCORE
@@ -0,0 +1,58 @@
+"""Migrated counts survive retried and repeated chunk commits"""
+
+import asyncio
+
+from backend.services.memory_firestore import LatencyModel, MemoryFirestore
+from backend.services.migration_pipeline import MigrationPipeline
+
+
+class _FirestoreService:
+    def __init__(self, db):
+        self.db = db
+        self.stats = None
+
+    async def update_user_stats(self, user_id, stats):
+        self.stats = stats
+
+
+class _CommitThenFail:
+    """Batch whose first commit applies and then reports an error (deadline after apply)"""
+
+    failures = 1
+
+    def __init__(self, batch):
+        self._batch = batch
+
+    def __getattr__(self, name):
+        return getattr(self._batch, name)
+
+    def commit(self):
+        result = self._batch.commit()
+        if _CommitThenFail.failures:
+            _CommitThenFail.failures -= 1
+            raise RuntimeError("Deadline exceeded")
+        return result
+
+
+def _payload():
+    workouts = [{"id": f"workout-{i}", "name": f"Workout {i}", "exercise_groups": []} for i in range(5)]
+    programs = [{"id": "program-1", "name": "Program", "workouts": []}]
+    return programs, workouts
+
+
+def test_retried_commit_is_counted_once():
+    db = MemoryFirestore(latency=LatencyModel(0, 0))
+    batch = db.batch
+    db.batch = lambda: _CommitThenFail(batch())
+    service = _FirestoreService(db)
+    pipeline = MigrationPipeline(service, batch_size=2)
+
+    programs, workouts = _payload()
+    result = asyncio.run(pipeline.run("user", programs, workouts))
+    assert result["success"]
+    assert (result["migrated_workouts"], result["migrated_programs"]) == (5, 1)
+
+    # Re-posting the same payload resumes without counting anything again
+    result = asyncio.run(pipeline.run("user", programs, workouts))
+    assert (result["migrated_workouts"], result["migrated_programs"]) == (5, 1)
+    assert (service.stats["totalWorkouts"], service.stats["totalPrograms"]) == (5, 1)
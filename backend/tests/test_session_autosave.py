@@ -0,0 +1,33 @@
+"""A coalesced autosave isn't lost when the request that started its batch goes away"""
+
+import asyncio
+from datetime import datetime, timezone
+
+from backend.models import SessionAutosaveRequest
+from backend.services.memory_firestore import LatencyModel, MemoryFirestore
+from backend.services.session_autosave import SessionAutosaver
+
+
+class _DataService:
+    def __init__(self):
+        self.db = MemoryFirestore(latency=LatencyModel(0, 0))
+        self.db.load({"users/user/workout_sessions/session": {
+            "id": "session", "workout_id": "workout", "workout_name": "Push",
+            "started_at": datetime.now(timezone.utc), "status": "in_progress",
+            "exercises_performed": [],
+        }})
+
+
+def test_follower_gets_result_when_leader_is_cancelled():
+    async def scenario():
+        autosaver = SessionAutosaver(_DataService(), coalesce_ms=50)
+        leader = asyncio.ensure_future(autosaver.autosave("user", "session", SessionAutosaveRequest(notes="first")))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(autosaver.autosave("user", "session", SessionAutosaveRequest(notes="second")))
+        await asyncio.sleep(0.01)
+        leader.cancel()  # client disconnected during the coalescing window
+        return await follower
+
+    result = asyncio.run(scenario())
+    assert result["coalesced"] == 2
+    assert result["session"].notes == "second"
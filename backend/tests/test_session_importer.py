@@ -0,0 +1,23 @@
+"""Import rows with out-of-range values are counted as invalid, not fatal"""
+
+import io
+
+from backend.services.memory_firestore import LatencyModel, MemoryFirestore
+from backend.services.session_importer import SessionImporter
+
+
+class _FirestoreService:
+    def __init__(self):
+        self.db = MemoryFirestore(latency=LatencyModel(0, 0))
+
+
+def test_negative_values_are_invalid_rows():
+    rows = b"\n".join([
+        b'{"date": "2024-02-01", "exercise": "Squat", "reps": -3}',
+        b'{"date": "2024-02-01", "exercise": "Pull Up", "weight": -20, "reps": 5}',
+        b'{"date": "2024-02-01", "exercise": "Bench Press", "weight": 100, "reps": 5}',
+    ])
+    report = SessionImporter(_FirestoreService()).run("user", io.BytesIO(rows), "ndjson")
+
+    assert report["invalid_rows"] == 2
+    assert report["rows"] == 1 and report["sessions"] == 1
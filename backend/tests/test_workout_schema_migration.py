@@ -0,0 +1,85 @@
+"""The workout schema migration's lease: one runner at a time, taken over when it expires"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.models import CURRENT_WORKOUT_SCHEMA_VERSION
+from backend.services.memory_firestore import LatencyModel, MemoryFirestore
+from backend.services.workout_schema_migration import (
+    CHECKPOINT_COLLECTION,
+    CHECKPOINT_DOCUMENT,
+    MigrationLeaseHeld,
+    WorkoutSchemaMigration,
+)
+
+
+@pytest.fixture
+def db():
+    db = MemoryFirestore(latency=LatencyModel(0, 0))
+    db.load({f"users/u{i}/workouts/w{i}": {"id": f"w{i}", "name": "Workout", "exercise_groups": []}
+             for i in range(5)})
+    return db
+
+
+def _migration(db, owner):
+    migration = WorkoutSchemaMigration(db=db, page_size=2)
+    migration._owner = lambda: owner
+    return migration
+
+
+def _checkpoint(db):
+    return db.document(CHECKPOINT_COLLECTION, CHECKPOINT_DOCUMENT).get().to_dict()
+
+
+def test_live_lease_blocks_other_runners(db):
+    _migration(db, "host:1")._claim(reset=False)
+    with pytest.raises(MigrationLeaseHeld):
+        _migration(db, "host:2").run()
+
+
+def test_expired_lease_is_taken_over_and_resumed(db):
+    first = _migration(db, "host:1")
+    first.run(max_docs=2)
+    _, lease_time = first._claim(reset=False)
+    db.document(CHECKPOINT_COLLECTION, CHECKPOINT_DOCUMENT).update(
+        {"lease_expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)}
+    )
+
+    result = _migration(db, "host:2").run()
+    assert result["completed"] and result["scanned"] == 3
+    assert _checkpoint(db)["migrated"] == 5
+    assert _checkpoint(db)["lease_owner"] is None
+
+    # The old owner's next checkpoint write is rejected
+    with pytest.raises(MigrationLeaseHeld):
+        first._write_checkpoint({"cursor": None}, lease_time)
+
+
+def test_workout_saved_during_a_page_is_not_overwritten(db):
+    saved = {"id": "w1", "name": "Edited", "exercise_groups": [], "sections": [],
+             "schema_version": CURRENT_WORKOUT_SCHEMA_VERSION}
+    batch = db.batch
+
+    class SaveBeforeCommit:
+        """The user saves w1 after the page was read, just before the migration commits"""
+
+        def __init__(self):
+            self._batch = batch()
+
+        def __getattr__(self, name):
+            return getattr(self._batch, name)
+
+        def commit(self):
+            db.document("users/u1/workouts/w1").set(saved)
+            db.batch = batch
+            return self._batch.commit()
+
+    db.batch = SaveBeforeCommit
+    result = _migration(db, "host:1").run()
+
+    assert result["completed"] and result["failed"] == 0
+    assert db.document("users/u1/workouts/w1").get().to_dict() == saved
+    assert result["migrated"] == 4
+    for i in (0, 2, 3, 4):
+        assert db.document(f"users/u{i}/workouts/w{i}").get().to_dict()["schema_version"] == CURRENT_WORKOUT_SCHEMA_VERSION
@@ -2,7 +2,7 @@
  * Ghost Gym - Auto Save Service
  * Manages auto-saving of workout sessions to the server
  * Extracted from WorkoutSessionService for single responsibility
- * @version 1.0.0
+ * @version 1.1.0
  * @date 2026-02-06
  */
 
@@ -10,6 +10,9 @@ class AutoSaveService {
     constructor(options = {}) {
         // State
         this.autoSaveTimer = null;
+        // Last saved exercises (name -> JSON) per session, the baseline for delta saves
+        this.savedSessionId = null;
+        this.savedExercises = new Map();
 
         // Callbacks for session service coordination
         this.onGetCurrentSession = options.onGetCurrentSession || (() => null);
@@ -49,24 +52,16 @@ class AutoSaveService {
                 throw new Error('Authentication required');
             }
 
-            // Use centralized API config
-            const url = window.config.api.getUrl(`/api/v3/workout-sessions/${currentSession.id}`);
-
-            const response = await fetch(url, {
-                method: 'PUT',
-                headers: {
-                    'Authorization': `Bearer ${token}`,
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    exercises_performed: exercisesPerformed
-                })
-            });
+            const deltas = this.buildExerciseDeltas(currentSession.id, exercisesPerformed);
+            // First save of a session (or after a reload) sends everything
+            const response = (deltas && await this.saveDeltas(currentSession.id, deltas, token))
+                || await this.saveFull(currentSession.id, exercisesPerformed, token);
 
             if (!response.ok) {
                 throw new Error(`Failed to save: ${response.statusText}`);
             }
 
+            this.rememberSaved(currentSession.id, exercisesPerformed);
             console.log('✅ Session auto-saved');
             this.onNotify('sessionSaved', { sessionId: currentSession.id });
 
@@ -80,6 +75,100 @@ class AutoSaveService {
         }
     }
 
+    /**
+     * Changes since the last successful save, one entry per changed exercise
+     * @param {string} sessionId - Session being saved
+     * @param {Array} exercisesPerformed - Current exercise data
+     * @returns {Array|null} Exercise deltas for the autosave endpoint, or null without a baseline
+     */
+    buildExerciseDeltas(sessionId, exercisesPerformed) {
+        if (this.savedSessionId !== sessionId) {
+            return null;
+        }
+        const saved = this.savedExercises;
+        const deltas = [];
+        const seen = new Set();
+
+        for (const exercise of exercisesPerformed) {
+            const name = exercise.exercise_name;
+            seen.add(name);
+            const before = saved.has(name) ? JSON.parse(saved.get(name)) : null;
+            const { exercise_name, set_details = [], ...fields } = exercise;
+
+            const changedFields = {};
+            for (const [key, value] of Object.entries(fields)) {
+                if (!before || JSON.stringify(before[key]) !== JSON.stringify(value)) {
+                    changedFields[key] = value;
+                }
+            }
+
+            const previousSets = new Map((before?.set_details || []).map(s => [s.set_number, JSON.stringify(s)]));
+            const changedSets = set_details.filter(s => previousSets.get(s.set_number) !== JSON.stringify(s));
+            const currentNumbers = new Set(set_details.map(s => s.set_number));
+            for (const setNumber of previousSets.keys()) {
+                if (!currentNumbers.has(setNumber)) changedSets.push({ set_number: setNumber, remove: true });
+            }
+
+            if (Object.keys(changedFields).length || changedSets.length) {
+                deltas.push({ exercise_name, fields: changedFields, set_details: changedSets });
+            }
+        }
+
+        for (const name of saved.keys()) {
+            if (!seen.has(name)) deltas.push({ exercise_name: name, remove: true });
+        }
+        return deltas;
+    }
+
+    /**
+     * Send deltas to the autosave endpoint
+     * @returns {Promise<Response|null>} Response, or null to fall back to a full save
+     */
+    async saveDeltas(sessionId, deltas, token) {
+        const url = window.config.api.getUrl(`/api/v3/workout-sessions/${sessionId}/autosave`);
+        try {
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Authorization': `Bearer ${token}`,
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ exercises: deltas })
+            });
+            // 400: the server's copy diverged from our baseline; resend everything
+            return response.ok || response.status === 409 ? response : null;
+        } catch (error) {
+            console.warn('⚠️ Delta autosave failed, sending full session:', error);
+            return null;
+        }
+    }
+
+    /**
+     * Send the full exercise list (original autosave)
+     * @returns {Promise<Response>}
+     */
+    async saveFull(sessionId, exercisesPerformed, token) {
+        const url = window.config.api.getUrl(`/api/v3/workout-sessions/${sessionId}`);
+        return fetch(url, {
+            method: 'PUT',
+            headers: {
+                'Authorization': `Bearer ${token}`,
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                exercises_performed: exercisesPerformed
+            })
+        });
+    }
+
+    /**
+     * Record what the server now has, as the baseline for the next delta
+     */
+    rememberSaved(sessionId, exercisesPerformed) {
+        this.savedSessionId = sessionId;
+        this.savedExercises = new Map(exercisesPerformed.map(ex => [ex.exercise_name, JSON.stringify(ex)]));
+    }
+
     /**
      * Schedule an auto-save with a delay
      * @param {Function} callback - Callback to execute
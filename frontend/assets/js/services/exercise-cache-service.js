@@ -177,8 +177,50 @@ class ExerciseCacheService {
         return this.fetchPromise;
     }
     
+    /**
+     * Fetch the whole catalog as one dictionary-encoded snapshot blob.
+     * Returns null when the server has no current snapshot.
+     */
+    async fetchSnapshot() {
+        try {
+            this.metrics.apiRequests++;
+            const response = await fetch(window.getApiUrl('/api/v3/exercises/snapshot'));
+            if (!response.ok) return null;
+
+            const { count, columns, dictionaries } = await response.json();
+            const decoded = Object.entries(columns).map(([field, column]) => {
+                const dictionary = dictionaries[field];
+                if (!dictionary) return [field, column];
+                return [field, column.map(value => Array.isArray(value)
+                    ? value.map(code => dictionary[code])
+                    : (value === null ? null : dictionary[value]))];
+            });
+
+            const exercises = new Array(count);
+            for (let i = 0; i < count; i++) {
+                const exercise = {};
+                for (const [field, column] of decoded) {
+                    exercise[field] = column[i];
+                }
+                exercises[i] = exercise;
+            }
+            return exercises;
+        } catch (error) {
+            console.warn('[ExerciseCache] Snapshot fetch failed, falling back to paged fetch:', error);
+            return null;
+        }
+    }
+
     async fetchFromServer(options = {}) {
         const { maxTier = 2 } = options;
+
+        const snapshot = await this.fetchSnapshot();
+        if (snapshot) {
+            return maxTier
+                ? snapshot.filter(ex => ex.exerciseTier !== null && ex.exerciseTier <= maxTier)
+                : snapshot;
+        }
+
         const PAGE_SIZE = 500;
         let allExercises = [];
         let page = 1;
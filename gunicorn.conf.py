@@ -0,0 +1,75 @@
+"""
+Gunicorn configuration for the production launcher (python run.py --production)
+
+Runs uvicorn workers sized to the container's CPU quota. The app is imported
+once in the master, which also preloads read-only state (compiled templates,
+exercise catalog snapshot) so forked workers share it. Workers are recycled
+after MAX_REQUESTS (+ jitter) requests and drain in-flight requests for up
+to GRACEFUL_TIMEOUT seconds on deploy (SIGTERM).
+
+Environment:
+    PORT                  Listen port (default 8001)
+    WEB_CONCURRENCY       Worker count (default: CPU quota, rounded up)
+    MAX_WORKERS           Upper bound for the computed worker count (default 8)
+    MAX_REQUESTS          Requests before a worker is recycled (default 5000, 0 = never)
+    MAX_REQUESTS_JITTER   Random extra requests so workers don't recycle together (default 500)
+    GRACEFUL_TIMEOUT      Seconds to finish in-flight requests on shutdown (default 30)
+    WORKER_TIMEOUT        Seconds without a heartbeat before a worker is killed (default 120)
+"""
+
+import math
+import os
+
+from backend.config.cpu import cpu_quota
+
+
+def default_workers() -> int:
+    return max(1, min(math.ceil(cpu_quota()), int(os.getenv("MAX_WORKERS", "8"))))
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8001')}"
+workers = int(os.getenv("WEB_CONCURRENCY") or default_workers())
+# Workers inherit it, so per-worker pools (DOCX rendering) split the quota between them
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+
+preload_app = True
+max_requests = int(os.getenv("MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "500"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+loglevel = "info"
+
+
+def when_ready(server):
+    """Master, after the app is imported and before workers fork"""
+    from backend.main import preload_shared_state
+
+    preload_shared_state()
+    server.log.info(f"Preloaded shared state; starting {server.num_workers} worker(s)")
+
+
+def pre_fork(server, worker):
+    """Master, before forking: give the worker the lowest free slot (1..workers)"""
+    # worker.age grows with every recycle; a reused slot keeps the worker id (a
+    # /metrics label) bounded by the worker count
+    used = {getattr(w, "slot", None) for w in server.WORKERS.values()}
+    worker.slot = next(slot for slot in range(1, len(used) + 2) if slot not in used)
+
+
+def post_fork(server, worker):
+    """Worker, right after fork: give it its own identity and counters"""
+    from backend.services.startup_timing import startup_timing
+    from backend.services.worker_status import worker_status
+
+    startup_timing.forked()
+    # worker.max_requests includes this worker's jitter; it is sys.maxsize when recycling is off
+    worker_status.start(worker.slot, max_requests=worker.max_requests if server.cfg.max_requests else 0)
+
+
+def worker_exit(server, worker):
+    server.log.info(f"Worker {worker.slot} (pid {worker.pid}, spawn {worker.age}) exited")
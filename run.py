@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """
-Development server launcher for Fitness Field Notes
+Server launcher for Fitness Field Notes
 Modern HTML/PDF generation with Gotenberg integration
+
+    python run.py                 Development server (single uvicorn process)
+    python run.py --production    Production server: gunicorn with uvicorn workers,
+                                  configured by gunicorn.conf.py
 """
 
 import uvicorn
@@ -9,6 +13,17 @@ import os
 import sys
 from pathlib import Path
 
+
+def run_production():
+    """Replace this process with the multi-worker gunicorn master"""
+    project_root = Path(__file__).parent
+    os.chdir(project_root)
+    config = project_root / "gunicorn.conf.py"
+    print(f"[INFO] Starting production server (gunicorn, config {config.name})")
+    sys.stdout.flush()
+    os.execvp(sys.executable, [sys.executable, "-m", "gunicorn", "-c", str(config), "backend.main:app"])
+
+
 def main():
     """Launch the V2 development server"""
     
@@ -86,4 +101,7 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
+    if "--production" in sys.argv[1:]:
+        run_production()
+    else:
+        main()
@@ -3,18 +3,25 @@ Download exercise GIF thumbnails from ExerciseDB and update seed data to use loc
 
 Usage:
     python scripts/download-exercise-gifs.py
+    python scripts/download-exercise-gifs.py --workers 16
 
 Downloads all exercise GIFs referenced in exercise-seed-data.js to
 frontend/assets/img/exercises/ and updates the seed data URLs to local paths.
+Downloads run in a bounded thread pool; frontend/assets/img/exercises/manifest.json
+records a SHA-256 per file, so re-runs skip unchanged GIFs and an interrupted
+run resumes from the last checkpoint.
 """
 
+import argparse
 import json
 import re
-import time
-import urllib.request
-import urllib.error
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.catalog_sync import DEFAULT_DOWNLOAD_WORKERS, download_media  # noqa: E402
+
 SEED_DATA_PATH = Path("frontend/assets/js/data/exercise-seed-data.js")
 OUTPUT_DIR = Path("frontend/assets/img/exercises")
 BASE_URL = "https://static.exercisedb.dev/media"
@@ -32,25 +39,6 @@ def parse_seed_data():
     return json.loads(match.group(1))
 
 
-def download_gif(exercise_db_id: str, output_path: Path) -> bool:
-    """Download a single GIF with retries. Returns True on success."""
-    url = f"{BASE_URL}/{exercise_db_id}.gif"
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                data = resp.read()
-                output_path.write_bytes(data)
-                size_kb = len(data) / 1024
-                print(f"  OK ({size_kb:.0f} KB)")
-                return True
-        except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError) as e:
-            print(f"  Attempt {attempt}/{MAX_RETRIES} failed: {e}")
-            if attempt < MAX_RETRIES:
-                time.sleep(2 * attempt)
-    return False
-
-
 def update_seed_data():
     """Replace external gifUrl values with local paths in the seed data file."""
     content = SEED_DATA_PATH.read_text(encoding="utf-8")
@@ -65,7 +53,11 @@ def update_seed_data():
 
 
 def main():
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    parser = argparse.ArgumentParser(description="Download exercise GIFs and point seed data at local copies")
+    parser.add_argument("--workers", type=int, default=DEFAULT_DOWNLOAD_WORKERS, help="Concurrent downloads")
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES, help="Attempts per file")
+    args = parser.parse_args()
+
     exercises = parse_seed_data()
 
     # Collect exercises with exerciseDbId
@@ -73,37 +65,34 @@ def main():
         ex for ex in exercises
         if ex.get("exerciseDbId") and ex.get("gifUrl", "").startswith("http")
     ]
+    names = {f"{ex['exerciseDbId']}.gif": ex["name"] for ex in to_download}
 
     print(f"Found {len(to_download)} exercises with external GIF URLs.\n")
 
-    success = 0
-    failed = []
-    skipped = 0
-
-    for i, ex in enumerate(to_download, 1):
-        db_id = ex["exerciseDbId"]
-        out_path = OUTPUT_DIR / f"{db_id}.gif"
+    done = 0
 
-        # Skip if already downloaded
-        if out_path.exists() and out_path.stat().st_size > 0:
-            print(f"[{i}/{len(to_download)}] {ex['name']} — already exists, skipping")
-            skipped += 1
-            success += 1
-            continue
+    def report(filename, status):
+        nonlocal done
+        done += 1
+        if status not in ("skipped", "adopted"):
+            print(f"[{done}/{len(names)}] {names.get(filename, filename)} — {status}")
 
-        print(f"[{i}/{len(to_download)}] {ex['name']} ({db_id})...", end="")
-        if download_gif(db_id, out_path):
-            success += 1
-        else:
-            failed.append(ex["name"])
+    result = download_media(
+        ((f"{ex['exerciseDbId']}.gif", f"{BASE_URL}/{ex['exerciseDbId']}.gif") for ex in to_download),
+        OUTPUT_DIR,
+        max_workers=args.workers,
+        retries=args.retries,
+        progress=report,
+    )
 
     print(f"\n{'='*50}")
-    print(f"Results: {success} OK, {len(failed)} failed, {skipped} skipped (already existed)")
+    print(f"Results: {result['downloaded']} downloaded, {result['unchanged']} unchanged, "
+          f"{result['skipped'] + result['adopted']} skipped (already current), {result['failed']} failed")
 
-    if failed:
+    if result["failures"]:
         print(f"\nFailed exercises:")
-        for name in failed:
-            print(f"  - {name}")
+        for filename, error in result["failures"]:
+            print(f"  - {names.get(filename, filename)}: {error}")
 
     # Update seed data URLs to local paths
     update_seed_data()
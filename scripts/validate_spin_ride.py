@@ -15,6 +15,9 @@ Usage:
     # Generate a ride live via the API and validate the response:
     python scripts/validate_spin_ride.py --generate 30 --difficulty hard --all-outs
 
+    # Same, using the local (non-AI) generator:
+    python scripts/validate_spin_ride.py --generate 30 --local -n 20
+
 Exit codes:
     0 = no errors (warnings allowed)
     1 = validation errors
@@ -39,8 +42,16 @@ def _load_plan_from_path(path: str) -> dict:
         return json.load(f)
 
 
-def _generate_plan(duration: int, difficulty: str, include_all_outs: bool) -> dict:
-    """Call the generator directly (requires GEMINI_API_KEY)."""
+def _generate_plan(duration: int, difficulty: str, include_all_outs: bool, local: bool = False) -> dict:
+    """Call the generator directly (Gemini requires GEMINI_API_KEY)."""
+    if local:
+        from backend.services.spin_ride_local_generator import get_local_spin_ride_generator
+        return get_local_spin_ride_generator().generate(
+            duration_minutes=duration,
+            include_all_outs=include_all_outs,
+            difficulty=difficulty,
+        )
+
     from dotenv import load_dotenv
     load_dotenv()
     from backend.services.spin_ride_generator import get_spin_ride_generator
@@ -99,6 +110,11 @@ def main() -> int:
         default=1,
         help="Number of generations to validate when using --generate (default: 1).",
     )
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="With --generate, use the local rule-based generator instead of Gemini.",
+    )
 
     args = parser.parse_args()
 
@@ -124,7 +140,7 @@ def main() -> int:
         print(f"\n=== Run {i + 1}/{args.runs} — {args.generate}min {args.difficulty} "
               f"{'(with all-outs)' if include else '(no all-outs)'} ===")
         try:
-            plan = _generate_plan(args.generate, args.difficulty, include)
+            plan = _generate_plan(args.generate, args.difficulty, include, local=args.local)
         except Exception as e:  # noqa: BLE001 — surface any generator failure
             print(f"ERROR: generation failed: {type(e).__name__}: {e}", file=sys.stderr)
             total_errors += 1